@@ -8,6 +8,10 @@ import logging
 from typing import Dict, Any, List, Tuple
 from datetime import datetime
 
+import numpy as np
+
+from .agent_evaluation import AgentEvaluation, evaluate_agents, ACTIONS, BUY, SELL, HOLD
+
 logger = logging.getLogger(__name__)
 
 
@@ -45,107 +49,132 @@ class AgentCoordinatorImproved:
         Returns:
             Decisão consolidada com voting results
         """
-        if not self.agents:
-            return {
-                'decision': 'HOLD',
-                'confidence': 0.0,
-                'reason': 'Nenhum agente disponível',
-                'votes': {}
-            }
+        symbol = market_data.get('symbol', '')
+        return self.coordinate_decisions({symbol: market_data}, group_id)[symbol]
+    
+    def coordinate_decisions(
+        self,
+        market_data_by_symbol: Dict[str, Dict[str, Any]],
+        group_id: str = "G1"
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Coordena decisões para vários símbolos de uma vez
         
-        # Coletar análises de todos os agentes
-        agent_analyses = []
-        for agent in self.agents:
-            try:
-                analysis = agent.analyze_market(market_data)
-                agent_analyses.append(analysis)
-            except Exception as e:
-                logger.error(f"Erro ao analisar com agente {agent.agent_id}: {e}")
+        Indicadores são calculados uma vez por símbolo e as regras de todos
+        os agentes avaliadas em lote; a contagem de votos é vetorizada.
         
-        if not agent_analyses:
+        Args:
+            market_data_by_symbol: Dict símbolo -> dados do mercado
+            group_id: Grupo de agentes (G1 ou G2)
+        
+        Returns:
+            Dict símbolo -> decisão consolidada
+        """
+        if not self.agents:
             return {
-                'decision': 'HOLD',
-                'confidence': 0.0,
-                'reason': 'Nenhuma análise válida',
-                'votes': {}
+                symbol: {
+                    'decision': 'HOLD',
+                    'confidence': 0.0,
+                    'reason': 'Nenhum agente disponível',
+                    'votes': {}
+                }
+                for symbol in market_data_by_symbol
             }
         
+        # Avaliar todos os agentes sobre todos os símbolos
+        evaluation = evaluate_agents([(agent.agent_id, agent) for agent in self.agents], market_data_by_symbol)
+        evaluation.record_decisions()
+        
         # Sistema de voting
-        votes = self._count_votes(agent_analyses, group_id)
-        
-        # Decisão final baseada em consensus
-        decision, confidence, reason = self._make_consensus_decision(votes, agent_analyses)
-        
-        # Armazenar no histórico
-        decision_record = {
-            'timestamp': datetime.utcnow().isoformat(),
-            'decision': decision,
-            'confidence': confidence,
-            'reason': reason,
-            'votes': votes,
-            'num_agents': len(agent_analyses)
-        }
-        self.history.append(decision_record)
+        votes_by_symbol = self._count_votes(evaluation, group_id)
+        
+        results = {}
+        for s, symbol in enumerate(evaluation.symbols):
+            num_agents = int(evaluation.valid[:, s].sum())
+            if num_agents == 0:
+                results[symbol] = {
+                    'decision': 'HOLD',
+                    'confidence': 0.0,
+                    'reason': 'Nenhuma análise válida',
+                    'votes': {}
+                }
+                continue
+            
+            # Decisão final baseada em consensus
+            votes = votes_by_symbol[s]
+            decision, confidence, reason = self._make_consensus_decision(votes, evaluation, s)
+            
+            # Armazenar no histórico
+            decision_record = {
+                'timestamp': datetime.utcnow().isoformat(),
+                'decision': decision,
+                'confidence': confidence,
+                'reason': reason,
+                'votes': votes,
+                'num_agents': num_agents
+            }
+            self.history.append(decision_record)
+            results[symbol] = decision_record
         
         # Manter histórico limitado (últimas 100 decisões)
         if len(self.history) > 100:
             self.history = self.history[-100:]
         
-        return decision_record
+        return results
     
-    def _count_votes(self, analyses: List[Dict[str, Any]], group_id: str) -> Dict[str, Any]:
+    def _count_votes(self, evaluation: AgentEvaluation, group_id: str) -> List[Dict[str, Any]]:
         """
-        Conta votos ponderados dos agentes
+        Conta votos ponderados dos agentes (vetorizado sobre agentes x símbolos)
         
         Args:
-            analyses: Lista de análises dos agentes
+            evaluation: Avaliação dos agentes
             group_id: ID do grupo para pesos
         
         Returns:
-            Contagem de votos por sinal
+            Contagem de votos por sinal, um dict por símbolo
         """
         weights = self.group_weights.get(group_id, {})
+        agent_weights = np.array([weights.get(agent_id, 0.1) for agent_id in evaluation.agent_ids])[:, None]
         
-        votes = {
-            'BUY': {'count': 0, 'weighted_score': 0.0, 'confidence_sum': 0.0},
-            'SELL': {'count': 0, 'weighted_score': 0.0, 'confidence_sum': 0.0},
-            'HOLD': {'count': 0, 'weighted_score': 0.0, 'confidence_sum': 0.0}
-        }
+        confidence = np.where(evaluation.valid, evaluation.confidence, 0.0)
+        per_signal = {}
+        for code in (BUY, SELL, HOLD):
+            mask = evaluation.valid & (evaluation.actions == code)
+            per_signal[ACTIONS[code]] = (
+                mask.sum(axis=0),
+                np.where(mask, agent_weights * confidence, 0.0).sum(axis=0),
+                np.where(mask, confidence, 0.0).sum(axis=0)
+            )
         
-        for analysis in analyses:
-            signal = analysis.get('signal', 'HOLD')
-            confidence = analysis.get('confidence', 0.0)
-            agent_id = analysis.get('agent_id', 'unknown')
-            
-            # Peso do agente
-            weight = weights.get(agent_id, 0.1)
-            
-            if signal in votes:
-                votes[signal]['count'] += 1
-                votes[signal]['weighted_score'] += weight * confidence
-                votes[signal]['confidence_sum'] += confidence
-        
-        # Calcular médias
-        for signal in votes:
-            if votes[signal]['count'] > 0:
-                votes[signal]['avg_confidence'] = votes[signal]['confidence_sum'] / votes[signal]['count']
-            else:
-                votes[signal]['avg_confidence'] = 0.0
-        
-        return votes
+        votes_by_symbol = []
+        for s in range(len(evaluation.symbols)):
+            votes = {}
+            for signal, (count, weighted_score, confidence_sum) in per_signal.items():
+                count_s = int(count[s])
+                votes[signal] = {
+                    'count': count_s,
+                    'weighted_score': float(weighted_score[s]),
+                    'confidence_sum': float(confidence_sum[s]),
+                    # Calcular médias
+                    'avg_confidence': float(confidence_sum[s]) / count_s if count_s > 0 else 0.0
+                }
+            votes_by_symbol.append(votes)
+        
+        return votes_by_symbol
     
-    def _make_consensus_decision(self, votes: Dict[str, Any], analyses: List[Dict]) -> Tuple[str, float, str]:
+    def _make_consensus_decision(self, votes: Dict[str, Any], evaluation: AgentEvaluation, symbol_index: int) -> Tuple[str, float, str]:
         """
         Toma decisão baseada em consensus
         
         Args:
-            votes: Votos contados
-            analyses: Análises originais dos agentes
+            votes: Votos contados do símbolo
+            evaluation: Avaliação dos agentes
+            symbol_index: Coluna do símbolo na avaliação
         
         Returns:
             (decision, confidence, reason)
         """
-        total_agents = len(analyses)
+        total_agents = int(evaluation.valid[:, symbol_index].sum())
         
         # Encontrar sinal com maior score ponderado
         max_signal = max(votes.items(), key=lambda x: x[1]['weighted_score'])
@@ -168,17 +197,15 @@ class AgentCoordinatorImproved:
             decision = 'HOLD'
             reason = f'Consensus abaixo do threshold ({confidence:.2%} < {self.threshold:.2%})'
         else:
-            # Coletar razões dos agentes que votaram no sinal vencedor
-            reasons = []
-            for analysis in analyses:
-                if analysis.get('signal') == decision:
-                    agent_reason = analysis.get('reason', '')
-                    if agent_reason:
-                        reasons.append(agent_reason)
-            
             reason = f'{vote_count}/{total_agents} agentes votaram {decision}'
-            if reasons:
-                reason += f': {reasons[0]}'  # Primeira razão como exemplo
+            
+            # Primeira razão dos agentes que votaram no sinal vencedor como exemplo
+            code = ACTIONS.index(decision)
+            for a in np.flatnonzero(evaluation.valid[:, symbol_index] & (evaluation.actions[:, symbol_index] == code)):
+                agent_reason = evaluation.analysis(int(a), symbol_index).get('reason', '')
+                if agent_reason:
+                    reason += f': {agent_reason}'
+                    break
         
         return decision, min(confidence, 1.0), reason
     
@@ -0,0 +1,641 @@
+# ai/agents/agent_evaluation.py
+"""
+Motor de Avaliação de Agentes - Votação multi-agente vetorizada
+Calcula o conjunto de indicadores uma vez por símbolo (NumPy, vários
+símbolos por vez) e avalia as regras de todos os agentes sobre ele,
+produzindo arrays de (ação, confiança) agente x símbolo
+"""
+
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Tuple, Optional, Callable
+
+import numpy as np
+
+from .intelligent_agent import IntelligentAgent
+from .real_agent_logic import RealAgentLogic, TechnicalIndicators
+
+logger = logging.getLogger(__name__)
+
+# Códigos de ação nos arrays (-1 = sinal desconhecido de agente genérico)
+HOLD, BUY, SELL = 0, 1, 2
+ACTIONS = ('HOLD', 'BUY', 'SELL')
+_ACTION_CODES = {name: code for code, name in enumerate(ACTIONS)}
+
+# Caso "dados insuficientes" (comum a todas as famílias de regras)
+_INSUFFICIENT = -1
+
+# Métodos que, se sobrescritos, obrigam a avaliar o agente individualmente
+_INTELLIGENT_AGENT_METHODS = (
+    'analyze_market', '_make_decision', '_calculate_rsi', '_calculate_macd',
+    '_calculate_bollinger', '_analyze_volume', '_analyze_trend'
+)
+
+
+def _truthy(values: np.ndarray) -> np.ndarray:
+    """Equivalente vetorizado de `if valor:` para indicadores opcionais (None/NaN/0)"""
+    return ~np.isnan(values) & (values != 0)
+
+
+def _opt(value: float) -> Optional[float]:
+    return None if np.isnan(value) else float(value)
+
+
+class MarketIndicators:
+    """
+    Indicadores compartilhados de um grupo de símbolos com o mesmo número
+    de candles; cada indicador é calculado uma vez (por parâmetro) para
+    todos os símbolos do grupo
+    """
+
+    def __init__(self, symbols: List[str], market_data: List[Dict[str, Any]]):
+        self.symbols = symbols
+        self.closes, self.highs, self.lows, self.volumes = (
+            np.array([d.get(key) or [] for d in market_data], dtype=np.float64)
+            for key in ('closes', 'highs', 'lows', 'volumes')
+        )
+        self._cache: Dict[Tuple, Any] = {}
+
+    @property
+    def n_closes(self) -> int:
+        return self.closes.shape[1]
+
+    @property
+    def n_volumes(self) -> int:
+        return self.volumes.shape[1]
+
+    @property
+    def price(self) -> np.ndarray:
+        return self.closes[:, -1] if self.n_closes else np.full(len(self.symbols), np.nan)
+
+    @property
+    def complete(self) -> bool:
+        """Critério de RealAgentLogic: closes/highs/lows/volumes com pelo menos 30 candles"""
+        return min(a.shape[1] for a in (self.closes, self.highs, self.lows, self.volumes)) >= 30
+
+    def _cached(self, key: Tuple, compute: Callable[[], Any]) -> Any:
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def ema(self, period: int) -> np.ndarray:
+        """EMA do último candle (NaN se faltar dado, como TechnicalIndicators.ema)"""
+        period = int(period)
+        return self._cached(('ema', period), lambda: (
+            TechnicalIndicators.ema_matrix(self.closes, period)[:, -1]
+            if self.n_closes >= period else np.full(len(self.symbols), np.nan)
+        ))
+
+    def rsi(self, period: int = 14) -> np.ndarray:
+        return self._cached(('rsi', period), lambda: TechnicalIndicators.rsi_matrix(self.closes, period))
+
+    def macd(self, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return self._cached(('macd', fast, slow, signal),
+                            lambda: TechnicalIndicators.macd_matrix(self.closes, fast, slow, signal))
+
+    def bollinger(self, period: int = 20, std_dev: float = 2.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return self._cached(('bollinger', period, std_dev),
+                            lambda: TechnicalIndicators.bollinger_matrix(self.closes, period, std_dev))
+
+    def volume(self, period: int = 20) -> Tuple[np.ndarray, np.ndarray]:
+        return self._cached(('volume', period), lambda: TechnicalIndicators.volume_ratio_matrix(self.volumes, period))
+
+    def atr(self, period: int = 14) -> np.ndarray:
+        def compute():
+            if not (self.highs.shape == self.lows.shape == self.closes.shape):
+                return np.full(len(self.symbols), np.nan)
+            return TechnicalIndicators.atr_matrix(self.highs, self.lows, self.closes, period)
+        return self._cached(('atr', period), compute)
+
+    def trend_change_pct(self) -> np.ndarray:
+        """Variação % da média dos últimos 5 candles sobre os 5 anteriores"""
+        def compute():
+            recent = self.closes[:, -5:].mean(axis=1)
+            previous = self.closes[:, -10:-5].mean(axis=1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return np.where(previous > 0, ((recent - previous) / previous) * 100, 0.0)
+        return self._cached(('trend',), compute)
+
+    def range_levels(self, lookback: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(suporte, resistência) dos últimos `lookback` candles"""
+        return self._cached(('range', lookback), lambda: (
+            self.lows[:, -lookback:].min(axis=1), self.highs[:, -lookback:].max(axis=1)
+        ))
+
+
+def _per_agent(values_for: Callable[..., np.ndarray], *params: np.ndarray) -> np.ndarray:
+    """Monta um array agente x símbolo calculando o indicador uma vez por combinação de parâmetros"""
+    keys = list(zip(*(p[:, 0].tolist() for p in params)))
+    rows = {key: values_for(*key) for key in set(keys)}
+    return np.stack([rows[key] for key in keys])
+
+
+# ----------------------------------------------------------------------
+# Regras por família de agente
+# Cada avaliador recebe os indicadores do grupo e os parâmetros dos
+# agentes (arrays A x 1) e devolve (ação, confiança, caso) em A x S; o
+# caso identifica o ramo da regra para montar a razão sob demanda.
+# ----------------------------------------------------------------------
+
+def _eval_scored(ind: MarketIndicators, p: Dict[str, np.ndarray]):
+    """Regras de pontuação do IntelligentAgent"""
+    shape = (p['rsi_oversold'].shape[0], len(ind.symbols))
+    if ind.n_closes < 20:
+        return np.full(shape, HOLD), np.zeros(shape), np.full(shape, _INSUFFICIENT)
+
+    price = ind.price
+    zero = np.zeros(len(ind.symbols), dtype=int)
+
+    rsi = ind.rsi(14)
+    rsi_buy = (rsi < p['rsi_oversold']).astype(int)
+    rsi_sell = (rsi > p['rsi_overbought']).astype(int)
+
+    if ind.n_closes >= 26:
+        macd, signal, hist = ind.macd(12, 26, 9)
+        macd_buy = ((hist > 0) & (macd > signal)).astype(int)
+        macd_sell = ((hist < 0) & (macd < signal)).astype(int)
+    else:
+        macd_buy = macd_sell = zero
+
+    upper, _, lower = ind.bollinger(20, 2.0)
+    bb_buy = (price < lower).astype(int)
+    bb_sell = (price > upper).astype(int)
+
+    buy = 2 * rsi_buy + 2 * macd_buy + bb_buy
+    sell = 2 * rsi_sell + 2 * macd_sell + bb_sell
+
+    # Volume forte reforça o lado que está na frente (antes da tendência)
+    if ind.n_volumes >= 20:
+        strong = ind.volume(20)[1] > p['volume_threshold']
+        buy, sell = buy + (strong & (buy > sell)), sell + (strong & (sell > buy))
+
+    change_pct = ind.trend_change_pct() if ind.n_closes >= 10 else np.zeros(len(ind.symbols))
+    buy = buy + (change_pct > 2)
+    sell = sell + (change_pct < -2)
+
+    max_score = np.maximum(buy, sell)
+    hold = (max_score == 0) | (buy == sell)
+    action = np.where(hold, HOLD, np.where(buy == max_score, BUY, SELL))
+    confidence = np.where(hold, 0.5, np.minimum(max_score / 7, 1.0))
+    return action, confidence, action
+
+
+def _eval_scalping(ind: MarketIndicators, p: Dict[str, np.ndarray]):
+    rsi = ind.rsi(14)
+    ema_fast = _per_agent(ind.ema, p['ema_fast'])
+    ema_slow = _per_agent(ind.ema, p['ema_slow'])
+    volume_ratio = ind.volume(20)[1]
+
+    ok = _truthy(rsi) & _truthy(ema_fast) & _truthy(ema_slow)
+    buy = ok & (rsi < p['rsi_oversold']) & (ema_fast > ema_slow) & (volume_ratio > 1.2)
+    sell = ok & ~buy & (rsi > p['rsi_overbought']) & (ema_fast < ema_slow)
+    neutral = ok & ~buy & ~sell & (rsi > 40) & (rsi < 60)
+
+    action = np.select([buy, sell], [BUY, SELL], HOLD)
+    confidence = np.select(
+        [buy, sell, neutral],
+        [np.minimum(0.85, 0.65 + (p['rsi_oversold'] - rsi) / 100),
+         np.minimum(0.85, 0.65 + (rsi - p['rsi_overbought']) / 100),
+         0.45],
+        0.5
+    )
+    return action, confidence, np.select([buy, sell, neutral], [1, 2, 3], 0)
+
+
+def _eval_trend_following(ind: MarketIndicators, p: Dict[str, np.ndarray]):
+    ema_fast = _per_agent(ind.ema, p['ema_fast'])
+    ema_slow = _per_agent(ind.ema, p['ema_slow'])
+    macd, signal, _ = ind.macd(12, 26, 9)
+
+    ok = _truthy(ema_fast) & _truthy(ema_slow) & (ind.n_closes >= 35)
+    buy = ok & (ema_fast > ema_slow) & (macd > signal)
+    sell = ok & (ema_fast < ema_slow) & (macd < signal)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        trend_strength = np.minimum(np.abs((ema_fast - ema_slow) / ema_slow * 100) / 2, 1.0)
+
+    action = np.select([buy, sell], [BUY, SELL], HOLD)
+    confidence = np.select(
+        [buy | sell, ok], [np.minimum(0.88, 0.70 + trend_strength * 0.18), 0.40], 0.5
+    )
+    return action, confidence, np.select([buy, sell, ok], [1, 2, 3], 0)
+
+
+def _eval_mean_reversion(ind: MarketIndicators, p: Dict[str, np.ndarray]):
+    bands = _per_agent(lambda period, std: np.stack(ind.bollinger(int(period), std)), p['bb_period'], p['bb_std'])
+    upper, lower = bands[:, 0], bands[:, 2]
+    rsi = _per_agent(lambda period: ind.rsi(int(period)), p['rsi_period'])
+    price = ind.price
+
+    ok = ~np.isnan(upper) & _truthy(rsi)
+    buy = ok & (price <= lower) & (rsi < 35)
+    sell = ok & ~buy & (price >= upper) & (rsi > 65)
+
+    action = np.select([buy, sell], [BUY, SELL], HOLD)
+    confidence = np.select([buy | sell, ok], [0.75, 0.35], 0.5)
+    return action, confidence, np.select([buy, sell, ok], [1, 2, 3], 0)
+
+
+def _eval_momentum(ind: MarketIndicators, p: Dict[str, np.ndarray]):
+    rsi = _per_agent(lambda period: ind.rsi(int(period)), p['rsi_period'])
+    macd = _per_agent(
+        lambda fast, slow, signal: np.stack(ind.macd(int(fast), int(slow), int(signal))),
+        p['macd_fast'], p['macd_slow'], p['macd_signal']
+    )
+    hist = macd[:, 2]
+    volume_ratio = ind.volume(20)[1]
+
+    ok = _truthy(rsi) & (ind.n_closes >= p['macd_slow'] + p['macd_signal'])
+    buy = ok & (rsi > 55) & (rsi < 75) & (hist > 0) & (volume_ratio > 1.3)
+    sell = ok & (rsi < 45) & (rsi > 25) & (hist < 0) & (volume_ratio > 1.3)
+
+    action = np.select([buy, sell], [BUY, SELL], HOLD)
+    confidence = np.select([buy | sell, ok], [0.78, 0.42], 0.5)
+    return action, confidence, np.select([buy, sell, ok], [1, 2, 3], 0)
+
+
+def _eval_breakout(ind: MarketIndicators, p: Dict[str, np.ndarray]):
+    levels = _per_agent(lambda lookback: np.stack(ind.range_levels(int(lookback))), p['lookback_period'])
+    support, resistance = levels[:, 0], levels[:, 1]
+    price = ind.price
+    volume_ratio = ind.volume(20)[1]
+    surge = volume_ratio > p['volume_threshold']
+
+    buy = (price > resistance * 1.002) & surge
+    sell = ~buy & (price < support * 0.998) & surge
+
+    action = np.select([buy, sell], [BUY, SELL], HOLD)
+    confidence = np.select([buy | sell], [0.82], 0.38)
+    return action, confidence, np.select([buy, sell], [1, 2], 3)
+
+
+# ----------------------------------------------------------------------
+# Razões e indicadores por agente (montados sob demanda)
+# ----------------------------------------------------------------------
+
+def _describe_scored(ind: MarketIndicators, j: int, params: Dict[str, float], case: int, agent) -> Tuple[str, Dict]:
+    """Reconstrói o dict de indicadores do IntelligentAgent e usa o próprio _make_decision para a razão"""
+    if case == _INSUFFICIENT:
+        return 'Dados insuficientes', {}
+
+    price = float(ind.price[j])
+    rsi = float(ind.rsi(14)[j])
+    rsi_signal = 'BUY' if rsi < params['rsi_oversold'] else 'SELL' if rsi > params['rsi_overbought'] else 'NEUTRAL'
+    indicators = {
+        'rsi': {
+            'value': 100 if rsi == 100.0 else round(rsi, 2),
+            'signal': rsi_signal,
+            'oversold': rsi < params['rsi_oversold'],
+            'overbought': rsi > params['rsi_overbought']
+        }
+    }
+
+    if ind.n_closes >= 26:
+        macd, signal, hist = (float(v[j]) for v in ind.macd(12, 26, 9))
+        indicators['macd'] = {
+            'macd_line': round(macd, 4),
+            'signal_line': round(signal, 4),
+            'histogram': round(hist, 4),
+            'signal': 'BUY' if hist > 0 and macd > signal else 'SELL' if hist < 0 and macd < signal else 'NEUTRAL'
+        }
+    else:
+        indicators['macd'] = {'signal': 'NEUTRAL', 'histogram': 0}
+
+    upper, middle, lower = (float(v[j]) for v in ind.bollinger(20, 2.0))
+    indicators['bollinger'] = {
+        'upper': round(upper, 2),
+        'middle': round(middle, 2),
+        'lower': round(lower, 2),
+        'current': round(price, 2),
+        'signal': 'BUY' if price < lower else 'SELL' if price > upper else 'NEUTRAL'
+    }
+
+    if ind.n_volumes >= 20:
+        average, ratio = (float(v[j]) for v in ind.volume(20))
+        indicators['volume_analysis'] = {
+            'current': float(ind.volumes[j, -1]),
+            'average': round(average, 2),
+            'ratio': round(ratio, 2),
+            'strength': 'HIGH' if ratio > params['volume_threshold'] else 'MEDIUM' if ratio > 1.2 else 'LOW',
+            'signal': 'STRONG' if ratio > params['volume_threshold'] else 'WEAK'
+        }
+    else:
+        indicators['volume_analysis'] = {'signal': 'NEUTRAL', 'strength': 'LOW'}
+
+    change_pct = float(ind.trend_change_pct()[j])
+    direction = 'UP' if change_pct > 2 else 'DOWN' if change_pct < -2 else 'SIDEWAYS'
+    indicators['trend'] = {
+        'direction': direction,
+        'strength': round(min(abs(change_pct) / 10, 1.0) if direction != 'SIDEWAYS' else 0, 2),
+        'change_pct': round(change_pct, 2)
+    }
+
+    return agent._make_decision(indicators)[2], indicators
+
+
+def _describe_scalping(ind: MarketIndicators, j: int, params: Dict[str, float], case: int, agent) -> Tuple[str, Dict]:
+    rsi = _opt(ind.rsi(14)[j])
+    indicators = {
+        'rsi': rsi,
+        'ema_fast': _opt(ind.ema(int(params['ema_fast']))[j]),
+        'ema_slow': _opt(ind.ema(int(params['ema_slow']))[j]),
+        'current_price': float(ind.price[j]),
+        'volume_ratio': float(ind.volume(20)[1][j])
+    }
+    reason = {
+        1: lambda: f"RSI oversold ({rsi:.1f}) + EMA bullish + volume surge",
+        2: lambda: f"RSI overbought ({rsi:.1f}) + EMA bearish",
+        3: lambda: f"Mercado neutro (RSI: {rsi:.1f})",
+    }.get(case, lambda: "Aguardando setup")()
+    return reason, indicators
+
+
+def _describe_trend_following(ind: MarketIndicators, j: int, params: Dict[str, float], case: int, agent) -> Tuple[str, Dict]:
+    ema_fast = _opt(ind.ema(int(params['ema_fast']))[j])
+    ema_slow = _opt(ind.ema(int(params['ema_slow']))[j])
+    macd = _opt(ind.macd(12, 26, 9)[0][j]) if ind.n_closes >= 35 else None
+    indicators = {
+        'ema_fast': ema_fast,
+        'ema_slow': ema_slow,
+        'macd': macd,
+        'atr': _opt(ind.atr(14)[j]),
+        'current_price': float(ind.price[j])
+    }
+    if case in (1, 2):
+        ema_diff_pct = ((ema_fast - ema_slow) / ema_slow) * 100
+        direction = 'alta' if case == 1 else 'baixa'
+        reason = f"Tendência de {direction} confirmada (EMA diff: {ema_diff_pct:.2f}%)"
+    elif case == 3:
+        reason = "Sem tendência definida ou sinais conflitantes"
+    else:
+        reason = "Aguardando tendência clara"
+    return reason, indicators
+
+
+def _describe_mean_reversion(ind: MarketIndicators, j: int, params: Dict[str, float], case: int, agent) -> Tuple[str, Dict]:
+    upper, middle, lower = (v[j] for v in ind.bollinger(int(params['bb_period']), params['bb_std']))
+    rsi = _opt(ind.rsi(int(params['rsi_period']))[j])
+    bollinger = None if np.isnan(upper) else {
+        'upper': float(upper), 'middle': float(middle), 'lower': float(lower), 'current': float(ind.price[j])
+    }
+    reason = {
+        1: lambda: f"Reversão à média: preço na banda inferior + RSI {rsi:.1f}",
+        2: lambda: f"Reversão à média: preço na banda superior + RSI {rsi:.1f}",
+        3: lambda: "Preço dentro das bandas normais",
+    }.get(case, lambda: "Aguardando extremos de banda")()
+    return reason, {'bollinger': bollinger, 'rsi': rsi}
+
+
+def _describe_momentum(ind: MarketIndicators, j: int, params: Dict[str, float], case: int, agent) -> Tuple[str, Dict]:
+    rsi = _opt(ind.rsi(int(params['rsi_period']))[j])
+    fast, slow, signal = int(params['macd_fast']), int(params['macd_slow']), int(params['macd_signal'])
+    macd = None
+    if ind.n_closes >= slow + signal:
+        macd_line, signal_line, hist = (float(v[j]) for v in ind.macd(fast, slow, signal))
+        macd = {'macd': macd_line, 'signal': signal_line, 'histogram': hist}
+    indicators = {'rsi': rsi, 'macd': macd, 'volume_ratio': float(ind.volume(20)[1][j])}
+    reason = {
+        1: lambda: f"Momentum positivo: RSI {rsi:.1f} + MACD bullish + volume",
+        2: lambda: f"Momentum negativo: RSI {rsi:.1f} + MACD bearish + volume",
+        3: lambda: "Momentum fraco ou indefinido",
+    }.get(case, lambda: "Aguardando momentum")()
+    return reason, indicators
+
+
+def _describe_breakout(ind: MarketIndicators, j: int, params: Dict[str, float], case: int, agent) -> Tuple[str, Dict]:
+    support, resistance = (float(v[j]) for v in ind.range_levels(int(params['lookback_period'])))
+    indicators = {
+        'resistance': resistance,
+        'support': support,
+        'current_price': float(ind.price[j]),
+        'volume_ratio': float(ind.volume(20)[1][j])
+    }
+    reason = {
+        1: f"Breakout de resistência ({resistance:.2f}) com volume",
+        2: f"Breakout de suporte ({support:.2f}) com volume",
+    }.get(case, f"Preço em range (S:{support:.2f} - R:{resistance:.2f})")
+    return reason, indicators
+
+
+_FAMILIES = {
+    'scored': (_eval_scored, _describe_scored),
+    'scalping': (_eval_scalping, _describe_scalping),
+    'trend_following': (_eval_trend_following, _describe_trend_following),
+    'mean_reversion': (_eval_mean_reversion, _describe_mean_reversion),
+    'momentum': (_eval_momentum, _describe_momentum),
+    'breakout': (_eval_breakout, _describe_breakout),
+}
+
+
+def _agent_rules(agent) -> Tuple[Optional[str], Dict[str, float]]:
+    """Família de regras vetorizável do agente (None = avaliar via analyze_market)"""
+    if isinstance(agent, RealAgentLogic):
+        family = agent.strategy.value
+        method = f'_analyze_{family}'
+        if (family in _FAMILIES
+                and type(agent).analyze_market is RealAgentLogic.analyze_market
+                and getattr(type(agent), method, None) is getattr(RealAgentLogic, method, None)):
+            return family, dict(agent.params)
+    elif isinstance(agent, IntelligentAgent):
+        if all(getattr(type(agent), m) is getattr(IntelligentAgent, m) for m in _INTELLIGENT_AGENT_METHODS):
+            return 'scored', {
+                'rsi_oversold': agent.rsi_oversold,
+                'rsi_overbought': agent.rsi_overbought,
+                'volume_threshold': agent.volume_threshold
+            }
+    return None, {}
+
+
+class AgentEvaluation:
+    """
+    Resultado da avaliação de A agentes sobre S símbolos
+
+    Attributes:
+        agent_ids: IDs dos agentes (linhas)
+        symbols: Símbolos (colunas)
+        actions: int8 A x S (HOLD/BUY/SELL; -1 = sinal desconhecido)
+        confidence: float A x S
+        valid: bool A x S (False = agente falhou para o símbolo)
+    """
+
+    def __init__(self, agent_ids: List[str], agents: List[Any], symbols: List[str]):
+        self.agent_ids = agent_ids
+        self.agents = agents
+        self.symbols = symbols
+        self.actions = np.zeros((len(agents), len(symbols)), dtype=np.int8)
+        self.confidence = np.zeros((len(agents), len(symbols)))
+        self.valid = np.ones((len(agents), len(symbols)), dtype=bool)
+        self.timestamp = datetime.now(timezone.utc).isoformat()
+
+        self._cases = np.zeros((len(agents), len(symbols)), dtype=np.int8)
+        self._families: List[Optional[str]] = [None] * len(agents)
+        self._params: List[Dict[str, float]] = [{}] * len(agents)
+        self._groups: List[Tuple[MarketIndicators, List[int]]] = []
+        self._column: Dict[int, Tuple[MarketIndicators, int]] = {}
+        self._fallback: Dict[Tuple[int, int], Dict[str, Any]] = {}
+
+    def analysis(self, agent_index: int, symbol_index: int) -> Optional[Dict[str, Any]]:
+        """Análise de um agente para um símbolo no formato de analyze_market (None se falhou)"""
+        if not self.valid[agent_index, symbol_index]:
+            return None
+        if (agent_index, symbol_index) in self._fallback:
+            return self._fallback[(agent_index, symbol_index)]
+
+        family = self._families[agent_index]
+        agent = self.agents[agent_index]
+        ind, j = self._column[symbol_index]
+        case = int(self._cases[agent_index, symbol_index])
+        if family != 'scored' and case == _INSUFFICIENT:
+            reason, indicators = "Dados de mercado insuficientes", {}
+        else:
+            reason, indicators = _FAMILIES[family][1](ind, j, self._params[agent_index], case, agent)
+
+        analysis = {
+            'agent_id': self.agent_ids[agent_index],
+            'signal': ACTIONS[self.actions[agent_index, symbol_index]],
+            'confidence': float(self.confidence[agent_index, symbol_index]),
+            'reason': reason,
+            'indicators': indicators,
+            'timestamp': self.timestamp
+        }
+        if family != 'scored':
+            analysis['strategy'] = family
+        return analysis
+
+    def record_decision(self, agent_index: int, symbol_index: int, analysis: Dict[str, Any]):
+        """Atualiza o estado do IntelligentAgent como analyze_market faria"""
+        agent = self.agents[agent_index]
+        if self._families[agent_index] != 'scored' or self._cases[agent_index, symbol_index] == _INSUFFICIENT:
+            return
+        agent.last_decision = {
+            'timestamp': analysis['timestamp'],
+            'signal': analysis['signal'],
+            'confidence': analysis['confidence'],
+            'reason': analysis['reason'],
+            'indicators': analysis['indicators']
+        }
+        agent.decisions_count += 1
+
+    def record_decisions(self):
+        """
+        Atualiza o estado dos IntelligentAgent para todos os símbolos de uma vez
+
+        decisions_count soma os símbolos avaliados com dados suficientes;
+        last_decision fica com o último deles (só esse é materializado).
+        """
+        for a, family in enumerate(self._families):
+            if family != 'scored':
+                continue
+            evaluated = np.flatnonzero(self.valid[a] & (self._cases[a] != _INSUFFICIENT))
+            if not len(evaluated):
+                continue
+            last = int(evaluated[-1])
+            self.record_decision(a, last, self.analysis(a, last))
+            self.agents[a].decisions_count += len(evaluated) - 1
+
+
+def evaluate_agents(
+    agents: List[Tuple[str, Any]],
+    market_data: Dict[str, Dict[str, Any]]
+) -> AgentEvaluation:
+    """
+    Avalia todos os agentes sobre todos os símbolos
+
+    Indicadores são calculados uma vez por grupo de símbolos com o mesmo
+    número de candles; as regras de cada família (IntelligentAgent e as
+    estratégias de RealAgentLogic) rodam vetorizadas sobre agentes x
+    símbolos. Agentes de outros tipos são avaliados via analyze_market.
+
+    Args:
+        agents: Lista de (agent_id, agente)
+        market_data: Dict símbolo -> dados de mercado (closes, highs, lows, volumes)
+
+    Returns:
+        AgentEvaluation
+    """
+    symbols = list(market_data)
+    result = AgentEvaluation([a[0] for a in agents], [a[1] for a in agents], symbols)
+
+    by_family: Dict[str, List[int]] = {}
+    fallback: List[int] = []
+    for i, (_, agent) in enumerate(agents):
+        family, params = _agent_rules(agent)
+        result._families[i] = family
+        result._params[i] = params
+        if family:
+            by_family.setdefault(family, []).append(i)
+        else:
+            fallback.append(i)
+
+    # Grupos de símbolos com o mesmo número de candles por série
+    groups: Dict[Tuple[int, ...], List[int]] = {}
+    for s, symbol in enumerate(symbols):
+        data = market_data[symbol]
+        key = tuple(len(data.get(k) or []) for k in ('closes', 'highs', 'lows', 'volumes'))
+        groups.setdefault(key, []).append(s)
+
+    for columns in groups.values():
+        ind = MarketIndicators([symbols[s] for s in columns], [market_data[symbols[s]] for s in columns])
+        result._groups.append((ind, columns))
+        for j, s in enumerate(columns):
+            result._column[s] = (ind, j)
+
+        for family, rows in by_family.items():
+            cells = np.ix_(rows, columns)
+            if family != 'scored' and not ind.complete:
+                result.actions[cells] = HOLD
+                result.confidence[cells] = 0.0
+                result._cases[cells] = _INSUFFICIENT
+                continue
+
+            params = {
+                key: np.array([result._params[i][key] for i in rows], dtype=np.float64)[:, None]
+                for key in result._params[rows[0]]
+                if isinstance(result._params[rows[0]][key], (int, float))
+            }
+            with np.errstate(invalid='ignore'):
+                action, confidence, case = _FAMILIES[family][0](ind, params)
+            result.actions[cells] = np.broadcast_to(action, (len(rows), len(columns)))
+            result.confidence[cells] = np.broadcast_to(confidence, (len(rows), len(columns)))
+            result._cases[cells] = np.broadcast_to(case, (len(rows), len(columns)))
+
+    for i in fallback:
+        agent_id, agent = agents[i]
+        for s, symbol in enumerate(symbols):
+            try:
+                analysis = agent.analyze_market(market_data[symbol])
+            except Exception as e:
+                logger.error(f"Erro ao analisar com agente {agent_id}: {e}")
+                result.valid[i, s] = False
+                continue
+            result._fallback[(i, s)] = analysis
+            result.actions[i, s] = _ACTION_CODES.get(analysis.get('signal', 'HOLD'), -1)
+            result.confidence[i, s] = analysis.get('confidence', 0.0)
+
+    return result
+
+
+def weighted_vote(
+    actions: np.ndarray,
+    confidence: np.ndarray,
+    weights: np.ndarray,
+    valid: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Votação ponderada por símbolo
+
+    Args:
+        actions: A x S códigos de ação
+        confidence: A x S confianças
+        weights: A pesos dos agentes
+        valid: A x S votos válidos (padrão: todos)
+
+    Returns:
+        (scores 3 x S somando peso x confiança por ação [HOLD, BUY, SELL],
+         peso total S dos votos com ação conhecida)
+    """
+    valid = np.ones(actions.shape, dtype=bool) if valid is None else valid
+    weighted = np.where(valid, confidence * weights[:, None], 0.0)
+    scores = np.stack([np.where(actions == code, weighted, 0.0).sum(axis=0) for code in (HOLD, BUY, SELL)])
+    known = valid & (actions >= 0)
+    total_weight = np.where(known, weights[:, None], 0.0).sum(axis=0)
+    return scores, total_weight
@@ -10,6 +10,10 @@ from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 import json
 
+import numpy as np
+
+from .real_agent_logic import TechnicalIndicators
+
 logger = logging.getLogger(__name__)
 
 
@@ -150,19 +154,11 @@ class IntelligentAgent:
         if len(closes) < 26:
             return {'signal': 'NEUTRAL', 'histogram': 0}
         
-        # EMA rápida (12 períodos)
-        ema_12 = self._ema(closes, 12)
-        # EMA lenta (26 períodos)
-        ema_26 = self._ema(closes, 26)
-        
-        # MACD line
-        macd_line = ema_12 - ema_26
-        
-        # Signal line (EMA de 9 períodos do MACD)
-        # Simplificado: usar média simples
-        signal_line = macd_line * 0.9
-        
-        histogram = macd_line - signal_line
+        # MACD line (EMA 12 - EMA 26) e signal line (EMA de 9 períodos do MACD)
+        macd, signal_line, histogram = TechnicalIndicators.macd_matrix(
+            np.asarray(closes, dtype=np.float64)[None, :], 12, 26, 9
+        )
+        macd_line, signal_line, histogram = float(macd[0]), float(signal_line[0]), float(histogram[0])
         
         # Determinar sinal
         if histogram > 0 and macd_line > signal_line:
@@ -269,18 +265,10 @@ class IntelligentAgent:
     
     def _ema(self, data: List[float], period: int) -> float:
         """Calcula EMA (Exponential Moving Average)"""
-        if len(data) < period:
-            return sum(data) / len(data) if data else 0
-        
-        # Começar com SMA
-        sma = sum(data[:period]) / period
-        multiplier = 2 / (period + 1)
-        
-        ema = sma
-        for price in data[period:]:
-            ema = (price * multiplier) + (ema * (1 - multiplier))
-        
-        return ema
+        if not data:
+            return 0
+        # Começa com SMA; média simples se houver menos de `period` valores
+        return float(TechnicalIndicators.ema_last_matrix(np.asarray(data, dtype=np.float64)[None, :], period)[0])
     
     def _make_decision(self, indicators: Dict[str, Any]) -> Tuple[str, float, str]:
         """
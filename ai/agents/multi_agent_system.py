@@ -11,8 +11,11 @@ from datetime import datetime
 from enum import Enum
 import json
 
+import numpy as np
+
 from .intelligent_agent import IntelligentAgent
 from .real_agent_logic import RealAgentLogic, AgentStrategy
+from .agent_evaluation import AgentEvaluation, evaluate_agents, weighted_vote, ACTIONS, HOLD, BUY, SELL
 
 logger = logging.getLogger(__name__)
 
@@ -149,28 +152,48 @@ class MultiAgentSystem:
         Returns:
             Consenso com votação e decisão final
         """
+        return self.analyze_markets_consensus({symbol: market_data})[symbol]
+    
+    def analyze_markets_consensus(self, market_data_by_symbol: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Consenso de todos os agentes para vários símbolos de uma vez
+        
+        Os indicadores são calculados uma vez por símbolo e as regras de
+        todos os agentes avaliadas em lote (ver agent_evaluation).
+        
+        Args:
+            market_data_by_symbol: Dict símbolo -> dados do mercado
+        
+        Returns:
+            Dict símbolo -> consenso (mesmo formato de analyze_market_consensus)
+        """
         if not self.agents:
             return {
-                'consensus': VoteResult.NO_CONSENSUS.value,
-                'confidence': 0.0,
-                'reason': 'Nenhum agente disponível',
-                'votes': []
+                symbol: {
+                    'consensus': VoteResult.NO_CONSENSUS.value,
+                    'confidence': 0.0,
+                    'reason': 'Nenhum agente disponível',
+                    'votes': []
+                }
+                for symbol in market_data_by_symbol
             }
         
-        # Coletar votos de todos os agentes
-        votes: List[Dict[str, Any]] = []
-        
-        for agent_id, agent in self.agents.items():
-            try:
-                # Usa lógica real se disponível
-                if agent_id in self.agent_logic:
-                    analysis = self.agent_logic[agent_id].analyze_market(market_data)
-                else:
-                    analysis = agent.analyze_market(market_data)
+        evaluation = self._evaluate(market_data_by_symbol)
+        weights = self._weights(evaluation)
+        normalized, winners, _ = self._vote_arrays(evaluation, weights)
+        
+        results = {}
+        for s, symbol in enumerate(evaluation.symbols):
+            # Coletar votos de todos os agentes
+            votes: List[Dict[str, Any]] = []
+            for a, agent_id in enumerate(evaluation.agent_ids):
+                analysis = evaluation.analysis(a, s)
+                if analysis is None:
+                    continue
+                evaluation.record_decision(a, s, analysis)
                 
-                weight = self.agent_weights.get(agent_id, 1.0)
-                
-                vote = {
+                weight = float(weights[a])
+                votes.append({
                     'agent_id': agent_id,
                     'signal': analysis['signal'],
                     'confidence': analysis['confidence'],
@@ -178,49 +201,114 @@ class MultiAgentSystem:
                     'weighted_confidence': analysis['confidence'] * weight,
                     'reason': analysis['reason'],
                     'indicators': analysis.get('indicators', {})
-                }
-                votes.append(vote)
+                })
                 
                 logger.debug(
                     f"Voto de {agent_id}: {analysis['signal']} "
                     f"(confiança: {analysis['confidence']:.2%}, peso: {weight})"
                 )
-                
-            except Exception as e:
-                logger.error(f"Erro ao coletar voto de {agent_id}: {e}")
+            
+            # Verificar mínimo de votos
+            if len(votes) < self.min_agents_voting:
+                results[symbol] = {
+                    'consensus': VoteResult.NO_CONSENSUS.value,
+                    'confidence': 0.0,
+                    'reason': f'Votos insuficientes ({len(votes)}/{self.min_agents_voting})',
+                    'votes': votes,
+                    'symbol': symbol
+                }
                 continue
+            
+            # Calcular consenso
+            consensus_result = self._calculate_consensus(votes, normalized[:, s], int(winners[s]))
+            consensus_result['symbol'] = symbol
+            consensus_result['votes'] = votes
+            consensus_result['timestamp'] = datetime.utcnow().isoformat()
+            
+            # Armazenar no histórico
+            self.decision_history.append(consensus_result)
+            
+            # Log da decisão
+            logger.info(
+                f"📊 CONSENSO para {symbol}: {consensus_result['consensus']} | "
+                f"Confiança: {consensus_result['confidence']:.2%} | "
+                f"Votos: {len(votes)} | Razão: {consensus_result['reason']}"
+            )
+            
+            results[symbol] = consensus_result
         
-        # Verificar mínimo de votos
-        if len(votes) < self.min_agents_voting:
+        if len(self.decision_history) > 1000:
+            self.decision_history = self.decision_history[-1000:]
+        
+        return results
+    
+    def vote_markets(self, market_data_by_symbol: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Votação em lote sem montar votos individuais nem gravar histórico
+        
+        Args:
+            market_data_by_symbol: Dict símbolo -> dados do mercado
+        
+        Returns:
+            Dict com arrays por símbolo:
+                - symbols: lista de símbolos
+                - action: int8 (0=HOLD, 1=BUY, 2=SELL, -1=NO_CONSENSUS)
+                - confidence: confiança do sinal vencedor
+                - scores: S x 3 scores normalizados (HOLD, BUY, SELL)
+                - votes: número de votos válidos
+        """
+        symbols = list(market_data_by_symbol)
+        if not self.agents:
             return {
-                'consensus': VoteResult.NO_CONSENSUS.value,
-                'confidence': 0.0,
-                'reason': f'Votos insuficientes ({len(votes)}/{self.min_agents_voting})',
-                'votes': votes,
-                'symbol': symbol
+                'symbols': symbols,
+                'action': np.full(len(symbols), -1, dtype=np.int8),
+                'confidence': np.zeros(len(symbols)),
+                'scores': np.zeros((len(symbols), 3)),
+                'votes': np.zeros(len(symbols), dtype=int)
             }
         
-        # Calcular consenso
-        consensus_result = self._calculate_consensus(votes)
-        consensus_result['symbol'] = symbol
-        consensus_result['votes'] = votes
-        consensus_result['timestamp'] = datetime.utcnow().isoformat()
-        
-        # Armazenar no histórico
-        self.decision_history.append(consensus_result)
-        if len(self.decision_history) > 1000:
-            self.decision_history = self.decision_history[-1000:]
+        evaluation = self._evaluate(market_data_by_symbol)
+        normalized, winners, n_votes = self._vote_arrays(evaluation, self._weights(evaluation))
+        confidence = np.take_along_axis(normalized, winners[None, :], axis=0)[0]
         
-        # Log da decisão
-        logger.info(
-            f"📊 CONSENSO para {symbol}: {consensus_result['consensus']} | "
-            f"Confiança: {consensus_result['confidence']:.2%} | "
-            f"Votos: {len(votes)} | Razão: {consensus_result['reason']}"
+        no_consensus = (n_votes < self.min_agents_voting) | (confidence < self.consensus_threshold)
+        return {
+            'symbols': evaluation.symbols,
+            'action': np.where(no_consensus, -1, winners).astype(np.int8),
+            'confidence': np.where(n_votes < self.min_agents_voting, 0.0, confidence),
+            'scores': normalized.T,
+            'votes': n_votes
+        }
+    
+    def _evaluate(self, market_data_by_symbol: Dict[str, Dict[str, Any]]) -> AgentEvaluation:
+        """Avalia todos os agentes (lógica real quando disponível) sobre os símbolos"""
+        return evaluate_agents(
+            [(agent_id, self.agent_logic.get(agent_id, agent)) for agent_id, agent in self.agents.items()],
+            market_data_by_symbol
         )
+    
+    def _weights(self, evaluation: AgentEvaluation) -> np.ndarray:
+        return np.array([self.agent_weights.get(agent_id, 1.0) for agent_id in evaluation.agent_ids])
+    
+    def _vote_arrays(self, evaluation: AgentEvaluation, weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Votação ponderada vetorizada
+        
+        Returns:
+            (scores normalizados 3 x S [HOLD, BUY, SELL], sinal vencedor S,
+             número de votos S)
+        """
+        scores, total_weight = weighted_vote(evaluation.actions, evaluation.confidence, weights, evaluation.valid)
         
-        return consensus_result
+        # Normalizar pelo peso total dos votos com sinal conhecido
+        normalized = np.where(total_weight > 0, scores / np.where(total_weight > 0, total_weight, 1.0), scores)
+        
+        # Empate: BUY, depois SELL, depois HOLD
+        preference = np.array([BUY, SELL, HOLD])
+        winners = preference[np.argmax(normalized[preference], axis=0)]
+        return normalized, winners, evaluation.valid.sum(axis=0)
     
-    def _calculate_consensus(self, votes: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _calculate_consensus(self, votes: List[Dict[str, Any]], normalized: np.ndarray, winner: int) -> Dict[str, Any]:
         """
         Calcula consenso baseado em votação ponderada
         
@@ -229,38 +317,12 @@ class MultiAgentSystem:
         2. Normaliza pelo peso total
         3. Verifica se atinge threshold mínimo
         4. Retorna sinal vencedor ou NO_CONSENSUS
-        """
-        # Acumular votos ponderados
-        weighted_scores = {
-            'BUY': 0.0,
-            'SELL': 0.0,
-            'HOLD': 0.0
-        }
         
-        total_weight = 0.0
-        
-        for vote in votes:
-            signal = vote['signal']
-            weighted_conf = vote['weighted_confidence']
-            weight = vote['weight']
-            
-            if signal in weighted_scores:
-                weighted_scores[signal] += weighted_conf
-                total_weight += weight
-        
-        # Normalizar scores
-        if total_weight > 0:
-            normalized_scores = {
-                signal: score / total_weight
-                for signal, score in weighted_scores.items()
-            }
-        else:
-            normalized_scores = weighted_scores
-        
-        # Encontrar sinal vencedor
-        winner_signal = max(normalized_scores.items(), key=lambda x: x[1])
-        consensus_signal = winner_signal[0]
-        consensus_confidence = winner_signal[1]
+        Os passos 1-2 chegam prontos de _vote_arrays (normalized, winner).
+        """
+        normalized_scores = {ACTIONS[code]: float(normalized[code]) for code in (BUY, SELL, HOLD)}
+        consensus_signal = ACTIONS[winner]
+        consensus_confidence = normalized_scores[consensus_signal]
         
         # Verificar se atinge threshold
         if consensus_confidence < self.consensus_threshold:
@@ -30,7 +30,129 @@ class AgentStrategy(str, Enum):
 
 
 class TechnicalIndicators:
-    """Calculadora de indicadores técnicos"""
+    """
+    Calculadora de indicadores técnicos
+    
+    Os métodos *_matrix recebem arrays 2D (símbolos x candles) e calculam o
+    indicador de todos os símbolos de uma vez; os métodos escalares usam as
+    mesmas rotinas com uma linha.
+    """
+    
+    # ---------- Versões vetorizadas (símbolos x candles) ----------
+    
+    @staticmethod
+    def ema_matrix(values: np.ndarray, period: int) -> np.ndarray:
+        """
+        Série EMA por linha, semeada com a SMA dos primeiros `period` valores
+        
+        Returns:
+            Array com o mesmo shape; NaN antes do candle period-1
+        """
+        values = np.asarray(values, dtype=np.float64)
+        out = np.full(values.shape, np.nan)
+        n = values.shape[1]
+        if n < period:
+            return out
+        
+        multiplier = 2 / (period + 1)
+        ema = values[:, :period].mean(axis=1)
+        out[:, period - 1] = ema
+        if values.shape[0] == 1:
+            # Uma linha: o laço em floats Python é mais rápido que fatias NumPy
+            ema, row, series = float(ema[0]), values[0].tolist(), out[0]
+            for t in range(period, n):
+                ema = (row[t] * multiplier) + (ema * (1 - multiplier))
+                series[t] = ema
+            return out
+        for t in range(period, n):
+            ema = (values[:, t] * multiplier) + (ema * (1 - multiplier))
+            out[:, t] = ema
+        return out
+    
+    @staticmethod
+    def ema_last_matrix(values: np.ndarray, period: int) -> np.ndarray:
+        """Último valor da EMA por linha (média simples se houver menos de `period` valores)"""
+        values = np.asarray(values, dtype=np.float64)
+        if values.shape[1] < period:
+            return values.mean(axis=1) if values.shape[1] else np.zeros(values.shape[0])
+        return TechnicalIndicators.ema_matrix(values, period)[:, -1]
+    
+    @staticmethod
+    def macd_matrix(
+        closes: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        MACD por linha: (macd, signal line, histogram) do último candle
+        
+        A signal line é a EMA de `signal` períodos da série MACD (média
+        simples se a série ainda for mais curta que `signal`).
+        """
+        closes = np.asarray(closes, dtype=np.float64)
+        macd_series = (
+            TechnicalIndicators.ema_matrix(closes, fast) - TechnicalIndicators.ema_matrix(closes, slow)
+        )[:, slow - 1:]
+        if macd_series.shape[1] == 0:
+            nan = np.full(closes.shape[0], np.nan)
+            return nan, nan.copy(), nan.copy()
+        macd_line = macd_series[:, -1]
+        signal_line = TechnicalIndicators.ema_last_matrix(macd_series, signal)
+        return macd_line, signal_line, macd_line - signal_line
+    
+    @staticmethod
+    def rsi_matrix(closes: np.ndarray, period: int = 14) -> np.ndarray:
+        """RSI (médias simples dos últimos `period` ganhos/perdas) por linha; NaN se faltar dado"""
+        closes = np.asarray(closes, dtype=np.float64)
+        if closes.shape[1] < period + 1:
+            return np.full(closes.shape[0], np.nan)
+        
+        deltas = np.diff(closes[:, -period - 1:], axis=1)
+        avg_gain = np.where(deltas > 0, deltas, 0.0).mean(axis=1)
+        avg_loss = np.where(deltas < 0, -deltas, 0.0).mean(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+        return np.where(avg_loss == 0, 100.0, rsi)
+    
+    @staticmethod
+    def bollinger_matrix(
+        closes: np.ndarray, period: int = 20, std_dev: float = 2.0
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Bandas de Bollinger (upper, middle, lower) por linha; NaN se faltar dado"""
+        closes = np.asarray(closes, dtype=np.float64)
+        if closes.shape[1] < period:
+            nan = np.full(closes.shape[0], np.nan)
+            return nan, nan.copy(), nan.copy()
+        recent = closes[:, -period:]
+        sma = recent.mean(axis=1)
+        std = recent.std(axis=1)
+        return sma + (std_dev * std), sma, sma - (std_dev * std)
+    
+    @staticmethod
+    def atr_matrix(highs: np.ndarray, lows: np.ndarray, closes: np.ndarray, period: int = 14) -> np.ndarray:
+        """Average True Range por linha; NaN se faltar dado"""
+        highs, lows, closes = (np.asarray(a, dtype=np.float64) for a in (highs, lows, closes))
+        if closes.shape[1] < period + 1:
+            return np.full(closes.shape[0], np.nan)
+        prev_close = closes[:, :-1]
+        true_range = np.maximum.reduce([
+            highs[:, 1:] - lows[:, 1:],
+            np.abs(highs[:, 1:] - prev_close),
+            np.abs(lows[:, 1:] - prev_close)
+        ])
+        return true_range[:, -period:].mean(axis=1)
+    
+    @staticmethod
+    def volume_ratio_matrix(volumes: np.ndarray, period: int = 20) -> Tuple[np.ndarray, np.ndarray]:
+        """(volume médio, volume atual / médio) por linha; NaN se faltar dado"""
+        volumes = np.asarray(volumes, dtype=np.float64)
+        if volumes.shape[1] < period:
+            nan = np.full(volumes.shape[0], np.nan)
+            return nan, nan.copy()
+        avg_volume = volumes[:, -period:].mean(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = np.where(avg_volume > 0, volumes[:, -1] / avg_volume, 1.0)
+        return avg_volume, ratio
+    
+    # ---------- Versões escalares ----------
     
     @staticmethod
     def sma(prices: List[float], period: int) -> Optional[float]:
@@ -41,66 +163,32 @@ class TechnicalIndicators:
     
     @staticmethod
     def ema(prices: List[float], period: int) -> Optional[float]:
-        """Exponential Moving Average"""
+        """Exponential Moving Average (sobre todo o histórico, semeada com SMA)"""
         if len(prices) < period:
             return None
-        
-        prices_array = np.array(prices[-period:])
-        multiplier = 2 / (period + 1)
-        ema = prices_array[0]
-        
-        for price in prices_array[1:]:
-            ema = (price * multiplier) + (ema * (1 - multiplier))
-        
-        return ema
+        return float(TechnicalIndicators.ema_matrix(np.asarray(prices, dtype=np.float64)[None, :], period)[0, -1])
     
     @staticmethod
     def rsi(prices: List[float], period: int = 14) -> Optional[float]:
         """Relative Strength Index"""
         if len(prices) < period + 1:
             return None
-        
-        deltas = np.diff(prices[-period-1:])
-        gains = deltas.copy()
-        losses = deltas.copy()
-        
-        gains[gains < 0] = 0
-        losses[losses > 0] = 0
-        losses = abs(losses)
-        
-        avg_gain = np.mean(gains)
-        avg_loss = np.mean(losses)
-        
-        if avg_loss == 0:
-            return 100.0
-        
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-        
-        return rsi
+        return float(TechnicalIndicators.rsi_matrix(np.asarray(prices, dtype=np.float64)[None, :], period)[0])
     
     @staticmethod
     def macd(prices: List[float], fast: int = 12, slow: int = 26, signal: int = 9) -> Optional[Dict[str, float]]:
-        """MACD (Moving Average Convergence Divergence)"""
+        """MACD (Moving Average Convergence Divergence) com signal line EMA"""
         if len(prices) < slow + signal:
             return None
         
-        ema_fast = TechnicalIndicators.ema(prices, fast)
-        ema_slow = TechnicalIndicators.ema(prices, slow)
-        
-        if ema_fast is None or ema_slow is None:
-            return None
-        
-        macd_line = ema_fast - ema_slow
-        
-        # Calcular signal line (simplificado)
-        signal_line = macd_line * 0.9  # Aproximação
-        histogram = macd_line - signal_line
+        macd_line, signal_line, histogram = TechnicalIndicators.macd_matrix(
+            np.asarray(prices, dtype=np.float64)[None, :], fast, slow, signal
+        )
         
         return {
-            "macd": macd_line,
-            "signal": signal_line,
-            "histogram": histogram
+            "macd": float(macd_line[0]),
+            "signal": float(signal_line[0]),
+            "histogram": float(histogram[0])
         }
     
     @staticmethod
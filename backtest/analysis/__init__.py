@@ -6,5 +6,6 @@ Sistema de análise de performance de backtesting
 
 from .performance_analyzer import PerformanceAnalyzer
 from .risk_analyzer import RiskAnalyzer
+from .batch_metrics import BatchMetrics
 
-__all__ = ['PerformanceAnalyzer', 'RiskAnalyzer']
\ No newline at end of file
+__all__ = ['PerformanceAnalyzer', 'RiskAnalyzer', 'BatchMetrics']
\ No newline at end of file
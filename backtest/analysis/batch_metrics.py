@@ -0,0 +1,309 @@
+# backtest/analysis/batch_metrics.py
+"""
+Batch Metrics - Métricas quantitativas vetorizadas sobre muitas curvas
+Mesmas definições de QuantitativeMetrics, calculadas para uma matriz
+(execuções x tempo) de retornos em uma única passada numpy
+"""
+
+import numpy as np
+from typing import Dict, Optional, Sequence
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def run_lengths(mask: np.ndarray) -> np.ndarray:
+    """
+    Comprimento de cada sequência de True em um array 1D
+
+    Args:
+        mask: Array booleano
+
+    Returns:
+        Comprimentos das sequências, em ordem
+    """
+    padded = np.concatenate(([False], np.asarray(mask, dtype=bool), [False]))
+    edges = np.flatnonzero(np.diff(padded.astype(np.int8)))
+    return edges[1::2] - edges[::2]
+
+
+def max_run_length(mask: np.ndarray) -> np.ndarray:
+    """
+    Maior sequência de True por linha
+
+    Args:
+        mask: Matriz booleana (execuções x tempo)
+
+    Returns:
+        Maior sequência por linha (int)
+    """
+    mask = np.atleast_2d(mask)
+    idx = np.arange(mask.shape[1])
+    # Índice do último False até cada posição
+    last_break = np.maximum.accumulate(np.where(mask, -1, idx), axis=1)
+    runs = np.where(mask, idx - last_break, 0)
+    return runs.max(axis=1, initial=0)
+
+
+def row_quantiles(values: np.ndarray, valid: np.ndarray, quantiles: Sequence[float]) -> np.ndarray:
+    """
+    Percentis por linha ignorando posições inválidas (interpolação linear,
+    igual a np.percentile)
+
+    Args:
+        values: Matriz (execuções x tempo)
+        valid: Máscara de valores válidos
+        quantiles: Quantis em [0, 1]
+
+    Returns:
+        Matriz (execuções x len(quantiles)); NaN para linhas vazias
+    """
+    ordered = np.sort(np.where(valid, values, np.inf), axis=1)
+    n = valid.sum(axis=1)
+
+    q = np.asarray(quantiles, dtype=np.float64)
+    pos = q[None, :] * np.maximum(n - 1, 0)[:, None]
+    lo = np.floor(pos).astype(np.int64)
+    hi = np.minimum(lo + 1, np.maximum(n - 1, 0)[:, None])
+    frac = pos - lo
+
+    lo_values = np.take_along_axis(ordered, lo, axis=1)
+    hi_values = np.take_along_axis(ordered, hi, axis=1)
+    result = lo_values + frac * (hi_values - lo_values)
+
+    # Evita inf - inf quando lo == hi
+    result = np.where(lo == hi, lo_values, result)
+    return np.where(n[:, None] > 0, result, np.nan)
+
+
+def skewness(values: np.ndarray, valid: Optional[np.ndarray] = None, bias: bool = False) -> np.ndarray:
+    """
+    Assimetria por linha
+
+    Args:
+        values: Matriz (execuções x tempo)
+        valid: Máscara de valores válidos (None = finitos)
+        bias: True = momento populacional; False = ajustada (pandas)
+
+    Returns:
+        Skewness por linha (0 com menos de 3 valores ou variância nula)
+    """
+    values = np.atleast_2d(values)
+    if valid is None:
+        valid = np.isfinite(values)
+    n, m2, m3, _ = _central_moments(values, valid)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        g1 = m3 / m2 ** 1.5
+        if not bias:
+            g1 = g1 * np.sqrt(n * (n - 1)) / (n - 2)
+
+    return np.where((n >= 3) & (m2 > 0), g1, 0.0)
+
+
+def kurtosis(values: np.ndarray, valid: Optional[np.ndarray] = None, bias: bool = False) -> np.ndarray:
+    """
+    Curtose em excesso por linha
+
+    Args:
+        values: Matriz (execuções x tempo)
+        valid: Máscara de valores válidos (None = finitos)
+        bias: True = momento populacional; False = ajustada (pandas)
+
+    Returns:
+        Excess kurtosis por linha (0 com menos de 4 valores ou variância nula)
+    """
+    values = np.atleast_2d(values)
+    if valid is None:
+        valid = np.isfinite(values)
+    n, m2, _, m4 = _central_moments(values, valid)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        g2 = m4 / m2 ** 2 - 3.0
+        if not bias:
+            g2 = ((n + 1) * g2 + 6.0) * (n - 1) / ((n - 2) * (n - 3))
+
+    return np.where((n >= 4) & (m2 > 0), g2, 0.0)
+
+
+def _central_moments(values: np.ndarray, valid: np.ndarray):
+    """n, m2, m3, m4 (momentos centrais populacionais) por linha"""
+    n = valid.sum(axis=1).astype(np.float64)
+    safe_n = np.maximum(n, 1)
+    x = np.where(valid, values, 0.0)
+    mean = x.sum(axis=1) / safe_n
+    d = np.where(valid, values - mean[:, None], 0.0)
+    d2 = d * d
+    return (
+        n,
+        d2.sum(axis=1) / safe_n,
+        (d2 * d).sum(axis=1) / safe_n,
+        (d2 * d2).sum(axis=1) / safe_n,
+    )
+
+
+class BatchMetrics:
+    """
+    Motor de métricas em lote para hyperopt, walk-forward e testes A/B
+
+    Recebe retornos como matriz (execuções x tempo); execuções de tamanhos
+    diferentes são preenchidas com NaN à direita. Todas as métricas de
+    QuantitativeMetrics.calculate_all_metrics são devolvidas como arrays
+    (uma posição por execução), com 0 onde a métrica é indefinida.
+    """
+
+    def __init__(self, risk_free_rate: float = 0.02, periods: int = 365):
+        """
+        Args:
+            risk_free_rate: Taxa livre de risco anual (padrão 2%)
+            periods: Períodos por ano (padrão 365, crypto 24/7)
+        """
+        self.risk_free_rate = risk_free_rate
+        self.periods = periods
+
+    def calculate_all_metrics(
+        self,
+        returns: np.ndarray,
+        benchmark_returns: Optional[np.ndarray] = None,
+        confidence: float = 0.95
+    ) -> Dict[str, np.ndarray]:
+        """
+        Calcula todas as métricas para todas as execuções
+
+        Args:
+            returns: Matriz de retornos (execuções x tempo), NaN = sem dado
+            benchmark_returns: Retornos do benchmark (tempo,) ou (execuções x tempo)
+            confidence: Nível de confiança do VaR/CVaR
+
+        Returns:
+            Dicionário métrica -> array (execuções,)
+        """
+        R = np.atleast_2d(np.asarray(returns, dtype=np.float64))
+        valid = np.isfinite(R)
+        x = np.where(valid, R, 0.0)
+
+        P = self.periods
+        n = valid.sum(axis=1)
+        safe_n = np.maximum(n, 1)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Média e desvio padrão amostral (ddof=1, como pandas)
+            mean = x.sum(axis=1) / safe_n
+            dev = np.where(valid, R - mean[:, None], 0.0)
+            std = np.sqrt((dev * dev).sum(axis=1) / (n - 1))
+            std = np.where(n > 1, std, 0.0)
+
+            # Downside (retornos < 0)
+            down = valid & (R < 0)
+            n_down = down.sum(axis=1)
+            down_mean = np.where(down, R, 0.0).sum(axis=1) / np.maximum(n_down, 1)
+            down_dev = np.where(down, R - down_mean[:, None], 0.0)
+            down_std = np.sqrt((down_dev * down_dev).sum(axis=1) / (n_down - 1))
+            down_std = np.where(n_down > 1, down_std, 0.0)
+
+            annual_return = mean * P
+            volatility = std * np.sqrt(P)
+            downside_deviation = down_std * np.sqrt(P)
+
+            sharpe = np.where(volatility > 0, (annual_return - self.risk_free_rate) / volatility, 0.0)
+            sortino = np.where(downside_deviation > 0, annual_return / downside_deviation, 0.0)
+
+            # Drawdown sobre a curva de equity (NaN = equity parada)
+            equity = np.cumprod(1.0 + x, axis=1)
+            peak = np.maximum.accumulate(equity, axis=1)
+            drawdown = (equity - peak) / peak
+            max_drawdown = np.where(n > 0, drawdown.min(axis=1, initial=0.0), 0.0)
+            calmar = np.where(max_drawdown != 0, annual_return / np.abs(max_drawdown), 0.0)
+
+            # Omega (threshold 0)
+            gains = np.where(valid & (R > 0), R, 0.0).sum(axis=1)
+            losses = -np.where(down, R, 0.0).sum(axis=1)
+            omega = np.where(
+                losses > 0,
+                gains / losses,
+                np.where(gains > 0, np.inf, 0.0)
+            )
+
+            # Percentis: cauda, VaR e CVaR em uma ordenação
+            p_low, p5, p95 = row_quantiles(R, valid, [1 - confidence, 0.05, 0.95]).T
+            tail_ratio = np.where(p5 < 0, np.abs(p95 / p5), 0.0)
+
+            var = -p_low
+            tail = valid & (R <= p_low[:, None])
+            n_tail = tail.sum(axis=1)
+            cvar = -np.where(tail, R, 0.0).sum(axis=1) / np.maximum(n_tail, 1)
+            cvar = np.where(n_tail > 0, cvar, var)
+
+        metrics = {
+            'sharpe_ratio': sharpe,
+            'sortino_ratio': sortino,
+            'calmar_ratio': calmar,
+            'max_drawdown': max_drawdown,
+            'volatility': volatility,
+            'downside_deviation': downside_deviation,
+            'omega_ratio': omega,
+            'tail_ratio': tail_ratio,
+            'var_95': np.where(n > 0, var, 0.0),
+            'cvar_95': np.where(n > 0, cvar, 0.0),
+            'skewness': skewness(R, valid),
+            'kurtosis': kurtosis(R, valid),
+            'total_return': equity[:, -1] - 1.0 if R.shape[1] else np.zeros(len(R)),
+            'max_drawdown_duration': max_run_length(valid & (drawdown < -0.001)),
+            'max_consecutive_wins': max_run_length(valid & (R > 0)),
+            'max_consecutive_losses': max_run_length(down),
+        }
+
+        if benchmark_returns is not None:
+            metrics.update(self._benchmark_metrics(R, valid, benchmark_returns))
+
+        return metrics
+
+    def _benchmark_metrics(
+        self,
+        R: np.ndarray,
+        valid: np.ndarray,
+        benchmark_returns: np.ndarray
+    ) -> Dict[str, np.ndarray]:
+        """Information ratio, alpha e beta contra o benchmark"""
+        B = np.broadcast_to(np.asarray(benchmark_returns, dtype=np.float64), R.shape)
+        both = valid & np.isfinite(B)
+        n = both.sum(axis=1)
+        safe_n = np.maximum(n, 1)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            r_mean = np.where(both, R, 0.0).sum(axis=1) / safe_n
+            b_mean = np.where(both, B, 0.0).sum(axis=1) / safe_n
+            r_dev = np.where(both, R - r_mean[:, None], 0.0)
+            b_dev = np.where(both, B - b_mean[:, None], 0.0)
+
+            covariance = (r_dev * b_dev).sum(axis=1) / (n - 1)
+            b_var = (b_dev * b_dev).sum(axis=1) / (n - 1)
+            beta = np.where((n > 1) & (b_var > 0), covariance / b_var, 0.0)
+
+            excess_dev = r_dev - b_dev
+            tracking_error = np.sqrt((excess_dev * excess_dev).sum(axis=1) / (n - 1))
+            information_ratio = np.where(
+                (n > 1) & (tracking_error > 0),
+                (r_mean - b_mean) / tracking_error,
+                0.0
+            )
+
+            P = self.periods
+            alpha = r_mean * P - (self.risk_free_rate + beta * (b_mean * P - self.risk_free_rate))
+            alpha = np.where(n > 1, alpha, 0.0)
+
+        return {
+            'information_ratio': information_ratio,
+            'alpha': alpha,
+            'beta': beta,
+        }
+
+    @staticmethod
+    def to_records(metrics: Dict[str, np.ndarray]) -> list:
+        """
+        Converte o resultado em lote para uma lista de dicts (um por
+        execução), no formato esperado pelas loss functions do hyperopt
+        """
+        names = list(metrics)
+        columns = [np.asarray(metrics[name]).tolist() for name in names]
+        return [dict(zip(names, row)) for row in zip(*columns)]
@@ -10,6 +10,8 @@ from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional, Tuple
 import math
 
+from .batch_metrics import kurtosis, max_run_length, run_lengths, skewness
+
 
 class PerformanceAnalyzer:
     """
@@ -175,25 +177,11 @@ class PerformanceAnalyzer:
         max_drawdown = np.min(drawdown)
         max_drawdown_pct = max_drawdown * 100
         
-        # Calcula duração do drawdown
-        drawdown_periods = []
-        in_drawdown = False
-        start_period = 0
-        
-        for i, dd in enumerate(drawdown):
-            if dd < -0.001 and not in_drawdown:  # Inicia drawdown (>0.1%)
-                in_drawdown = True
-                start_period = i
-            elif dd >= -0.001 and in_drawdown:  # Termina drawdown
-                in_drawdown = False
-                drawdown_periods.append(i - start_period)
-        
-        # Se ainda está em drawdown
-        if in_drawdown:
-            drawdown_periods.append(len(drawdown) - start_period)
+        # Calcula duração do drawdown (sequências abaixo de -0.1%)
+        drawdown_periods = run_lengths(drawdown < -0.001)
         
-        max_drawdown_duration = max(drawdown_periods) if drawdown_periods else 0
-        avg_drawdown_duration = np.mean(drawdown_periods) if drawdown_periods else 0
+        max_drawdown_duration = int(drawdown_periods.max()) if len(drawdown_periods) else 0
+        avg_drawdown_duration = np.mean(drawdown_periods) if len(drawdown_periods) else 0
         
         # Calmar Ratio (Return anualizado / Max Drawdown)
         total_return_pct = (equity_values[-1] - equity_values[0]) / equity_values[0] * 100
@@ -257,14 +245,9 @@ class PerformanceAnalyzer:
             return {}
         
         # Duração dos trades (assumindo timestamp em ms)
-        durations = []
-        for _, trade in trades_df.iterrows():
-            if pd.notna(trade['entry_time']) and pd.notna(trade['exit_time']):
-                duration_ms = trade['exit_time'] - trade['entry_time']
-                duration_minutes = duration_ms / (1000 * 60)  # Converte para minutos
-                durations.append(duration_minutes)
-        
-        if not durations:
+        durations = ((trades_df['exit_time'] - trades_df['entry_time']) / (1000 * 60)).dropna().values
+        
+        if len(durations) == 0:
             return {}
         
         avg_trade_duration = np.mean(durations)
@@ -290,14 +273,7 @@ class PerformanceAnalyzer:
         if len(data) < 3:
             return 0
         
-        mean = np.mean(data)
-        std = np.std(data)
-        
-        if std == 0:
-            return 0
-        
-        skew = np.mean(((data - mean) / std) ** 3)
-        return skew
+        return float(skewness(np.asarray(data, dtype=np.float64), bias=True)[0])
     
     def _calculate_kurtosis(self, data: np.array) -> float:
         """
@@ -306,35 +282,18 @@ class PerformanceAnalyzer:
         if len(data) < 4:
             return 0
         
-        mean = np.mean(data)
-        std = np.std(data)
-        
-        if std == 0:
-            return 0
-        
-        kurt = np.mean(((data - mean) / std) ** 4) - 3  # Excess kurtosis
-        return kurt
+        return float(kurtosis(np.asarray(data, dtype=np.float64), bias=True)[0])  # Excess kurtosis
     
     def _calculate_max_consecutive(self, trades_df: pd.DataFrame, result_type: str) -> int:
         """
         Calcula máxima sequência consecutiva de wins ou losses
         """
         if result_type == 'win':
-            results = (trades_df['net_pnl'] > 0).astype(int)
+            results = trades_df['net_pnl'].values > 0
         else:
-            results = (trades_df['net_pnl'] < 0).astype(int)
-        
-        max_consecutive = 0
-        current_consecutive = 0
-        
-        for result in results:
-            if result == 1:
-                current_consecutive += 1
-                max_consecutive = max(max_consecutive, current_consecutive)
-            else:
-                current_consecutive = 0
+            results = trades_df['net_pnl'].values < 0
         
-        return max_consecutive
+        return int(max_run_length(results)[0])
     
     def _analyze_time_distribution(self, trades_df: pd.DataFrame) -> Dict[str, Any]:
         """
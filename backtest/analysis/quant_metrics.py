@@ -9,6 +9,8 @@ import numpy as np
 from typing import Dict, Any, List, Optional
 import logging
 
+from .batch_metrics import BatchMetrics
+
 logger = logging.getLogger(__name__)
 
 
@@ -82,6 +84,25 @@ class QuantitativeMetrics:
         
         return metrics
     
+    def calculate_all_metrics_batch(
+        self,
+        returns: np.ndarray,
+        benchmark_returns: Optional[np.ndarray] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Calcula todas as métricas para muitas curvas de uma vez
+        
+        Args:
+            returns: Matriz de retornos (execuções x tempo); execuções mais
+                curtas preenchidas com NaN
+            benchmark_returns: Retornos do benchmark (tempo,) ou (execuções x tempo)
+        
+        Returns:
+            Dicionário métrica -> array com um valor por execução
+        """
+        batch = BatchMetrics(self.risk_free_rate, self.trading_days_per_year)
+        return batch.calculate_all_metrics(returns, benchmark_returns)
+    
     def sharpe_ratio(self, returns: pd.Series, periods: int = None) -> float:
         """
         Sharpe Ratio - Retorno ajustado pelo risco
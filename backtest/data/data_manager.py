@@ -10,6 +10,7 @@ import ccxt
 import os
 import time
 import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
@@ -165,27 +166,41 @@ class DataManager:
         symbols: List[str], 
         start_date: str, 
         end_date: str,
-        timeframe: str = '1m'
+        timeframe: str = '1m',
+        max_workers: int = 4
     ) -> Dict[str, pd.DataFrame]:
         """
         Obtém dados para múltiplos símbolos
+        Cada símbolo é carregado uma vez; as coletas (I/O de exchange/cache)
+        rodam em paralelo em até max_workers threads
         """
         
         results = {}
+        unique_symbols = list(dict.fromkeys(symbols))
         
-        for symbol in symbols:
+        def collect(symbol: str) -> pd.DataFrame:
             print(f"[DATA_MANAGER] 📊 Coletando {symbol}...")
-            try:
-                data = self.get_historical_data(symbol, start_date, end_date, timeframe)
-                if not data.empty:
-                    results[symbol] = data
-                else:
-                    print(f"[DATA_MANAGER] ⚠️  Nenhum dado para {symbol}")
-            except Exception as e:
-                print(f"[DATA_MANAGER] ❌ Erro em {symbol}: {e}")
-                continue
-        
-        print(f"[DATA_MANAGER] ✅ Coletados dados para {len(results)}/{len(symbols)} símbolos")
+            return self.get_historical_data(symbol, start_date, end_date, timeframe)
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(unique_symbols) or 1))) as executor:
+            futures = {executor.submit(collect, symbol): symbol for symbol in unique_symbols}
+            
+            for future in as_completed(futures):
+                symbol = futures[future]
+                try:
+                    data = future.result()
+                    if not data.empty:
+                        results[symbol] = data
+                    else:
+                        print(f"[DATA_MANAGER] ⚠️  Nenhum dado para {symbol}")
+                except Exception as e:
+                    print(f"[DATA_MANAGER] ❌ Erro em {symbol}: {e}")
+                    continue
+        
+        # Mantém a ordem dos símbolos pedidos
+        results = {symbol: results[symbol] for symbol in unique_symbols if symbol in results}
+        
+        print(f"[DATA_MANAGER] ✅ Coletados dados para {len(results)}/{len(unique_symbols)} símbolos")
         return results
     
     def update_data(
@@ -8,7 +8,10 @@ Gerencia execução, decisões e integração com slots de trading
 import logging
 import asyncio
 import threading
-from typing import Dict, List, Optional, Any
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed, wait
+from concurrent.futures import TimeoutError as FuturesTimeout
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, timezone
 from enum import Enum
 import time
@@ -32,6 +35,16 @@ class AgentGroup(str, Enum):
     G2_TREND = "g2_trend"  # Tendência - trades médio prazo
 
 
+@dataclass
+class SlotJob:
+    """Slot apto a operar no ciclo atual"""
+    slot: Dict[str, Any]
+    agent_id: str
+    agent: IntelligentAgent
+    symbol: str
+    deadline: float  # time.monotonic() limite para o slot no ciclo
+
+
 class AgentOrchestrator:
     """
     Orquestrador central de agentes IA
@@ -60,6 +73,21 @@ class AgentOrchestrator:
         # Configurações
         self.scan_interval = 30  # Segundos entre scans
         self.min_confidence = 0.65  # Confiança mínima para operar
+        self.max_workers = 8  # Threads para fetch de mercado e análise
+        self.slot_deadline_seconds = 20.0  # Prazo de cada slot dentro do ciclo
+        
+        # Pools do ciclo (criados sob demanda): fetch/análise e fila de execução serial
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._execution_pool: Optional[ThreadPoolExecutor] = None
+        self._agent_locks: Dict[str, threading.Lock] = {}
+        
+        # Métricas de ciclo
+        self.cycle_stats: Dict[str, Any] = {
+            'cycles': 0,
+            'slot_timeouts': 0,
+            'expired_trades': 0,
+            'last_cycle': None
+        }
         
         # Inicializar agentes
         self._initialize_agents()
@@ -113,6 +141,8 @@ class AgentOrchestrator:
                 'last_execution': None
             }
         
+        self._agent_locks = {agent_id: threading.Lock() for agent_id in self.agents}
+        
         logger.info(f"✅ {len(self.agents)} agentes inicializados")
     
     def start(self):
@@ -133,6 +163,11 @@ class AgentOrchestrator:
         if self._loop_thread:
             self._loop_thread.join(timeout=5)
         
+        for pool in (self._pool, self._execution_pool):
+            if pool:
+                pool.shutdown(wait=False)
+        self._pool = self._execution_pool = None
+        
         logger.info("🛑 Agent Orchestrator parado")
     
     def _orchestration_loop(self):
@@ -150,7 +185,17 @@ class AgentOrchestrator:
         logger.info("🔄 Orchestration loop finalizado")
     
     def _execute_cycle(self):
-        """Executa um ciclo de análise e decisão"""
+        """
+        Executa um ciclo de análise e decisão em estágios
+        
+        1. Seleção dos slots aptos (agente ativo, limite de posições)
+        2. Fetch de mercado em paralelo, um por (exchange, símbolo)
+        3. Análise concorrente assim que o dado do slot chega
+           (serial por agente, que guarda estado entre análises)
+        4. Fila de execução serial; trades de slots com prazo vencido
+           são descartados
+        """
+        cycle_start = time.monotonic()
         
         # 1. Buscar slots ativos
         active_slots = self.slot_manager.get_active_slots()
@@ -161,39 +206,117 @@ class AgentOrchestrator:
         
         logger.info(f"📊 Processando {len(active_slots)} slots ativos")
         
-        # 2. Para cada slot ativo
+        deadline = cycle_start + self.slot_deadline_seconds
+        jobs: List[SlotJob] = []
         for slot in active_slots:
             try:
-                self._process_slot(slot)
+                job = self._prepare_slot(slot, deadline)
+                if job:
+                    jobs.append(job)
             except Exception as e:
                 logger.error(f"Erro ao processar slot {slot['slot_id']}: {e}")
+        
+        timings = {'select_ms': (time.monotonic() - cycle_start) * 1000}
+        timed_out = 0
+        analyses: List[Future] = []
+        executions: List[Future] = []
+        
+        if jobs:
+            pool = self._get_pool()
+            
+            # 2. Fetch deduplicado por (exchange, símbolo)
+            by_market: Dict[Tuple[str, str], List[SlotJob]] = {}
+            for job in jobs:
+                by_market.setdefault((job.slot['exchange'], job.symbol), []).append(job)
+            
+            fetches = {
+                pool.submit(self._fetch_market_data, exchange, symbol): (exchange, symbol)
+                for exchange, symbol in by_market
+            }
+            
+            # 3. Análise conforme os dados chegam
+            try:
+                for future in as_completed(fetches, timeout=max(0.0, deadline - time.monotonic())):
+                    exchange, symbol = fetches[future]
+                    market_data = future.result()
+                    if not market_data:
+                        logger.warning(f"Não foi possível buscar dados de mercado para {symbol}")
+                        continue
+                    for job in by_market[(exchange, symbol)]:
+                        analyses.append(pool.submit(self._analyze_slot, job, market_data, executions))
+            except FuturesTimeout:
+                late = [fetches[f] for f in fetches if not f.done()]
+                timed_out += sum(len(by_market[key]) for key in late)
+                logger.warning(f"⏱️ Fetch de mercado excedeu o prazo: {late}")
+            timings['fetch_ms'] = (time.monotonic() - cycle_start) * 1000
+            
+            _, pending = wait(analyses, timeout=max(0.0, deadline - time.monotonic()))
+            timed_out += len(pending)
+            timings['analysis_ms'] = (time.monotonic() - cycle_start) * 1000
+            
+            # 4. Aguardar fila de execução
+            _, pending = wait(list(executions), timeout=max(0.0, deadline - time.monotonic()))
+            timings['execution_ms'] = (time.monotonic() - cycle_start) * 1000
+            if pending:
+                logger.warning(f"⏱️ {len(pending)} execuções ainda na fila ao fim do ciclo")
+        
+        timings['total_ms'] = (time.monotonic() - cycle_start) * 1000
+        
+        with self._lock:
+            self.cycle_stats['cycles'] += 1
+            self.cycle_stats['slot_timeouts'] += timed_out
+            self.cycle_stats['last_cycle'] = {
+                'active_slots': len(active_slots),
+                'eligible_slots': len(jobs),
+                'market_fetches': len({(j.slot['exchange'], j.symbol) for j in jobs}),
+                'analyses': len(analyses),
+                'trades_queued': len(executions),
+                'slot_timeouts': timed_out,
+                **{k: round(v, 2) for k, v in timings.items()},
+                'finished_at': datetime.now(timezone.utc).isoformat()
+            }
+        
+        if timed_out:
+            logger.warning(f"⏱️ {timed_out} slots excederam o prazo de {self.slot_deadline_seconds}s")
+    
+    def _get_pool(self) -> ThreadPoolExecutor:
+        """Pools do ciclo (fetch/análise e fila de execução)"""
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="orchestrator"
+            )
+            self._execution_pool = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="orchestrator-exec"
+            )
+        return self._pool
     
-    def _process_slot(self, slot: Dict[str, Any]):
+    def _prepare_slot(self, slot: Dict[str, Any], deadline: float) -> Optional[SlotJob]:
         """
-        Processa um slot: busca dados, analisa com agente, executa decisão
+        Verifica se o slot pode operar neste ciclo
         
         Args:
             slot: Dados do slot
+            deadline: Prazo do slot (time.monotonic())
+        
+        Returns:
+            SlotJob ou None se o slot não opera
         """
         slot_id = slot['slot_id']
-        exchange = slot['exchange']
         assigned_agent_id = slot.get('assigned_agent')
         
         # Verificar se tem agente atribuído
         if not assigned_agent_id:
             logger.debug(f"Slot {slot_id} sem agente atribuído")
-            return
+            return None
         
         # Verificar se agente existe e está ativo
         if assigned_agent_id not in self.agents:
             logger.warning(f"Agente {assigned_agent_id} não encontrado")
-            return
+            return None
         
         if self.agent_status[assigned_agent_id] != AgentStatus.ACTIVE:
             logger.debug(f"Agente {assigned_agent_id} não está ativo")
-            return
-        
-        agent = self.agents[assigned_agent_id]
+            return None
         
         # Verificar se slot pode abrir nova posição
         open_positions = self.slot_manager.get_positions(slot_id, status="open")
@@ -201,37 +324,64 @@ class AgentOrchestrator:
         
         if len(open_positions) >= max_positions:
             logger.debug(f"Slot {slot_id} já tem {len(open_positions)} posições abertas (max: {max_positions})")
-            return
+            return None
         
-        # Buscar dados de mercado
         # TODO: Implementar seleção inteligente de símbolo
         # Por enquanto usa BTC/USDT
         symbol = "BTC/USDT"
         
-        market_data = self._fetch_market_data(exchange, symbol)
+        return SlotJob(
+            slot=slot,
+            agent_id=assigned_agent_id,
+            agent=self.agents[assigned_agent_id],
+            symbol=symbol,
+            deadline=deadline
+        )
+    
+    def _analyze_slot(self, job: SlotJob, market_data: Dict, executions: List[Future]):
+        """
+        Analisa o mercado com o agente do slot e enfileira o trade, se houver
+        
+        Args:
+            job: Slot a analisar
+            market_data: Dados de mercado do (exchange, símbolo) do slot
+            executions: Lista de futures da fila de execução do ciclo
+        """
+        try:
+            # Analisar com agente
+            with self._agent_locks[job.agent_id]:
+                decision = job.agent.analyze_market(market_data)
+            
+            # Atualizar stats
+            with self._lock:
+                self.agent_stats[job.agent_id]['decisions_count'] += 1
+                self.agent_stats[job.agent_id]['last_decision'] = decision
+                self.agent_stats[job.agent_id]['last_execution'] = datetime.utcnow().isoformat()
+            
+            # Verificar se deve executar trade
+            signal = decision.get('signal')
+            confidence = decision.get('confidence', 0)
+            
+            if signal in ['BUY', 'SELL'] and confidence >= self.min_confidence:
+                logger.info(f"🎯 Agente {job.agent_id}: {signal} {job.symbol} (confiança: {confidence:.2%})")
+                executions.append(self._execution_pool.submit(
+                    self._execute_queued_trade, job, signal, decision, market_data
+                ))
+            else:
+                logger.debug(f"Agente {job.agent_id}: {signal} {job.symbol} (confiança: {confidence:.2%}) - Aguardando")
         
-        if not market_data:
-            logger.warning(f"Não foi possível buscar dados de mercado para {symbol}")
+        except Exception as e:
+            logger.error(f"Erro ao processar slot {job.slot['slot_id']}: {e}")
+    
+    def _execute_queued_trade(self, job: SlotJob, signal: str, decision: Dict, market_data: Dict):
+        """Executa um trade da fila, descartando-o se o prazo do slot venceu"""
+        if time.monotonic() > job.deadline:
+            logger.warning(f"⏱️ Slot {job.slot['slot_id']}: prazo excedido, trade {signal} {job.symbol} descartado")
+            with self._lock:
+                self.cycle_stats['expired_trades'] += 1
             return
         
-        # Analisar com agente
-        decision = agent.analyze_market(market_data)
-        
-        # Atualizar stats
-        with self._lock:
-            self.agent_stats[assigned_agent_id]['decisions_count'] += 1
-            self.agent_stats[assigned_agent_id]['last_decision'] = decision
-            self.agent_stats[assigned_agent_id]['last_execution'] = datetime.utcnow().isoformat()
-        
-        # Verificar se deve executar trade
-        signal = decision.get('signal')
-        confidence = decision.get('confidence', 0)
-        
-        if signal in ['BUY', 'SELL'] and confidence >= self.min_confidence:
-            logger.info(f"🎯 Agente {assigned_agent_id}: {signal} {symbol} (confiança: {confidence:.2%})")
-            self._execute_trade(slot, symbol, signal, decision, market_data)
-        else:
-            logger.debug(f"Agente {assigned_agent_id}: {signal} {symbol} (confiança: {confidence:.2%}) - Aguardando")
+        self._execute_trade(job.slot, job.symbol, signal, decision, market_data)
     
     def _fetch_market_data(self, exchange: str, symbol: str) -> Optional[Dict]:
         """
@@ -416,5 +566,9 @@ class AgentOrchestrator:
                 'successful_trades': total_successful,
                 'failed_trades': total_failed,
                 'success_rate': (total_successful / (total_successful + total_failed) * 100)
-                    if (total_successful + total_failed) > 0 else 0
+                    if (total_successful + total_failed) > 0 else 0,
+                'cycles': self.cycle_stats['cycles'],
+                'slot_timeouts': self.cycle_stats['slot_timeouts'],
+                'expired_trades': self.cycle_stats['expired_trades'],
+                'last_cycle': self.cycle_stats['last_cycle']
             }
@@ -29,7 +29,8 @@ class FundingRateArbitrage:
     Sistema de arbitragem de funding rates
     """
     
-    def __init__(self):
+    def __init__(self, funding_store=None):
+        self.funding_store = funding_store
         self.opportunities: List[FundingOpportunity] = []
         self.active_positions: Dict[str, Dict[str, Any]] = {}
         
@@ -39,6 +40,10 @@ class FundingRateArbitrage:
         
         logger.info("✅ Funding Rate Arbitrage initialized")
     
+    def set_funding_store(self, funding_store):
+        """Conecta um FundingRateStore (scan passa a ser servido da memória)"""
+        self.funding_store = funding_store
+    
     async def scan_funding_opportunities(
         self,
         symbols: List[str] = None
@@ -52,6 +57,9 @@ class FundingRateArbitrage:
         Returns:
             Lista de oportunidades
         """
+        if self.funding_store is not None:
+            return self._scan_from_store(symbols)
+        
         if symbols is None:
             symbols = ['BTC/USDT', 'ETH/USDT', 'BNB/USDT']
         
@@ -93,8 +101,43 @@ class FundingRateArbitrage:
         
         return self.opportunities
     
+    def _scan_from_store(self, symbols: Optional[List[str]] = None) -> List[FundingOpportunity]:
+        """Escaneia todos os símbolos × exchanges em uma passada sobre o store"""
+        opportunities = []
+        
+        for spread in self.funding_store.cross_exchange_spreads(symbols):
+            funding_diff = spread['funding_diff_pct']
+            annual_rate = funding_diff * 365 * 3  # 3 funding por dia
+            net_profit = annual_rate - (self.transfer_cost + self.trading_fee * 2)
+            
+            if net_profit <= 5.0:
+                # Spreads vêm ordenados; os próximos são menores
+                break
+            
+            opportunities.append(FundingOpportunity(
+                symbol=spread['symbol'],
+                long_exchange=spread['long_exchange'],
+                short_exchange=spread['short_exchange'],
+                funding_rate_diff=funding_diff,
+                annual_rate=annual_rate,
+                net_profit_estimate=net_profit,
+                risk_score=self._calculate_risk(spread['symbol'], funding_diff)
+            ))
+        
+        self.opportunities = sorted(opportunities, key=lambda x: x.net_profit_estimate, reverse=True)
+        
+        return self.opportunities
+    
     async def _fetch_funding_rates(self, symbol: str) -> Dict[str, float]:
         """Busca funding rates de múltiplas exchanges"""
+        if self.funding_store is not None:
+            rates = {}
+            for exchange_name in self.funding_store.exchanges:
+                latest = self.funding_store.get_latest(exchange_name, symbol)
+                if latest:
+                    rates[exchange_name] = latest['funding_rate_pct']
+            return rates
+        
         # Mock de funding rates (em produção, buscar de APIs)
         import random
         
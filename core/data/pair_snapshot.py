@@ -0,0 +1,239 @@
+# core/data/pair_snapshot.py
+"""
+Pair Snapshot - Snapshot colunar de mercados e tickers por exchange
+Um único load_markets + fetch_tickers por refresh alimenta todas as
+consultas de ranking (volume, tendência, volatilidade, spread, blacklist),
+que rodam vetorizadas sobre o mesmo DataFrame
+"""
+import asyncio
+import inspect
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_COLUMNS = [
+    'symbol', 'base', 'quote', 'active', 'has_ticker',
+    'last', 'quote_volume', 'percentage', 'high', 'low', 'bid', 'ask',
+    'volatility', 'spread'
+]
+
+
+@dataclass
+class TickerSnapshot:
+    """Mercados + tickers de uma exchange num instante"""
+    exchange: str
+    frame: pd.DataFrame
+    fetched_at: float
+
+    @property
+    def age_seconds(self) -> float:
+        return time.time() - self.fetched_at
+
+
+def _number(value: Any) -> float:
+    try:
+        return float(value) if value is not None else np.nan
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def build_snapshot_frame(markets: Dict[str, Dict], tickers: Dict[str, Dict]) -> pd.DataFrame:
+    """
+    Monta o frame colunar (uma linha por mercado, na ordem de markets)
+
+    Args:
+        markets: Resultado de load_markets
+        tickers: Resultado de fetch_tickers
+
+    Returns:
+        DataFrame com SNAPSHOT_COLUMNS; volatility = (high - low) / last e
+        spread = (ask - bid) / meio, ambos em %
+    """
+    rows = []
+    for symbol, market in markets.items():
+        ticker = tickers.get(symbol)
+        t = ticker or {}
+        rows.append((
+            symbol,
+            market.get('base'),
+            market.get('quote'),
+            bool(market.get('active', True)),
+            bool(ticker),
+            _number(t.get('last')),
+            _number(t.get('quoteVolume')),
+            _number(t.get('percentage')),
+            _number(t.get('high')),
+            _number(t.get('low')),
+            _number(t.get('bid')),
+            _number(t.get('ask')),
+        ))
+
+    frame = pd.DataFrame(rows, columns=SNAPSHOT_COLUMNS[:-2])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        last = frame['last'].where(frame['last'] > 0)
+        frame['volatility'] = (frame['high'] - frame['low']) / last * 100
+        mid = (frame['ask'] + frame['bid']) / 2
+        frame['spread'] = (frame['ask'] - frame['bid']) / mid.where(mid > 0) * 100
+    return frame
+
+
+def rank_pairs(
+    frame: pd.DataFrame,
+    quote_currency: str,
+    limit: int,
+    sort_by: str = 'quote_volume',
+    min_volume: float = 0.0,
+    min_abs_change: Optional[float] = None,
+    max_volatility: Optional[float] = None,
+    max_spread: Optional[float] = None,
+    blacklist: Iterable[str] = ()
+) -> List[str]:
+    """
+    Consulta vetorizada de ranking sobre um snapshot
+
+    Filtros: mercado ativo, quote, fora da blacklist, com ticker, volume
+    quote > min_volume, |variação 24h| > min_abs_change. Volatilidade e
+    spread só excluem pares cujo valor é conhecido e acima do limite.
+
+    Args:
+        frame: Frame de build_snapshot_frame
+        quote_currency: Moeda quote
+        limit: Número máximo de pares
+        sort_by: 'quote_volume' ou 'change' (|percentage|), decrescente
+        min_volume: Volume quote mínimo (exclusivo)
+        min_abs_change: Variação absoluta mínima em % (exclusiva)
+        max_volatility: Volatilidade máxima em %
+        max_spread: Spread máximo em %
+        blacklist: Pares excluídos
+
+    Returns:
+        Lista de símbolos ordenados
+    """
+    if frame.empty or limit <= 0:
+        return []
+
+    volume = frame['quote_volume']
+    mask = (
+        frame['active'].to_numpy()
+        & (frame['quote'] == quote_currency).to_numpy()
+        & frame['has_ticker'].to_numpy()
+        & ~frame['symbol'].isin(list(blacklist)).to_numpy()
+        & (volume > 0).to_numpy()
+        & (volume > min_volume).to_numpy()
+    )
+
+    change = frame['percentage'].abs()
+    if min_abs_change is not None:
+        mask &= (change > min_abs_change).to_numpy()
+    if max_volatility is not None:
+        mask &= ~(frame['volatility'] > max_volatility).to_numpy()
+    if max_spread is not None:
+        mask &= ~(frame['spread'] > max_spread).to_numpy()
+
+    rows = np.flatnonzero(mask)
+    if not len(rows):
+        return []
+
+    keys = (change if sort_by == 'change' else volume).to_numpy()[rows]
+    # Ordenação estável decrescente (empates mantêm a ordem dos mercados)
+    order = rows[np.argsort(-keys, kind='stable')][:limit]
+    return frame['symbol'].to_numpy()[order].tolist()
+
+
+class PairSnapshotService:
+    """
+    Mantém um snapshot por exchange, atualizado no máximo a cada ttl_seconds
+
+    Chamadas concorrentes durante um refresh aguardam o mesmo fetch. Se o
+    refresh falhar, o último snapshot válido continua sendo servido.
+    """
+
+    def __init__(self, exchange_factory: Callable[[str], Any], ttl_seconds: float = 60.0):
+        self._exchange_factory = exchange_factory
+        self.ttl_seconds = ttl_seconds
+        self._snapshots: Dict[str, TickerSnapshot] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.fetch_count = 0
+
+    async def get(self, exchange: str, max_age: Optional[float] = None) -> TickerSnapshot:
+        """
+        Snapshot da exchange, atualizando se mais velho que max_age (padrão: ttl)
+        """
+        max_age = self.ttl_seconds if max_age is None else max_age
+        snapshot = self._snapshots.get(exchange)
+        if snapshot is not None and snapshot.age_seconds < max_age:
+            return snapshot
+
+        lock = self._locks.setdefault(exchange, asyncio.Lock())
+        async with lock:
+            # Outro chamador pode ter atualizado enquanto esperávamos
+            snapshot = self._snapshots.get(exchange)
+            if snapshot is not None and snapshot.age_seconds < max_age:
+                return snapshot
+            try:
+                return await self.refresh(exchange)
+            except Exception as e:
+                if snapshot is None:
+                    raise
+                logger.warning(
+                    f"Erro ao atualizar snapshot de {exchange}, usando snapshot de "
+                    f"{snapshot.age_seconds:.0f}s: {e}"
+                )
+                return snapshot
+
+    async def refresh(self, exchange: str) -> TickerSnapshot:
+        """Busca mercados e tickers uma vez e substitui o snapshot"""
+        instance = self._exchange_factory(exchange)
+        markets = await self._call(instance.load_markets)
+        tickers = await self._call(instance.fetch_tickers)
+        self.fetch_count += 1
+
+        snapshot = TickerSnapshot(
+            exchange=exchange,
+            frame=build_snapshot_frame(markets or {}, tickers or {}),
+            fetched_at=time.time()
+        )
+        self._snapshots[exchange] = snapshot
+        logger.debug(f"Snapshot de {exchange} atualizado: {len(snapshot.frame)} mercados")
+        return snapshot
+
+    def start_periodic_refresh(self, exchanges: List[str], interval_seconds: Optional[float] = None):
+        """Inicia o refresh periódico (precisa de um event loop em execução)"""
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        interval = interval_seconds or self.ttl_seconds
+        self._refresh_task = asyncio.get_running_loop().create_task(
+            self._refresh_loop(list(exchanges), interval)
+        )
+
+    def stop_periodic_refresh(self):
+        """Cancela o refresh periódico"""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+
+    async def _refresh_loop(self, exchanges: List[str], interval: float):
+        while True:
+            for exchange in exchanges:
+                try:
+                    await self.get(exchange, max_age=interval)
+                except Exception as e:
+                    logger.error(f"Erro no refresh periódico de {exchange}: {e}")
+            await asyncio.sleep(interval)
+
+    @staticmethod
+    async def _call(method: Callable[[], Any]) -> Any:
+        # ccxt síncrono roda numa thread para não bloquear o event loop
+        if inspect.iscoroutinefunction(method):
+            return await method()
+        result = await asyncio.to_thread(method)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
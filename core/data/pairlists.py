@@ -11,6 +11,8 @@ import ccxt
 import redis
 import json
 
+from .pair_snapshot import PairSnapshotService, rank_pairs
+
 logger = logging.getLogger(__name__)
 
 class PairListManager:
@@ -27,8 +29,16 @@ class PairListManager:
             'blacklisted_pairs': ['USDT/USD', 'BUSD/USDT'],
             'whitelisted_pairs': [],
             'quote_currencies': ['USDT', 'BTC', 'ETH'],
-            'cache_ttl_minutes': 60
+            'cache_ttl_minutes': 60,
+            'snapshot_ttl_seconds': 60,      # Refresh do snapshot de tickers
+            'max_volatility_pct': 15.0,      # Mean reversion: amplitude 24h máxima
+            'max_spread_pct': 0.2            # Arbitragem: spread bid/ask máximo
         }
+        
+        # Snapshot de mercados/tickers compartilhado por todos os rankings
+        self.snapshots = PairSnapshotService(
+            self._get_exchange, ttl_seconds=self.config['snapshot_ttl_seconds']
+        )
     
     def _get_redis_client(self):
         """Obtém cliente Redis"""
@@ -98,47 +108,11 @@ class PairListManager:
                     logger.debug(f"Usando pairlist do cache: {len(cached_pairs)} pares")
                     return cached_pairs
             
-            # Buscar da exchange
-            exchange_instance = self._get_exchange(exchange)
-            
-            # Carregar mercados
-            markets = await exchange_instance.load_markets()
-            
-            # Buscar tickers para volume
-            tickers = await exchange_instance.fetch_tickers()
-            
-            # Filtrar e ordenar por volume
-            volume_pairs = []
-            
-            for symbol, market in markets.items():
-                # Filtros básicos
-                if not market.get('active', True):
-                    continue
-                
-                if market['quote'] != quote_currency:
-                    continue
-                
-                if symbol in self.config['blacklisted_pairs']:
-                    continue
-                
-                # Verificar ticker
-                ticker = tickers.get(symbol)
-                if not ticker:
-                    continue
-                
-                volume_quote = ticker.get('quoteVolume', 0)
-                if volume_quote and volume_quote > self.config['min_volume_usdt']:
-                    volume_pairs.append({
-                        'symbol': symbol,
-                        'volume': volume_quote,
-                        'price': ticker.get('last', 0)
-                    })
-            
-            # Ordenar por volume decrescente
-            volume_pairs.sort(key=lambda x: x['volume'], reverse=True)
-            
-            # Extrair apenas símbolos
-            top_pairs = [pair['symbol'] for pair in volume_pairs[:limit]]
+            # Ranking por volume sobre o snapshot da exchange
+            top_pairs = await self.rank_pairs(
+                exchange, quote_currency, limit,
+                min_volume=self.config['min_volume_usdt']
+            )
             
             # Salvar no cache
             if self.redis_client and top_pairs:
@@ -178,48 +152,13 @@ class PairListManager:
                 if cached_data:
                     return json.loads(cached_data)
             
-            # Buscar da exchange
-            exchange_instance = self._get_exchange(exchange)
-            
-            markets = await exchange_instance.load_markets()
-            tickers = await exchange_instance.fetch_tickers()
-            
-            # Filtrar e ordenar por variação percentual
-            trending_pairs = []
-            
-            for symbol, market in markets.items():
-                if not market.get('active', True):
-                    continue
-                
-                if market['quote'] != quote_currency:
-                    continue
-                
-                if symbol in self.config['blacklisted_pairs']:
-                    continue
-                
-                ticker = tickers.get(symbol)
-                if not ticker:
-                    continue
-                
-                percentage_change = ticker.get('percentage')
-                volume_quote = ticker.get('quoteVolume', 0)
-                
-                # Filtrar por volume mínimo e variação significativa
-                if (volume_quote and volume_quote > self.config['min_volume_usdt'] * 0.5 and
-                    percentage_change is not None and abs(percentage_change) > 2):
-                    
-                    trending_pairs.append({
-                        'symbol': symbol,
-                        'change': abs(percentage_change),
-                        'volume': volume_quote,
-                        'direction': 'up' if percentage_change > 0 else 'down'
-                    })
-            
-            # Ordenar por variação decrescente
-            trending_pairs.sort(key=lambda x: x['change'], reverse=True)
-            
-            # Extrair símbolos
-            trending_symbols = [pair['symbol'] for pair in trending_pairs[:limit]]
+            # Volume mínimo reduzido e variação 24h significativa (> 2%)
+            trending_symbols = await self.rank_pairs(
+                exchange, quote_currency, limit,
+                sort_by='change',
+                min_volume=self.config['min_volume_usdt'] * 0.5,
+                min_abs_change=2
+            )
             
             # Cache
             if self.redis_client and trending_symbols:
@@ -233,6 +172,32 @@ class PairListManager:
             logger.error(f"Erro ao obter pares trending: {e}")
             return self._get_fallback_pairs(quote_currency)[:limit]
     
+    async def rank_pairs(
+        self,
+        exchange: str = "binance",
+        quote_currency: str = "USDT",
+        limit: int = 20,
+        **filters
+    ) -> List[str]:
+        """
+        Consulta de ranking sobre o snapshot compartilhado (sem cache Redis)
+        
+        Args:
+            exchange: Exchange
+            quote_currency: Moeda quote
+            limit: Número máximo de pares
+            **filters: sort_by, min_volume, min_abs_change, max_volatility,
+                max_spread (ver pair_snapshot.rank_pairs)
+            
+        Returns:
+            Lista de pares ranqueados, já sem a blacklist
+        """
+        snapshot = await self.snapshots.get(exchange)
+        return rank_pairs(
+            snapshot.frame, quote_currency, limit,
+            blacklist=self.config['blacklisted_pairs'], **filters
+        )
+    
     def get_static_pairlist(self, strategy: str = "balanced") -> List[str]:
         """
         Obtém lista estática de pares baseada na estratégia
@@ -304,15 +269,20 @@ class PairListManager:
                 adaptive_pairs = list(dict.fromkeys(volume_pairs + trending_pairs))[:limit]
                 
             elif strategy_type == "mean_reversion":
-                # Para mean reversion: focar em pares estáveis com volume
-                volume_pairs = await self.get_top_volume_pairs(exchange, limit=limit)
-                # Filtrar pares muito voláteis (seria implementado com lógica adicional)
-                adaptive_pairs = volume_pairs
+                # Para mean reversion: pares estáveis com volume (sem os muito voláteis)
+                adaptive_pairs = await self.rank_pairs(
+                    exchange, limit=limit,
+                    min_volume=self.config['min_volume_usdt'],
+                    max_volatility=self.config['max_volatility_pct']
+                )
                 
             elif strategy_type == "arbitrage":
-                # Para arbitragem: pares com alta liquidez
-                volume_pairs = await self.get_top_volume_pairs(exchange, limit=limit)
-                adaptive_pairs = volume_pairs
+                # Para arbitragem: pares com alta liquidez e spread apertado
+                adaptive_pairs = await self.rank_pairs(
+                    exchange, limit=limit,
+                    min_volume=self.config['min_volume_usdt'],
+                    max_spread=self.config['max_spread_pct']
+                )
                 
             else:
                 # Default: balanceado
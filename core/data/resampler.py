@@ -0,0 +1,421 @@
+# core/data/resampler.py
+"""
+Multi-Timeframe Resampler - Candles de timeframes maiores a partir do TF base
+Agrega candles base em barras alinhadas (UTC) do timeframe maior, mantém a
+barra aberta atualizada incrementalmente e projeta valores do TF maior de
+volta no índice base sem lookahead.
+"""
+
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .timeframe import TIMEFRAME_SECONDS, timeframe_to_seconds
+
+logger = logging.getLogger(__name__)
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+# Semanas de exchange começam na segunda-feira (epoch é uma quinta-feira)
+WEEK_OFFSET_MS = 4 * 86400 * 1000
+
+
+def timeframe_to_ms(timeframe: str) -> int:
+    """Duração do timeframe em milissegundos"""
+    return timeframe_to_seconds(timeframe) * 1000
+
+
+def bar_start(times_ms: np.ndarray, timeframe: str) -> np.ndarray:
+    """
+    Início (ms) da barra do timeframe que contém cada timestamp
+
+    Args:
+        times_ms: Timestamps em ms (int64)
+        timeframe: Timeframe da barra
+
+    Returns:
+        Início das barras em ms
+    """
+    period = timeframe_to_ms(timeframe)
+    offset = WEEK_OFFSET_MS if timeframe == '1w' else 0
+    return (times_ms - offset) // period * period + offset
+
+
+def infer_timeframe(times_ms: Optional[np.ndarray]) -> Optional[str]:
+    """
+    Timeframe dos candles pelo espaçamento mediano dos timestamps
+
+    Args:
+        times_ms: Timestamps em ms (ordenados)
+
+    Returns:
+        Timeframe cujo período é exatamente o espaçamento mediano, ou None
+        (menos de dois candles ou espaçamento fora dos timeframes conhecidos)
+    """
+    if times_ms is None or len(times_ms) < 2:
+        return None
+    diffs = np.diff(times_ms)
+    diffs = diffs[diffs > 0]
+    if not len(diffs):
+        return None
+    spacing = int(np.median(diffs))
+    for timeframe, seconds in TIMEFRAME_SECONDS.items():
+        if seconds * 1000 == spacing:
+            return timeframe
+    return None
+
+
+def candle_times(dataframe: pd.DataFrame) -> Optional[np.ndarray]:
+    """
+    Timestamps (ms, int64) dos candles: coluna 'timestamp' (ms), coluna
+    'date' ou DatetimeIndex. None se o dataframe não tiver timestamps.
+    """
+    if 'timestamp' in dataframe.columns:
+        values = dataframe['timestamp']
+        if pd.api.types.is_datetime64_any_dtype(values):
+            return _datetime_to_ms(values)
+        return values.to_numpy(dtype=np.int64)
+    if 'date' in dataframe.columns:
+        return _datetime_to_ms(dataframe['date'])
+    if isinstance(dataframe.index, pd.DatetimeIndex):
+        return _datetime_to_ms(dataframe.index)
+    return None
+
+
+def _datetime_to_ms(values) -> np.ndarray:
+    index = pd.DatetimeIndex(values)
+    if index.tz is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+    return index.values.astype('datetime64[ms]').astype(np.int64)
+
+
+def _aggregate(starts: np.ndarray, ohlcv: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Agrega linhas OHLCV (ordenadas) por início de barra
+
+    Returns:
+        (inícios únicos, matriz OHLCV por barra)
+    """
+    unique, first = np.unique(starts, return_index=True)
+    last = np.append(first[1:], len(starts)) - 1
+    bars = np.column_stack([
+        ohlcv[first, 0],
+        np.maximum.reduceat(ohlcv[:, 1], first),
+        np.minimum.reduceat(ohlcv[:, 2], first),
+        ohlcv[last, 3],
+        np.add.reduceat(ohlcv[:, 4], first),
+    ])
+    return unique, bars
+
+
+def resample_ohlcv(
+    dataframe: pd.DataFrame,
+    timeframe: str,
+    base_timeframe: str
+) -> pd.DataFrame:
+    """
+    Reamostra candles base em barras do timeframe maior (sem estado)
+
+    Args:
+        dataframe: Candles base (OHLCV + timestamps)
+        timeframe: Timeframe de destino
+        base_timeframe: Timeframe dos candles base
+
+    Returns:
+        DataFrame com timestamp (início da barra, ms), OHLCV e 'complete'
+    """
+    times = candle_times(dataframe)
+    if times is None:
+        # Sem timestamps: barras posicionais a partir do primeiro candle
+        times = np.arange(len(dataframe), dtype=np.int64) * timeframe_to_ms(base_timeframe)
+
+    if len(times) == 0:
+        return pd.DataFrame(columns=['timestamp'] + OHLCV_COLUMNS + ['complete'])
+
+    starts = bar_start(times, timeframe)
+    unique, bars = _aggregate(starts, dataframe[OHLCV_COLUMNS].to_numpy(dtype=np.float64))
+
+    result = pd.DataFrame(bars, columns=OHLCV_COLUMNS)
+    result.insert(0, 'timestamp', unique)
+    result['complete'] = True
+    # Só a última barra pode estar incompleta
+    result.loc[len(result) - 1, 'complete'] = bool(
+        times[-1] + timeframe_to_ms(base_timeframe) >= unique[-1] + timeframe_to_ms(timeframe)
+    )
+    return result
+
+
+def align_to_base(
+    base_times: np.ndarray,
+    bar_starts: np.ndarray,
+    timeframe: str,
+    base_timeframe: str
+) -> np.ndarray:
+    """
+    Barra fechada mais recente disponível em cada candle base (sem lookahead)
+
+    Uma barra só é visível a partir do seu último candle base; antes disso
+    o candle base enxerga a barra anterior.
+
+    Args:
+        base_times: Timestamps dos candles base (ms)
+        bar_starts: Inícios das barras fechadas (ms, ordenados)
+        timeframe: Timeframe das barras
+        base_timeframe: Timeframe base
+
+    Returns:
+        Posição em bar_starts por candle base (-1 = nenhuma barra fechada)
+    """
+    own_start = bar_start(base_times, timeframe)
+    own_closed = base_times + timeframe_to_ms(base_timeframe) >= own_start + timeframe_to_ms(timeframe)
+    visible = np.where(own_closed, own_start, own_start - 1)
+    return np.searchsorted(bar_starts, visible, side='right') - 1
+
+
+class _TimeframeBars:
+    """
+    Barras de um (símbolo, timeframe) mantidas incrementalmente
+
+    Guarda as barras anteriores à barra corrente, o agregado da barra
+    corrente sem o último candle e o último candle separado, para que um
+    candle ainda em formação possa ser substituído a cada atualização.
+    """
+
+    def __init__(self, timeframe: str, base_timeframe: str, max_bars: int):
+        self.timeframe = timeframe
+        self.base_timeframe = base_timeframe
+        self.max_bars = max_bars
+
+        self.closed_starts = np.empty(0, dtype=np.int64)
+        self.closed_bars = np.empty((0, 5), dtype=np.float64)
+        self.current_start: Optional[int] = None
+        self.current_prefix: Optional[np.ndarray] = None   # OHLCV sem o último candle
+        self.last_time: Optional[int] = None
+        self.last_candle: Optional[np.ndarray] = None
+
+    def reset(self):
+        self.__init__(self.timeframe, self.base_timeframe, self.max_bars)
+
+    def update(self, times: np.ndarray, ohlcv: np.ndarray):
+        """Incorpora candles base (ordenados); só processa os novos"""
+        if len(times) == 0:
+            return
+
+        if self.last_time is not None:
+            if times[-1] < self.last_time:
+                # Dados anteriores ao estado (outro período): recomeça
+                self.reset()
+            else:
+                new = times >= self.last_time
+                times, ohlcv = times[new], ohlcv[new]
+
+        rows_t = [times]
+        rows_v = [ohlcv]
+        if self.last_time is not None:
+            if times[0] != self.last_time:
+                # Último candle não veio de novo: mantém o armazenado
+                rows_t.insert(0, np.array([self.last_time]))
+                rows_v.insert(0, self.last_candle[None, :])
+            if self.current_prefix is not None:
+                rows_t.insert(0, np.array([self.current_start]))
+                rows_v.insert(0, self.current_prefix[None, :])
+
+        times = np.concatenate(rows_t)
+        ohlcv = np.concatenate(rows_v)
+        starts = bar_start(times, self.timeframe)
+
+        unique, bars = _aggregate(starts, ohlcv)
+
+        # Barras anteriores à corrente fecham
+        if len(unique) > 1:
+            self.closed_starts = np.concatenate([self.closed_starts, unique[:-1]])[-self.max_bars:]
+            self.closed_bars = np.concatenate([self.closed_bars, bars[:-1]])[-self.max_bars:]
+
+        # Barra corrente: agregado sem o último candle + último candle
+        in_current = starts == unique[-1]
+        self.current_start = int(unique[-1])
+        self.last_time = int(times[-1])
+        self.last_candle = ohlcv[-1].copy()
+        prefix_rows = np.flatnonzero(in_current)[:-1]
+        self.current_prefix = _aggregate(starts[prefix_rows], ohlcv[prefix_rows])[1][0] if len(prefix_rows) else None
+
+    def current_bar(self) -> Optional[np.ndarray]:
+        """OHLCV da barra corrente (aberta ou recém-fechada)"""
+        if self.last_candle is None:
+            return None
+        if self.current_prefix is None:
+            return self.last_candle.copy()
+        prefix, last = self.current_prefix, self.last_candle
+        return np.array([
+            prefix[0],
+            max(prefix[1], last[1]),
+            min(prefix[2], last[2]),
+            last[3],
+            prefix[4] + last[4],
+        ])
+
+    def is_current_complete(self) -> bool:
+        if self.last_time is None:
+            return False
+        return (self.last_time + timeframe_to_ms(self.base_timeframe)
+                >= self.current_start + timeframe_to_ms(self.timeframe))
+
+    def bars(self, include_open: bool = False) -> pd.DataFrame:
+        """Barras fechadas (e opcionalmente a aberta) em ordem cronológica"""
+        starts, values = self.closed_starts, self.closed_bars
+        current = self.current_bar()
+        if current is not None and (include_open or self.is_current_complete()):
+            starts = np.append(starts, self.current_start)
+            values = np.vstack([values, current])
+
+        result = pd.DataFrame(values, columns=OHLCV_COLUMNS)
+        result.insert(0, 'timestamp', starts)
+        return result
+
+
+class MultiTimeframeData:
+    """
+    Camada de dados multi-timeframe
+
+    Mantém, por (símbolo, timeframe), as barras do timeframe maior
+    atualizadas incrementalmente a partir dos candles base: cada atualização
+    agrega apenas os candles novos e reescreve a barra aberta. Indicadores
+    calculados nas barras (1/N das linhas) são projetados de volta no índice
+    base com forward-fill, sem lookahead.
+
+    O timeframe base vem de cada chamada (base_timeframe) ou do espaçamento
+    dos candles recebidos; o do construtor é só o último recurso. Um
+    timeframe base errado desloca o instante em que cada barra fica visível.
+    """
+
+    def __init__(self, base_timeframe: Optional[str] = None, max_bars: int = 1000):
+        """
+        Args:
+            base_timeframe: Timeframe base padrão (None = sempre da chamada/dados)
+            max_bars: Barras fechadas mantidas por (símbolo, timeframe)
+        """
+        self.base_timeframe = base_timeframe
+        self.max_bars = max_bars
+        self._series: Dict[Tuple[str, str], _TimeframeBars] = {}
+
+    def resolve_base_timeframe(
+        self,
+        dataframe: pd.DataFrame,
+        base_timeframe: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Timeframe base efetivo: o informado, o inferido dos timestamps ou o padrão
+
+        Returns:
+            Timeframe base, ou None se não houver como determiná-lo
+        """
+        if base_timeframe:
+            return base_timeframe
+        return infer_timeframe(candle_times(dataframe)) or self.base_timeframe
+
+    def _require_base(self, dataframe: pd.DataFrame, base_timeframe: Optional[str]) -> str:
+        base = self.resolve_base_timeframe(dataframe, base_timeframe)
+        if base is None:
+            raise ValueError("Timeframe base desconhecido: informe base_timeframe ou timestamps regulares")
+        return base
+
+    def get_bars(
+        self,
+        dataframe: pd.DataFrame,
+        timeframe: str,
+        symbol: Optional[str] = None,
+        include_open: bool = False,
+        base_timeframe: Optional[str] = None
+    ) -> pd.DataFrame:
+        """
+        Barras do timeframe maior atualizadas com os candles do dataframe
+
+        Args:
+            dataframe: Candles base (OHLCV + timestamps)
+            timeframe: Timeframe de destino
+            symbol: Par (None = reamostragem sem estado)
+            include_open: Inclui a barra ainda aberta
+            base_timeframe: Timeframe dos candles (None = resolve_base_timeframe)
+
+        Returns:
+            DataFrame com timestamp (início da barra, ms) e OHLCV
+        """
+        base_timeframe = self._require_base(dataframe, base_timeframe)
+        times = candle_times(dataframe)
+        if symbol is None or times is None:
+            bars = resample_ohlcv(dataframe, timeframe, base_timeframe)
+            if not include_open and len(bars) and not bars['complete'].iloc[-1]:
+                bars = bars.iloc[:-1]
+            return bars.drop(columns='complete').reset_index(drop=True)
+
+        key = (symbol, timeframe)
+        series = self._series.get(key)
+        if series is None or series.base_timeframe != base_timeframe:
+            # Outro timeframe base invalida o estado (fechamento das barras muda)
+            series = self._series[key] = _TimeframeBars(timeframe, base_timeframe, self.max_bars)
+
+        series.update(times, dataframe[OHLCV_COLUMNS].to_numpy(dtype=np.float64))
+        return series.bars(include_open=include_open)
+
+    def merge(
+        self,
+        dataframe: pd.DataFrame,
+        informative: pd.DataFrame,
+        timeframe: str,
+        base_timeframe: Optional[str] = None
+    ) -> pd.DataFrame:
+        """
+        Projeta colunas das barras do TF maior no índice base (forward-fill)
+
+        Cada candle base recebe os valores da barra fechada mais recente
+        visível naquele momento; candles antes da primeira barra fechada
+        recebem NaN.
+
+        Args:
+            dataframe: Candles base
+            informative: Barras (coluna 'timestamp' = início, ms) com indicadores
+            timeframe: Timeframe das barras
+            base_timeframe: Timeframe dos candles (None = resolve_base_timeframe)
+
+        Returns:
+            DataFrame com as colunas de 'informative' (exceto timestamp)
+            indexado como o dataframe base
+        """
+        base_timeframe = self._require_base(dataframe, base_timeframe)
+        times = candle_times(dataframe)
+        if times is None:
+            times = np.arange(len(dataframe), dtype=np.int64) * timeframe_to_ms(base_timeframe)
+
+        columns = [c for c in informative.columns if c != 'timestamp']
+        positions = align_to_base(
+            times,
+            informative['timestamp'].to_numpy(dtype=np.int64),
+            timeframe,
+            base_timeframe
+        )
+
+        values = informative[columns].to_numpy(dtype=np.float64)
+        if len(values):
+            merged = values[np.maximum(positions, 0)]
+        else:
+            merged = np.empty((len(positions), len(columns)))
+        merged[positions < 0] = np.nan
+
+        return pd.DataFrame(merged, index=dataframe.index, columns=columns)
+
+    def reset(self, symbol: Optional[str] = None):
+        """Descarta o estado de um símbolo (ou de todos)"""
+        if symbol is None:
+            self._series.clear()
+        else:
+            for key in [k for k in self._series if k[0] == symbol]:
+                del self._series[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'series': len(self._series),
+            'bars': sum(len(s.closed_starts) for s in self._series.values()),
+            'max_bars': self.max_bars,
+        }
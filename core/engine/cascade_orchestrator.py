@@ -1,13 +1,14 @@
 # core/engine/cascade_orchestrator.py
 """
 Cascade Orchestrator - Sistema Automático de Transferência de Lucros entre Slots
-Monitora slots e executa cascade quando meta de 10% é atingida
+Executa cascade quando a meta de 10% é atingida, reavaliando apenas o slot
+afetado a cada evento de settlement/mudança de capital
 """
 
 import time
 import logging
 import threading
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 from pathlib import Path
 import json
@@ -20,7 +21,8 @@ class CascadeOrchestrator:
     Orquestrador automático do sistema de cascade entre slots
     
     Responsabilidades:
-    - Monitorar todos os slots periodicamente
+    - Receber eventos de settlement/capital (TreasuryRouter, CascadeManager, API)
+      e reavaliar só os slots afetados
     - Detectar quando slot atinge meta de lucro (padrão 10%)
     - Executar transferência automática de lucro para próximo slot
     - Ativar próximo slot quando receber capital
@@ -30,20 +32,29 @@ class CascadeOrchestrator:
     def __init__(
         self,
         slot_manager=None,
-        check_interval_seconds: int = 300,  # 5 minutos
-        config_file: str = "./data/cascade_config.json"
+        check_interval_seconds: Optional[int] = 300,
+        config_file: str = "./data/cascade_config.json",
+        debounce_seconds: float = 0.05,
+        journal_compact_every: int = 200
     ):
         """
         Inicializa o orquestrador de cascade
         
         Args:
             slot_manager: Gerenciador de slots (será integrado futuramente)
-            check_interval_seconds: Intervalo entre verificações (padrão: 5 min)
+            check_interval_seconds: Reconciliação periódica de todos os slots
+                (padrão: 5 min; None = apenas eventos)
             config_file: Arquivo de configuração da cadeia de slots
+            debounce_seconds: Janela para agrupar rajadas de eventos
+            journal_compact_every: Entradas do journal antes de reescrever o config
         """
         self.slot_manager = slot_manager
         self.check_interval = check_interval_seconds
         self.config_file = Path(config_file)
+        self.journal_file = self.config_file.with_name(self.config_file.stem + "_journal.jsonl")
+        self.history_file = Path("./data/cascade_history.jsonl")
+        self.debounce_seconds = debounce_seconds
+        self.journal_compact_every = journal_compact_every
         
         # Estado do orquestrador
         self.running = False
@@ -51,14 +62,33 @@ class CascadeOrchestrator:
         self.slots_config = {}
         self.cascade_history = []
         
+        # Eventos pendentes (slot_id -> motivo) e persistência em lote
+        self._lock = threading.RLock()
+        self._wakeup = threading.Condition(self._lock)
+        self._pending: Dict[str, str] = {}
+        self._dirty_slots: set = set()
+        self._unsaved_history: List[Dict[str, Any]] = []
+        self._agent_activations: List[Tuple[str, str]] = []
+        self._journal_entries = 0
+        # Fonte de PnL conectada (router ou cascade manager): só uma, senão
+        # o mesmo trade seria aplicado duas vezes ao capital do slot
+        self._event_source: Optional[str] = None
+        self.stats = {
+            'events': 0,
+            'evaluations': 0,
+            'cascades': 0,
+            'journal_writes': 0,
+            'compactions': 0
+        }
+        
         # Carregar configuração
         self._load_config()
         
         logger.info(f"[CASCADE_ORCHESTRATOR] Initialized with {len(self.slots_config)} slots")
-        logger.info(f"[CASCADE_ORCHESTRATOR] Check interval: {check_interval_seconds}s")
+        logger.info(f"[CASCADE_ORCHESTRATOR] Event-driven (reconcile interval: {check_interval_seconds}s)")
     
     def _load_config(self) -> None:
-        """Carrega configuração da cadeia de slots"""
+        """Carrega configuração da cadeia de slots (snapshot + journal)"""
         try:
             if self.config_file.exists():
                 with open(self.config_file, 'r') as f:
@@ -67,6 +97,7 @@ class CascadeOrchestrator:
                         slot['slot_id']: slot 
                         for slot in data.get('cascade_chain', [])
                     }
+                self._replay_journal()
                 logger.info(f"[CASCADE_ORCHESTRATOR] Loaded config for {len(self.slots_config)} slots")
             else:
                 logger.warning(f"[CASCADE_ORCHESTRATOR] Config file not found: {self.config_file}")
@@ -121,6 +152,20 @@ class CascadeOrchestrator:
         except Exception as e:
             logger.error(f"[CASCADE_ORCHESTRATOR] Error saving default config: {e}")
     
+    def _replay_journal(self) -> None:
+        """Aplica ao snapshot os estados de slot gravados no journal"""
+        if not self.journal_file.exists():
+            return
+        
+        with open(self.journal_file, 'r') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # Linha truncada por queda do processo
+                self.slots_config[entry['slot_id']] = entry['slot']
+                self._journal_entries += 1
+    
     def start(self) -> None:
         """Inicia o orquestrador em thread separada"""
         if self.running:
@@ -128,40 +173,159 @@ class CascadeOrchestrator:
             return
         
         self.running = True
-        self.thread = threading.Thread(target=self._monitoring_loop, daemon=True)
+        
+        # Reconciliação inicial: estado carregado do disco pode já estar na meta
+        self._check_all_slots('startup')
+        
+        self.thread = threading.Thread(target=self._event_loop, daemon=True)
         self.thread.start()
         
-        logger.info("[CASCADE_ORCHESTRATOR] Started monitoring loop")
+        logger.info("[CASCADE_ORCHESTRATOR] Started event loop")
     
     def stop(self) -> None:
         """Para o orquestrador"""
         if not self.running:
             return
         
-        self.running = False
+        with self._wakeup:
+            self.running = False
+            self._wakeup.notify_all()
         if self.thread:
             self.thread.join(timeout=10)
         
         logger.info("[CASCADE_ORCHESTRATOR] Stopped")
     
-    def _monitoring_loop(self) -> None:
-        """Loop principal de monitoramento"""
-        logger.info("[CASCADE_ORCHESTRATOR] Monitoring loop started")
+    # ------------------------------------------------------------------
+    # Eventos
+    # ------------------------------------------------------------------
+    
+    def attach_treasury_router(self, router) -> bool:
+        """
+        Reavalia o slot a cada settlement do TreasuryRouter
+        
+        Returns:
+            False se uma fonte de PnL já estiver conectada
+        """
+        if not self._claim_event_source('treasury_router'):
+            return False
+        router.add_settlement_listener(
+            lambda slot_id, result: self.notify_trade_settled(slot_id, result['net_pnl'])
+        )
+        return True
+    
+    def attach_cascade_manager(self, cascade_manager) -> bool:
+        """
+        Reavalia o slot a cada resultado registrado no CascadeManager
         
-        while self.running:
+        Returns:
+            False se uma fonte de PnL já estiver conectada
+        """
+        if not self._claim_event_source('cascade_manager'):
+            return False
+        cascade_manager.add_trade_listener(self.notify_trade_settled)
+        return True
+    
+    def _claim_event_source(self, source: str) -> bool:
+        """Reserva a única fonte de PnL (router e cascade manager veem os mesmos trades)"""
+        with self._lock:
+            if self._event_source is not None:
+                logger.warning(
+                    f"[CASCADE_ORCHESTRATOR] {source} not attached: already receiving "
+                    f"trades from {self._event_source}"
+                )
+                return False
+            self._event_source = source
+        logger.info(f"[CASCADE_ORCHESTRATOR] Receiving trade settlements from {source}")
+        return True
+    
+    def notify_trade_settled(self, slot_id: str, net_pnl: float) -> bool:
+        """
+        Aplica o PnL de um trade fechado ao slot e agenda sua reavaliação
+        
+        Args:
+            slot_id: Slot que fechou o trade
+            net_pnl: Lucro líquido do trade
+            
+        Returns:
+            True se o slot existe na cadeia
+        """
+        with self._wakeup:
+            slot = self.slots_config.get(slot_id)
+            if slot is None:
+                return False
+            slot['capital_current'] = slot.get('capital_current', slot['capital_base']) + net_pnl
+            self._dirty_slots.add(slot_id)
+            self._enqueue(slot_id, 'trade_settled')
+        return True
+    
+    def notify_capital_change(self, slot_id: str, capital_current: float) -> bool:
+        """
+        Atualiza o capital atual do slot e agenda sua reavaliação
+        
+        Args:
+            slot_id: Slot cujo capital mudou
+            capital_current: Novo capital
+            
+        Returns:
+            True se o slot existe na cadeia
+        """
+        with self._wakeup:
+            slot = self.slots_config.get(slot_id)
+            if slot is None:
+                return False
+            slot['capital_current'] = capital_current
+            self._dirty_slots.add(slot_id)
+            self._enqueue(slot_id, 'capital_change')
+        return True
+    
+    def _enqueue(self, slot_id: str, reason: str) -> None:
+        """Agenda reavaliação do slot (chamado com o lock)"""
+        self.stats['events'] += 1
+        self._pending[slot_id] = reason
+        self._wakeup.notify()
+    
+    def _event_loop(self) -> None:
+        """Aguarda eventos e reavalia apenas os slots afetados"""
+        logger.info("[CASCADE_ORCHESTRATOR] Event loop started")
+        
+        while True:
+            with self._wakeup:
+                while self.running and not self._pending:
+                    notified = self._wakeup.wait(self.check_interval)
+                    if not notified and self.running:
+                        self._check_all_slots()
+                if not self.running:
+                    break
+            
+            # Agrupa rajadas (ex.: vários trades fechando no mesmo candle)
+            if self.debounce_seconds > 0:
+                time.sleep(self.debounce_seconds)
+            
             try:
-                # Verificar todos os slots
-                self._check_all_slots()
-                
-                # Aguardar próximo ciclo
-                time.sleep(self.check_interval)
-                
+                self._process_pending()
             except Exception as e:
-                logger.error(f"[CASCADE_ORCHESTRATOR] Error in monitoring loop: {e}")
-                time.sleep(60)  # Aguarda 1 min em caso de erro
+                logger.error(f"[CASCADE_ORCHESTRATOR] Error in event loop: {e}")
+        
+        self._flush(compact=True)
     
-    def _check_all_slots(self) -> None:
-        """Verifica todos os slots para possível cascade"""
+    def _process_pending(self) -> None:
+        """Reavalia os slots com eventos pendentes e persiste o lote"""
+        with self._wakeup:
+            pending, self._pending = self._pending, {}
+            for slot_id in pending:
+                slot = self.slots_config.get(slot_id)
+                if slot is None:
+                    continue
+                try:
+                    self.stats['evaluations'] += 1
+                    self._check_slot_cascade(slot)
+                except Exception as e:
+                    logger.error(f"[CASCADE_ORCHESTRATOR] Error checking slot {slot_id}: {e}")
+        
+        self._flush()
+    
+    def _check_all_slots(self, reason: str = 'reconcile') -> None:
+        """Agenda reavaliação de todos os slots (reconciliação)"""
         
         # Se temos slot_manager integrado, usar ele
         if self.slot_manager:
@@ -170,11 +334,11 @@ class CascadeOrchestrator:
             # Caso contrário, usar dados da configuração (modo standalone)
             slots = self._get_slots_from_config()
         
-        for slot in slots:
-            try:
-                self._check_slot_cascade(slot)
-            except Exception as e:
-                logger.error(f"[CASCADE_ORCHESTRATOR] Error checking slot {slot.get('id', 'unknown')}: {e}")
+        with self._wakeup:
+            for slot in slots:
+                slot_id = slot.get('slot_id') or slot.get('id')
+                if slot_id and slot_id not in self._pending:
+                    self._enqueue(slot_id, reason)
     
     def _get_slots_from_manager(self) -> List[Dict[str, Any]]:
         """Obtém slots do gerenciador (integração futura)"""
@@ -257,10 +421,14 @@ class CascadeOrchestrator:
                 # ATIVAR próximo slot (recebeu capital!)
                 next_slot['active'] = True
                 
-                # ATIVAR agente IA do próximo slot
+                # ATIVAR agente IA do próximo slot (após persistir o lote)
                 if 'assigned_ia' in next_slot:
                     next_slot['ia_status'] = 'ACTIVE'
-                    self._activate_ia_agent(next_slot['assigned_ia'], next_slot_id)
+                    self._agent_activations.append((next_slot['assigned_ia'], next_slot_id))
+                
+                # Próximo slot recebeu capital: reavaliar também
+                self._dirty_slots.add(next_slot_id)
+                self._enqueue(next_slot_id, 'cascade_received')
                 
                 logger.info(f"[CASCADE_ORCHESTRATOR] Slot {next_slot_id} activated with ${next_slot['capital_current']:.2f}")
                 logger.info(f"[CASCADE_ORCHESTRATOR] Agent {next_slot.get('assigned_ia', 'N/A')} activated for {next_slot_id}")
@@ -274,10 +442,11 @@ class CascadeOrchestrator:
                 'success': True
             }
             self.cascade_history.append(cascade_record)
-            self._save_cascade_log(cascade_record)
+            self._unsaved_history.append(cascade_record)
+            self.stats['cascades'] += 1
             
-            # 4. Persistir mudanças
-            self._save_config()
+            # 4. Persistir mudanças (journal, no fim do lote)
+            self._dirty_slots.add(slot_id)
             
             logger.info(f"[CASCADE_ORCHESTRATOR] Cascade completed successfully")
             
@@ -294,25 +463,73 @@ class CascadeOrchestrator:
                 'error': str(e)
             }
             self.cascade_history.append(cascade_record)
-            self._save_cascade_log(cascade_record)
+            self._unsaved_history.append(cascade_record)
+    
+    def _flush(self, compact: bool = False) -> None:
+        """
+        Persiste o lote: estados alterados no journal e cascades no histórico
+        
+        O config completo só é reescrito quando o journal passa de
+        journal_compact_every entradas (ou com compact=True, ao parar).
+        """
+        with self._lock:
+            entries = [
+                {'timestamp': datetime.now().isoformat(), 'slot_id': slot_id, 'slot': self.slots_config[slot_id]}
+                for slot_id in self._dirty_slots if slot_id in self.slots_config
+            ]
+            history, self._unsaved_history = self._unsaved_history, []
+            activations, self._agent_activations = self._agent_activations, []
+            self._dirty_slots.clear()
+            
+            try:
+                if entries:
+                    self.journal_file.parent.mkdir(parents=True, exist_ok=True)
+                    with open(self.journal_file, 'a') as f:
+                        f.write(''.join(json.dumps(entry) + '\n' for entry in entries))
+                    self._journal_entries += len(entries)
+                    self.stats['journal_writes'] += 1
+                
+                if history:
+                    self._save_cascade_log(history)
+                
+                if self._journal_entries and (compact or self._journal_entries >= self.journal_compact_every):
+                    # Journal só é apagado depois que o snapshot foi gravado
+                    if self._save_config():
+                        self.journal_file.unlink(missing_ok=True)
+                        self._journal_entries = 0
+                        self.stats['compactions'] += 1
+                    
+            except Exception as e:
+                logger.error(f"[CASCADE_ORCHESTRATOR] Error persisting cascade state: {e}")
+        
+        for agent_id, slot_id in activations:
+            self._activate_ia_agent(agent_id, slot_id)
     
-    def _save_config(self) -> None:
-        """Salva configuração atualizada"""
+    def _save_config(self) -> bool:
+        """
+        Salva configuração atualizada (escrita atômica)
+        
+        Returns:
+            True se o config foi gravado
+        """
         try:
             cascade_chain = list(self.slots_config.values())
-            with open(self.config_file, 'w') as f:
+            tmp_file = self.config_file.with_suffix('.tmp')
+            with open(tmp_file, 'w') as f:
                 json.dump({"cascade_chain": cascade_chain}, f, indent=2)
+            tmp_file.replace(self.config_file)
+            return True
         except Exception as e:
             logger.error(f"[CASCADE_ORCHESTRATOR] Error saving config: {e}")
+            return False
     
-    def _save_cascade_log(self, record: Dict[str, Any]) -> None:
-        """Salva log de cascade executado"""
+    def _save_cascade_log(self, records: List[Dict[str, Any]]) -> None:
+        """Salva log dos cascades executados"""
         try:
-            log_file = Path("./data/cascade_history.jsonl")
-            log_file.parent.mkdir(parents=True, exist_ok=True)
+            self.history_file.parent.mkdir(parents=True, exist_ok=True)
             
-            with open(log_file, 'a') as f:
-                f.write(json.dumps(record) + '\n')
+            with open(self.history_file, 'a') as f:
+                f.write(''.join(json.dumps(record) + '\n' for record in records))
                 
         except Exception as e:
             logger.error(f"[CASCADE_ORCHESTRATOR] Error saving cascade log: {e}")
@@ -395,7 +612,7 @@ class CascadeOrchestrator:
             Lista com histórico de cascades
         """
         try:
-            log_file = Path("./data/cascade_history.jsonl")
+            log_file = self.history_file
             
             if not log_file.exists():
                 return []
@@ -418,14 +635,20 @@ class CascadeOrchestrator:
     
     def get_status(self) -> Dict[str, Any]:
         """Retorna status do orquestrador"""
-        return {
-            'running': self.running,
-            'check_interval_seconds': self.check_interval,
-            'total_slots': len(self.slots_config),
-            'active_slots': sum(1 for s in self.slots_config.values() if s.get('active', False)),
-            'total_cascades': len(self.cascade_history),
-            'last_cascade': self.cascade_history[-1] if self.cascade_history else None
-        }
+        with self._lock:
+            return {
+                'running': self.running,
+                'mode': 'event_driven',
+                'check_interval_seconds': self.check_interval,
+                'event_source': self._event_source,
+                'total_slots': len(self.slots_config),
+                'active_slots': sum(1 for s in self.slots_config.values() if s.get('active', False)),
+                'total_cascades': len(self.cascade_history),
+                'last_cascade': self.cascade_history[-1] if self.cascade_history else None,
+                'pending_events': len(self._pending),
+                'journal_entries': self._journal_entries,
+                'stats': dict(self.stats)
+            }
     
     def update_slot_config(self, slot_id: str, updates: Dict[str, Any]) -> bool:
         """
@@ -439,18 +662,23 @@ class CascadeOrchestrator:
             True se sucesso, False caso contrário
         """
         try:
-            if slot_id not in self.slots_config:
-                logger.error(f"[CASCADE_ORCHESTRATOR] Slot {slot_id} not found")
-                return False
-            
-            # Atualizar campos permitidos
-            allowed_fields = ['capital_base', 'cascade_target_pct', 'cascade_enabled', 'active']
-            for field, value in updates.items():
-                if field in allowed_fields:
-                    self.slots_config[slot_id][field] = value
+            with self._wakeup:
+                if slot_id not in self.slots_config:
+                    logger.error(f"[CASCADE_ORCHESTRATOR] Slot {slot_id} not found")
+                    return False
+                
+                # Atualizar campos permitidos
+                allowed_fields = ['capital_base', 'cascade_target_pct', 'cascade_enabled', 'active']
+                for field, value in updates.items():
+                    if field in allowed_fields:
+                        self.slots_config[slot_id][field] = value
+                
+                # Meta/capital base mudaram: reavaliar o slot
+                self._dirty_slots.add(slot_id)
+                self._enqueue(slot_id, 'config_update')
             
-            # Salvar configuração
-            self._save_config()
+            # Salvar configuração (journal)
+            self._flush()
             
             logger.info(f"[CASCADE_ORCHESTRATOR] Updated config for slot {slot_id}")
             return True
@@ -465,11 +693,22 @@ _cascade_orchestrator_instance = None
 
 
 def get_cascade_orchestrator(**kwargs) -> CascadeOrchestrator:
-    """Retorna instância singleton do orquestrador"""
+    """
+    Retorna instância singleton do orquestrador
+    
+    Na criação conecta o TreasuryRouter global como fonte de settlements,
+    para que cada trade fechado reavalie o slot.
+    """
     global _cascade_orchestrator_instance
     
     if _cascade_orchestrator_instance is None:
-        _cascade_orchestrator_instance = CascadeOrchestrator(**kwargs)
+        orchestrator = CascadeOrchestrator(**kwargs)
+        try:
+            from core.treasury.router import treasury_router
+            orchestrator.attach_treasury_router(treasury_router)
+        except Exception as e:
+            logger.warning(f"[CASCADE_ORCHESTRATOR] TreasuryRouter not attached: {e}")
+        _cascade_orchestrator_instance = orchestrator
     
     return _cascade_orchestrator_instance
 
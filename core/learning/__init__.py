@@ -3,5 +3,6 @@
 
 from .store import learning_store
 from .policy import policy_manager
+from .replay_buffer import ReplayBuffer
 
-__all__ = ['learning_store', 'policy_manager']
+__all__ = ['learning_store', 'policy_manager', 'ReplayBuffer']
@@ -3,8 +3,13 @@
 
 Implements lightweight online learning with gradient-free optimization (SPSA).
 Adjusts agent confidence thresholds and feature weights based on experience.
+
+In counterfactual mode each SPSA iteration scores theta+ and theta- by
+replaying the agent's replay-buffer window under the perturbed policy;
+windows of all agents are scored together in one vectorized pass.
 """
 
+import asyncio
 import logging
 import os
 import time
@@ -30,13 +35,67 @@ learning_reward_avg = Gauge(
     ['agent']
 )
 
+learning_policy_objective = Gauge(
+    'learning_policy_objective',
+    'Counterfactual objective of the current policy over the replay window',
+    ['agent']
+)
+
+# (confidence_threshold, risk_tolerance) bounds
+THETA_LOW = np.array([0.3, 0.1])
+THETA_HIGH = np.array([0.9, 1.0])
+
+
+def counterfactual_objective(
+    theta: np.ndarray,
+    confidence: np.ndarray,
+    risk: np.ndarray,
+    reward: np.ndarray,
+    mask: np.ndarray,
+    lambda_risk: float = 0.5,
+    temperature: float = 0.05
+) -> np.ndarray:
+    """Score policies by replaying logged consensus outcomes
+    
+    An experience is taken with weight sigmoid((confidence - threshold) / T)
+    (a smooth version of "act if confidence >= threshold", so small
+    threshold perturbations change the score) and its reward scales with
+    risk_tolerance / logged risk (position size). The score is the mean
+    replayed reward minus lambda_risk times its variance.
+    
+    Args:
+        theta: Policies (..., K, 2) as (confidence_threshold, risk_tolerance)
+        confidence: Logged confidences (..., 1, N)
+        risk: Logged risk tolerances (..., 1, N)
+        reward: Logged (normalized) rewards (..., 1, N)
+        mask: Valid experiences (..., 1, N)
+        lambda_risk: Variance penalty
+        temperature: Gate smoothness
+    
+    Returns:
+        Scores (..., K)
+    """
+    threshold = theta[..., 0:1]
+    risk_tolerance = theta[..., 1:2]
+    
+    gate = 1.0 / (1.0 + np.exp(-(confidence - threshold) / temperature))
+    replayed = np.where(mask, gate * reward * (risk_tolerance / risk), 0.0)
+    
+    n = np.maximum(mask.sum(axis=-1), 1)
+    mean = replayed.sum(axis=-1) / n
+    var = (np.where(mask, replayed - mean[..., None], 0.0) ** 2).sum(axis=-1) / n
+    
+    return mean - lambda_risk * var
+
 
 class PolicyManager:
     """Manages online learning and policy updates for agents"""
     
     def __init__(self):
         self.enabled = os.getenv('LEARNING_ENABLED', 'false').lower() == 'true'
-        self.update_freq = int(os.getenv('LEARNING_FREQ_DECISIONS', '50'))
+        self.update_freq = int(os.getenv('LEARNING_FREQ_DECISIONS', '10'))
+        # Experiences per update, read from the in-memory replay buffer
+        self.update_window = int(os.getenv('LEARNING_UPDATE_WINDOW', '100'))
         self.max_drift = float(os.getenv('LEARNING_MAX_DRIFT', '0.1'))
         
         # SPSA parameters (Simultaneous Perturbation Stochastic Approximation)
@@ -45,6 +104,13 @@ class PolicyManager:
         self.spsa_alpha = 0.602  # Step size decay
         self.spsa_gamma = 0.101  # Perturbation decay
         
+        # 'counterfactual' (evaluate theta +/- c*delta on the replay window)
+        # or 'reward' (legacy: nudge along the average reward)
+        self.spsa_mode = os.getenv('LEARNING_SPSA_MODE', 'counterfactual')
+        self.lambda_risk = float(os.getenv('LEARNING_LAMBDA_RISK', '0.5'))
+        self.gate_temperature = float(os.getenv('LEARNING_GATE_TEMPERATURE', '0.05'))
+        self.rng = np.random.default_rng()
+        
         # Track last update
         self.last_update: Dict[str, float] = {}
         self.decision_counts: Dict[str, int] = {}
@@ -138,46 +204,103 @@ class PolicyManager:
         Returns:
             True if policy was updated
         """
+        results = await self.update_policies([agent_id])
+        return results.get(agent_id, False)
+    
+    async def update_policies(self, agent_ids: Optional[List[str]] = None) -> Dict[str, bool]:
+        """Update the policies of many agents in one pass
+        
+        Replay windows come from the in-memory buffers; in counterfactual
+        mode all agents are scored together and the new policies are
+        stored concurrently.
+        
+        Args:
+            agent_ids: Agents to update (None = every agent with a buffer)
+        
+        Returns:
+            agent_id -> True if the policy was updated
+        """
         if not self.enabled:
-            return False
+            return {}
+        
+        if agent_ids is None:
+            agent_ids = list(learning_store.buffers)
+        
+        results: Dict[str, bool] = {}
+        windows: Dict[str, Dict[str, np.ndarray]] = {}
+        policies: Dict[str, Dict[str, Any]] = {}
+        
+        for agent_id in agent_ids:
+            try:
+                logger.info(f"🎯 Updating policy for agent {agent_id}")
+                
+                # Get recent experiences (replay buffer, no DB round-trip)
+                buffer = await learning_store.get_replay_buffer(agent_id)
+                experiences = buffer.recent(self.update_window)
+                n_experiences = len(experiences['reward'])
+                
+                if n_experiences < 10:
+                    logger.warning(f"Not enough experiences for {agent_id}: {n_experiences}")
+                    results[agent_id] = False
+                    continue
+                
+                # Calculate average reward
+                avg_reward = float(experiences['reward'].mean())
+                
+                # Update metrics
+                learning_reward_avg.labels(agent=agent_id).set(avg_reward)
+                
+                logger.info(f"Agent {agent_id}: avg_reward={avg_reward:.4f} over {n_experiences} experiences")
+                
+                windows[agent_id] = experiences
+                policies[agent_id] = await self.get_policy(agent_id)
+                
+            except Exception as e:
+                logger.error(f"Error updating policy for {agent_id}: {e}")
+                results[agent_id] = False
+        
+        if not windows:
+            return results
+        
+        # Perform policy updates using SPSA
+        if self.spsa_mode == 'counterfactual':
+            new_policies = self._spsa_counterfactual_update(policies, windows)
+        else:
+            new_policies = {
+                agent_id: self._spsa_update(
+                    policies[agent_id],
+                    windows[agent_id],
+                    iteration=policies[agent_id].get('version', 0) + 1
+                )
+                for agent_id in windows
+            }
         
+        stored = await asyncio.gather(*(
+            self._commit_policy(agent_id, new_policies[agent_id], windows[agent_id])
+            for agent_id in windows
+        ))
+        results.update(zip(windows, stored))
+        
+        return results
+    
+    async def _commit_policy(
+        self,
+        agent_id: str,
+        new_policy: Dict[str, Any],
+        experiences: Dict[str, np.ndarray]
+    ) -> bool:
+        """Store a new policy version and make it current"""
         try:
-            logger.info(f"🎯 Updating policy for agent {agent_id}")
-            
-            # Get recent experiences
-            experiences = await learning_store.get_recent_experiences(
-                agent_id,
-                limit=self.update_freq * 2  # Use 2x for stability
-            )
-            
-            if len(experiences) < 10:
-                logger.warning(f"Not enough experiences for {agent_id}: {len(experiences)}")
-                return False
-            
-            # Get current policy
-            current_policy = await self.get_policy(agent_id)
-            
-            # Calculate average reward
-            rewards = [exp['reward'] for exp in experiences]
-            avg_reward = np.mean(rewards)
-            
-            # Update metrics
-            learning_reward_avg.labels(agent=agent_id).set(avg_reward)
-            
-            logger.info(f"Agent {agent_id}: avg_reward={avg_reward:.4f} over {len(experiences)} experiences")
-            
-            # Perform policy update using SPSA
-            new_policy = self._spsa_update(
-                current_policy,
-                experiences,
-                iteration=current_policy.get('version', 0) + 1
-            )
+            avg_reward = float(experiences['reward'].mean())
             
             # Store new policy
             policy_id = await learning_store.store_policy(
                 agent_id=agent_id,
                 policy_data=new_policy,
-                notes=f"SPSA update: avg_reward={avg_reward:.4f}, n={len(experiences)}"
+                notes=(
+                    f"SPSA {self.spsa_mode} update: avg_reward={avg_reward:.4f}, "
+                    f"n={len(experiences['reward'])}"
+                )
             )
             
             if policy_id:
@@ -203,21 +326,120 @@ class PolicyManager:
             traceback.print_exc()
             return False
     
+    def _spsa_counterfactual_update(
+        self,
+        policies: Dict[str, Dict[str, Any]],
+        windows: Dict[str, Dict[str, np.ndarray]]
+    ) -> Dict[str, Dict[str, Any]]:
+        """Two-evaluation SPSA step for many agents at once
+        
+        For each agent, theta+ = theta + c_k*delta and theta- = theta - c_k*delta
+        are scored with counterfactual_objective on the agent's window and
+        the gradient estimate is (J+ - J-) / (2 c_k delta). Windows are
+        padded into one (agents x window) matrix so every score is a single
+        vectorized evaluation.
+        
+        Args:
+            policies: agent_id -> current policy
+            windows: agent_id -> replay buffer columns
+        
+        Returns:
+            agent_id -> updated policy
+        """
+        agent_ids = list(windows)
+        n_agents = len(agent_ids)
+        width = max(len(windows[agent_id]['reward']) for agent_id in agent_ids)
+        
+        confidence = np.zeros((n_agents, 1, width))
+        risk = np.ones((n_agents, 1, width))
+        reward = np.zeros((n_agents, 1, width))
+        mask = np.zeros((n_agents, 1, width), dtype=bool)
+        
+        theta = np.empty((n_agents, 2))
+        iteration = np.empty(n_agents)
+        
+        for i, agent_id in enumerate(agent_ids):
+            window = windows[agent_id]
+            policy = policies[agent_id]
+            n = len(window['reward'])
+            
+            theta[i] = policy['confidence_threshold'], policy['risk_tolerance']
+            iteration[i] = policy.get('version', 0) + 1
+            
+            # Rewards in units of the window's std: step sizes stay
+            # meaningful whatever the reward scale of the agent
+            std = window['reward'].std()
+            reward[i, 0, :n] = window['reward'] / std if std > 0 else window['reward']
+            # Missing logs: act at the current policy
+            confidence[i, 0, :n] = np.where(
+                np.isnan(window['confidence']), theta[i, 0], window['confidence']
+            )
+            risk[i, 0, :n] = np.where(
+                np.isnan(window['risk']) | (window['risk'] <= 0), theta[i, 1], window['risk']
+            )
+            mask[i, 0, :n] = True
+        
+        # Calculate step sizes
+        a_k = self.spsa_a / ((iteration + 1) ** self.spsa_alpha)
+        c_k = self.spsa_c / ((iteration + 1) ** self.spsa_gamma)
+        
+        # Generate random perturbation
+        delta = self.rng.choice([-1.0, 1.0], size=theta.shape)
+        
+        # Evaluate theta, theta+ and theta- for every agent in one pass
+        points = np.stack([
+            theta,
+            theta + c_k[:, None] * delta,
+            theta - c_k[:, None] * delta,
+        ], axis=1)
+        points = np.clip(points, THETA_LOW, THETA_HIGH)
+        
+        scores = counterfactual_objective(
+            points, confidence, risk, reward, mask,
+            lambda_risk=self.lambda_risk,
+            temperature=self.gate_temperature
+        )
+        
+        # Estimate gradient (ascent on the objective)
+        gradient = ((scores[:, 1] - scores[:, 2]) / (2.0 * c_k))[:, None] / delta
+        
+        # Update parameters, clip to valid ranges and max drift
+        theta_diff = np.clip(a_k[:, None] * gradient, -self.max_drift, self.max_drift)
+        theta_new = np.clip(theta + theta_diff, THETA_LOW, THETA_HIGH)
+        
+        new_policies = {}
+        for i, agent_id in enumerate(agent_ids):
+            learning_policy_objective.labels(agent=agent_id).set(float(scores[i, 0]))
+            
+            new_policy = policies[agent_id].copy()
+            new_policy['confidence_threshold'] = float(theta_new[i, 0])
+            new_policy['risk_tolerance'] = float(theta_new[i, 1])
+            new_policy['version'] = int(iteration[i])
+            new_policies[agent_id] = new_policy
+            
+            logger.debug(
+                f"SPSA update {agent_id}: J+={scores[i, 1]:.4f} J-={scores[i, 2]:.4f}, "
+                f"confidence {theta[i, 0]:.3f} → {theta_new[i, 0]:.3f}, "
+                f"risk {theta[i, 1]:.3f} → {theta_new[i, 1]:.3f}"
+            )
+        
+        return new_policies
+    
     def _spsa_update(
         self,
         current_policy: Dict[str, Any],
-        experiences: List[Dict[str, Any]],
+        experiences: Dict[str, np.ndarray],
         iteration: int
     ) -> Dict[str, Any]:
-        """Perform SPSA policy update
+        """Perform SPSA policy update ('reward' mode)
         
-        SPSA (Simultaneous Perturbation Stochastic Approximation) is a
-        gradient-free optimization method that only requires 2 function
-        evaluations per iteration.
+        Legacy single-agent step: moves theta along a random perturbation
+        scaled by the average reward, without evaluating the perturbed
+        points (see _spsa_counterfactual_update for the two-evaluation step).
         
         Args:
             current_policy: Current policy parameters
-            experiences: Recent experiences
+            experiences: Recent experiences (replay buffer columns)
             iteration: Update iteration number
         
         Returns:
@@ -237,8 +459,7 @@ class PolicyManager:
         delta = np.random.choice([-1, 1], size=theta.shape)
         
         # Evaluate at perturbed points (simplified - use average reward)
-        rewards = [exp['reward'] for exp in experiences]
-        avg_reward = np.mean(rewards)
+        avg_reward = experiences['reward'].mean()
         
         # Estimate gradient
         gradient = (avg_reward / c_k) * delta
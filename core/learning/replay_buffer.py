@@ -0,0 +1,125 @@
+# core/learning/replay_buffer.py
+"""Replay Buffer - In-memory experience storage for policy updates
+
+Fixed-capacity ring buffer per agent with columnar numpy storage, so
+policy updates read recent rewards/features without a database round-trip.
+"""
+
+from typing import Dict, Any, Iterable, Optional, Sequence
+
+import numpy as np
+
+# State features kept as columns (same keys as the policy feature_weights)
+DEFAULT_FEATURES = ('trend_strength', 'volume_ratio', 'volatility', 'sentiment')
+
+
+def consensus_confidence(
+    decision: Dict[str, Any],
+    consensus_meta: Optional[Dict[str, Any]] = None
+) -> Optional[float]:
+    """Confidence the policy threshold was applied to"""
+    conf_avg = (consensus_meta or {}).get('conf_avg')
+    return conf_avg if conf_avg is not None else decision.get('confidence')
+
+
+class ReplayBuffer:
+    """Ring buffer of one agent's experiences
+
+    Columns: t, reward, confidence (consensus confidence, or the decision
+    confidence without consensus), risk (risk tolerance of the policy that
+    decided) and one column per state feature. Missing values are stored
+    as NaN. Once full, new
+    experiences overwrite the oldest ones.
+    """
+
+    def __init__(self, capacity: int = 10000, feature_names: Sequence[str] = DEFAULT_FEATURES):
+        self.capacity = capacity
+        self.feature_names = tuple(feature_names)
+
+        self.t = np.zeros(capacity, dtype=np.float64)
+        self.reward = np.zeros(capacity, dtype=np.float64)
+        self.confidence = np.full(capacity, np.nan, dtype=np.float64)
+        self.risk = np.full(capacity, np.nan, dtype=np.float64)
+        self.features = np.full((capacity, len(self.feature_names)), np.nan, dtype=np.float64)
+
+        self._next = 0      # slot of the next write
+        self._size = 0
+        self.total_added = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def feature_vector(self, state_features: Dict[str, Any]) -> np.ndarray:
+        """Numeric feature columns of a state dict (NaN if missing)"""
+        vector = np.full(len(self.feature_names), np.nan)
+        for i, name in enumerate(self.feature_names):
+            value = state_features.get(name)
+            if isinstance(value, (int, float)):
+                vector[i] = value
+        return vector
+
+    def add(
+        self,
+        t: float,
+        reward: float,
+        state_features: Optional[Dict[str, Any]] = None,
+        confidence: Optional[float] = None,
+        risk: Optional[float] = None
+    ):
+        """Append one experience (O(1))"""
+        i = self._next
+        self.t[i] = t
+        self.reward[i] = reward
+        self.confidence[i] = confidence if confidence is not None else np.nan
+        self.risk[i] = risk if risk is not None else np.nan
+        self.features[i] = self.feature_vector(state_features or {})
+
+        self._next = (i + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+        self.total_added += 1
+
+    def extend(self, experiences: Iterable[Dict[str, Any]]):
+        """Append experience documents (oldest first), e.g. from MongoDB"""
+        for exp in experiences:
+            decision = exp.get('decision') or {}
+            self.add(
+                exp.get('t', 0.0),
+                exp.get('reward', 0.0),
+                exp.get('state_features'),
+                consensus_confidence(decision, exp.get('consensus_meta')),
+                decision.get('risk_tolerance')
+            )
+
+    def _indices(self, n: Optional[int]) -> np.ndarray:
+        """Ring slots of the last n experiences, oldest first"""
+        n = self._size if n is None else min(n, self._size)
+        return (self._next - n + np.arange(n)) % self.capacity
+
+    def recent(self, n: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Last n experiences as columns (oldest first)
+
+        Args:
+            n: Number of experiences (None = whole buffer)
+
+        Returns:
+            Dict with t, reward, confidence, risk and features
+            (n x n_features)
+        """
+        idx = self._indices(n)
+        return {
+            't': self.t[idx],
+            'reward': self.reward[idx],
+            'confidence': self.confidence[idx],
+            'risk': self.risk[idx],
+            'features': self.features[idx],
+        }
+
+    def since(self, t: float) -> Dict[str, np.ndarray]:
+        """Experiences newer than timestamp t (oldest first)"""
+        batch = self.recent()
+        mask = batch['t'] > t
+        return {key: values[mask] for key, values in batch.items()}
+
+    def clear(self):
+        self._next = 0
+        self._size = 0
@@ -2,17 +2,24 @@
 """Learning Store - Persistent storage for agent experiences and policies
 
 Stores experiences and policy versions in MongoDB for continuous learning.
+Experiences are also kept in a per-agent in-memory replay buffer and
+written to MongoDB asynchronously in bulk batches.
 """
 
+import asyncio
 import logging
 import os
 import time
+from collections import deque
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timezone
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import BulkWriteError
 import hashlib
 import json
 
+from .replay_buffer import ReplayBuffer, consensus_confidence
+
 logger = logging.getLogger(__name__)
 
 
@@ -28,6 +35,20 @@ class LearningStore:
         self.experiences_col = None
         self.policies_col = None
         
+        # Replay buffers (agent -> ReplayBuffer) + pending bulk writes
+        self.buffer_capacity = int(os.getenv('LEARNING_BUFFER_CAPACITY', '10000'))
+        self.batch_size = int(os.getenv('LEARNING_BATCH_SIZE', '100'))
+        self.flush_interval = float(os.getenv('LEARNING_FLUSH_INTERVAL', '2.0'))
+        self.max_pending = int(os.getenv('LEARNING_MAX_PENDING', '50000'))
+        
+        self.buffers: Dict[str, ReplayBuffer] = {}
+        self._pending: deque = deque()
+        self._flush_event: Optional[asyncio.Event] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._warm_locks: Dict[str, asyncio.Lock] = {}
+        self.dropped_experiences = 0
+        
         self._initialized = False
     
     async def initialize(self):
@@ -50,7 +71,20 @@ class LearningStore:
             await self._create_indexes()
             
             self._initialized = True
-            logger.info(f"✅ LearningStore initialized: {self.mongo_uri}")
+            
+            # Background bulk writer
+            self._flush_event = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+            self._flush_task = asyncio.create_task(self._flush_loop())
+            
+            # Warm-start replay buffers of known agents
+            for agent_id in await self.experiences_col.distinct('agent'):
+                await self.get_replay_buffer(agent_id)
+            
+            logger.info(
+                f"✅ LearningStore initialized: {self.mongo_uri} "
+                f"({len(self.buffers)} replay buffer(s) warm)"
+            )
             return True
             
         except Exception as e:
@@ -84,6 +118,10 @@ class LearningStore:
     ) -> bool:
         """Store an agent experience
         
+        The experience is added to the agent's replay buffer right away and
+        queued for the next bulk write to MongoDB (state digest computed
+        there, off the decision path).
+        
         Args:
             agent_id: Agent identifier
             state_features: State representation (will be hashed)
@@ -101,14 +139,21 @@ class LearningStore:
             await self.initialize()
         
         try:
-            # Create state digest (hash of features)
-            state_digest = self._hash_state(state_features)
+            t = time.time()
+            
+            buffer = await self.get_replay_buffer(agent_id)
+            buffer.add(
+                t,
+                reward,
+                state_features,
+                consensus_confidence(decision, consensus_meta),
+                decision.get('risk_tolerance')
+            )
             
-            experience = {
-                't': time.time(),
+            self._enqueue({
+                't': t,
                 'timestamp': datetime.now(timezone.utc),
                 'agent': agent_id,
-                'state_digest': state_digest,
                 'state_features': state_features,
                 'decision': decision,
                 'outcome': outcome,
@@ -116,9 +161,7 @@ class LearningStore:
                 'consensus_meta': consensus_meta or {},
                 'market_ctx': market_ctx or {},
                 'policy_id': policy_id or 'default'
-            }
-            
-            await self.experiences_col.insert_one(experience)
+            })
             
             logger.debug(f"Experience stored: agent={agent_id}, reward={reward:.4f}")
             return True
@@ -127,6 +170,125 @@ class LearningStore:
             logger.error(f"Error storing experience: {e}")
             return False
     
+    def _enqueue(self, experience: Dict[str, Any]):
+        """Queue an experience for the next bulk write"""
+        if len(self._pending) >= self.max_pending:
+            # MongoDB unreachable for too long: keep memory bounded
+            self._pending.popleft()
+            self.dropped_experiences += 1
+        
+        self._pending.append(experience)
+        
+        if len(self._pending) >= self.batch_size and self._flush_event is not None:
+            self._flush_event.set()
+    
+    async def _flush_loop(self):
+        """Write pending experiences every flush_interval or full batch"""
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_event.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_event.clear()
+            
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error flushing experiences: {e}")
+    
+    async def flush(self) -> int:
+        """Write all pending experiences to MongoDB (insert_many batches)
+        
+        Returns:
+            Number of experiences written
+        """
+        if self._flush_lock is None:
+            return 0
+        
+        written = 0
+        async with self._flush_lock:
+            while self._pending:
+                batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+                for experience in batch:
+                    experience.setdefault('state_digest', self._hash_state(experience['state_features']))
+                
+                try:
+                    await self.experiences_col.insert_many(batch, ordered=False)
+                except BulkWriteError as e:
+                    # ordered=False: every document without a write error was
+                    # stored. Duplicate keys (11000) are documents stored by an
+                    # earlier attempt under the _id pymongo already assigned
+                    errors = [err for err in e.details.get('writeErrors', []) if err.get('code') != 11000]
+                    failed = [batch[err['index']] for err in errors]
+                    written += len(batch) - len(failed)
+                    if failed:
+                        # Keep only the unwritten documents (oldest first)
+                        self._pending.extendleft(reversed(failed))
+                        raise
+                    continue
+                except Exception:
+                    # Keep the batch for the next attempt (oldest first); a
+                    # retry of documents that did get stored is a duplicate key
+                    self._pending.extendleft(reversed(batch))
+                    raise
+                
+                written += len(batch)
+        
+        return written
+    
+    async def close(self):
+        """Flush pending experiences and stop the background writer"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        
+        if self._initialized:
+            await self.flush()
+    
+    async def get_replay_buffer(self, agent_id: str) -> ReplayBuffer:
+        """Replay buffer of an agent, warm-started from MongoDB on first use
+        
+        Args:
+            agent_id: Agent identifier
+        
+        Returns:
+            ReplayBuffer with the agent's most recent experiences
+        """
+        buffer = self.buffers.get(agent_id)
+        if buffer is not None:
+            return buffer
+        
+        lock = self._warm_locks.setdefault(agent_id, asyncio.Lock())
+        async with lock:
+            buffer = self.buffers.get(agent_id)
+            if buffer is not None:
+                return buffer
+            
+            buffer = ReplayBuffer(self.buffer_capacity)
+            if self._initialized:
+                try:
+                    cursor = self.experiences_col.find(
+                        {'agent': agent_id},
+                        {
+                            't': 1, 'reward': 1, 'state_features': 1, 'consensus_meta.conf_avg': 1,
+                            'decision.confidence': 1, 'decision.risk_tolerance': 1, '_id': 0
+                        }
+                    ).sort('t', -1).limit(self.buffer_capacity)
+                    
+                    experiences = await cursor.to_list(length=self.buffer_capacity)
+                    buffer.extend(reversed(experiences))
+                except Exception as e:
+                    logger.warning(f"Could not warm-start replay buffer for {agent_id}: {e}")
+            
+            self.buffers[agent_id] = buffer
+            return buffer
+    
     def _hash_state(self, state_features: Dict[str, Any]) -> str:
         """Create a hash digest of state features"""
         # Sort keys for consistent hashing
@@ -151,6 +313,8 @@ class LearningStore:
             await self.initialize()
         
         try:
+            await self.flush()
+            
             cursor = self.experiences_col.find(
                 {'agent': agent_id}
             ).sort('t', -1).limit(limit)
@@ -249,6 +413,8 @@ class LearningStore:
             await self.initialize()
         
         try:
+            await self.flush()
+            
             query = {'agent': agent_id}
             if since_timestamp:
                 query['t'] = {'$gte': since_timestamp}
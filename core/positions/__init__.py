@@ -1,6 +1,6 @@
-# core/positions/__init__.py
 """Position management for live trading"""
 
 from .position_manager import PositionManager, LiveTrade
+from .mark_to_market import MarkToMarketBook, MarkTrigger, CloseQueue
 
-__all__ = ['PositionManager', 'LiveTrade']
+__all__ = ['PositionManager', 'LiveTrade', 'MarkToMarketBook', 'MarkTrigger', 'CloseQueue']
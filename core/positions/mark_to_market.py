@@ -0,0 +1,315 @@
+# core/positions/mark_to_market.py
+"""
+Mark-to-Market Engine - Batched valuation of open positions
+Keeps positions in columnar arrays per price bucket (usually a symbol),
+revalues a whole bucket per price update and finds SL/TP crossings through
+sorted level indices, so only crossed positions are touched
+"""
+
+import logging
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_SIDE_DIRECTION = {'long': 1.0, 'short': -1.0}
+
+
+@dataclass
+class MarkTrigger:
+    """A position whose stop loss or take profit was crossed by a price update"""
+    key: Hashable
+    bucket: Hashable
+    reason: str  # 'stop_loss' or 'take_profit'
+    price: float
+
+
+class _Bucket:
+    """Columnar storage for the positions valued against one price"""
+
+    __slots__ = (
+        'keys', 'entry', 'scale', 'divisor', 'direction',
+        'below', 'below_reason', 'above', 'above_reason',
+        'size', 'price', 'pnl', 'dirty', 'below_index', 'above_index'
+    )
+
+    def __init__(self, capacity: int = 16):
+        self.keys: List[Hashable] = []
+        self.entry = np.zeros(capacity)
+        self.scale = np.zeros(capacity)
+        self.divisor = np.ones(capacity)
+        self.direction = np.zeros(capacity)
+        # 'below' fires when price <= level, 'above' when price >= level (NaN = disarmed)
+        self.below = np.full(capacity, np.nan)
+        self.above = np.full(capacity, np.nan)
+        self.below_reason: List[Optional[str]] = []
+        self.above_reason: List[Optional[str]] = []
+        self.size = 0
+        self.price: Optional[float] = None
+        self.pnl = np.zeros(capacity)
+        self.dirty = True
+        self.below_index: Tuple[np.ndarray, np.ndarray] = (np.empty(0), np.empty(0, dtype=np.intp))
+        self.above_index: Tuple[np.ndarray, np.ndarray] = (np.empty(0), np.empty(0, dtype=np.intp))
+
+    def grow(self):
+        capacity = len(self.entry) * 2
+        for name, fill in (('entry', 0.0), ('scale', 0.0), ('divisor', 1.0), ('direction', 0.0),
+                           ('below', np.nan), ('above', np.nan), ('pnl', 0.0)):
+            old = getattr(self, name)
+            new = np.full(capacity, fill)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def reindex(self):
+        """Rebuild the sorted SL/TP level indices (armed levels only)"""
+        for levels, attr in ((self.below, 'below_index'), (self.above, 'above_index')):
+            rows = np.flatnonzero(~np.isnan(levels[:self.size]))
+            order = rows[np.argsort(levels[rows], kind='stable')]
+            setattr(self, attr, (levels[order], order))
+        self.dirty = False
+
+
+class MarkToMarketBook:
+    """
+    Columnar book of open positions for batched mark-to-market
+
+    Unrealized PnL of a row is ``direction * scale * (price - entry) / divisor``:
+    notional-based trades use ``scale=notional, divisor=entry``, size-based
+    positions use ``scale=size, divisor=1``. Object fields (``current_price``,
+    ``unrealized_pnl``) are not written on every tick; owners read them back
+    with :meth:`valuation` when a position is inspected.
+
+    Not thread-safe: callers guard it with their own lock.
+    """
+
+    def __init__(self):
+        self._buckets: Dict[Hashable, _Bucket] = {}
+        self._rows: Dict[Hashable, Tuple[Hashable, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._rows
+
+    def add(
+        self,
+        key: Hashable,
+        bucket: Hashable,
+        side: str,
+        entry_price: float,
+        scale: float,
+        divisor: float = 1.0,
+        stop_loss: Optional[float] = None,
+        take_profit: Optional[float] = None
+    ):
+        """
+        Add (or replace) a position
+
+        Args:
+            key: Position identifier
+            bucket: Price bucket the position is marked against (e.g. symbol)
+            side: 'long' or 'short' (anything else is never revalued)
+            entry_price: Entry price
+            scale: PnL scale (notional or size)
+            divisor: PnL divisor (entry price for notional-based PnL)
+            stop_loss: Stop loss price, if any
+            take_profit: Take profit price, if any
+        """
+        if key in self._rows:
+            self.remove(key)
+
+        b = self._buckets.get(bucket)
+        if b is None:
+            b = self._buckets[bucket] = _Bucket()
+        if b.size == len(b.entry):
+            b.grow()
+
+        direction = _SIDE_DIRECTION.get(side, 0.0)
+        row = b.size
+        b.keys.append(key)
+        b.entry[row] = entry_price
+        b.scale[row] = scale
+        b.divisor[row] = divisor
+        b.direction[row] = direction
+
+        # Long: SL below / TP above. Short: TP below / SL above
+        if direction > 0:
+            below, above = (stop_loss, 'stop_loss'), (take_profit, 'take_profit')
+        elif direction < 0:
+            below, above = (take_profit, 'take_profit'), (stop_loss, 'stop_loss')
+        else:
+            below = above = (None, None)
+        b.below[row] = below[0] if below[0] is not None else np.nan
+        b.above[row] = above[0] if above[0] is not None else np.nan
+        b.below_reason.append(below[1])
+        b.above_reason.append(above[1])
+
+        b.pnl[row] = 0.0 if b.price is None else self._row_pnl(b, row, b.price)
+        b.size += 1
+        b.dirty = True
+        self._rows[key] = (bucket, row)
+
+    def remove(self, key: Hashable) -> bool:
+        """Remove a position (swap-with-last, O(1))"""
+        location = self._rows.pop(key, None)
+        if location is None:
+            return False
+
+        bucket, row = location
+        b = self._buckets[bucket]
+        last = b.size - 1
+        if row != last:
+            moved = b.keys[last]
+            b.keys[row] = moved
+            b.below_reason[row] = b.below_reason[last]
+            b.above_reason[row] = b.above_reason[last]
+            for arr in (b.entry, b.scale, b.divisor, b.direction, b.below, b.above, b.pnl):
+                arr[row] = arr[last]
+            self._rows[moved] = (bucket, row)
+
+        b.keys.pop()
+        b.below_reason.pop()
+        b.above_reason.pop()
+        b.below[last] = b.above[last] = np.nan
+        b.size = last
+        b.dirty = True
+        if b.size == 0:
+            del self._buckets[bucket]
+        return True
+
+    def disarm(self, key: Hashable):
+        """Stop checking SL/TP for a position while keeping it valued"""
+        location = self._rows.get(key)
+        if location is None:
+            return
+        b = self._buckets[location[0]]
+        b.below[location[1]] = b.above[location[1]] = np.nan
+        b.dirty = True
+
+    def mark(self, prices: Dict[Hashable, float]) -> List[MarkTrigger]:
+        """
+        Revalue every position in the priced buckets and collect SL/TP crossings
+
+        Triggered positions are disarmed so they are reported once; callers
+        remove them when the close is done (or re-add them to re-arm).
+
+        Args:
+            prices: Dict of bucket -> current price
+
+        Returns:
+            List of MarkTrigger for crossed positions
+        """
+        triggers: List[MarkTrigger] = []
+        for bucket, price in prices.items():
+            b = self._buckets.get(bucket)
+            if b is None:
+                continue
+
+            price = float(price)
+            n = b.size
+            b.price = price
+            b.pnl[:n] = b.direction[:n] * b.scale[:n] * ((price - b.entry[:n]) / b.divisor[:n])
+
+            if b.dirty:
+                b.reindex()
+            below_levels, below_rows = b.below_index
+            above_levels, above_rows = b.above_index
+            crossed_below = below_rows[np.searchsorted(below_levels, price, side='left'):]
+            crossed_above = above_rows[:np.searchsorted(above_levels, price, side='right')]
+            if not len(crossed_below) and not len(crossed_above):
+                continue
+
+            hits: Dict[int, str] = {}
+            for row in crossed_below:
+                hits[int(row)] = b.below_reason[row]
+            for row in crossed_above:
+                # Both sides crossed only with inverted levels: stop loss wins
+                if hits.get(int(row)) != 'stop_loss':
+                    hits[int(row)] = b.above_reason[row]
+
+            for row, reason in hits.items():
+                b.below[row] = b.above[row] = np.nan
+                triggers.append(MarkTrigger(key=b.keys[row], bucket=bucket, reason=reason, price=price))
+            b.dirty = True
+
+        return triggers
+
+    def valuation(self, key: Hashable) -> Optional[Tuple[float, float]]:
+        """
+        Last mark of a position
+
+        Returns:
+            (current_price, unrealized_pnl), or None if never marked
+        """
+        location = self._rows.get(key)
+        if location is None:
+            return None
+        b = self._buckets[location[0]]
+        if b.price is None:
+            return None
+        return b.price, float(b.pnl[location[1]])
+
+    def unrealized_pnl(self, bucket: Optional[Hashable] = None) -> float:
+        """Total unrealized PnL of one bucket (or of the whole book)"""
+        buckets = [self._buckets.get(bucket)] if bucket is not None else self._buckets.values()
+        return float(sum(b.pnl[:b.size].sum() for b in buckets if b is not None))
+
+    @staticmethod
+    def _row_pnl(b: _Bucket, row: int, price: float) -> float:
+        return float(b.direction[row] * b.scale[row] * ((price - b.entry[row]) / b.divisor[row]))
+
+
+class CloseQueue:
+    """
+    Execution queue for triggered closes
+
+    A single worker thread runs ``handler(key, *args)`` for each submitted
+    close, so price updates never wait on order placement. Keys already
+    pending are not queued twice.
+    """
+
+    def __init__(self, handler: Callable[..., Any], name: str = "close-queue"):
+        self._handler = handler
+        self._name = name
+        self._queue: "queue.Queue[Tuple[Hashable, tuple]]" = queue.Queue()
+        self._pending: set = set()
+        self._pending_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, key: Hashable, *args) -> bool:
+        """Queue a close; returns False if the key is already pending"""
+        with self._pending_lock:
+            if key in self._pending:
+                return False
+            self._pending.add(key)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+                self._thread.start()
+        self._queue.put((key, args))
+        return True
+
+    def pending(self) -> int:
+        """Number of queued or running closes"""
+        with self._pending_lock:
+            return len(self._pending)
+
+    def join(self):
+        """Block until every submitted close has been handled"""
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            key, args = self._queue.get()
+            try:
+                self._handler(key, *args)
+            except Exception as e:
+                logger.error(f"Error executing queued close for {key}: {e}")
+            finally:
+                with self._pending_lock:
+                    self._pending.discard(key)
+                self._queue.task_done()
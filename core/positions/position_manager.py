@@ -10,6 +10,8 @@ from datetime import datetime, timezone
 from dataclasses import dataclass, field, asdict
 import threading
 
+from .mark_to_market import MarkToMarketBook, CloseQueue
+
 logger = logging.getLogger(__name__)
 
 
@@ -131,6 +133,10 @@ class PositionManager:
         self.positions: Dict[str, LiveTrade] = {}
         self._lock = threading.Lock()
         
+        # Open trades valued in batch per symbol; SL/TP closes run off-lock
+        self._book = MarkToMarketBook()
+        self._close_queue = CloseQueue(self._close_triggered_trade, name="position-close")
+        
         logger.info("PositionManager initialized")
     
     def open_live_trade(
@@ -226,6 +232,7 @@ class PositionManager:
                     
                     # Store position
                     self.positions[trade_id] = trade
+                    self._arm(trade)
                     
                     # Persist to database if available
                     if self.db_client:
@@ -258,6 +265,10 @@ class PositionManager:
         """
         Close a live trade by placing a closing order
         
+        The lock is held only to claim the trade (status 'closing') and to
+        apply the fill; the ticker and order REST calls run without it, so
+        price ticks and reads are not blocked by the exchange round-trip.
+        
         Args:
             trade_id: Trade ID to close
             reason: Close reason
@@ -266,111 +277,121 @@ class PositionManager:
             Tuple of (success, message, trade_data)
         """
         with self._lock:
-            try:
-                if trade_id not in self.positions:
-                    return False, f"Trade {trade_id} not found", None
-                
-                trade = self.positions[trade_id]
-                
-                if trade.status != 'open':
-                    return False, f"Trade {trade_id} is not open (status: {trade.status})", None
-                
-                trade.status = 'closing'
-                
-                if self.order_executor:
-                    # Get current price
-                    success, ticker, error = self.order_executor.fetch_ticker(trade.symbol)
-                    if not success:
-                        logger.error(f"Failed to fetch ticker: {error}")
-                        return False, error, trade.to_dict()
-                    
-                    close_price = ticker['last']
-                    
-                    # Determine closing order side (opposite of entry)
-                    side = 'sell' if trade.action == 'open_long' else 'buy'
-                    
-                    # Calculate amount (same as entry)
-                    amount = trade.notional_usdt / trade.entry_price
-                    
-                    # Place market order to close
-                    success, order, error = self.order_executor.create_order(
-                        symbol=trade.symbol,
-                        order_type='market',
-                        side=side,
-                        amount=amount
-                    )
-                    
-                    if not success:
-                        logger.error(f"Failed to close trade: {error}")
-                        trade.status = 'error'
-                        trade.error_message = error
-                        return False, error, trade.to_dict()
-                    
-                    # Update trade
-                    trade.exit_order_id = order['id']
-                    trade.exit_price = order.get('average') or order.get('price') or close_price
-                    trade.exit_time = datetime.now(timezone.utc)
-                    trade.close(trade.exit_price, reason)
-                    
-                    # Update in database
-                    if self.db_client:
-                        self._save_trade_to_db(trade)
-                    
-                    # NEW: Perform trade autopsy
-                    try:
-                        from core.analysis.trade_autopsy import trade_autopsy
-                        from core.market.regime_detector import regime_detector
-                        
-                        # Prepare trade data for autopsy
-                        trade_data = {
-                            'trade_id': trade.trade_id,
-                            'symbol': trade.symbol,
-                            'entry_time': trade.entry_time,
-                            'exit_time': trade.exit_time,
-                            'entry_price': trade.entry_price,
-                            'exit_price': trade.exit_price,
-                            'pnl': trade.realized_pnl,
-                            'pnl_pct': (trade.realized_pnl / trade.notional_usdt) * 100 if trade.notional_usdt else 0,
-                            'stop_loss': trade.stop_loss_price,
-                            'take_profit': trade.take_profit_price,
-                            'close_reason': reason
-                        }
-                        
-                        # Get market context
-                        regime_stats = regime_detector.get_regime_stats()
-                        market_context = {
-                            'regime': regime_stats.get('current_regime', 'unknown'),
-                            'regime_confidence': regime_stats.get('current_confidence', 0)
-                        }
-                        
-                        # Analyze trade
-                        analysis = trade_autopsy.analyze_trade(trade_data, market_context)
-                        
-                        logger.info(f"Trade autopsy completed for {trade_id}: {len(analysis.get('patterns', []))} patterns identified")
-                        
-                    except Exception as e:
-                        logger.error(f"Error in trade autopsy: {e}")
-                    
-                    logger.info(
-                        f"Live trade closed: {trade_id} - {trade.symbol} @ {trade.exit_price} "
-                        f"(PnL: ${trade.realized_pnl:.2f}, reason: {reason})"
-                    )
-                    
-                    return True, f"Trade {trade_id} closed successfully", trade.to_dict()
-                
-                else:
-                    return False, "No order executor available", None
-                    
-            except Exception as e:
-                error_msg = f"Error closing live trade: {str(e)}"
-                logger.error(error_msg)
-                return False, error_msg, None
+            if trade_id not in self.positions:
+                return False, f"Trade {trade_id} not found", None
+            
+            trade = self.positions[trade_id]
+            
+            if trade.status != 'open':
+                return False, f"Trade {trade_id} is not open (status: {trade.status})", None
+            
+            order_executor = self.order_executor
+            if not order_executor:
+                # Triggered closes arrive disarmed: keep SL/TP checked
+                self._arm(trade)
+                return False, "No order executor available", None
+            
+            self._marked(trade)
+            trade.status = 'closing'
+            symbol = trade.symbol
+            # Determine closing order side (opposite of entry)
+            side = 'sell' if trade.action == 'open_long' else 'buy'
+            # Calculate amount (same as entry)
+            amount = trade.notional_usdt / trade.entry_price
+        
+        try:
+            # Get current price
+            success, ticker, error = order_executor.fetch_ticker(symbol)
+        except Exception as e:
+            success, ticker, error = False, None, str(e)
+        if not success:
+            logger.error(f"Failed to fetch ticker: {error}")
+            with self._lock:
+                # Nothing was sent: the trade is open again and re-armed
+                trade.status = 'open'
+                self._arm(trade)
+                return False, error, trade.to_dict()
+        
+        close_price = ticker['last']
+        
+        try:
+            # Place market order to close
+            success, order, error = order_executor.create_order(
+                symbol=symbol,
+                order_type='market',
+                side=side,
+                amount=amount
+            )
+        except Exception as e:
+            success, order, error = False, None, f"Error closing live trade: {str(e)}"
+        
+        with self._lock:
+            if not success:
+                logger.error(f"Failed to close trade: {error}")
+                trade.status = 'error'
+                trade.error_message = error
+                self._book.remove(trade_id)
+                return False, error, trade.to_dict()
+            
+            # Update trade
+            trade.exit_order_id = order['id']
+            trade.exit_price = order.get('average') or order.get('price') or close_price
+            trade.exit_time = datetime.now(timezone.utc)
+            trade.close(trade.exit_price, reason)
+            self._book.remove(trade_id)
+            trade_dict = trade.to_dict()
+        
+        # Update in database
+        if self.db_client:
+            self._save_trade_to_db(trade)
+        
+        # NEW: Perform trade autopsy
+        try:
+            from core.analysis.trade_autopsy import trade_autopsy
+            from core.market.regime_detector import regime_detector
+            
+            # Prepare trade data for autopsy
+            trade_data = {
+                'trade_id': trade.trade_id,
+                'symbol': trade.symbol,
+                'entry_time': trade.entry_time,
+                'exit_time': trade.exit_time,
+                'entry_price': trade.entry_price,
+                'exit_price': trade.exit_price,
+                'pnl': trade.realized_pnl,
+                'pnl_pct': (trade.realized_pnl / trade.notional_usdt) * 100 if trade.notional_usdt else 0,
+                'stop_loss': trade.stop_loss_price,
+                'take_profit': trade.take_profit_price,
+                'close_reason': reason
+            }
+            
+            # Get market context
+            regime_stats = regime_detector.get_regime_stats()
+            market_context = {
+                'regime': regime_stats.get('current_regime', 'unknown'),
+                'regime_confidence': regime_stats.get('current_confidence', 0)
+            }
+            
+            # Analyze trade
+            analysis = trade_autopsy.analyze_trade(trade_data, market_context)
+            
+            logger.info(f"Trade autopsy completed for {trade_id}: {len(analysis.get('patterns', []))} patterns identified")
+            
+        except Exception as e:
+            logger.error(f"Error in trade autopsy: {e}")
+        
+        logger.info(
+            f"Live trade closed: {trade_id} - {trade.symbol} @ {trade.exit_price} "
+            f"(PnL: ${trade.realized_pnl:.2f}, reason: {reason})"
+        )
+        
+        return True, f"Trade {trade_id} closed successfully", trade_dict
     
     def get_open_trades(self) -> List[Dict[str, Any]]:
         """Get all open live trades"""
         with self._lock:
             return [
-                trade.to_dict()
+                self._marked(trade).to_dict()
                 for trade in self.positions.values()
                 if trade.status == 'open'
             ]
@@ -379,27 +400,54 @@ class PositionManager:
         """Get a specific trade"""
         with self._lock:
             trade = self.positions.get(trade_id)
-            return trade.to_dict() if trade else None
+            return self._marked(trade).to_dict() if trade else None
     
     def update_trade_prices(self, price_data: Dict[str, float]):
         """
         Update prices for all open trades and check SL/TP
         
+        Trades are revalued in batch per symbol; triggered closes are handed
+        to the close queue and placed outside the lock.
+        
         Args:
             price_data: Dict of symbol -> current_price
         """
         with self._lock:
-            for trade in self.positions.values():
-                if trade.status == 'open' and trade.symbol in price_data:
-                    current_price = price_data[trade.symbol]
-                    trade.update_price(current_price)
-                    
-                    # Check if SL or TP hit
-                    trigger = trade.check_sl_tp(current_price)
-                    if trigger:
-                        logger.info(f"Trade {trade.trade_id}: {trigger} triggered at {current_price}")
-                        # Close the trade
-                        self.close_live_trade(trade.trade_id, trigger)
+            triggers = self._book.mark(price_data)
+        
+        for trigger in triggers:
+            logger.info(f"Trade {trigger.key}: {trigger.reason} triggered at {trigger.price}")
+            self._close_queue.submit(trigger.key, trigger.reason)
+    
+    def wait_for_pending_closes(self):
+        """Block until every queued SL/TP close has been executed"""
+        self._close_queue.join()
+    
+    def _close_triggered_trade(self, trade_id: str, reason: str):
+        """Close queue handler for SL/TP triggers"""
+        success, message, _ = self.close_live_trade(trade_id, reason)
+        if not success:
+            logger.error(f"Triggered close failed for {trade_id}: {message}")
+    
+    def _arm(self, trade: LiveTrade):
+        """(Re)add an open trade to the book with its SL/TP levels (caller holds the lock)"""
+        self._book.add(
+            trade.trade_id, trade.symbol,
+            'long' if trade.action == 'open_long' else 'short',
+            trade.entry_price,
+            scale=trade.notional_usdt,
+            divisor=trade.entry_price,
+            stop_loss=trade.stop_loss_price,
+            take_profit=trade.take_profit_price
+        )
+    
+    def _marked(self, trade: LiveTrade) -> LiveTrade:
+        """Apply the latest batched mark to an open trade (caller holds the lock)"""
+        if trade.status == 'open':
+            mark = self._book.valuation(trade.trade_id)
+            if mark is not None:
+                trade.current_price, trade.unrealized_pnl = mark
+        return trade
     
     def sync_positions_from_exchange(self) -> Tuple[bool, str]:
         """
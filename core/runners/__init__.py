@@ -8,11 +8,19 @@ Inclui backtesting, hyperopt, e relatórios baseados no Freqtrade
 from .backtest_runner import MaverettaBacktestRunner, run_slot_backtest
 from .hyperopt_runner import MaverettaHyperoptRunner, optimize_slot_strategy
 from .backtest_cache import MaverettaBacktestCache
+from .result_store import BacktestResultStore
+from .backtest_jobs import BacktestJobManager
+from .strategy_backtester import StrategyBacktester
+from .portfolio_backtest import PortfolioBacktestResult
 
 __all__ = [
     'MaverettaBacktestRunner',
     'run_slot_backtest', 
     'MaverettaHyperoptRunner',
     'optimize_slot_strategy',
-    'MaverettaBacktestCache'
+    'MaverettaBacktestCache',
+    'BacktestResultStore',
+    'BacktestJobManager',
+    'StrategyBacktester',
+    'PortfolioBacktestResult'
 ]
\ No newline at end of file
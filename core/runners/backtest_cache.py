@@ -48,6 +48,13 @@ class MaverettaBacktestCache:
         self._memory_cache: Dict[str, Any] = {}
         self._cache_metadata: Dict[str, Dict[str, Any]] = {}
         
+        # Índice de tamanho dos arquivos (varredura única; atualizado a cada escrita/remoção)
+        self._file_sizes: Dict[Path, int] = {
+            f: f.stat().st_size
+            for cache_subdir in [self.results_cache_dir, self.data_cache_dir, self.metadata_cache_dir]
+            for f in cache_subdir.glob("*")
+        }
+        
         logger.info(f"[BACKTEST_CACHE] Initialized cache at {self.cache_dir}")
     
     def get_cache_key(
@@ -195,12 +202,14 @@ class MaverettaBacktestCache:
             cache_file = self.results_cache_dir / f"{cache_key}.json"
             with open(cache_file, 'w') as f:
                 json.dump(result_data, f, indent=2)
+            self._track_file(cache_file)
             
             # Salvar metadados separadamente
             if metadata:
                 metadata_file = self.metadata_cache_dir / f"{cache_key}_meta.json"
                 with open(metadata_file, 'w') as f:
                     json.dump(metadata, f, indent=2)
+                self._track_file(metadata_file)
             
             logger.info(f"[BACKTEST_CACHE] Cached result for {cache_key[:8]}")
             
@@ -234,6 +243,7 @@ class MaverettaBacktestCache:
             # Salvar DataFrame como pickle para eficiência
             data_file = self.data_cache_dir / f"{cache_key}_data.pkl"
             dataframe.to_pickle(data_file)
+            self._track_file(data_file)
             
             # Salvar metadados
             metadata_file = self.data_cache_dir / f"{cache_key}_data_meta.json"
@@ -243,6 +253,7 @@ class MaverettaBacktestCache:
             
             with open(metadata_file, 'w') as f:
                 json.dump(snapshot_metadata, f, indent=2)
+            self._track_file(metadata_file)
             
             logger.debug(f"[BACKTEST_CACHE] Cached data snapshot for {cache_key[:8]}")
             return True
@@ -315,6 +326,7 @@ class MaverettaBacktestCache:
             for file_path in files_to_remove:
                 if file_path.exists():
                     file_path.unlink()
+                self._file_sizes.pop(file_path, None)
             
             logger.info(f"[BACKTEST_CACHE] Invalidated cache for {cache_key[:8]}")
             return True
@@ -361,11 +373,13 @@ class MaverettaBacktestCache:
                 for cache_file in cache_subdir.glob("*"):
                     if cutoff_time is None:
                         cache_file.unlink()
+                        self._file_sizes.pop(cache_file, None)
                         removed_count += 1
                     else:
                         file_time = datetime.fromtimestamp(cache_file.stat().st_mtime)
                         if file_time < cutoff_time:
                             cache_file.unlink()
+                            self._file_sizes.pop(cache_file, None)
                             removed_count += 1
             
             logger.info(f"[BACKTEST_CACHE] Cleared {removed_count} cache entries")
@@ -383,17 +397,14 @@ class MaverettaBacktestCache:
             Dict com estatísticas do cache
         """
         try:
-            # Contar arquivos em cada diretório
-            results_count = len(list(self.results_cache_dir.glob("*.json")))
-            data_count = len(list(self.data_cache_dir.glob("*.pkl")))
-            metadata_count = len(list(self.metadata_cache_dir.glob("*.json")))
+            # Contar arquivos em cada diretório (pelo índice, sem varrer o disco)
+            files = list(self._file_sizes)
+            results_count = sum(1 for f in files if f.parent == self.results_cache_dir and f.suffix == '.json')
+            data_count = sum(1 for f in files if f.parent == self.data_cache_dir and f.suffix == '.pkl')
+            metadata_count = sum(1 for f in files if f.parent == self.metadata_cache_dir and f.suffix == '.json')
             
             # Calcular tamanho do cache
-            cache_size_bytes = sum(
-                f.stat().st_size 
-                for cache_subdir in [self.results_cache_dir, self.data_cache_dir, self.metadata_cache_dir]
-                for f in cache_subdir.glob("*")
-            )
+            cache_size_bytes = sum(self._file_sizes.values())
             cache_size_mb = cache_size_bytes / (1024 * 1024)
             
             # Estatísticas de memória
@@ -414,6 +425,10 @@ class MaverettaBacktestCache:
             logger.error(f"[BACKTEST_CACHE] Error getting cache stats: {e}")
             return {}
     
+    def _track_file(self, file_path: Path) -> None:
+        """Atualiza o índice de tamanho após escrever um arquivo"""
+        self._file_sizes[file_path] = file_path.stat().st_size
+    
     def _cleanup_cache_if_needed(self) -> None:
         """Limpa cache se exceder tamanho máximo"""
         try:
@@ -0,0 +1,846 @@
+# core/runners/backtest_jobs.py
+"""
+Maveretta Backtest Jobs - Fila assíncrona de backtests
+Execução de backtests em pool de processos com prioridades, limites de
+concorrência, progresso/resultados parciais, cancelamento e deduplicação
+de jobs idênticos em andamento (via MaverettaBacktestCache.get_cache_key)
+"""
+
+import heapq
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from .backtest_cache import MaverettaBacktestCache
+
+logger = logging.getLogger(__name__)
+
+# Estados de um job
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_COMPLETED = 'completed'
+JOB_FAILED = 'failed'
+JOB_CANCELLED = 'cancelled'
+
+FINAL_STATES = (JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED)
+
+# ===== MÉTRICAS PROMETHEUS =====
+
+backtest_jobs_queue_depth = Gauge(
+    'backtest_jobs_queue_depth',
+    'Backtest tasks waiting for a worker'
+)
+
+backtest_jobs_running = Gauge(
+    'backtest_jobs_running',
+    'Backtest tasks currently running in the worker pool'
+)
+
+backtest_jobs_total = Counter(
+    'backtest_jobs_total',
+    'Backtest jobs finished by the job manager',
+    ['status']
+)
+
+backtest_jobs_deduplicated_total = Counter(
+    'backtest_jobs_deduplicated_total',
+    'Backtest submissions served by an identical in-flight or cached job',
+    ['source']
+)
+
+backtest_job_duration_seconds = Histogram(
+    'backtest_job_duration_seconds',
+    'Wall time of a backtest job from start to finish',
+    ['status'],
+    buckets=[1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600]
+)
+
+
+# ----------------------------------------------------------------------
+# Lado do worker (executa nos processos do pool)
+# ----------------------------------------------------------------------
+
+_worker_runner = None
+_progress_queue = None
+
+
+def _init_worker(progress_queue, niceness: int):
+    """Inicializa o processo worker (fila de progresso e prioridade de CPU)"""
+    global _progress_queue
+    _progress_queue = progress_queue
+
+    # Backtests cedem CPU para a API e o trading ao vivo
+    if niceness and hasattr(os, 'nice'):
+        try:
+            os.nice(niceness)
+        except OSError:
+            pass
+
+
+def report_progress(job_id: str, task_index: int, stage: str, fraction: float,
+                    partial: Optional[Dict[str, Any]] = None):
+    """Envia progresso do worker para o processo da API (não bloqueia)"""
+    if _progress_queue is None:
+        return
+    try:
+        _progress_queue.put_nowait((job_id, task_index, stage, fraction, partial))
+    except Exception:
+        pass
+
+
+def run_backtest_task(job_id: str, task_index: int, params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Executa um backtest de slot (worker do pool)
+
+    Args:
+        job_id: ID do job
+        task_index: Índice da tarefa dentro do job
+        params: Parâmetros de MaverettaBacktestRunner.run_slot_backtest
+
+    Returns:
+        Resultado serializado (backtest_result_to_dict)
+    """
+    global _worker_runner
+    from .backtest_runner import MaverettaBacktestRunner, backtest_result_to_dict
+
+    if _worker_runner is None:
+        _worker_runner = MaverettaBacktestRunner()
+
+    def progress(stage: str, fraction: float, partial: Optional[Dict[str, Any]] = None):
+        report_progress(job_id, task_index, stage, fraction, partial)
+
+    result = _worker_runner.run_slot_backtest(**params, progress_callback=progress)
+    return backtest_result_to_dict(result)
+
+
+# ----------------------------------------------------------------------
+# Jobs (processo da API)
+# ----------------------------------------------------------------------
+
+@dataclass
+class BacktestJob:
+    """Job de backtest (um ou mais slots)"""
+    job_id: str
+    cache_key: str
+    kind: str                               # 'slot' ou 'multi_slot'
+    tasks: List[Dict[str, Any]]             # parâmetros de run_slot_backtest por slot
+    priority: int = 0
+    status: str = JOB_QUEUED
+    stage: str = JOB_QUEUED
+    created_at: datetime = field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    task_progress: List[float] = field(default_factory=list)
+    partial_results: Dict[str, Any] = field(default_factory=dict)
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    cached: bool = False
+    duplicates: int = 0
+
+    # Controle interno
+    done: Future = field(default_factory=Future, repr=False)
+    pending_tasks: int = 0
+    running_futures: Dict[int, Future] = field(default_factory=dict, repr=False)
+    crash_retries: Dict[int, int] = field(default_factory=dict, repr=False)
+    isolated_tasks: set = field(default_factory=set, repr=False)
+    started_perf: float = 0.0
+
+    @property
+    def progress(self) -> float:
+        if self.status == JOB_COMPLETED:
+            return 1.0
+        if not self.task_progress:
+            return 0.0
+        return sum(self.task_progress) / len(self.task_progress)
+
+    def to_dict(self, include_result: bool = True) -> Dict[str, Any]:
+        data = {
+            'job_id': self.job_id,
+            'cache_key': self.cache_key,
+            'kind': self.kind,
+            'status': self.status,
+            'stage': self.stage,
+            'priority': self.priority,
+            'progress': round(self.progress, 4),
+            'slots': [task['slot_id'] for task in self.tasks],
+            'partial_results': self.partial_results,
+            'cached': self.cached,
+            'duplicates': self.duplicates,
+            'error': self.error,
+            'created_at': self.created_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
+        if include_result:
+            data['result'] = self.result
+        return data
+
+
+def _result_summary(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Resumo de um resultado de slot para resultados parciais/eventos"""
+    return {
+        'backtest_id': result.get('backtest_id'),
+        'total_return': result.get('total_return', 0.0),
+        'sharpe_ratio': result.get('sharpe_ratio', 0.0),
+        'max_drawdown': result.get('max_drawdown', 0.0),
+        'trades_count': result.get('trades_count', 0),
+        'execution_time': result.get('execution_time_seconds', 0.0),
+    }
+
+
+class BacktestJobManager:
+    """
+    Gerenciador de jobs de backtest
+
+    Submissões retornam imediatamente com o job. As tarefas (uma por slot)
+    esperam numa fila de prioridade (maior primeiro, FIFO por prioridade) e
+    rodam num pool de processos; cada job usa no máximo
+    ``max_tasks_per_job`` workers ao mesmo tempo, para que um multi-slot
+    grande não bloqueie os demais. Jobs idênticos (mesma chave de cache)
+    em andamento são compartilhados e resultados válidos no
+    MaverettaBacktestCache são devolvidos sem executar nada.
+
+    Progresso e resultados parciais ficam no job e são publicados via
+    ``publish`` (ex: stream SSE de eventos).
+
+    Quando um worker morre, todas as tarefas do pool falham juntas. Elas
+    voltam a rodar uma de cada vez num pool isolado de um worker, onde
+    uma nova queda identifica a tarefa culpada: só ela consome
+    ``max_task_retries`` e falha o próprio job.
+    """
+
+    def __init__(
+        self,
+        config: Optional[Dict[str, Any]] = None,
+        cache: Optional[MaverettaBacktestCache] = None,
+        publish: Optional[Callable[[Dict[str, Any]], None]] = None,
+        task_runner: Callable[[str, int, Dict[str, Any]], Dict[str, Any]] = run_backtest_task
+    ):
+        """
+        Args:
+            config: Configuração (ver _default_config)
+            cache: Cache de resultados (chaves e resultados prontos)
+            publish: Chamado com cada evento de job
+            task_runner: Função picklável (job_id, task_index, params) -> resultado
+        """
+        self.config = {**self._default_config(), **(config or {})}
+        self.cache = cache or MaverettaBacktestCache()
+        self.publish = publish
+        self.task_runner = task_runner
+
+        self.max_workers = max(1, int(self.config['max_workers'] or max(1, (os.cpu_count() or 2) // 2)))
+        self.max_tasks_per_job = max(1, int(self.config['max_tasks_per_job'] or self.max_workers))
+
+        self._lock = threading.Condition(threading.Lock())
+        # Heap de (-prioridade, seq, job_id, task_index)
+        self._heap: List[tuple] = []
+        self._seq = 0
+        self._jobs: "OrderedDict[str, BacktestJob]" = OrderedDict()
+        self._inflight: Dict[str, str] = {}          # cache_key -> job_id
+        self._running_tasks = 0
+        self._finished: List[tuple] = []
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # Tarefas reexecutadas após queda de worker, uma de cada vez
+        self._isolation_pool: Optional[ProcessPoolExecutor] = None
+        self._isolated: deque = deque()
+        self._isolated_running = False
+        self._context = None
+        self._progress_queue = None
+        self._threads: List[threading.Thread] = []
+        self._stopped = False
+
+        self.stats = {
+            'submitted': 0,
+            'deduplicated': 0,
+            'cache_hits': 0,
+            JOB_COMPLETED: 0,
+            JOB_FAILED: 0,
+            JOB_CANCELLED: 0,
+            'pool_restarts': 0,
+            'task_retries': 0,
+        }
+
+    @staticmethod
+    def _default_config() -> Dict[str, Any]:
+        return {
+            'max_workers': None,          # processos (None = metade dos cores)
+            'max_tasks_per_job': None,    # workers por job (None = todos)
+            'max_queued_tasks': 1000,
+            'max_finished_jobs': 500,     # jobs finalizados mantidos em memória
+            'worker_niceness': 5,
+            'start_method': 'spawn',
+            'cache_results': True,
+            'max_task_retries': 1,        # reexecuções isoladas de uma tarefa que derrubou o worker
+        }
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Inicia o pool, o dispatcher e o leitor de progresso (idempotente)"""
+        with self._lock:
+            if self._threads or self._stopped:
+                return
+
+            self._context = multiprocessing.get_context(self.config['start_method'])
+            self._progress_queue = self._context.Queue()
+            self._pool = self._create_pool()
+            self._threads = [
+                threading.Thread(target=self._dispatch_loop, name='backtest-dispatcher', daemon=True),
+                threading.Thread(target=self._progress_loop, name='backtest-progress', daemon=True),
+            ]
+            for thread in self._threads:
+                thread.start()
+
+        logger.info(f"[BACKTEST_JOBS] Job manager started with {self.max_workers} workers")
+
+    def _create_pool(self, max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=max_workers or self.max_workers,
+            mp_context=self._context,
+            initializer=_init_worker,
+            initargs=(self._progress_queue, self.config['worker_niceness'])
+        )
+
+    def _replace_broken_pool(self, broken: ProcessPoolExecutor):
+        """
+        Recria o pool depois da queda de um worker
+
+        Um BrokenProcessPool recusa qualquer submissão nova; sem recriar o
+        pool todos os jobs seguintes falhariam. Vários callbacks podem
+        reportar o mesmo pool quebrado: só o primeiro o substitui.
+        """
+        with self._lock:
+            if self._stopped:
+                return
+            if self._pool is broken:
+                self._pool = self._create_pool()
+            elif self._isolation_pool is broken:
+                self._isolation_pool = None  # recriado sob demanda
+            else:
+                return
+            self.stats['pool_restarts'] += 1
+
+        logger.warning("[BACKTEST_JOBS] Worker process died; process pool recreated")
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def stop(self, wait: bool = False):
+        """Para o dispatcher; jobs em execução só são aguardados se ``wait``"""
+        with self._lock:
+            self._stopped = True
+            self._lock.notify_all()
+            pools, threads = (self._pool, self._isolation_pool), list(self._threads)
+
+        for thread in threads:
+            thread.join(timeout=5.0)
+        for pool in pools:
+            if pool is not None:
+                pool.shutdown(wait=wait, cancel_futures=True)
+
+    # ------------------------------------------------------------------
+    # Submissão
+    # ------------------------------------------------------------------
+
+    def job_cache_key(self, kind: str, tasks: List[Dict[str, Any]]) -> str:
+        """Chave de deduplicação/cache (MaverettaBacktestCache.get_cache_key)"""
+        def extra(task):
+            return {
+                k: v for k, v in task.items()
+                if k not in ('slot_id', 'pair', 'timeframe', 'start_date', 'end_date', 'strategy')
+            }
+
+        if kind == 'slot':
+            task = tasks[0]
+            return self.cache.get_cache_key(
+                task['slot_id'], task['pair'], task['timeframe'],
+                task['start_date'], task['end_date'], task['strategy'],
+                extra(task)
+            )
+
+        first = tasks[0]
+        slots = sorted(
+            (
+                {
+                    'slot_id': t['slot_id'], 'pair': t['pair'],
+                    'timeframe': t['timeframe'], 'strategy': t['strategy'], **extra(t)
+                }
+                for t in tasks
+            ),
+            key=lambda s: s['slot_id']
+        )
+        return self.cache.get_cache_key(
+            'multi_slot', '', '', first['start_date'], first['end_date'], '', {'slots': slots}
+        )
+
+    def submit(
+        self,
+        kind: str,
+        tasks: List[Dict[str, Any]],
+        priority: int = 0,
+        force_refresh: bool = False
+    ) -> BacktestJob:
+        """
+        Enfileira um job (não bloqueia)
+
+        Args:
+            kind: 'slot' (uma tarefa) ou 'multi_slot'
+            tasks: Parâmetros de run_slot_backtest por slot
+            priority: Maior executa primeiro
+            force_refresh: Ignora resultado em cache (não ignora jobs em andamento)
+
+        Returns:
+            Job novo, o job idêntico em andamento ou um job já concluído do cache
+        """
+        if not tasks:
+            raise ValueError("Backtest job needs at least one slot")
+
+        cache_key = self.job_cache_key(kind, tasks)
+
+        job = BacktestJob(
+            job_id=uuid.uuid4().hex[:12],
+            cache_key=cache_key,
+            kind=kind,
+            tasks=tasks,
+            priority=priority,
+            task_progress=[0.0] * len(tasks),
+        )
+
+        # Resultado pronto no cache (consultado fora do lock)
+        cached = None
+        if not force_refresh and self.cache.is_cache_valid(cache_key):
+            cached = self.cache.get_cached_result(cache_key)
+
+        # Verificação de duplicata e registro sob o mesmo lock: duas
+        # submissões idênticas simultâneas não criam dois jobs
+        with self._lock:
+            if self._stopped:
+                raise RuntimeError("Backtest job manager is stopped")
+
+            # Job idêntico em andamento
+            inflight = self._jobs.get(self._inflight.get(cache_key, ''))
+            if inflight is not None and inflight.status not in FINAL_STATES:
+                inflight.duplicates += 1
+                self.stats['deduplicated'] += 1
+                backtest_jobs_deduplicated_total.labels(source='inflight').inc()
+                if priority > inflight.priority:
+                    self._raise_priority(inflight, priority)
+                return inflight
+
+            if cached is not None:
+                job.cached = True
+                self._register(job)
+                self.stats['cache_hits'] += 1
+            else:
+                queued = sum(1 for item in self._heap if self._is_live(item))
+                if queued + len(tasks) > self.config['max_queued_tasks']:
+                    raise RuntimeError("Backtest queue is full")
+
+                self._register(job)
+                self._inflight[cache_key] = job.job_id
+                job.pending_tasks = len(tasks)
+                for index in range(len(tasks)):
+                    self._push(job, index)
+                self.stats['submitted'] += 1
+                self._update_gauges()
+                self._lock.notify_all()
+
+        if cached is not None:
+            backtest_jobs_deduplicated_total.labels(source='cache').inc()
+            self._finish(job, JOB_COMPLETED, result=cached)
+            return job
+
+        self._emit(job, 'backtest_job_queued')
+
+        if not self._threads:
+            self.start()
+        return job
+
+    def _register(self, job: BacktestJob):
+        """Registra o job e descarta os finalizados mais antigos (lock)"""
+        self._jobs[job.job_id] = job
+        finished = [jid for jid, j in self._jobs.items() if j.status in FINAL_STATES]
+        for jid in finished[:max(0, len(finished) - self.config['max_finished_jobs'])]:
+            del self._jobs[jid]
+
+    def _push(self, job: BacktestJob, index: int):
+        self._seq += 1
+        heapq.heappush(self._heap, (-job.priority, self._seq, job.job_id, index))
+
+    def _raise_priority(self, job: BacktestJob, priority: int):
+        """Reenfileira tarefas ainda não iniciadas com a nova prioridade (lock)"""
+        job.priority = priority
+        waiting = {item[3] for item in self._heap if item[2] == job.job_id}
+        for index in waiting:
+            self._push(job, index)
+
+    def _is_live(self, item: tuple) -> bool:
+        """Entrada do heap ainda válida (job ativo e prioridade atual)"""
+        job = self._jobs.get(item[2])
+        return (
+            job is not None
+            and job.status not in FINAL_STATES
+            and -item[0] == job.priority
+            and item[3] not in job.running_futures
+            and item[3] not in job.isolated_tasks
+            and job.task_progress[item[3]] < 1.0
+        )
+
+    # ------------------------------------------------------------------
+    # Consulta e cancelamento
+    # ------------------------------------------------------------------
+
+    def get_job(self, job_id: str) -> Optional[BacktestJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self, status: Optional[str] = None, limit: int = 50) -> List[BacktestJob]:
+        """Jobs mais recentes primeiro"""
+        with self._lock:
+            jobs = [j for j in reversed(self._jobs.values()) if status is None or j.status == status]
+        return jobs[:limit]
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancela um job
+
+        Tarefas na fila são descartadas; tarefas em execução são canceladas
+        se ainda não começaram no worker, senão o resultado é ignorado.
+
+        Returns:
+            True se o job foi cancelado
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in FINAL_STATES:
+                return False
+            futures = list(job.running_futures.values())
+
+        for future in futures:
+            future.cancel()
+
+        self._finish(job, JOB_CANCELLED)
+        return True
+
+    def cancel_by_key(self, cache_key: str) -> bool:
+        """Cancela o job em andamento com a chave de cache"""
+        with self._lock:
+            job_id = self._inflight.get(cache_key)
+        return self.cancel(job_id) if job_id else False
+
+    # ------------------------------------------------------------------
+    # Dispatcher
+    # ------------------------------------------------------------------
+
+    def _next_task(self) -> Optional[tuple]:
+        """Próxima tarefa executável respeitando max_tasks_per_job (lock)"""
+        deferred = []
+        task = None
+        while self._heap:
+            item = heapq.heappop(self._heap)
+            if not self._is_live(item):
+                continue
+            job = self._jobs[item[2]]
+            if len(job.running_futures) >= self.max_tasks_per_job:
+                deferred.append(item)
+                continue
+            task = (job, item[3])
+            break
+        for item in deferred:
+            heapq.heappush(self._heap, item)
+        return task
+
+    def _dispatch_loop(self):
+        while True:
+            with self._lock:
+                while not self._stopped and not self._finished and not self._isolated_ready() and not (
+                    self._running_tasks < self.max_workers and self._has_runnable()
+                ):
+                    self._lock.wait(timeout=30.0)
+
+                if self._stopped:
+                    return
+
+                finished = self._finished
+                self._finished = []
+
+                launched = []
+                while self._running_tasks < self.max_workers:
+                    task = self._next_task()
+                    if task is None:
+                        break
+                    job, index = task
+                    # Reserva o slot antes de submeter ao pool
+                    job.running_futures[index] = Future()
+                    self._running_tasks += 1
+                    launched.append(task)
+
+                isolated = None
+                if self._isolated_ready():
+                    isolated = self._isolated.popleft()
+                    isolated[0].running_futures[isolated[1]] = Future()
+                    self._isolated_running = True
+
+                self._update_gauges()
+
+            for job, index in launched:
+                self._launch(job, index)
+            if isolated is not None:
+                self._launch(*isolated, isolated=True)
+
+            for job, index, future, pool in finished:
+                self._complete_task(job, index, future, pool)
+
+    def _has_runnable(self) -> bool:
+        return any(
+            self._is_live(item) and len(self._jobs[item[2]].running_futures) < self.max_tasks_per_job
+            for item in self._heap
+        )
+
+    def _isolated_ready(self) -> bool:
+        """Há tarefa esperando o pool isolado e ele está livre (lock)"""
+        while self._isolated and self._isolated[0][0].status in FINAL_STATES:
+            self._isolated.popleft()
+        return bool(self._isolated) and not self._isolated_running
+
+    def _launch(self, job: BacktestJob, index: int, isolated: bool = False):
+        first_start = False
+        with self._lock:
+            if job.status == JOB_QUEUED:
+                job.status = JOB_RUNNING
+                job.stage = 'running'
+                job.started_at = datetime.now()
+                job.started_perf = time.perf_counter()
+                first_start = True
+
+        if first_start:
+            self._emit(job, 'backtest_job_started')
+
+        pool = self._isolation_executor() if isolated else self._pool
+        try:
+            try:
+                future = pool.submit(self.task_runner, job.job_id, index, job.tasks[index])
+            except BrokenProcessPool:
+                # Queda de worker ainda não tratada: recria o pool e tenta de novo
+                self._replace_broken_pool(pool)
+                pool = self._isolation_executor() if isolated else self._pool
+                future = pool.submit(self.task_runner, job.job_id, index, job.tasks[index])
+        except RuntimeError as e:  # pool encerrado
+            logger.warning(f"[BACKTEST_JOBS] Task {job.job_id}/{index} not started: {e}")
+            with self._lock:
+                job.running_futures.pop(index, None)
+                if isolated:
+                    self._isolated_running = False
+                else:
+                    self._running_tasks -= 1
+            self._finish(job, JOB_FAILED, error=str(e))
+            return
+
+        with self._lock:
+            job.running_futures[index] = future
+        future.add_done_callback(lambda f, j=job, i=index, p=pool: self._on_done(j, i, f, p))
+
+    def _isolation_executor(self) -> ProcessPoolExecutor:
+        """Pool de um worker para reexecutar tarefas após queda (criado sob demanda)"""
+        with self._lock:
+            if self._isolation_pool is None:
+                self._isolation_pool = self._create_pool(max_workers=1)
+            return self._isolation_pool
+
+    def _on_done(self, job: BacktestJob, index: int, future: Future, pool: ProcessPoolExecutor):
+        # Thread de callback do executor: repassa ao dispatcher
+        with self._lock:
+            self._finished.append((job, index, future, pool))
+            self._lock.notify_all()
+
+    def _complete_task(self, job: BacktestJob, index: int, future: Future, pool: ProcessPoolExecutor):
+        """Registra o fim de uma tarefa (thread do dispatcher)"""
+        result, error, crashed = None, None, False
+        if not future.cancelled():
+            try:
+                result = future.result()
+            except BrokenProcessPool as e:
+                # Um worker morreu: todas as tarefas do pool recebem este erro
+                crashed = True
+                error = f"worker process died ({e})"
+            except Exception as e:
+                error = str(e)
+                logger.error(f"[BACKTEST_JOBS] Task {job.job_id}/{index} failed: {e}")
+
+        if crashed:
+            self._replace_broken_pool(pool)
+
+        with self._lock:
+            isolated = index in job.isolated_tasks
+            job.running_futures.pop(index, None)
+            if isolated:
+                self._isolated_running = False
+            else:
+                self._running_tasks -= 1
+            if crashed and job.status not in FINAL_STATES:
+                # No pool compartilhado não dá para saber qual tarefa derrubou
+                # o worker: todas voltam, isoladas, sem consumir tentativas.
+                # No pool isolado a queda é da própria tarefa
+                retries = job.crash_retries.get(index, 0)
+                if not isolated or retries < self.config['max_task_retries']:
+                    if isolated:
+                        job.crash_retries[index] = retries + 1
+                    job.isolated_tasks.add(index)
+                    self._isolated.append((job, index))
+                    self.stats['task_retries'] += 1
+                    self._update_gauges()
+                    self._lock.notify_all()
+                    logger.warning(f"[BACKTEST_JOBS] Task {job.job_id}/{index} requeued in isolation after worker crash")
+                    return
+                logger.error(f"[BACKTEST_JOBS] Task {job.job_id}/{index} failed: {error}")
+            job.isolated_tasks.discard(index)
+            self._update_gauges()
+            self._lock.notify_all()
+            if job.status in FINAL_STATES or (result is None and error is None):
+                return  # cancelado: resultado descartado
+
+            slot_id = job.tasks[index]['slot_id']
+            if result is not None:
+                job.task_progress[index] = 1.0
+                job.partial_results[slot_id] = result
+                job.pending_tasks -= 1
+            remaining = job.pending_tasks
+
+        if error is not None:
+            self._finish(job, JOB_FAILED, error=f"{slot_id}: {error}")
+            return
+
+        self._emit(job, 'backtest_job_progress', {
+            'slot_id': slot_id,
+            'slot_result': _result_summary(result),
+        })
+
+        if remaining == 0:
+            if job.kind == 'slot':
+                final = job.partial_results[job.tasks[0]['slot_id']]
+            else:
+                final = {'results': dict(job.partial_results)}
+            self._finish(job, JOB_COMPLETED, result=final)
+
+    def _finish(self, job: BacktestJob, status: str, result: Optional[Dict[str, Any]] = None,
+                error: Optional[str] = None):
+        """Estado final do job (uma única vez)"""
+        with self._lock:
+            if job.status in FINAL_STATES:
+                return
+            job.status = status
+            job.stage = status
+            job.result = result
+            job.error = error
+            job.finished_at = datetime.now()
+            if self._inflight.get(job.cache_key) == job.job_id:
+                del self._inflight[job.cache_key]
+            self.stats[status] += 1
+            self._update_gauges()
+            self._lock.notify_all()
+
+        if status == JOB_COMPLETED and not job.cached and self.config['cache_results'] \
+                and self._is_cacheable(job):
+            self.cache.cache_result(job.cache_key, result, {'job_id': job.job_id, 'kind': job.kind})
+
+        if not job.cached:
+            duration = time.perf_counter() - job.started_perf if job.started_perf else 0.0
+            backtest_job_duration_seconds.labels(status=status).observe(duration)
+            backtest_jobs_total.labels(status=status).inc()
+
+        if not job.done.done():
+            job.done.set_result(job)
+
+        self._emit(job, f'backtest_job_{status}')
+
+    @staticmethod
+    def _is_cacheable(job: BacktestJob) -> bool:
+        """Só guarda resultados com dados (sem dados = erro, não resultado)"""
+        return all(r.get('candles_analyzed', 0) > 0 for r in job.partial_results.values())
+
+    def _update_gauges(self):
+        backtest_jobs_queue_depth.set(sum(1 for item in self._heap if self._is_live(item)))
+        backtest_jobs_running.set(self._running_tasks + int(self._isolated_running))
+
+    # ------------------------------------------------------------------
+    # Progresso dos workers
+    # ------------------------------------------------------------------
+
+    def _progress_loop(self):
+        """Consome o progresso enviado pelos workers"""
+        while not self._stopped:
+            try:
+                job_id, index, stage, fraction, partial = self._progress_queue.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                return
+
+            with self._lock:
+                job = self._jobs.get(job_id)
+                # Mensagens podem chegar depois do resultado da tarefa
+                if job is None or job.status in FINAL_STATES or job.task_progress[index] >= 1.0:
+                    continue
+                job.task_progress[index] = min(max(fraction, job.task_progress[index]), 0.999)
+                job.stage = stage
+                if partial:
+                    slot_id = job.tasks[index]['slot_id']
+                    job.partial_results.setdefault(slot_id, {}).update(partial)
+
+            self._emit(job, 'backtest_job_progress', {
+                'slot_id': job.tasks[index]['slot_id'],
+                'partial': partial,
+            })
+
+    # ------------------------------------------------------------------
+    # Eventos e métricas
+    # ------------------------------------------------------------------
+
+    def _emit(self, job: BacktestJob, event_type: str, extra: Optional[Dict[str, Any]] = None):
+        if self.publish is None:
+            return
+        event = {
+            'type': event_type,
+            'job_id': job.job_id,
+            'kind': job.kind,
+            'status': job.status,
+            'stage': job.stage,
+            'progress': round(job.progress, 4),
+            **(extra or {}),
+        }
+        if job.error:
+            event['error'] = job.error
+        try:
+            self.publish(event)
+        except Exception as e:
+            logger.debug(f"[BACKTEST_JOBS] Event publish failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            by_status: Dict[str, int] = {}
+            for job in self._jobs.values():
+                by_status[job.status] = by_status.get(job.status, 0) + 1
+            return {
+                **self.stats,
+                'queued_tasks': sum(1 for item in self._heap if self._is_live(item)),
+                'running_tasks': self._running_tasks + int(self._isolated_running),
+                'isolated_tasks': len(self._isolated),
+                'inflight_jobs': len(self._inflight),
+                'jobs_by_status': by_status,
+                'max_workers': self.max_workers,
+                'max_tasks_per_job': self.max_tasks_per_job,
+            }
@@ -6,8 +6,12 @@ Origem: freqtrade/optimize/backtesting.py
 """
 
 import logging
+import multiprocessing as mp
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Callable, Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass, field
 import pandas as pd
 import numpy as np
@@ -18,9 +22,34 @@ import uuid
 from ..data.ohlcv_loader import MaverettaOHLCVLoader
 from ..data.data_provider import MaverettaDataProvider  
 from ..data.metrics import MaverettaMetricsCalculator, SlotMetrics
+from ..data.resampler import candle_times, timeframe_to_ms
+from backtest.analysis.quant_metrics import QuantitativeMetrics
+from .result_store import BacktestResultStore
 
 logger = logging.getLogger(__name__)
 
+# (estágio, fração concluída, resultado parcial opcional)
+ProgressCallback = Callable[[str, float, Optional[Dict[str, Any]]], None]
+
+# Paginação do data provider e datasets mantidos em memória por processo
+HISTORY_PAGE_LIMIT = 1000
+HISTORY_CACHE_SIZE = 8
+
+
+def _to_utc_ms(value: datetime) -> int:
+    """datetime (naive = UTC) em epoch ms"""
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.tz_localize('UTC')
+    return int(timestamp.value // 1_000_000)
+
+
+def _to_naive_utc(value: datetime) -> pd.Timestamp:
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_convert('UTC').tz_localize(None)
+    return timestamp
+
 @dataclass
 class BacktestConfig:
     """Configuração de backtest para slot"""
@@ -65,6 +94,7 @@ class BacktestResult:
     # Resultados
     trades: List[BacktestTrade] = field(default_factory=list)
     metrics: Optional[SlotMetrics] = None
+    quant_metrics: Dict[str, float] = field(default_factory=dict)
     
     # Performance
     total_return: float = 0.0
@@ -83,18 +113,26 @@ class MaverettaBacktestRunner:
     Baseado no engine do Freqtrade mas adaptado para slots
     """
     
-    def __init__(self, data_provider: Optional[MaverettaDataProvider] = None):
+    def __init__(
+        self,
+        data_provider: Optional[MaverettaDataProvider] = None,
+        result_store: Optional[BacktestResultStore] = None
+    ):
         """
         Inicializa o backtest runner
         
         Args:
             data_provider: Provider de dados (opcional)
+            result_store: Store de resultados/histórico (opcional)
         """
         self.data_provider = data_provider or MaverettaDataProvider()
+        self.result_store = result_store or BacktestResultStore()
         self.metrics_calculator = MaverettaMetricsCalculator()
+        self.quant_metrics = QuantitativeMetrics()
         
         # Cache e configurações
         self.results_cache = {}
+        self._history_cache: "OrderedDict[tuple, pd.DataFrame]" = OrderedDict()
         self.cache_dir = Path("./data/backtest_cache")
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         
@@ -109,6 +147,7 @@ class MaverettaBacktestRunner:
         end_date: datetime,
         initial_capital: float = 10000.0,
         strategy: str = "momentum",
+        progress_callback: Optional[ProgressCallback] = None,
         **kwargs
     ) -> BacktestResult:
         """
@@ -122,6 +161,7 @@ class MaverettaBacktestRunner:
             end_date: Data de fim
             initial_capital: Capital inicial
             strategy: Estratégia a ser testada
+            progress_callback: Recebe (estágio, fração, parcial) durante a execução
             **kwargs: Parâmetros adicionais
             
         Returns:
@@ -129,6 +169,7 @@ class MaverettaBacktestRunner:
         """
         start_time = datetime.now()
         backtest_id = str(uuid.uuid4())[:8]
+        progress = progress_callback or (lambda stage, fraction, partial=None: None)
         
         try:
             logger.info(f"[BACKTEST_RUNNER] Starting backtest {backtest_id} for slot {slot_id}: {pair} {timeframe}")
@@ -141,67 +182,25 @@ class MaverettaBacktestRunner:
                 start_date=start_date,
                 end_date=end_date,
                 initial_capital=initial_capital,
+                fee=kwargs.get('fee', 0.001),
                 strategy=strategy
             )
             
-            # Carregar dados históricos
-            df = self.data_provider.get_pair_dataframe_for_slot(
-                slot_id=slot_id,
-                pair=pair,
-                timeframe=timeframe
-            )
+            # Carregar dados históricos (já filtrados pelo período)
+            progress('loading_data', 0.0)
+            df = self._load_pair_history(pair, timeframe, start_date, end_date)
             
             if df.empty:
-                logger.error(f"[BACKTEST_RUNNER] No data available for {slot_id} {pair}")
+                logger.error(f"[BACKTEST_RUNNER] No data in specified period for {slot_id} {pair}")
                 return self._create_empty_result(backtest_id, config)
             
-            # Filtrar por período
-            df = self._filter_dataframe_by_period(df, start_date, end_date)
-            
-            if df.empty:
-                logger.error(f"[BACKTEST_RUNNER] No data in specified period for {slot_id}")
-                return self._create_empty_result(backtest_id, config)
+            progress('data_loaded', 0.1, {'backtest_id': backtest_id, 'candles': len(df)})
             
             # Executar estratégia de backtesting
-            trades = self._execute_strategy_backtest(df, config)
-            
-            # Calcular métricas
-            returns_series = self._calculate_returns_from_trades(trades, df, initial_capital)
-            metrics = self.metrics_calculator.calculate_slot_metrics(
-                slot_id=slot_id,
-                pair=pair,
-                timeframe=timeframe,
-                returns_data=returns_series,
-                trades_data=[trade.__dict__ for trade in trades]
-            )
+            trades, _ = self._run_strategy(df, config, progress)
             
-            # Criar resultado
-            execution_time = (datetime.now() - start_time).total_seconds()
-            
-            result = BacktestResult(
-                backtest_id=backtest_id,
-                slot_id=slot_id,
-                pair=pair,
-                timeframe=timeframe,
-                config=config,
-                trades=trades,
-                metrics=metrics,
-                total_return=metrics.total_return,
-                sharpe_ratio=metrics.sharpe_ratio,
-                max_drawdown=metrics.max_drawdown,
-                win_rate=metrics.win_rate,
-                execution_time_seconds=execution_time,
-                candles_analyzed=len(df),
-                completed_at=datetime.now()
-            )
-            
-            # Cache resultado
-            self._cache_backtest_result(result)
-            
-            logger.info(f"[BACKTEST_RUNNER] Backtest {backtest_id} completed in {execution_time:.2f}s")
-            logger.info(f"[BACKTEST_RUNNER] Results: {len(trades)} trades, {metrics.total_return:.2%} return")
-            
-            return result
+            progress('calculating_metrics', 0.9, {'trades_count': len(trades)})
+            return self._build_result(backtest_id, config, df, trades, start_time)
             
         except Exception as e:
             logger.error(f"[BACKTEST_RUNNER] Error in backtest {backtest_id}: {e}")
@@ -212,15 +211,20 @@ class MaverettaBacktestRunner:
         slot_configs: List[Dict[str, Any]],
         start_date: datetime,
         end_date: datetime,
+        max_workers: Optional[int] = None,
         **kwargs
     ) -> Dict[str, BacktestResult]:
         """
         Executa backtest para múltiplos slots simultaneamente
         
+        Cada (par, timeframe) é carregado uma única vez e compartilhado entre
+        os slots; as simulações rodam em processos paralelos.
+        
         Args:
             slot_configs: Lista de configurações dos slots
             start_date: Data de início global
             end_date: Data de fim global
+            max_workers: Processos para as simulações (1 = sequencial)
             **kwargs: Parâmetros adicionais
             
         Returns:
@@ -228,41 +232,195 @@ class MaverettaBacktestRunner:
         """
         try:
             logger.info(f"[BACKTEST_RUNNER] Starting multi-slot backtest for {len(slot_configs)} slots")
+            start_time = datetime.now()
             
-            results = {}
+            configs = self._parse_slot_configs(slot_configs, start_date, end_date, **kwargs)
+            datasets = self._load_datasets(configs)
+            simulations = self._simulate_slots(configs, datasets, max_workers)
             
-            for slot_config in slot_configs:
-                slot_id = slot_config.get('slot_id')
-                pair = slot_config.get('pair')
-                timeframe = slot_config.get('timeframe', '1h')
-                initial_capital = slot_config.get('initial_capital', 10000.0)
-                strategy = slot_config.get('strategy', 'momentum')
-                
-                if not slot_id or not pair:
-                    logger.warning("[BACKTEST_RUNNER] Skipping invalid slot config")
+            results = {}
+            for config in configs:
+                backtest_id = str(uuid.uuid4())[:8]
+                simulation = simulations.get(config.slot_id)
+                if simulation is None:
+                    results[config.slot_id] = self._create_empty_result(backtest_id, config)
                     continue
-                
-                # Executar backtest individual
-                result = self.run_slot_backtest(
-                    slot_id=slot_id,
-                    pair=pair,
-                    timeframe=timeframe,
-                    start_date=start_date,
-                    end_date=end_date,
-                    initial_capital=initial_capital,
-                    strategy=strategy,
-                    **kwargs
+                results[config.slot_id] = self._build_result(
+                    backtest_id, config, datasets[(config.pair, config.timeframe)],
+                    simulation.trades, start_time
                 )
-                
-                results[slot_id] = result
             
-            logger.info(f"[BACKTEST_RUNNER] Multi-slot backtest completed: {len(results)} results")
+            logger.info(f"[BACKTEST_RUNNER] Multi-slot backtest completed: {len(results)} results, "
+                        f"{len(datasets)} datasets loaded")
             return results
             
         except Exception as e:
             logger.error(f"[BACKTEST_RUNNER] Error in multi-slot backtest: {e}")
             return {}
     
+    def run_portfolio_backtest(
+        self,
+        slot_configs: List[Dict[str, Any]],
+        start_date: datetime,
+        end_date: datetime,
+        valor_base: float = 1000.0,
+        cascade: bool = True,
+        max_workers: Optional[int] = None,
+        **kwargs
+    ):
+        """
+        Backtest de portfólio: slots em paralelo e curva de equity consolidada
+        
+        Args:
+            slot_configs: Configurações dos slots (na ordem da cascata)
+            start_date: Data de início global
+            end_date: Data de fim global
+            valor_base: VB da cascata (capital base por slot)
+            cascade: Aplica as regras do TreasuryRouter; False soma as
+                equities dos slots operando capital próprio
+            max_workers: Processos para as simulações (1 = sequencial)
+            **kwargs: Parâmetros adicionais (ex.: fee)
+            
+        Returns:
+            PortfolioBacktestResult
+        """
+        from .portfolio_backtest import PortfolioBacktestResult, merge_cascade, merge_independent
+        
+        start_time = datetime.now()
+        result = PortfolioBacktestResult()
+        
+        configs = self._parse_slot_configs(
+            slot_configs, start_date, end_date, default_capital=valor_base, **kwargs
+        )
+        datasets = self._load_datasets(configs)
+        result.datasets_loaded = len(datasets)
+        simulations = self._simulate_slots(configs, datasets, max_workers)
+        ordered = [simulations[c.slot_id] for c in configs if c.slot_id in simulations]
+        
+        for simulation in ordered:
+            config = simulation.config
+            result.slot_results[config.slot_id] = self._build_result(
+                str(uuid.uuid4())[:8], config, datasets[(config.pair, config.timeframe)],
+                simulation.trades, start_time
+            )
+        
+        if not ordered:
+            logger.error("[BACKTEST_RUNNER] Portfolio backtest without simulated slots")
+            return result
+        
+        if cascade:
+            merged = merge_cascade(ordered, valor_base)
+            timeline, equity = merged['timeline'], merged['equity']
+            result.initial_capital = merged['initial_capital']
+            result.allocations = merged['allocations']
+            result.settlements = merged['settlements']
+            result.cascade = merged['cascade']
+            result.skipped_trades = merged['skipped_trades']
+        else:
+            timeline, equity = merge_independent(ordered)
+            result.initial_capital = sum(sim.config.initial_capital for sim in ordered)
+        
+        result.equity = pd.Series(equity, index=pd.to_datetime(timeline, unit='ms'), name='equity')
+        result.final_capital = float(equity[-1])
+        result.total_return = result.final_capital / result.initial_capital - 1
+        
+        daily = result.equity.resample('1D').last().pct_change().dropna()
+        if len(daily) >= 2:
+            result.quant_metrics = self.quant_metrics.calculate_all_metrics(daily)
+        result.sharpe_ratio = result.quant_metrics.get('sharpe_ratio', 0.0)
+        result.max_drawdown = result.quant_metrics.get('max_drawdown', 0.0)
+        result.execution_time_seconds = (datetime.now() - start_time).total_seconds()
+        
+        logger.info(f"[BACKTEST_RUNNER] Portfolio backtest completed: {len(ordered)} slots, "
+                    f"{result.total_return:.2%} return in {result.execution_time_seconds:.2f}s")
+        return result
+    
+    def _parse_slot_configs(
+        self,
+        slot_configs: List[Dict[str, Any]],
+        start_date: datetime,
+        end_date: datetime,
+        default_capital: float = 10000.0,
+        **kwargs
+    ) -> List[BacktestConfig]:
+        """Valida as configurações de slot (aceita 'pair' ou 'symbol')"""
+        configs = []
+        for slot_config in slot_configs:
+            slot_id = slot_config.get('slot_id')
+            pair = slot_config.get('pair') or slot_config.get('symbol')
+            
+            if not slot_id or not pair:
+                logger.warning("[BACKTEST_RUNNER] Skipping invalid slot config")
+                continue
+            
+            configs.append(BacktestConfig(
+                slot_id=slot_id,
+                pair=pair,
+                timeframe=slot_config.get('timeframe', '1h'),
+                start_date=start_date,
+                end_date=end_date,
+                initial_capital=slot_config.get('initial_capital', default_capital),
+                fee=slot_config.get('fee', kwargs.get('fee', 0.001)),
+                strategy=slot_config.get('strategy', 'momentum')
+            ))
+        return configs
+    
+    def _load_datasets(self, configs: List[BacktestConfig]) -> Dict[Tuple[str, str], pd.DataFrame]:
+        """Carrega cada (par, timeframe) uma única vez para todos os slots"""
+        datasets = {}
+        for config in configs:
+            key = (config.pair, config.timeframe)
+            if key not in datasets:
+                datasets[key] = self._load_pair_history(
+                    config.pair, config.timeframe, config.start_date, config.end_date
+                )
+        return datasets
+    
+    def _simulate_slots(
+        self,
+        configs: List[BacktestConfig],
+        datasets: Dict[Tuple[str, str], pd.DataFrame],
+        max_workers: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Simula os slots com dados, em processos paralelos quando há mais de um
+        
+        Returns:
+            Dict slot_id -> SlotSimulation (slots sem dados ou com erro ficam de fora)
+        """
+        from .portfolio_backtest import simulate_slot
+        
+        runnable = [c for c in configs if not datasets[(c.pair, c.timeframe)].empty]
+        for config in configs:
+            if config not in runnable:
+                logger.error(f"[BACKTEST_RUNNER] No data in specified period for {config.slot_id} {config.pair}")
+        
+        workers = min(len(runnable), max_workers or os.cpu_count() or 1)
+        simulations = {}
+        
+        if workers <= 1:
+            for config in runnable:
+                try:
+                    simulations[config.slot_id] = simulate_slot(
+                        config, datasets[(config.pair, config.timeframe)], runner=self
+                    )
+                except Exception as e:
+                    logger.error(f"[BACKTEST_RUNNER] Error simulating slot {config.slot_id}: {e}")
+            return simulations
+        
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context('spawn')) as executor:
+            futures = {
+                executor.submit(simulate_slot, config, datasets[(config.pair, config.timeframe)]): config
+                for config in runnable
+            }
+            for future in as_completed(futures):
+                config = futures[future]
+                try:
+                    simulations[config.slot_id] = future.result()
+                except Exception as e:
+                    logger.error(f"[BACKTEST_RUNNER] Error simulating slot {config.slot_id}: {e}")
+        return simulations
+    
     def get_backtest_result(self, backtest_id: str) -> Optional[BacktestResult]:
         """
         Recupera resultado de backtest por ID
@@ -277,7 +435,15 @@ class MaverettaBacktestRunner:
         if backtest_id in self.results_cache:
             return self.results_cache[backtest_id]
         
-        # Tentar carregar do disco
+        # Store de resultados
+        run = self.result_store.get_run(backtest_id)
+        if run is not None:
+            try:
+                return self._reconstruct_result_from_store(run)
+            except Exception as e:
+                logger.warning(f"[BACKTEST_RUNNER] Error loading stored result {backtest_id}: {e}")
+        
+        # Formato antigo (JSON por backtest)
         cache_file = self.cache_dir / f"backtest_{backtest_id}.json"
         if cache_file.exists():
             try:
@@ -290,59 +456,75 @@ class MaverettaBacktestRunner:
         
         return None
     
-    def get_backtest_history(self, slot_id: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+    def get_backtest_history(
+        self,
+        slot_id: Optional[str] = None,
+        limit: int = 10,
+        offset: int = 0,
+        pair: Optional[str] = None,
+        strategy: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
         """
-        Retorna histórico de backtests executados
+        Retorna histórico de backtests executados (mais recentes primeiro)
+        Consulta só o índice do result store, sem carregar trades
         
         Args:
             slot_id: Filtrar por slot (opcional)
             limit: Limite de resultados
+            offset: Deslocamento para paginação
+            pair: Filtrar por par (opcional)
+            strategy: Filtrar por estratégia (opcional)
             
         Returns:
             Lista com sumário dos backtests
         """
-        history = []
-        
-        # Listar arquivos de cache
-        cache_files = sorted(
-            self.cache_dir.glob("backtest_*.json"),
-            key=lambda f: f.stat().st_mtime,
-            reverse=True
+        return self.result_store.list_runs(
+            slot_id=slot_id, pair=pair, strategy=strategy, limit=limit, offset=offset
         )
-        
-        for cache_file in cache_files[:limit]:
-            try:
-                with open(cache_file, 'r') as f:
-                    data = json.load(f)
-                    
-                # Filtrar por slot se especificado
-                if slot_id and data.get('slot_id') != slot_id:
-                    continue
-                    
-                history.append({
-                    'backtest_id': data.get('backtest_id'),
-                    'slot_id': data.get('slot_id'),
-                    'pair': data.get('pair'),
-                    'timeframe': data.get('timeframe'),
-                    'total_return': data.get('total_return', 0),
-                    'sharpe_ratio': data.get('sharpe_ratio', 0),
-                    'trades_count': len(data.get('trades', [])),
-                    'completed_at': data.get('completed_at')
-                })
-                
-            except Exception as e:
-                logger.warning(f"[BACKTEST_RUNNER] Error reading history file: {e}")
-                continue
-        
-        return history
     
-    def _execute_strategy_backtest(self, df: pd.DataFrame, config: BacktestConfig) -> List[BacktestTrade]:
+    def _run_strategy(
+        self,
+        df: pd.DataFrame,
+        config: BacktestConfig,
+        progress_callback: Optional[ProgressCallback] = None
+    ) -> Tuple[List[BacktestTrade], Optional[np.ndarray]]:
         """
-        Executa estratégia de backtesting nos dados
-        Implementação simplificada - em produção integraria com sistema de estratégias
+        Executa a estratégia do slot nos dados
+        Estratégias registradas em core.strategies rodam no StrategyBacktester
+        (mesmo código do trading ao vivo); demais nomes usam o momentum
+        SMA/RSI simplificado
+        
+        Returns:
+            (trades, equity marcada a mercado por candle ou None)
         """
+        from ..strategies import STRATEGY_REGISTRY, get_strategy
+        
+        if config.strategy in STRATEGY_REGISTRY:
+            from .strategy_backtester import StrategyBacktester
+            
+            if progress_callback is not None:
+                progress_callback('executing_strategy', 0.2, None)
+            backtester = StrategyBacktester(
+                get_strategy(config.strategy),
+                initial_capital=config.initial_capital,
+                fee=config.fee
+            )
+            result = backtester.run(df, pair=config.pair, timeframe=config.timeframe, slot_id=config.slot_id)
+            return result.trades, result.equity.to_numpy() if result.equity is not None else None
+        
+        return self._execute_strategy_backtest(df, config, progress_callback), None
+    
+    def _execute_strategy_backtest(
+        self,
+        df: pd.DataFrame,
+        config: BacktestConfig,
+        progress_callback: Optional[ProgressCallback] = None
+    ) -> List[BacktestTrade]:
+        """Executa o momentum SMA/RSI simplificado nos dados"""
         trades = []
         position = None
+        # Progresso a cada ~5% dos candles (faixa 0.1-0.9 do backtest)
+        report_every = max(1, len(df) // 20)
         
         # Estratégia simples de momentum para demonstração
         df = df.copy()
@@ -353,6 +535,13 @@ class MaverettaBacktestRunner:
         df['rsi'] = self._calculate_rsi(df['close'])
         
         for i in range(len(df)):
+            if progress_callback is not None and i and i % report_every == 0:
+                progress_callback('executing_strategy', 0.1 + 0.8 * i / len(df), {
+                    'candles_processed': i,
+                    'trades_count': len(trades),
+                    'realized_profit': sum(t.profit_abs for t in trades)
+                })
+            
             current_time = df.index[i]
             current_price = df.iloc[i]['close']
             
@@ -418,6 +607,110 @@ class MaverettaBacktestRunner:
         
         return trades
     
+    def _build_result(
+        self,
+        backtest_id: str,
+        config: BacktestConfig,
+        df: pd.DataFrame,
+        trades: List[BacktestTrade],
+        start_time: datetime
+    ) -> BacktestResult:
+        """Calcula métricas dos trades e monta (e cacheia) o BacktestResult"""
+        returns_series = self._calculate_returns_from_trades(trades, df, config.initial_capital)
+        metrics = self.metrics_calculator.from_trades([
+            {
+                'timestamp': trade.exit_time.isoformat(),
+                'side': 'sell' if trade.side == 'long' else 'buy',
+                'qty': trade.quantity,
+                'price': trade.exit_price,
+                'pnl': trade.profit_abs,
+                'pnl_pct': trade.profit_pct * 100
+            }
+            for trade in trades
+        ])
+        quant_metrics = self._calculate_quant_metrics(returns_series)
+        total_return = float((1 + returns_series).prod() - 1)
+        
+        execution_time = (datetime.now() - start_time).total_seconds()
+        
+        result = BacktestResult(
+            backtest_id=backtest_id,
+            slot_id=config.slot_id,
+            pair=config.pair,
+            timeframe=config.timeframe,
+            config=config,
+            trades=trades,
+            metrics=metrics,
+            quant_metrics=quant_metrics,
+            total_return=total_return,
+            sharpe_ratio=quant_metrics.get('sharpe_ratio', 0.0),
+            max_drawdown=quant_metrics.get('max_drawdown', 0.0),
+            win_rate=metrics.win_rate / 100,
+            execution_time_seconds=execution_time,
+            candles_analyzed=len(df),
+            completed_at=datetime.now()
+        )
+        
+        # Cache resultado (equity realizada a partir dos retornos)
+        self._cache_backtest_result(result, config.initial_capital * (1 + returns_series).cumprod())
+        
+        logger.info(f"[BACKTEST_RUNNER] Backtest {backtest_id} completed in {execution_time:.2f}s")
+        logger.info(f"[BACKTEST_RUNNER] Results: {len(trades)} trades, {total_return:.2%} return")
+        
+        return result
+    
+    def _load_pair_history(
+        self,
+        pair: str,
+        timeframe: str,
+        start_date: datetime,
+        end_date: datetime
+    ) -> pd.DataFrame:
+        """
+        Carrega o OHLCV do período paginando o data provider
+        
+        Resultados ficam num LRU pequeno por (par, timeframe, período), então
+        slots e jobs que repetem o mesmo dataset no processo não o baixam de novo.
+        
+        Returns:
+            DataFrame com DatetimeIndex (UTC, sem timezone) filtrado pelo período
+        """
+        key = (pair, timeframe, start_date, end_date)
+        cached = self._history_cache.get(key)
+        if cached is not None:
+            self._history_cache.move_to_end(key)
+            return cached
+        
+        since = _to_utc_ms(start_date)
+        until = _to_utc_ms(end_date)
+        step = timeframe_to_ms(timeframe)
+        chunks = []
+        
+        while since <= until:
+            chunk = self.data_provider.candles(pair, timeframe, since=since, limit=HISTORY_PAGE_LIMIT)
+            if chunk is None or chunk.empty:
+                break
+            chunks.append(chunk)
+            last = int(candle_times(chunk)[-1])
+            if last < since:
+                break
+            since = last + step
+        
+        if not chunks:
+            return pd.DataFrame(columns=['open', 'high', 'low', 'close', 'volume'])
+        
+        df = pd.concat(chunks, ignore_index=True)
+        times = candle_times(df)
+        df = df.drop(columns=[c for c in ('timestamp', 'date') if c in df.columns])
+        df.index = pd.DatetimeIndex(times.astype('datetime64[ms]'))
+        df = df[~df.index.duplicated(keep='last')].sort_index()
+        df = self._filter_dataframe_by_period(df, _to_naive_utc(start_date), _to_naive_utc(end_date))
+        
+        self._history_cache[key] = df
+        while len(self._history_cache) > HISTORY_CACHE_SIZE:
+            self._history_cache.popitem(last=False)
+        return df
+    
     def _calculate_rsi(self, prices: pd.Series, window: int = 14) -> pd.Series:
         """Calcula RSI simples"""
         delta = prices.diff()
@@ -452,6 +745,15 @@ class MaverettaBacktestRunner:
         
         return returns
     
+    def _calculate_quant_metrics(self, returns: pd.Series) -> Dict[str, float]:
+        """QuantitativeMetrics sobre os retornos diários (anualização em dias)"""
+        if isinstance(returns.index, pd.DatetimeIndex):
+            returns = (1 + returns).resample('1D').prod() - 1
+        
+        if len(returns) < 2:
+            return {}
+        return self.quant_metrics.calculate_all_metrics(returns)
+    
     def _filter_dataframe_by_period(
         self, 
         df: pd.DataFrame, 
@@ -475,42 +777,36 @@ class MaverettaBacktestRunner:
             logger.warning(f"[BACKTEST_RUNNER] Error filtering dataframe by period: {e}")
             return df
     
-    def _cache_backtest_result(self, result: BacktestResult) -> None:
-        """Salva resultado no cache"""
+    def _cache_backtest_result(self, result: BacktestResult, equity: Optional[pd.Series] = None) -> None:
+        """Salva resultado no cache em memória e no result store"""
         try:
             # Cache em memória
             self.results_cache[result.backtest_id] = result
             
-            # Cache em disco (simplificado)
-            cache_file = self.cache_dir / f"backtest_{result.backtest_id}.json"
-            cache_data = {
-                'backtest_id': result.backtest_id,
-                'slot_id': result.slot_id,
-                'pair': result.pair,
-                'timeframe': result.timeframe,
-                'total_return': result.total_return,
-                'sharpe_ratio': result.sharpe_ratio,
-                'max_drawdown': result.max_drawdown,
-                'win_rate': result.win_rate,
-                'trades': [
-                    {
-                        'id': trade.id,
-                        'side': trade.side,
-                        'entry_time': trade.entry_time.isoformat(),
-                        'entry_price': trade.entry_price,
-                        'exit_time': trade.exit_time.isoformat() if trade.exit_time else None,
-                        'exit_price': trade.exit_price,
-                        'profit_abs': trade.profit_abs,
-                        'profit_pct': trade.profit_pct
-                    }
-                    for trade in result.trades
-                ],
-                'completed_at': result.completed_at.isoformat(),
-                'execution_time_seconds': result.execution_time_seconds
-            }
-            
-            with open(cache_file, 'w') as f:
-                json.dump(cache_data, f, indent=2)
+            self.result_store.save_run(
+                {
+                    'backtest_id': result.backtest_id,
+                    'slot_id': result.slot_id,
+                    'pair': result.pair,
+                    'timeframe': result.timeframe,
+                    'strategy': result.config.strategy,
+                    'total_return': result.total_return,
+                    'sharpe_ratio': result.sharpe_ratio,
+                    'max_drawdown': result.max_drawdown,
+                    'win_rate': result.win_rate,
+                    'trades_count': len(result.trades),
+                    'candles_analyzed': result.candles_analyzed,
+                    'execution_time_seconds': result.execution_time_seconds,
+                    'completed_at': result.completed_at,
+                    'initial_capital': result.config.initial_capital,
+                    'fee': result.config.fee,
+                    'start_date': result.config.start_date.isoformat(),
+                    'end_date': result.config.end_date.isoformat(),
+                    'quant_metrics': result.quant_metrics
+                },
+                result.trades,
+                equity
+            )
             
         except Exception as e:
             logger.warning(f"[BACKTEST_RUNNER] Error caching result: {e}")
@@ -526,6 +822,54 @@ class MaverettaBacktestRunner:
             completed_at=datetime.now()
         )
     
+    def _reconstruct_result_from_store(self, run: Dict[str, Any]) -> BacktestResult:
+        """Reconstrói resultado (com trades) a partir do result store"""
+        trades_df = self.result_store.load_trades(run['backtest_id'])
+        trades = [
+            BacktestTrade(
+                id=row['id'],
+                slot_id=run['slot_id'],
+                pair=run['pair'],
+                side=row['side'],
+                entry_time=row['entry_time'].to_pydatetime(),
+                entry_price=row['entry_price'],
+                exit_time=None if pd.isna(row['exit_time']) else row['exit_time'].to_pydatetime(),
+                exit_price=None if pd.isna(row['exit_price']) else row['exit_price'],
+                quantity=row['quantity'],
+                fee=row['fee'],
+                profit_abs=row['profit_abs'],
+                profit_pct=row['profit_pct'],
+                exit_reason=row['exit_reason'] or None
+            )
+            for row in trades_df.to_dict('records')
+        ]
+        config = BacktestConfig(
+            slot_id=run['slot_id'],
+            pair=run['pair'],
+            timeframe=run['timeframe'],
+            start_date=datetime.fromisoformat(run['start_date']),
+            end_date=datetime.fromisoformat(run['end_date']),
+            initial_capital=run.get('initial_capital', 10000.0),
+            fee=run.get('fee', 0.001),
+            strategy=run.get('strategy') or 'momentum'
+        )
+        return BacktestResult(
+            backtest_id=run['backtest_id'],
+            slot_id=run['slot_id'],
+            pair=run['pair'],
+            timeframe=run['timeframe'],
+            config=config,
+            trades=trades,
+            quant_metrics=run.get('quant_metrics', {}),
+            total_return=run['total_return'],
+            sharpe_ratio=run['sharpe_ratio'],
+            max_drawdown=run['max_drawdown'],
+            win_rate=run['win_rate'],
+            execution_time_seconds=run['execution_time_seconds'],
+            candles_analyzed=run['candles_analyzed'],
+            completed_at=datetime.fromisoformat(run['completed_at'])
+        )
+    
     def _reconstruct_result_from_cache(self, data: Dict[str, Any]) -> BacktestResult:
         """Reconstrói resultado a partir do cache (simplificado)"""
         # Implementação simplificada para demo
@@ -540,6 +884,38 @@ class MaverettaBacktestRunner:
             win_rate=data.get('win_rate', 0)
         )
 
+def trade_to_dict(trade: BacktestTrade) -> Dict[str, Any]:
+    """Serializa trade para JSON (API/cache)"""
+    return {
+        'id': trade.id,
+        'entry_time': trade.entry_time.isoformat() if trade.entry_time else None,
+        'entry_price': trade.entry_price,
+        'exit_time': trade.exit_time.isoformat() if trade.exit_time else None,
+        'exit_price': trade.exit_price,
+        'profit_abs': trade.profit_abs,
+        'profit_pct': trade.profit_pct,
+        'side': trade.side
+    }
+
+def backtest_result_to_dict(result: BacktestResult) -> Dict[str, Any]:
+    """Serializa BacktestResult para JSON (jobs/cache/API)"""
+    return {
+        'backtest_id': result.backtest_id,
+        'slot_id': result.slot_id,
+        'pair': result.pair,
+        'timeframe': result.timeframe,
+        'total_return': result.total_return,
+        'sharpe_ratio': result.sharpe_ratio,
+        'max_drawdown': result.max_drawdown,
+        'win_rate': result.win_rate,
+        'trades_count': len(result.trades),
+        'candles_analyzed': result.candles_analyzed,
+        'execution_time_seconds': result.execution_time_seconds,
+        'completed_at': result.completed_at.isoformat(),
+        'quant_metrics': result.quant_metrics,
+        'trades': [trade_to_dict(trade) for trade in result.trades]
+    }
+
 # Funções de conveniência
 def run_slot_backtest(slot_id: str, pair: str, timeframe: str, start_date: datetime, 
                      end_date: datetime, **kwargs) -> BacktestResult:
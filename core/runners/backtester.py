@@ -4,20 +4,18 @@ Backtester - Sistema de backtesting adaptado do Freqtrade
 """
 import logging
 import uuid
-import json
-import os
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional, NamedTuple
 import pandas as pd
 import numpy as np
 from dataclasses import dataclass
-import redis
 
 from ..data.data_provider import MaverettaDataProvider
 
 # Criar instância do data provider
 data_provider = MaverettaDataProvider()
 from ..data.metrics import MaverettaMetricsCalculator
+from .result_store import BacktestResultStore
 
 logger = logging.getLogger(__name__)
 
@@ -212,19 +210,10 @@ class SimpleStrategy:
 class MaverettaBacktester:
     """Sistema de backtesting do Maveretta Bot"""
     
-    def __init__(self):
-        self.redis_client = self._get_redis_client()
+    def __init__(self, result_store: Optional[BacktestResultStore] = None):
+        self.result_store = result_store or BacktestResultStore()
         self.results_cache = {}
     
-    def _get_redis_client(self):
-        """Obtém cliente Redis"""
-        try:
-            redis_url = os.getenv("REDIS_URL", "redis://redis:6379/0")
-            return redis.from_url(redis_url, decode_responses=True)
-        except Exception as e:
-            logger.warning(f"Erro ao conectar Redis para backtest: {e}")
-            return None
-    
     async def run_backtest(
         self,
         slot_id: str,
@@ -491,9 +480,13 @@ class MaverettaBacktester:
             # Cache em memória
             self.results_cache[result.backtest_id] = result
             
-            # Salvar no Redis se disponível
-            if self.redis_client:
-                result_data = {
+            equity = None
+            if result.equity_curve:
+                curve = pd.DataFrame(result.equity_curve)
+                equity = pd.Series(curve['equity'].values, index=pd.to_datetime(curve['timestamp']))
+            
+            self.result_store.save_run(
+                {
                     'backtest_id': result.backtest_id,
                     'slot_id': result.slot_id,
                     'pair': result.pair,
@@ -502,18 +495,18 @@ class MaverettaBacktester:
                     'sharpe_ratio': result.sharpe_ratio,
                     'max_drawdown': result.max_drawdown,
                     'win_rate': result.win_rate,
-                    'total_trades': result.total_trades,
-                    'completed_at': result.completed_at.isoformat(),
-                    'execution_time_seconds': result.execution_time_seconds
-                }
-                
-                key = f"backtest_result:{result.backtest_id}"
-                self.redis_client.setex(key, 86400 * 7, json.dumps(result_data))  # TTL 7 dias
-                
-                # Adicionar à lista de histórico
-                history_key = f"backtest_history:{result.slot_id}"
-                self.redis_client.lpush(history_key, json.dumps(result_data))
-                self.redis_client.ltrim(history_key, 0, 99)  # Manter últimos 100
+                    'trades_count': result.total_trades,
+                    'candles_analyzed': result.candles_analyzed,
+                    'execution_time_seconds': result.execution_time_seconds,
+                    'completed_at': result.completed_at,
+                    'annualized_return': result.annualized_return,
+                    'profit_factor': result.profit_factor,
+                    'start_date': result.start_date.isoformat() if result.start_date else None,
+                    'end_date': result.end_date.isoformat() if result.end_date else None
+                },
+                result.trades,
+                equity
+            )
                 
         except Exception as e:
             logger.warning(f"Erro ao salvar resultado do backtest: {e}")
@@ -525,54 +518,17 @@ class MaverettaBacktester:
             if backtest_id in self.results_cache:
                 return self.results_cache[backtest_id]
             
-            # Verificar Redis
-            if self.redis_client:
-                key = f"backtest_result:{backtest_id}"
-                result_data = self.redis_client.get(key)
-                if result_data:
-                    # Retornar dados básicos (sem trades completos)
-                    data = json.loads(result_data)
-                    return data
-            
-            return None
+            # Retornar dados básicos (sem trades completos)
+            return self.result_store.get_run(backtest_id)
             
         except Exception as e:
             logger.warning(f"Erro ao obter resultado do backtest: {e}")
             return None
     
-    def get_history(self, slot_id: Optional[str] = None, limit: int = 20) -> List[Dict]:
-        """Obtém histórico de backtests"""
+    def get_history(self, slot_id: Optional[str] = None, limit: int = 20, offset: int = 0) -> List[Dict]:
+        """Obtém histórico de backtests (paginado no índice do result store)"""
         try:
-            if not self.redis_client:
-                return []
-            
-            if slot_id:
-                # Histórico de um slot específico
-                history_key = f"backtest_history:{slot_id}"
-                history_data = self.redis_client.lrange(history_key, 0, limit - 1)
-            else:
-                # Histórico geral (implementação simplificada)
-                history_data = []
-                
-                # Buscar de todos os slots conhecidos (implementação básica)
-                slot_keys = self.redis_client.keys("backtest_history:*")
-                for key in slot_keys[:10]:  # Limitar busca
-                    slot_history = self.redis_client.lrange(key, 0, 4)  # 5 mais recentes por slot
-                    history_data.extend(slot_history)
-            
-            # Converter e ordenar por data
-            history = []
-            for item_str in history_data:
-                try:
-                    item = json.loads(item_str)
-                    history.append(item)
-                except:
-                    continue
-            
-            # Ordenar por data decrescente
-            history.sort(key=lambda x: x.get('completed_at', ''), reverse=True)
-            
-            return history[:limit]
+            return self.result_store.list_runs(slot_id=slot_id, limit=limit, offset=offset)
             
         except Exception as e:
             logger.warning(f"Erro ao obter histórico de backtests: {e}")
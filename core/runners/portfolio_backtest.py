@@ -0,0 +1,246 @@
+# core/runners/portfolio_backtest.py
+"""
+Maveretta Portfolio Backtest - Backtest de portfólio multi-slot
+Simulações de slot em paralelo (processos) e fusão das curvas de equity em
+uma curva de portfólio, opcionalmente com as regras de cascata/tesouraria
+do TreasuryRouter (VB fixo, lucro roteado ao próximo slot)
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..data.resampler import candle_times
+from ..treasury.router import TreasuryRouter
+from .backtest_runner import BacktestConfig, BacktestResult, BacktestTrade
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SlotSimulation:
+    """Trades e equity (por candle) de um slot simulado isoladamente"""
+    config: BacktestConfig
+    trades: List[BacktestTrade]
+    times_ms: np.ndarray
+    equity: np.ndarray
+
+
+@dataclass
+class PortfolioBacktestResult:
+    """Resultado do backtest de portfólio"""
+    slot_results: Dict[str, BacktestResult] = field(default_factory=dict)
+    equity: Optional[pd.Series] = None            # valor total do portfólio
+    allocations: Optional[pd.DataFrame] = None    # capital por slot/tesouraria após cada settlement
+    settlements: List[Dict[str, Any]] = field(default_factory=list)
+    cascade: Dict[str, Any] = field(default_factory=dict)
+    quant_metrics: Dict[str, float] = field(default_factory=dict)
+    initial_capital: float = 0.0
+    final_capital: float = 0.0
+    total_return: float = 0.0
+    sharpe_ratio: float = 0.0
+    max_drawdown: float = 0.0
+    skipped_trades: int = 0                       # trades de slots ainda sem capital
+    datasets_loaded: int = 0
+    execution_time_seconds: float = 0.0
+
+
+# ----------------------------------------------------------------------
+# Worker (processos do pool)
+# ----------------------------------------------------------------------
+
+_worker_runner = None
+
+
+def simulate_slot(config: BacktestConfig, df: pd.DataFrame, runner=None) -> SlotSimulation:
+    """
+    Simula um slot (worker do pool)
+
+    Args:
+        config: Configuração do slot
+        df: OHLCV compartilhado do (par, timeframe), já filtrado pelo período
+        runner: MaverettaBacktestRunner a usar (padrão: um por processo)
+
+    Returns:
+        SlotSimulation com trades e equity por candle
+    """
+    global _worker_runner
+    if runner is None:
+        if _worker_runner is None:
+            from .backtest_runner import MaverettaBacktestRunner
+            _worker_runner = MaverettaBacktestRunner()
+        runner = _worker_runner
+
+    times_ms = candle_times(df)
+    trades, equity = runner._run_strategy(df, config)
+    if equity is None:
+        equity = realized_equity(times_ms, trades, config.initial_capital)
+    return SlotSimulation(
+        config=config,
+        trades=trades,
+        times_ms=times_ms,
+        equity=np.asarray(equity, dtype=np.float64)
+    )
+
+
+# ----------------------------------------------------------------------
+# Fusão das curvas
+# ----------------------------------------------------------------------
+
+def _to_ms(value) -> int:
+    return int(pd.Timestamp(value).value // 1_000_000)
+
+
+def realized_equity(times_ms: np.ndarray, trades: List[BacktestTrade], initial_capital: float) -> np.ndarray:
+    """Equity realizada (degrau no candle de saída de cada trade)"""
+    delta = np.zeros(len(times_ms))
+    if trades:
+        exits = np.searchsorted(times_ms, [_to_ms(t.exit_time) for t in trades])
+        np.add.at(delta, np.minimum(exits, len(times_ms) - 1), [t.profit_abs for t in trades])
+    return initial_capital + np.cumsum(delta)
+
+
+def _union_timeline(simulations: List[SlotSimulation]) -> np.ndarray:
+    return np.unique(np.concatenate([sim.times_ms for sim in simulations]))
+
+
+def _on_timeline(sim: SlotSimulation, values: np.ndarray, timeline: np.ndarray, before: float) -> np.ndarray:
+    """Projeta valores por candle do slot na linha do tempo comum (último valor conhecido)"""
+    idx = np.searchsorted(sim.times_ms, timeline, side='right') - 1
+    return np.where(idx >= 0, values[np.maximum(idx, 0)], before)
+
+
+def merge_independent(simulations: List[SlotSimulation]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Portfólio sem cascata: cada slot opera o próprio capital inicial
+
+    Returns:
+        (linha do tempo em ms, valor total do portfólio)
+    """
+    timeline = _union_timeline(simulations)
+    total = np.zeros(len(timeline))
+    for sim in simulations:
+        total += _on_timeline(sim, sim.equity, timeline, sim.config.initial_capital)
+    return timeline, total
+
+
+def merge_cascade(simulations: List[SlotSimulation], valor_base: float) -> Dict[str, Any]:
+    """
+    Portfólio com as regras de cascata do TreasuryRouter
+
+    Os slots (na ordem recebida) ocupam slot_1..slot_N da cascata. Cada
+    trade usa o retorno que teve sobre o capital do slot na simulação
+    isolada, aplicado ao capital que o slot tem na cascata no momento da
+    entrada (no máximo VB); slots ainda em BOOTSTRAP não operam. As saídas
+    são liquidadas em ordem cronológica num TreasuryRouter simulado, que
+    roteia o excesso acima do VB ao próximo slot ou à tesouraria.
+
+    Returns:
+        Dict com timeline, equity, allocations, settlements, cascade e
+        skipped_trades
+    """
+    router = TreasuryRouter(
+        valor_base=valor_base, simulated=True, num_slots=max(10, len(simulations))
+    )
+
+    cascade_ids = [router.slots[i].slot_id for i in range(len(simulations))]
+    initial_total = sum(s.capital_atual for s in router.slots) + router.treasury_balance
+
+    # Eventos: (tempo, ordem, slot, trade); saídas antes de entradas no mesmo candle
+    events = []
+    returns: List[List[float]] = []
+    for s, sim in enumerate(simulations):
+        capital = sim.config.initial_capital
+        slot_returns = []
+        for t, trade in enumerate(sim.trades):
+            slot_returns.append(trade.profit_abs / capital if capital > 0 else 0.0)
+            capital += trade.profit_abs
+            events.append((_to_ms(trade.entry_time), 1, s, t))
+            events.append((_to_ms(trade.exit_time), 0, s, t))
+        returns.append(slot_returns)
+    events.sort()
+
+    stakes: Dict[Tuple[int, int], float] = {}
+    settlements = []
+    allocation_rows = []
+    skipped = 0
+
+    def settle(time_ms: int, s: int, t: int):
+        stake = stakes.get((s, t))
+        if stake is None:
+            return
+        trade = simulations[s].trades[t]
+        pnl = stake * returns[s][t]
+        settlement = router.settle_trade(
+            cascade_ids[s], pnl, f"{simulations[s].config.slot_id}:{trade.id}",
+            {'pair': trade.pair, 'exit_reason': trade.exit_reason}
+        )
+        routing = settlement.get('routing', {})
+        settlements.append({
+            'timestamp': time_ms,
+            'slot_id': simulations[s].config.slot_id,
+            'cascade_slot': cascade_ids[s],
+            'stake': stake,
+            'net_pnl': pnl,
+            'routed_to': routing.get('destination'),
+            'routed_amount': routing.get('amount', 0.0),
+        })
+        allocation_rows.append(
+            [time_ms] + [slot.capital_atual for slot in router.slots[:len(simulations)]]
+            + [sum(slot.capital_atual for slot in router.slots[len(simulations):]),
+               router.treasury_balance]
+        )
+
+    for time_ms, order, s, t in events:
+        if order == 0:
+            settle(time_ms, s, t)
+            continue
+
+        slot = router.slots[s]
+        if slot.status != "OPERANDO" or slot.capital_atual <= 0:
+            skipped += 1
+            continue
+        stakes[(s, t)] = min(slot.capital_atual, valor_base)
+
+        # Trade aberto e fechado no mesmo candle
+        trade = simulations[s].trades[t]
+        if _to_ms(trade.exit_time) == time_ms:
+            settle(time_ms, s, t)
+
+    # Valor do portfólio: capital inicial + PnL realizado + marcação a mercado
+    timeline = _union_timeline(simulations)
+    realized = np.zeros(len(timeline))
+    unrealized = np.zeros(len(timeline))
+    if settlements:
+        idx = np.searchsorted(timeline, [row['timestamp'] for row in settlements])
+        np.add.at(realized, idx, [row['net_pnl'] for row in settlements])
+
+    for s, sim in enumerate(simulations):
+        open_value = np.zeros(len(sim.times_ms))
+        capital = sim.config.initial_capital
+        for t, trade in enumerate(sim.trades):
+            stake = stakes.get((s, t))
+            if stake is not None and capital > 0:
+                k = np.searchsorted(sim.times_ms, _to_ms(trade.entry_time))
+                j = np.searchsorted(sim.times_ms, _to_ms(trade.exit_time))
+                open_value[k:j] = stake * (sim.equity[k:j] - capital) / capital
+            capital += trade.profit_abs
+        unrealized += _on_timeline(sim, open_value, timeline, 0.0)
+
+    # 'reserve': capital roteado a slots da cascata sem simulação
+    columns = ['timestamp'] + [sim.config.slot_id for sim in simulations] + ['reserve', 'treasury']
+    allocations = pd.DataFrame(allocation_rows, columns=columns)
+    allocations.index = pd.to_datetime(allocations.pop('timestamp'), unit='ms')
+
+    return {
+        'timeline': timeline,
+        'equity': initial_total + np.cumsum(realized) + unrealized,
+        'initial_capital': initial_total,
+        'allocations': allocations,
+        'settlements': settlements,
+        'cascade': router.get_cascade_status(),
+        'skipped_trades': skipped,
+    }
@@ -0,0 +1,416 @@
+# core/runners/result_store.py
+"""
+Maveretta Backtest Result Store - Armazenamento de resultados de backtest
+Metadados de cada execução numa tabela SQLite indexada; trades e curva de
+equity em arquivos colunares comprimidos (.npz), lidos só quando pedidos
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, is_dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Colunas dos trades no arquivo colunar
+TRADE_TIME_COLUMNS = ('entry_time', 'exit_time')
+TRADE_TEXT_COLUMNS = ('id', 'side', 'exit_reason')
+TRADE_NUMBER_COLUMNS = (
+    'entry_price', 'exit_price', 'quantity', 'amount', 'fee',
+    'profit_abs', 'profit_pct', 'duration_minutes'
+)
+
+# Colunas de metadados filtráveis/ordenáveis
+RUN_COLUMNS = (
+    'backtest_id', 'slot_id', 'pair', 'timeframe', 'strategy', 'total_return',
+    'sharpe_ratio', 'max_drawdown', 'win_rate', 'trades_count', 'candles_analyzed',
+    'execution_time_seconds', 'completed_at'
+)
+ORDER_COLUMNS = {'completed_at', 'total_return', 'sharpe_ratio', 'max_drawdown', 'win_rate', 'trades_count'}
+
+_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS runs (
+        backtest_id TEXT PRIMARY KEY,
+        slot_id TEXT,
+        pair TEXT,
+        timeframe TEXT,
+        strategy TEXT,
+        total_return REAL,
+        sharpe_ratio REAL,
+        max_drawdown REAL,
+        win_rate REAL,
+        trades_count INTEGER,
+        candles_analyzed INTEGER,
+        execution_time_seconds REAL,
+        completed_at TEXT,
+        stored_at REAL,
+        size_bytes INTEGER,
+        extra TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_runs_completed ON runs (completed_at);
+    CREATE INDEX IF NOT EXISTS idx_runs_slot ON runs (slot_id, completed_at);
+    CREATE INDEX IF NOT EXISTS idx_runs_pair ON runs (pair, completed_at);
+    CREATE INDEX IF NOT EXISTS idx_runs_stored ON runs (stored_at);
+'''
+
+
+def _to_ms(values) -> np.ndarray:
+    """Datas (datetime/str/None) em epoch ms; ausentes viram -1"""
+    times = pd.to_datetime(pd.Series(values, dtype=object), utc=True, errors='coerce')
+    ms = times.values.astype('datetime64[ms]').astype(np.int64)
+    return np.where(times.isna().values, -1, ms)
+
+
+class BacktestResultStore:
+    """
+    Store de resultados de backtest
+
+    O histórico é paginado e filtrado direto no índice SQLite, sem
+    desserializar resultados; trades/equity de uma execução só são lidos
+    em load_trades/load_equity. Eviction por idade e tamanho total.
+    """
+
+    def __init__(
+        self,
+        store_dir: str = "./data/backtest_store",
+        max_age_days: Optional[float] = 30,
+        max_size_mb: Optional[float] = 500
+    ):
+        """
+        Inicializa o store
+
+        Args:
+            store_dir: Diretório do banco e dos arquivos colunares
+            max_age_days: Idade máxima das execuções (None = sem limite)
+            max_size_mb: Tamanho máximo dos arquivos (None = sem limite)
+        """
+        self.store_dir = Path(store_dir)
+        self.runs_dir = self.store_dir / "runs"
+        self.runs_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.store_dir / "runs.sqlite"
+
+        self.max_age_days = max_age_days
+        self.max_size_mb = max_size_mb
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+        logger.info(f"[RESULT_STORE] Initialized result store at {self.store_dir}")
+
+    # ------------------------------------------------------------------
+    # Escrita
+    # ------------------------------------------------------------------
+
+    def save_run(
+        self,
+        metadata: Dict[str, Any],
+        trades: Optional[List[Any]] = None,
+        equity: Optional[pd.Series] = None
+    ) -> bool:
+        """
+        Salva uma execução
+
+        Args:
+            metadata: Métricas/identificação (backtest_id obrigatório); chaves
+                fora de RUN_COLUMNS vão para 'extra' (JSON)
+            trades: Trades (dicts ou dataclasses)
+            equity: Curva de equity com DatetimeIndex
+
+        Returns:
+            True se salvou com sucesso
+        """
+        backtest_id = metadata.get('backtest_id')
+        if not backtest_id:
+            logger.error("[RESULT_STORE] Cannot store run without backtest_id")
+            return False
+
+        try:
+            trades = [asdict(t) if is_dataclass(t) else dict(t) for t in (trades or [])]
+            arrays = self._trade_arrays(trades)
+            if equity is not None and len(equity):
+                arrays['equity_time'] = _to_ms(list(equity.index))
+                arrays['equity_value'] = np.asarray(equity.values, dtype=np.float64)
+
+            path = self._run_path(backtest_id)
+            path.parent.mkdir(exist_ok=True)
+            tmp_path = path.with_suffix('.tmp.npz')
+            np.savez_compressed(tmp_path, **arrays)
+            tmp_path.replace(path)
+
+            completed_at = metadata.get('completed_at') or datetime.now()
+            row = {column: metadata.get(column) for column in RUN_COLUMNS}
+            row['completed_at'] = completed_at.isoformat() if isinstance(completed_at, datetime) else str(completed_at)
+            row['trades_count'] = metadata.get('trades_count', len(trades))
+            row['stored_at'] = time.time()
+            row['size_bytes'] = path.stat().st_size
+            row['extra'] = json.dumps(
+                {k: v for k, v in metadata.items() if k not in RUN_COLUMNS}, default=str
+            )
+
+            with self._lock:
+                self._conn.execute(
+                    f"INSERT OR REPLACE INTO runs ({', '.join(row)}) VALUES ({', '.join('?' * len(row))})",
+                    list(row.values())
+                )
+                self._conn.commit()
+
+            if self.max_size_mb is not None and row['size_bytes'] > self.max_size_mb * 1024 * 1024:
+                logger.warning(
+                    f"[RESULT_STORE] Run {backtest_id} ({row['size_bytes'] / (1024 * 1024):.1f} MB) "
+                    f"exceeds max_size_mb={self.max_size_mb}; kept, older runs evicted"
+                )
+            self.evict(keep=backtest_id)
+            return True
+
+        except Exception as e:
+            logger.error(f"[RESULT_STORE] Error storing run {backtest_id}: {e}")
+            return False
+
+    @staticmethod
+    def _trade_arrays(trades: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """Trades em colunas (só as colunas presentes)"""
+        present = set().union(*trades) if trades else set()
+        arrays = {}
+        for column in TRADE_TIME_COLUMNS:
+            if column in present:
+                arrays[f'trade_{column}'] = _to_ms([t.get(column) for t in trades])
+        for column in TRADE_TEXT_COLUMNS:
+            if column in present:
+                arrays[f'trade_{column}'] = np.array(
+                    ['' if t.get(column) is None else str(t[column]) for t in trades], dtype=str
+                )
+        for column in TRADE_NUMBER_COLUMNS:
+            if column in present:
+                arrays[f'trade_{column}'] = np.array(
+                    [np.nan if t.get(column) is None else t[column] for t in trades], dtype=np.float64
+                )
+        return arrays
+
+    # ------------------------------------------------------------------
+    # Leitura
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _where(
+        slot_id: Optional[str] = None,
+        pair: Optional[str] = None,
+        strategy: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ):
+        clauses, params = [], []
+        for column, value in (('slot_id', slot_id), ('pair', pair), ('strategy', strategy)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("completed_at >= ?")
+            params.append(since.isoformat())
+        if until is not None:
+            clauses.append("completed_at <= ?")
+            params.append(until.isoformat())
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def list_runs(
+        self,
+        slot_id: Optional[str] = None,
+        pair: Optional[str] = None,
+        strategy: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        order_by: str = 'completed_at',
+        descending: bool = True,
+        limit: int = 20,
+        offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        """
+        Lista execuções (só metadados), filtradas e paginadas no índice
+
+        Returns:
+            Lista de dicts com as colunas de RUN_COLUMNS
+        """
+        if order_by not in ORDER_COLUMNS:
+            raise ValueError(f"Cannot order by '{order_by}'. Available: {sorted(ORDER_COLUMNS)}")
+
+        where, params = self._where(slot_id, pair, strategy, since, until)
+        query = (
+            f"SELECT {', '.join(RUN_COLUMNS)} FROM runs{where} "
+            f"ORDER BY {order_by} {'DESC' if descending else 'ASC'} LIMIT ? OFFSET ?"
+        )
+        with self._lock:
+            rows = self._conn.execute(query, params + [limit, offset]).fetchall()
+        return [dict(row) for row in rows]
+
+    def count_runs(
+        self,
+        slot_id: Optional[str] = None,
+        pair: Optional[str] = None,
+        strategy: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> int:
+        """Número de execuções que passam pelos filtros"""
+        where, params = self._where(slot_id, pair, strategy, since, until)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM runs{where}", params).fetchone()[0]
+
+    def get_run(self, backtest_id: str) -> Optional[Dict[str, Any]]:
+        """Metadados de uma execução (inclui os campos de 'extra')"""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(RUN_COLUMNS)}, extra FROM runs WHERE backtest_id = ?",
+                (backtest_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        run = dict(row)
+        run.update(json.loads(run.pop('extra') or '{}'))
+        return run
+
+    def load_trades(self, backtest_id: str) -> pd.DataFrame:
+        """Trades de uma execução (DataFrame vazio se não existir)"""
+        arrays = self._load_arrays(backtest_id)
+        columns = {}
+        for name, values in arrays.items():
+            if not name.startswith('trade_'):
+                continue
+            column = name[len('trade_'):]
+            if column in TRADE_TIME_COLUMNS:
+                columns[column] = pd.to_datetime(np.where(values < 0, np.nan, values), unit='ms')
+            elif column in TRADE_TEXT_COLUMNS:
+                columns[column] = values.astype(object)
+            else:
+                columns[column] = values
+        return pd.DataFrame(columns)
+
+    def load_equity(self, backtest_id: str) -> Optional[pd.Series]:
+        """Curva de equity de uma execução"""
+        arrays = self._load_arrays(backtest_id)
+        if 'equity_time' not in arrays:
+            return None
+        return pd.Series(
+            arrays['equity_value'],
+            index=pd.to_datetime(arrays['equity_time'], unit='ms'),
+            name='equity'
+        )
+
+    def _run_path(self, backtest_id: str) -> Path:
+        return self.runs_dir / backtest_id[:2] / f"{backtest_id}.npz"
+
+    def _load_arrays(self, backtest_id: str) -> Dict[str, np.ndarray]:
+        path = self._run_path(backtest_id)
+        if not path.exists():
+            return {}
+        with np.load(path, allow_pickle=False) as data:
+            return {name: data[name] for name in data.files}
+
+    # ------------------------------------------------------------------
+    # Eviction
+    # ------------------------------------------------------------------
+
+    def delete_run(self, backtest_id: str) -> bool:
+        """Remove uma execução"""
+        with self._lock:
+            deleted = self._conn.execute("DELETE FROM runs WHERE backtest_id = ?", (backtest_id,)).rowcount
+            self._conn.commit()
+        self._run_path(backtest_id).unlink(missing_ok=True)
+        return bool(deleted)
+
+    def evict(
+        self,
+        max_age_days: Optional[float] = None,
+        max_size_mb: Optional[float] = None,
+        keep: Optional[str] = None
+    ) -> int:
+        """
+        Remove execuções antigas e, se o total passar do limite, as mais
+        antigas até caber
+
+        Args:
+            max_age_days: Sobrescreve o limite de idade configurado
+            max_size_mb: Sobrescreve o limite de tamanho configurado
+            keep: Execução nunca removida pelo limite de tamanho (a recém-salva)
+
+        Returns:
+            Número de execuções removidas
+        """
+        max_age_days = self.max_age_days if max_age_days is None else max_age_days
+        max_size_mb = self.max_size_mb if max_size_mb is None else max_size_mb
+        expired = []
+
+        with self._lock:
+            if max_age_days is not None:
+                cutoff = time.time() - max_age_days * 86400
+                expired += [row[0] for row in self._conn.execute(
+                    "SELECT backtest_id FROM runs WHERE stored_at < ?", (cutoff,)
+                )]
+                self._conn.execute("DELETE FROM runs WHERE stored_at < ?", (cutoff,))
+
+            if max_size_mb is not None:
+                excess = self._conn.execute(
+                    "SELECT COALESCE(SUM(size_bytes), 0) FROM runs"
+                ).fetchone()[0] - max_size_mb * 1024 * 1024
+                if excess > 0:
+                    oldest = []
+                    for backtest_id, size_bytes in self._conn.execute(
+                        "SELECT backtest_id, size_bytes FROM runs ORDER BY stored_at"
+                    ):
+                        if excess <= 0:
+                            break
+                        if backtest_id == keep:
+                            continue
+                        oldest.append(backtest_id)
+                        excess -= size_bytes or 0
+                    self._conn.executemany("DELETE FROM runs WHERE backtest_id = ?", [(i,) for i in oldest])
+                    expired += oldest
+
+            if expired:
+                self._conn.commit()
+
+        for backtest_id in expired:
+            self._run_path(backtest_id).unlink(missing_ok=True)
+        if expired:
+            logger.info(f"[RESULT_STORE] Evicted {len(expired)} runs")
+        return len(expired)
+
+    def clear(self) -> int:
+        """Remove todas as execuções"""
+        with self._lock:
+            ids = [row[0] for row in self._conn.execute("SELECT backtest_id FROM runs")]
+            self._conn.execute("DELETE FROM runs")
+            self._conn.commit()
+        for backtest_id in ids:
+            self._run_path(backtest_id).unlink(missing_ok=True)
+        return len(ids)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estatísticas do store (do índice, sem varrer o diretório)"""
+        with self._lock:
+            count, size_bytes, oldest, newest = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0), MIN(completed_at), MAX(completed_at) FROM runs"
+            ).fetchone()
+        return {
+            'store_directory': str(self.store_dir),
+            'runs_stored': count,
+            'total_size_mb': round(size_bytes / (1024 * 1024), 2),
+            'oldest_run': oldest,
+            'newest_run': newest,
+            'max_age_days': self.max_age_days,
+            'max_size_mb': self.max_size_mb
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,375 @@
+# core/runners/strategy_backtester.py
+"""
+Maveretta Strategy Backtester - Backtest das estratégias reais (BaseStrategy)
+Roda analyze() uma única vez sobre todo o histórico (mesmo código do trading
+ao vivo) e simula fills, fees, minimal_roi, stoploss e custom_stoploss
+pulando de evento em evento sobre arrays numpy, sem iterar linha a linha
+"""
+
+import logging
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backtest.analysis.quant_metrics import QuantitativeMetrics
+
+from ..data.resampler import candle_times
+from ..strategies.base_strategy import BaseStrategy
+from .backtest_runner import BacktestTrade
+
+logger = logging.getLogger(__name__)
+
+LONG = 1
+SHORT = -1
+
+# Janela inicial da busca vetorizada de saída (dobra até o máximo)
+SCAN_CHUNK = 64
+MAX_SCAN_CHUNK = 4096
+
+
+@dataclass
+class StrategyBacktestResult:
+    """Resultado do backtest de uma estratégia"""
+    strategy: str
+    pair: str
+    timeframe: str
+    trades: List[BacktestTrade] = field(default_factory=list)
+    equity: Optional[pd.Series] = None       # equity marcada a mercado por candle
+    returns: Optional[pd.Series] = None      # retornos diários da equity
+    metrics: Dict[str, float] = field(default_factory=dict)
+    initial_capital: float = 0.0
+    final_capital: float = 0.0
+    total_return: float = 0.0
+    win_rate: float = 0.0
+    exit_reasons: Dict[str, int] = field(default_factory=dict)
+    candles_analyzed: int = 0
+
+
+class StrategyBacktester:
+    """
+    Engine de backtest para qualquer subclasse de BaseStrategy
+
+    Regras (padrão Freqtrade, uma posição por vez):
+    - Sinal no candle i executa na abertura do candle i+1
+    - No mesmo candle: sinal de saída (na abertura) > stoploss > ROI
+    - Stop/ROI executam no preço do nível, ou na abertura se ela já passou
+    - custom_stoploss é avaliado no fechamento (relativo ao preço atual) e
+      só vale a partir do candle seguinte; o stop nunca recua
+    - confirm_trade_entry/confirm_trade_exit podem recusar entradas e saídas
+      por sinal/ROI (stoploss não é recusável)
+    """
+
+    def __init__(
+        self,
+        strategy: BaseStrategy,
+        initial_capital: float = 10000.0,
+        fee: float = 0.001,
+        stake_fraction: float = 0.95,
+        slippage: float = 0.0,
+        can_short: bool = False
+    ):
+        """
+        Args:
+            strategy: Estratégia a ser testada
+            initial_capital: Capital inicial
+            fee: Fee por lado (fração do notional)
+            stake_fraction: Fração do capital alocada em cada trade
+            slippage: Slippage contra o trade em cada fill
+            can_short: Permite sinais enter_short/exit_short
+        """
+        self.strategy = strategy
+        self.initial_capital = initial_capital
+        self.fee = fee
+        self.stake_fraction = stake_fraction
+        self.slippage = slippage
+        self.can_short = can_short
+        self.quant_metrics = QuantitativeMetrics()
+
+        # minimal_roi como arrays ordenados por minutos
+        roi = sorted((int(minutes), float(value)) for minutes, value in strategy.minimal_roi.items())
+        self._roi_minutes = np.array([m for m, _ in roi], dtype=np.float64)
+        self._roi_values = np.array([v for _, v in roi], dtype=np.float64)
+
+        # custom_stoploss só força a simulação candle a candle se sobrescrito
+        self._custom_stoploss = (
+            type(strategy).custom_stoploss is not BaseStrategy.custom_stoploss
+        )
+
+    # ------------------------------------------------------------------
+    # Execução
+    # ------------------------------------------------------------------
+
+    def run(
+        self,
+        dataframe: pd.DataFrame,
+        pair: str,
+        timeframe: Optional[str] = None,
+        slot_id: str = "",
+        start_date: Optional[datetime] = None
+    ) -> StrategyBacktestResult:
+        """
+        Executa o backtest
+
+        Args:
+            dataframe: OHLCV (DatetimeIndex, coluna 'timestamp' ou 'date')
+            pair: Par de trading
+            timeframe: Timeframe dos candles (padrão: o da estratégia)
+            slot_id: Slot dono dos trades
+            start_date: Primeiro candle em que entradas são permitidas
+                (candles anteriores servem só de warm-up dos indicadores)
+
+        Returns:
+            StrategyBacktestResult com trades, equity e métricas
+        """
+        timeframe = timeframe or self.strategy.timeframe
+        result = StrategyBacktestResult(
+            strategy=self.strategy.strategy_name,
+            pair=pair,
+            timeframe=timeframe,
+            initial_capital=self.initial_capital,
+            final_capital=self.initial_capital,
+            candles_analyzed=len(dataframe)
+        )
+        if len(dataframe) < 2:
+            return result
+
+        metadata = {'pair': pair, 'timeframe': timeframe, 'slot_id': slot_id}
+        analyzed = self.strategy.analyze(dataframe.copy(), metadata)
+
+        times_ms = candle_times(analyzed)
+        if times_ms is None:
+            raise ValueError("Backtest dataframe needs a DatetimeIndex, 'timestamp' or 'date' column")
+
+        first_entry = max(1, int(self.strategy.startup_candle_count or 0))
+        if start_date is not None:
+            start_ms = pd.Timestamp(start_date).value // 1_000_000
+            first_entry = max(first_entry, int(np.searchsorted(times_ms, start_ms)))
+
+        trades, equity = self._simulate(analyzed, times_ms, pair, slot_id, first_entry)
+
+        result.trades = trades
+        result.final_capital = float(equity[-1])
+        result.total_return = result.final_capital / self.initial_capital - 1.0
+        result.win_rate = (
+            sum(1 for t in trades if t.profit_abs > 0) / len(trades) if trades else 0.0
+        )
+        for trade in trades:
+            result.exit_reasons[trade.exit_reason] = result.exit_reasons.get(trade.exit_reason, 0) + 1
+
+        index = pd.to_datetime(times_ms, unit='ms')
+        result.equity = pd.Series(equity, index=index, name='equity')
+        result.returns = result.equity.resample('1D').last().pct_change().dropna()
+        if len(result.returns) > 1:
+            result.metrics = self.quant_metrics.calculate_all_metrics(result.returns)
+
+        logger.info(f"[STRATEGY_BACKTEST] {result.strategy} {pair} {timeframe}: "
+                    f"{len(trades)} trades, {result.total_return:.2%} return")
+        return result
+
+    # ------------------------------------------------------------------
+    # Simulação
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _signal(dataframe: pd.DataFrame, column: str) -> np.ndarray:
+        if column not in dataframe.columns:
+            return np.zeros(len(dataframe), dtype=bool)
+        return dataframe[column].fillna(0).to_numpy() == 1
+
+    def _simulate(
+        self,
+        df: pd.DataFrame,
+        times_ms: np.ndarray,
+        pair: str,
+        slot_id: str,
+        first_entry: int
+    ) -> Tuple[List[BacktestTrade], np.ndarray]:
+        """Percorre entradas e saídas e monta a equity por candle"""
+        n = len(df)
+        prices = {
+            'open': df['open'].to_numpy(dtype=np.float64),
+            'high': df['high'].to_numpy(dtype=np.float64),
+            'low': df['low'].to_numpy(dtype=np.float64),
+            'close': df['close'].to_numpy(dtype=np.float64),
+        }
+
+        enter_long, exit_long = self._signal(df, 'enter_long'), self._signal(df, 'exit_long')
+        enter_short, exit_short = self._signal(df, 'enter_short'), self._signal(df, 'exit_short')
+        if not self.can_short:
+            enter_short = np.zeros(n, dtype=bool)
+
+        # Candles de fill (sinal no candle anterior); sinais conflitantes são ignorados
+        long_ok = enter_long & ~exit_long & ~enter_short
+        short_ok = enter_short & ~exit_short & ~enter_long
+        entry_rows = np.flatnonzero(long_ok[:-1] | short_ok[:-1]) + 1
+        entry_rows = entry_rows[entry_rows >= first_entry]
+
+        exits = {LONG: exit_long, SHORT: exit_short}
+
+        trades: List[BacktestTrade] = []
+        equity = np.empty(n, dtype=np.float64)
+        capital = self.initial_capital
+        equity_from = 0
+        cursor = 0
+
+        while True:
+            pos = np.searchsorted(entry_rows, cursor)
+            if pos >= len(entry_rows):
+                break
+            k = int(entry_rows[pos])
+            side = LONG if long_ok[k - 1] else SHORT
+
+            entry_price = prices['open'][k] * (1 + self.slippage * side)
+            stake = capital * self.stake_fraction
+            quantity = stake / entry_price
+            entry_time = pd.Timestamp(times_ms[k], unit='ms').to_pydatetime()
+
+            if not self.strategy.confirm_trade_entry(
+                pair, 'market', quantity, entry_price, 'GTC',
+                current_time=entry_time, side='long' if side == LONG else 'short'
+            ):
+                cursor = k + 1
+                continue
+
+            trade = BacktestTrade(
+                id=str(uuid.uuid4())[:8],
+                slot_id=slot_id,
+                pair=pair,
+                side='long' if side == LONG else 'short',
+                entry_time=entry_time,
+                entry_price=entry_price,
+                quantity=quantity,
+                fee=self.fee * quantity * entry_price
+            )
+
+            j, raw_exit, reason = self._find_exit(trade, k, side, prices, times_ms, exits[side], pair)
+            exit_price = raw_exit * (1 - self.slippage * side)
+
+            trade.exit_time = pd.Timestamp(times_ms[j], unit='ms').to_pydatetime()
+            trade.exit_price = exit_price
+            trade.exit_reason = reason
+            trade.profit_abs = (
+                side * (exit_price - entry_price) * quantity
+                - trade.fee - self.fee * quantity * exit_price
+            )
+            trade.profit_pct = trade.profit_abs / (entry_price * quantity)
+            trades.append(trade)
+
+            # Equity: caixa antes da entrada, marcação a mercado com a posição
+            # aberta e caixa realizado a partir do candle de saída
+            equity[equity_from:k] = capital
+            equity[k:j] = capital - trade.fee + side * quantity * (prices['close'][k:j] - entry_price)
+            capital += trade.profit_abs
+            equity_from = j
+
+            # Sem nova entrada no candle de saída
+            cursor = j + 1
+            if reason == 'end_of_data':
+                break
+
+        equity[equity_from:] = capital
+        return trades, equity
+
+    def _roi_threshold(self, minutes: np.ndarray) -> np.ndarray:
+        """ROI mínimo exigido para cada duração de trade (inf = sem ROI)"""
+        if not len(self._roi_minutes):
+            return np.full(len(minutes), np.inf)
+        idx = np.searchsorted(self._roi_minutes, minutes, side='right') - 1
+        return np.where(idx >= 0, self._roi_values[np.maximum(idx, 0)], np.inf)
+
+    def _find_exit(
+        self,
+        trade: BacktestTrade,
+        k: int,
+        side: int,
+        prices: Dict[str, np.ndarray],
+        times_ms: np.ndarray,
+        exit_signal: np.ndarray,
+        pair: str
+    ) -> Tuple[int, float, str]:
+        """
+        Primeiro candle de saída do trade aberto no candle k
+
+        Returns:
+            (índice do candle, preço de saída, motivo)
+        """
+        n = len(times_ms)
+        entry_price = trade.entry_price
+        stop_price = entry_price * (1 - side * abs(self.strategy.stoploss))
+        start = k
+        chunk = SCAN_CHUNK
+
+        while start < n:
+            if self._custom_stoploss:
+                end = start + 1
+            else:
+                end = min(start + chunk, n)
+                chunk = min(chunk * 2, MAX_SCAN_CHUNK)
+            j = np.arange(start, end)
+
+            open_ = prices['open'][j]
+            high, low = prices['high'][j], prices['low'][j]
+
+            signal_hit = (j > k) & exit_signal[np.maximum(j - 1, 0)]
+
+            roi = self._roi_threshold((times_ms[j] - times_ms[k]) / 60000.0)
+            roi_price = entry_price * (1 + side * roi)
+            if side == LONG:
+                stop_hit = low <= stop_price
+                roi_hit = high >= roi_price
+            else:
+                stop_hit = high >= stop_price
+                roi_hit = low <= roi_price
+
+            hits = np.flatnonzero(signal_hit | stop_hit | roi_hit)
+            for h in hits:
+                row = int(j[h])
+                # Sinal recusado pela estratégia: stop e ROI do mesmo candle ainda valem
+                if signal_hit[h] and self._confirm_exit(pair, trade, open_[h], 'exit_signal', times_ms[row]):
+                    return row, open_[h], 'exit_signal'
+                if stop_hit[h]:
+                    # Gap além do stop: executa na abertura
+                    rate = min(open_[h], stop_price) if side == LONG else max(open_[h], stop_price)
+                    return row, rate, 'stop_loss'
+                if roi_hit[h]:
+                    rate = max(open_[h], roi_price[h]) if side == LONG else min(open_[h], roi_price[h])
+                    if self._confirm_exit(pair, trade, rate, 'roi', times_ms[row]):
+                        return row, rate, 'roi'
+
+            if self._custom_stoploss:
+                stop_price = self._update_stop(trade, start, side, stop_price, prices, times_ms, pair)
+            start = end
+
+        return n - 1, prices['close'][n - 1], 'end_of_data'
+
+    def _confirm_exit(self, pair: str, trade: BacktestTrade, rate: float, reason: str, time_ms: int) -> bool:
+        """confirm_trade_exit da estratégia para uma saída a mercado"""
+        return self.strategy.confirm_trade_exit(
+            pair, trade, 'market', trade.quantity, rate, 'GTC', reason,
+            current_time=pd.Timestamp(time_ms, unit='ms').to_pydatetime()
+        )
+
+    def _update_stop(
+        self,
+        trade: BacktestTrade,
+        row: int,
+        side: int,
+        stop_price: float,
+        prices: Dict[str, np.ndarray],
+        times_ms: np.ndarray,
+        pair: str
+    ) -> float:
+        """Stop do próximo candle via custom_stoploss no fechamento (ratchet)"""
+        rate = prices['close'][row]
+        current_profit = side * (rate - trade.entry_price) / trade.entry_price
+        stoploss = self.strategy.custom_stoploss(
+            pair, trade, pd.Timestamp(times_ms[row], unit='ms').to_pydatetime(), rate, current_profit
+        )
+        if stoploss is None:
+            return stop_price
+        candidate = rate * (1 - side * abs(stoploss))
+        return max(stop_price, candidate) if side == LONG else min(stop_price, candidate)
@@ -5,7 +5,7 @@ Gerencia a alocação progressiva de capital em slots
 """
 
 import logging
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any
 from datetime import datetime, timezone
 from enum import Enum
 from prometheus_client import Counter, Histogram, Gauge
@@ -297,8 +297,14 @@ class CascadeManager:
     
     def __init__(self):
         self.slots: Dict[str, CascadeSlot] = {}
+        # Chamados com (slot_id, profit_loss) após cada trade registrado
+        self._trade_listeners: List[Callable[[str, float], None]] = []
         logger.info("Cascade Manager inicializado")
     
+    def add_trade_listener(self, listener: Callable[[str, float], None]):
+        """Registra callback chamado após cada resultado de trade registrado"""
+        self._trade_listeners.append(listener)
+    
     def create_slot(
         self,
         slot_id: str,
@@ -341,6 +347,12 @@ class CascadeManager:
         elif slot.should_downgrade():
             slot.downgrade_stage()
         
+        for listener in self._trade_listeners:
+            try:
+                listener(slot_id, profit_loss)
+            except Exception as e:
+                logger.error(f"Erro em listener de trade do slot {slot_id}: {e}")
+        
         return True
     
     def get_all_slots(self) -> List[Dict[str, Any]]:
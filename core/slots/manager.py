@@ -10,6 +10,7 @@ from .models import (
     SlotMode, TradeAction, SlotStatus, TradeDecision,
     SlotPosition, SlotMetrics, PaperTrade
 )
+from ..positions.mark_to_market import MarkToMarketBook
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +25,10 @@ class SlotManager:
         self.paper_trades: Dict[str, PaperTrade] = {}  # paper_id -> PaperTrade (Phase 3)
         self._lock = threading.Lock()
         
+        # Batched mark-to-market: positions by (slot_id, symbol), paper trades by symbol
+        self._position_book = MarkToMarketBook()
+        self._paper_book = MarkToMarketBook()
+        
         # Initialize demo slots for phase 2
         self._initialize_demo_slots()
         
@@ -116,7 +121,12 @@ class SlotManager:
     def get_positions(self, slot_id: str) -> List[SlotPosition]:
         """Get all positions for a slot"""
         with self._lock:
-            return self.positions.get(slot_id, [])
+            positions = self.positions.get(slot_id, [])
+            for position in positions:
+                mark = self._position_book.valuation(id(position))
+                if mark is not None:
+                    position.current_price, position.unrealized_pnl = mark
+            return positions
     
     def open_position(
         self,
@@ -146,6 +156,9 @@ class SlotManager:
             )
             
             self.positions[slot_id].append(position)
+            self._position_book.add(
+                id(position), (slot_id, symbol), side, entry_price, scale=size
+            )
             self.metrics[slot_id].positions_open += 1
             
             logger.info(
@@ -184,6 +197,7 @@ class SlotManager:
                     
                     # Remove position
                     positions.pop(i)
+                    self._position_book.remove(id(pos))
                     
                     logger.info(
                         f"Closed position in slot {slot_id}: "
@@ -195,14 +209,14 @@ class SlotManager:
             return False
     
     def update_position_prices(self, slot_id: str, price_data: Dict[str, float]):
-        """Update current prices for positions"""
+        """Update current prices for positions (batched per symbol)"""
         with self._lock:
             if slot_id not in self.positions:
                 return
             
-            for position in self.positions[slot_id]:
-                if position.symbol in price_data:
-                    position.update_pnl(price_data[position.symbol])
+            self._position_book.mark({
+                (slot_id, symbol): price for symbol, price in price_data.items()
+            })
     
     def get_metrics(self, slot_id: str) -> Optional[SlotMetrics]:
         """Get metrics for a slot"""
@@ -271,6 +285,7 @@ class SlotManager:
             )
             
             self.paper_trades[consensus_id] = paper_trade
+            self._add_paper_trade_to_book(paper_trade)
             
             logger.info(
                 f"Paper trade opened: {consensus_id} - {action} {symbol} @ {entry_price} "
@@ -307,6 +322,7 @@ class SlotManager:
             
             # Close the trade
             paper_trade.close(close_price, reason)
+            self._paper_book.remove(paper_id)
             
             logger.info(
                 f"Paper trade closed: {paper_id} - {paper_trade.symbol} @ {close_price} "
@@ -319,7 +335,7 @@ class SlotManager:
         """Get all open paper trades - Phase 3"""
         with self._lock:
             return [
-                trade.to_dict()
+                self._marked_paper_trade(trade).to_dict()
                 for trade in self.paper_trades.values()
                 if trade.status == "open"
             ]
@@ -328,28 +344,62 @@ class SlotManager:
         """Get a specific paper trade - Phase 3"""
         with self._lock:
             trade = self.paper_trades.get(paper_id)
-            return trade.to_dict() if trade else None
+            return self._marked_paper_trade(trade).to_dict() if trade else None
     
     def update_paper_trade_prices(self, price_data: Dict[str, float]):
         """
         Update prices for all open paper trades - Phase 3
         
+        Trades are revalued in batch per symbol; only trades whose SL/TP
+        level was crossed are touched (and closed at the tick price).
+        
         Args:
             price_data: Dict of symbol -> current_price
         """
         with self._lock:
-            for trade in self.paper_trades.values():
-                if trade.status == "open" and trade.symbol in price_data:
-                    trade.update_price(price_data[trade.symbol])
-                    
-                    # Check if SL/TP hit
-                    hit_reason = trade.check_sl_tp(price_data[trade.symbol])
-                    if hit_reason:
-                        trade.close(price_data[trade.symbol], hit_reason)
-                        logger.info(
-                            f"Paper trade {trade.paper_id} auto-closed: "
-                            f"{hit_reason} hit at {price_data[trade.symbol]}"
-                        )
+            for trigger in self._paper_book.mark(price_data):
+                trade = self.paper_trades[trigger.key]
+                trade.close(trigger.price, trigger.reason)
+                self._paper_book.remove(trigger.key)
+                logger.info(
+                    f"Paper trade {trade.paper_id} auto-closed: "
+                    f"{trigger.reason} hit at {trigger.price}"
+                )
+    
+    def _add_paper_trade_to_book(self, trade: PaperTrade):
+        """Index an open paper trade for batched mark-to-market"""
+        if trade.entry_price <= 0:
+            # Never revalued nor SL/TP-checked (see PaperTrade.update_price)
+            self._paper_book.add(trade.paper_id, trade.symbol, "none", 0.0, scale=0.0)
+            return
+        
+        entry = trade.entry_price
+        if trade.action == "open_long":
+            side = "long"
+            stop_loss = entry * (1 - trade.sl_pct / 100)
+            take_profit = entry * (1 + trade.tp_pct / 100)
+        elif trade.action == "open_short":
+            side = "short"
+            stop_loss = entry * (1 + trade.sl_pct / 100)
+            take_profit = entry * (1 - trade.tp_pct / 100)
+        else:
+            side, stop_loss, take_profit = "none", None, None
+        
+        self._paper_book.add(
+            trade.paper_id, trade.symbol, side, entry,
+            scale=trade.notional_usdt,
+            divisor=entry,
+            stop_loss=stop_loss,
+            take_profit=take_profit
+        )
+    
+    def _marked_paper_trade(self, trade: PaperTrade) -> PaperTrade:
+        """Apply the latest batched mark to an open paper trade (caller holds the lock)"""
+        if trade.status == "open":
+            mark = self._paper_book.valuation(trade.paper_id)
+            if mark is not None:
+                trade.current_price, trade.unrealized_pnl = mark
+        return trade
 
 
 # Global instance
@@ -3,6 +3,7 @@ Strategy Management Module - Todas as Estratégias Disponíveis
 """
 from .strategy_manager import StrategyManager
 from .base_strategy import BaseStrategy
+from .indicators import IndicatorCache, indicator_cache
 
 # Estratégias Existentes
 from .example_strategy import ExampleStrategy
@@ -65,6 +66,8 @@ def list_strategies():
 __all__ = [
     'StrategyManager',
     'BaseStrategy',
+    'IndicatorCache',
+    'indicator_cache',
     'STRATEGY_REGISTRY',
     'get_strategy',
     'list_strategies',
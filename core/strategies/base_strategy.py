@@ -9,6 +9,8 @@ from abc import ABC, abstractmethod
 from typing import Dict, Any, Optional
 import logging
 
+from .indicators import IndicatorCache, IndicatorResult, indicator_cache
+
 logger = logging.getLogger(__name__)
 
 
@@ -41,6 +43,9 @@ class BaseStrategy(ABC):
     # Startup candle count
     startup_candle_count: int = 30
     
+    # Indicator results shared with every other strategy (None disables caching)
+    indicator_cache: Optional[IndicatorCache] = indicator_cache
+    
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         """
         Initialize strategy
@@ -49,6 +54,8 @@ class BaseStrategy(ABC):
             config: Strategy configuration dictionary
         """
         self.config = config or {}
+        if not self.config.get('indicator_cache', True):
+            self.indicator_cache = None
         logger.info(f"Strategy {self.strategy_name} v{self.strategy_version} initialized")
     
     @abstractmethod
@@ -97,6 +104,33 @@ class BaseStrategy(ABC):
         """
         pass
     
+    def indicator(self, dataframe: pd.DataFrame, metadata: dict, name: str, **params) -> IndicatorResult:
+        """
+        Shared, memoized indicator (see core.strategies.indicators)
+        
+        Strategies analyzing the same pair and candles reuse each other's
+        results instead of recomputing them.
+        
+        Args:
+            dataframe: OHLCV data
+            metadata: Metadata with 'pair' (or 'symbol') and optionally 'timeframe'
+            name: Indicator name ('ema', 'sma', 'std', 'rsi', 'atr', 'macd', 'bollinger', ...)
+            **params: Indicator parameters
+        
+        Returns:
+            Series or DataFrame aligned with the dataframe
+        """
+        if self.indicator_cache is None:
+            return IndicatorCache.compute(dataframe, name, **params)
+        
+        return self.indicator_cache.get(
+            dataframe,
+            name,
+            symbol=metadata.get('pair') or metadata.get('symbol'),
+            timeframe=metadata.get('timeframe', self.timeframe),
+            **params
+        )
+    
     def analyze(self, dataframe: pd.DataFrame, metadata: dict) -> pd.DataFrame:
         """
         Full analysis pipeline: indicators → entry → exit
@@ -5,7 +5,6 @@ Abre e fecha posições no mesmo dia trading
 """
 
 import pandas as pd
-import numpy as np
 from .base_strategy import BaseStrategy
 import logging
 
@@ -46,27 +45,18 @@ class DayTradingStrategy(BaseStrategy):
         Calcula indicadores técnicos
         """
         # EMAs
-        dataframe['ema_9'] = dataframe['close'].ewm(span=9, adjust=False).mean()
-        dataframe['ema_21'] = dataframe['close'].ewm(span=21, adjust=False).mean()
+        dataframe['ema_9'] = self.indicator(dataframe, metadata, 'ema', span=9)
+        dataframe['ema_21'] = self.indicator(dataframe, metadata, 'ema', span=21)
         
         # RSI
-        delta = dataframe['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        dataframe['rsi'] = 100 - (100 / (1 + rs))
+        dataframe['rsi'] = self.indicator(dataframe, metadata, 'rsi', period=14)
         
         # Volume
-        dataframe['volume_ma'] = dataframe['volume'].rolling(window=20).mean()
+        dataframe['volume_ma'] = self.indicator(dataframe, metadata, 'sma', window=20, source='volume')
         dataframe['volume_ratio'] = dataframe['volume'] / dataframe['volume_ma']
         
         # ATR (Average True Range) para volatilidade
-        high_low = dataframe['high'] - dataframe['low']
-        high_close = np.abs(dataframe['high'] - dataframe['close'].shift())
-        low_close = np.abs(dataframe['low'] - dataframe['close'].shift())
-        ranges = pd.concat([high_low, high_close, low_close], axis=1)
-        true_range = ranges.max(axis=1)
-        dataframe['atr'] = true_range.rolling(14).mean()
+        dataframe['atr'] = self.indicator(dataframe, metadata, 'atr', period=14)
         dataframe['atr_pct'] = (dataframe['atr'] / dataframe['close']) * 100
         
         # VWAP (Volume Weighted Average Price)
@@ -7,6 +7,8 @@ from typing import Dict, List, Optional
 from decimal import Decimal
 from datetime import datetime
 
+from exchanges.dex.token_graph import TokenGraph
+
 logger = logging.getLogger(__name__)
 
 
@@ -36,6 +38,12 @@ class DEXArbitrageStrategy:
         self.min_profit_pct = config.get('MIN_PROFIT_PCT', 0.5)
         self.max_gas_cost_pct = config.get('MAX_GAS_COST_PCT', 30.0)
         self.slippage_tolerance = config.get('SLIPPAGE_TOLERANCE', 0.01)
+        # Apenas os K melhores ciclos (preço spot) são confirmados com quotes reais
+        self.triangular_top_k = config.get('TRIANGULAR_TOP_K', 10)
+        
+        # Grafo de tokens por chain (atualizado incrementalmente)
+        self.token_graphs: Dict[str, TokenGraph] = {}
+        self._graph_blocks: Dict[str, int] = {}
         
         # Estatísticas
         self.stats = {
@@ -244,37 +252,85 @@ class DEXArbitrageStrategy:
             min_profit_pct=0  # Vamos filtrar depois
         )
 
+    async def _refresh_token_graph(
+        self,
+        tokens: List[str],
+        chain: str
+    ) -> TokenGraph:
+        """
+        Atualiza o grafo de tokens da chain com as pools dos pares informados.
+        
+        Estados de pool vêm do cache por bloco do QuoteEngine; se o bloco
+        não avançou e nenhum token novo entrou, o grafo é reutilizado.
+        """
+        engine = self.dex_manager.quote_engine
+        graph = self.token_graphs.get(chain)
+        if graph is None:
+            graph = TokenGraph(chain)
+            self.token_graphs[chain] = graph
+        
+        addresses = []
+        for token in tokens:
+            try:
+                addresses.append(engine.resolve_token_address(token, chain))
+            except ValueError:
+                continue
+        
+        block_number = await engine.get_block_number(chain)
+        if (self._graph_blocks.get(chain) == block_number
+                and all(graph.has_token(a) for a in addresses)):
+            return graph
+        
+        pairs = [
+            (a, b)
+            for i, a in enumerate(addresses)
+            for b in addresses[i+1:]
+        ]
+        results = await asyncio.gather(*(
+            engine.get_pool_rates(chain, a, b, block_number)
+            for a, b in pairs
+        ), return_exceptions=True)
+        
+        for (a, b), rates in zip(pairs, results):
+            if isinstance(rates, Exception):
+                continue
+            for pool_id, rate_ab, rate_ba in rates:
+                graph.update_pool(pool_id, a, b, rate_ab, rate_ba)
+        
+        self._graph_blocks[chain] = block_number
+        return graph
+
     async def _find_triangular_opportunities(
         self,
         tokens: List[str],
         chain: str,
         amount: float
     ) -> List[Dict]:
-        """Busca arbitragem triangular (3 tokens em ciclo)"""
+        """Busca arbitragem triangular (ciclos de 3 e 4 tokens)"""
         opportunities = []
         
         if len(tokens) < 3:
             return opportunities
         
-        # Para cada combinação de 3 tokens
-        for i in range(len(tokens)):
-            for j in range(i+1, len(tokens)):
-                for k in range(j+1, len(tokens)):
-                    token_a = tokens[i]
-                    token_b = tokens[j]
-                    token_c = tokens[k]
-                    
-                    try:
-                        # Simular ciclo: A -> B -> C -> A
-                        result = await self._simulate_triangular_cycle(
-                            token_a, token_b, token_c, chain, amount
-                        )
-                        
-                        if result and result.get('net_profit_pct', 0) > 0:
-                            opportunities.append(result)
-                    
-                    except Exception as e:
-                        continue
+        graph = await self._refresh_token_graph(tokens, chain)
+        
+        # Avaliação vetorizada de todos os ciclos pelo preço spot
+        candidates = graph.top_cycles(k=self.triangular_top_k, min_profit_pct=0.0)
+        if not candidates:
+            return opportunities
+        
+        # Confirmar apenas o top-K com quotes reais
+        results = await asyncio.gather(*(
+            self._simulate_cycle(candidate['tokens'], chain, amount)
+            for candidate in candidates
+        ), return_exceptions=True)
+        
+        for candidate, result in zip(candidates, results):
+            if isinstance(result, Exception) or not result:
+                continue
+            if result.get('net_profit_pct', 0) > 0:
+                result['spot_profit_pct'] = candidate['gross_profit_pct']
+                opportunities.append(result)
         
         return opportunities
 
@@ -287,40 +343,37 @@ class DEXArbitrageStrategy:
         amount: float
     ) -> Optional[Dict]:
         """Simula ciclo triangular"""
+        return await self._simulate_cycle([token_a, token_b, token_c], chain, amount)
+
+    async def _simulate_cycle(
+        self,
+        cycle_tokens: List[str],
+        chain: str,
+        amount: float
+    ) -> Optional[Dict]:
+        """Simula ciclo A -> B -> ... -> A com quotes reais"""
         try:
-            # A -> B
-            route1 = await self.dex_manager.find_best_route(
-                token_a, token_b, amount, chain
-            )
-            if not route1.get('success'):
-                return None
-            
-            amount_b = route1['amount_out']
-            
-            # B -> C
-            route2 = await self.dex_manager.find_best_route(
-                token_b, token_c, amount_b, chain
-            )
-            if not route2.get('success'):
-                return None
-            
-            amount_c = route2['amount_out']
+            routes = []
+            current_amount = amount
+            legs = list(zip(cycle_tokens, cycle_tokens[1:] + cycle_tokens[:1]))
             
-            # C -> A
-            route3 = await self.dex_manager.find_best_route(
-                token_c, token_a, amount_c, chain
-            )
-            if not route3.get('success'):
-                return None
+            for token_in, token_out in legs:
+                route = await self.dex_manager.find_best_route(
+                    token_in, token_out, current_amount, chain
+                )
+                if not route.get('success'):
+                    return None
+                routes.append(route)
+                current_amount = route['amount_out']
             
-            final_amount_a = route3['amount_out']
+            final_amount_a = current_amount
             
             # Calcular lucro
             profit = final_amount_a - amount
             profit_pct = (profit / amount) * 100 if amount > 0 else 0
             
-            # Estimar gas (3 swaps)
-            gas_cost_usd = await self._estimate_gas_cost(chain, 'swap') * 3
+            # Estimar gas (um swap por perna)
+            gas_cost_usd = await self._estimate_gas_cost(chain, 'swap') * len(legs)
             
             # Lucro líquido
             net_profit_usd = profit - gas_cost_usd
@@ -330,7 +383,8 @@ class DEXArbitrageStrategy:
                 return {
                     'type': 'triangular',
                     'chain': chain,
-                    'cycle': f"{token_a} -> {token_b} -> {token_c} -> {token_a}",
+                    'cycle': ' -> '.join(cycle_tokens + cycle_tokens[:1]),
+                    'hops': len(legs),
                     'amount_start': amount,
                     'amount_end': final_amount_a,
                     'gross_profit': profit,
@@ -338,7 +392,7 @@ class DEXArbitrageStrategy:
                     'gas_cost_usd': gas_cost_usd,
                     'net_profit_usd': net_profit_usd,
                     'net_profit_pct': net_profit_pct,
-                    'routes': [route1, route2, route3]
+                    'routes': routes
                 }
             
             return None
@@ -92,14 +92,16 @@ class ExampleStrategy(BaseStrategy):
         """
         try:
             # Calculate EMAs
-            dataframe['ema_short'] = ema(dataframe['close'], self.ema_short_period)
-            dataframe['ema_long'] = ema(dataframe['close'], self.ema_long_period)
+            dataframe['ema_short'] = self.indicator(dataframe, metadata, 'ema', span=self.ema_short_period)
+            dataframe['ema_long'] = self.indicator(dataframe, metadata, 'ema', span=self.ema_long_period)
             
             # Calculate volume moving average
-            dataframe['volume_ma'] = sma(dataframe['volume'], self.volume_ma_period)
+            dataframe['volume_ma'] = self.indicator(
+                dataframe, metadata, 'sma', window=self.volume_ma_period, source='volume'
+            )
             
             # Additional indicators for confirmation
-            dataframe['rsi'] = rsi(dataframe['close'], 14)
+            dataframe['rsi'] = self.indicator(dataframe, metadata, 'rsi', period=14)
             
             logger.debug(f"Indicators calculated for {metadata.get('pair', 'unknown')}")
             
@@ -83,11 +83,11 @@ class GridTradingStrategy(BaseStrategy):
             dataframe['range_width'] = self.grid_range_pct
         
         # Detecta se está em range ou tendência
-        dataframe['atr'] = self._calculate_atr(dataframe, period=14)
+        dataframe['atr'] = self.indicator(dataframe, metadata, 'atr', period=14)
         dataframe['atr_pct'] = dataframe['atr'] / dataframe['close']
         
         # ADX para confirmar range (ADX baixo = range)
-        dataframe['adx'] = self._calculate_adx(dataframe, period=14)
+        dataframe['adx'] = self._calculate_adx(dataframe, period=14, atr=dataframe['atr'])
         
         # Calcula níveis do grid
         dataframe = self._calculate_grid_levels(dataframe)
@@ -96,7 +96,7 @@ class GridTradingStrategy(BaseStrategy):
         dataframe['grid_position'] = self._identify_grid_position(dataframe)
         
         # Volume profile
-        dataframe['volume_ma'] = dataframe['volume'].rolling(20).mean()
+        dataframe['volume_ma'] = self.indicator(dataframe, metadata, 'sma', window=20, source='volume')
         
         return dataframe
     
@@ -210,7 +210,8 @@ class GridTradingStrategy(BaseStrategy):
         
         return atr
     
-    def _calculate_adx(self, dataframe: pd.DataFrame, period: int = 14) -> pd.Series:
+    def _calculate_adx(self, dataframe: pd.DataFrame, period: int = 14,
+                       atr: Optional[pd.Series] = None) -> pd.Series:
         """
         Calcula Average Directional Index
         """
@@ -228,8 +229,9 @@ class GridTradingStrategy(BaseStrategy):
         plus_dm[(up_move > down_move) & (up_move > 0)] = up_move
         minus_dm[(down_move > up_move) & (down_move > 0)] = down_move
         
-        # Calculate ATR
-        atr = self._calculate_atr(dataframe, period)
+        # Calculate ATR (reuses the one already computed, if given)
+        if atr is None:
+            atr = self._calculate_atr(dataframe, period)
         
         # Calculate +DI and -DI
         plus_di = 100 * (plus_dm.rolling(period).sum() / atr)
@@ -0,0 +1,307 @@
+# core/strategies/indicators.py
+"""
+Indicators - Shared technical indicator library with a memoization layer
+
+Strategies analyzing the same pair in one cycle request the same EMAs, RSI,
+ATR, MACD and Bollinger bands. IndicatorCache keys each result by
+(symbol, timeframe, data fingerprint, indicator spec), so every indicator is
+computed once per candle no matter how many strategies/slots ask for it.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Union
+
+import numpy as np
+import pandas as pd
+from prometheus_client import Counter, Gauge
+import logging
+
+logger = logging.getLogger(__name__)
+
+IndicatorResult = Union[pd.Series, pd.DataFrame]
+
+
+# ===== INDICATORS =====
+
+def ema(dataframe: pd.DataFrame, span: int, source: str = 'close', adjust: bool = False) -> pd.Series:
+    """Exponential Moving Average"""
+    return dataframe[source].ewm(span=span, adjust=adjust).mean()
+
+
+def sma(dataframe: pd.DataFrame, window: int, source: str = 'close') -> pd.Series:
+    """Simple Moving Average"""
+    return dataframe[source].rolling(window=window).mean()
+
+
+def rolling_std(dataframe: pd.DataFrame, window: int, source: str = 'close') -> pd.Series:
+    """Rolling standard deviation (ddof=1)"""
+    return dataframe[source].rolling(window=window).std()
+
+
+def rsi(dataframe: pd.DataFrame, period: int = 14, source: str = 'close') -> pd.Series:
+    """Relative Strength Index (simple moving average of gains/losses)"""
+    delta = dataframe[source].diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+    rs = gain / loss
+    return 100 - (100 / (1 + rs))
+
+
+def true_range(dataframe: pd.DataFrame) -> pd.Series:
+    """True Range"""
+    high_low = dataframe['high'] - dataframe['low']
+    high_close = np.abs(dataframe['high'] - dataframe['close'].shift())
+    low_close = np.abs(dataframe['low'] - dataframe['close'].shift())
+    return pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
+
+
+def atr(dataframe: pd.DataFrame, period: int = 14) -> pd.Series:
+    """Average True Range (simple moving average of the true range)"""
+    return true_range(dataframe).rolling(period).mean()
+
+
+def macd(
+    dataframe: pd.DataFrame,
+    fast: int = 12,
+    slow: int = 26,
+    signal: int = 9,
+    source: str = 'close',
+    adjust: bool = False
+) -> pd.DataFrame:
+    """MACD line, signal line and histogram"""
+    close = dataframe[source]
+    line = close.ewm(span=fast, adjust=adjust).mean() - close.ewm(span=slow, adjust=adjust).mean()
+    signal_line = line.ewm(span=signal, adjust=adjust).mean()
+    return pd.DataFrame({
+        'macd': line,
+        'macd_signal': signal_line,
+        'macd_hist': line - signal_line,
+    })
+
+
+def bollinger_bands(
+    dataframe: pd.DataFrame,
+    period: int = 20,
+    std: float = 2.0,
+    source: str = 'close'
+) -> pd.DataFrame:
+    """Bollinger Bands (middle, std, upper, lower)"""
+    middle = dataframe[source].rolling(period).mean()
+    std_dev = dataframe[source].rolling(period).std()
+    return pd.DataFrame({
+        'bb_middle': middle,
+        'bb_std': std_dev,
+        'bb_upper': middle + (std_dev * std),
+        'bb_lower': middle - (std_dev * std),
+    })
+
+
+INDICATORS: Dict[str, Callable[..., IndicatorResult]] = {
+    'ema': ema,
+    'sma': sma,
+    'std': rolling_std,
+    'rsi': rsi,
+    'true_range': true_range,
+    'atr': atr,
+    'macd': macd,
+    'bollinger': bollinger_bands,
+}
+
+
+# ===== METRICS =====
+
+strategy_indicator_cache_requests_total = Counter(
+    'strategy_indicator_cache_requests_total',
+    'Indicator cache lookups',
+    ['indicator', 'result']
+)
+
+strategy_indicator_cache_evictions_total = Counter(
+    'strategy_indicator_cache_evictions_total',
+    'Indicator results evicted from the cache (LRU)'
+)
+
+strategy_indicator_cache_entries = Gauge(
+    'strategy_indicator_cache_entries',
+    'Indicator results currently cached'
+)
+
+
+# ===== CACHE =====
+
+def data_fingerprint(dataframe: pd.DataFrame) -> Optional[tuple]:
+    """
+    Identify the candles of a dataframe without hashing all of it
+
+    First/last candle timestamps and length pin the window (EMAs depend on
+    where the history starts); the last close/volume catch a still-forming
+    candle that was updated in place.
+
+    Returns:
+        Fingerprint tuple, or None if the dataframe has no timestamps
+    """
+    if dataframe.empty:
+        return None
+
+    if 'timestamp' in dataframe.columns:
+        times = dataframe['timestamp']
+    elif 'date' in dataframe.columns:
+        times = dataframe['date']
+    elif isinstance(dataframe.index, pd.DatetimeIndex):
+        times = dataframe.index
+    else:
+        return None
+
+    last = dataframe.iloc[-1]
+    return (
+        len(dataframe),
+        times[0] if isinstance(times, pd.Index) else times.iloc[0],
+        times[-1] if isinstance(times, pd.Index) else times.iloc[-1],
+        last.get('close'),
+        last.get('volume'),
+    )
+
+
+class IndicatorCache:
+    """
+    Thread-safe LRU cache of indicator results
+
+    Results are stored as numpy arrays and handed out as fresh pandas
+    objects aligned with the caller's index, so strategies can modify them
+    without corrupting the cache.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'uncached': 0,
+            'evictions': 0,
+        }
+
+    @staticmethod
+    def compute(dataframe: pd.DataFrame, name: str, **params) -> IndicatorResult:
+        """Compute an indicator without caching"""
+        function = INDICATORS.get(name)
+        if function is None:
+            raise ValueError(f"Unknown indicator '{name}'. Available: {list(INDICATORS)}")
+        return function(dataframe, **params)
+
+    @staticmethod
+    def make_key(
+        symbol: str,
+        timeframe: Optional[str],
+        fingerprint: tuple,
+        name: str,
+        params: Dict[str, Any]
+    ) -> tuple:
+        return (symbol, timeframe, fingerprint, name, tuple(sorted(params.items())))
+
+    def get(
+        self,
+        dataframe: pd.DataFrame,
+        name: str,
+        symbol: Optional[str] = None,
+        timeframe: Optional[str] = None,
+        **params
+    ) -> IndicatorResult:
+        """
+        Return the indicator for the dataframe, computing it on a miss
+
+        Args:
+            dataframe: OHLCV data
+            name: Indicator name (key of INDICATORS)
+            symbol: Pair the data belongs to (None disables caching)
+            timeframe: Candle timeframe
+            **params: Indicator parameters (part of the key)
+
+        Returns:
+            Series or DataFrame indexed like ``dataframe``
+        """
+        fingerprint = data_fingerprint(dataframe) if symbol else None
+        if fingerprint is None:
+            with self._lock:
+                self.stats['uncached'] += 1
+            strategy_indicator_cache_requests_total.labels(indicator=name, result='uncached').inc()
+            return self.compute(dataframe, name, **params)
+
+        key = self.make_key(symbol, timeframe, fingerprint, name, params)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+
+        if entry is not None:
+            strategy_indicator_cache_requests_total.labels(indicator=name, result='hit').inc()
+            return self._materialize(entry, dataframe.index)
+
+        result = self.compute(dataframe, name, **params)
+        entry = self._store(key, result)
+        with self._lock:
+            self.stats['misses'] += 1
+        strategy_indicator_cache_requests_total.labels(indicator=name, result='miss').inc()
+        return self._materialize(entry, dataframe.index)
+
+    def _store(self, key: Hashable, result: IndicatorResult) -> tuple:
+        if isinstance(result, pd.DataFrame):
+            entry = (result.to_numpy(dtype=np.float64), list(result.columns), None)
+        else:
+            entry = (result.to_numpy(dtype=np.float64), None, result.name)
+
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            evicted = 0
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+            self.stats['evictions'] += evicted
+            size = len(self._entries)
+
+        if evicted:
+            strategy_indicator_cache_evictions_total.inc(evicted)
+        strategy_indicator_cache_entries.set(size)
+        return entry
+
+    @staticmethod
+    def _materialize(entry: tuple, index: pd.Index) -> IndicatorResult:
+        values, columns, name = entry
+        if columns is not None:
+            return pd.DataFrame(values.copy(), index=index, columns=columns)
+        return pd.Series(values.copy(), index=index, name=name)
+
+    def invalidate(self, symbol: Optional[str] = None):
+        """Drop the results of one symbol (or all)"""
+        with self._lock:
+            if symbol is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k[0] == symbol]:
+                    del self._entries[key]
+            size = len(self._entries)
+        strategy_indicator_cache_entries.set(size)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return {
+                **self.stats,
+                'cached_results': len(self._entries),
+                'max_entries': self.max_entries,
+                'hit_rate': self.stats['hits'] / lookups if lookups else 0.0
+            }
+
+
+# Cache shared by every strategy instance in the process
+indicator_cache = IndicatorCache()
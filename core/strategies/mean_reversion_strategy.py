@@ -5,7 +5,6 @@ Aposta que preço retornará à média após movimento extremo
 """
 
 import pandas as pd
-import numpy as np
 from .base_strategy import BaseStrategy
 import logging
 
@@ -44,11 +43,11 @@ class MeanReversionStrategy(BaseStrategy):
         Indicadores para mean reversion
         """
         # Média móvel
-        dataframe['sma_20'] = dataframe['close'].rolling(window=20).mean()
-        dataframe['sma_50'] = dataframe['close'].rolling(window=50).mean()
+        dataframe['sma_20'] = self.indicator(dataframe, metadata, 'sma', window=20)
+        dataframe['sma_50'] = self.indicator(dataframe, metadata, 'sma', window=50)
         
         # Desvio padrão
-        dataframe['std_20'] = dataframe['close'].rolling(window=20).std()
+        dataframe['std_20'] = self.indicator(dataframe, metadata, 'std', window=20)
         
         # Z-Score (quantos desvios padrão o preço está da média)
         dataframe['zscore'] = (dataframe['close'] - dataframe['sma_20']) / dataframe['std_20']
@@ -62,20 +61,11 @@ class MeanReversionStrategy(BaseStrategy):
         dataframe['bb_position'] = (dataframe['close'] - dataframe['bb_lower']) / (dataframe['bb_upper'] - dataframe['bb_lower'])
         
         # RSI para confirmação
-        delta = dataframe['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        dataframe['rsi'] = 100 - (100 / (1 + rs))
+        dataframe['rsi'] = self.indicator(dataframe, metadata, 'rsi', period=14)
         
         # Keltner Channels (alternativa)
-        dataframe['ema_20'] = dataframe['close'].ewm(span=20, adjust=False).mean()
-        high_low = dataframe['high'] - dataframe['low']
-        high_close = np.abs(dataframe['high'] - dataframe['close'].shift())
-        low_close = np.abs(dataframe['low'] - dataframe['close'].shift())
-        ranges = pd.concat([high_low, high_close, low_close], axis=1)
-        true_range = ranges.max(axis=1)
-        dataframe['atr'] = true_range.rolling(14).mean()
+        dataframe['ema_20'] = self.indicator(dataframe, metadata, 'ema', span=20)
+        dataframe['atr'] = self.indicator(dataframe, metadata, 'atr', period=14)
         
         dataframe['kc_upper'] = dataframe['ema_20'] + (1.5 * dataframe['atr'])
         dataframe['kc_lower'] = dataframe['ema_20'] - (1.5 * dataframe['atr'])
@@ -10,6 +10,8 @@ from typing import Dict, Any, Optional, List, Tuple
 import logging
 
 from .base_strategy import BaseStrategy
+from ..data.resampler import MultiTimeframeData
+from ..data.timeframe import timeframe_to_seconds
 
 logger = logging.getLogger(__name__)
 
@@ -73,8 +75,9 @@ class MultiTimeframeStrategy(BaseStrategy):
             self.use_ema = config.get('use_ema', self.use_ema)
             self.signal_threshold = config.get('signal_threshold', self.signal_threshold)
         
-        # Cache de dados de outros timeframes
-        self.tf_data_cache: Dict[str, pd.DataFrame] = {}
+        # Barras dos timeframes maiores (incrementais por par); o TF base vem
+        # de cada chamada (metadata['timeframe'] ou espaçamento dos candles)
+        self.mtf_data = MultiTimeframeData(max_bars=(config or {}).get('mtf_max_bars', 1000))
         
         logger.info(f"MultiTimeframe Strategy initialized - Primary: {self.primary_timeframe}, Secondary: {self.secondary_timeframes}")
     
@@ -84,23 +87,21 @@ class MultiTimeframeStrategy(BaseStrategy):
         """
         # Indicadores básicos do TF atual
         if self.use_ema:
-            dataframe['ema_9'] = dataframe['close'].ewm(span=9).mean()
-            dataframe['ema_21'] = dataframe['close'].ewm(span=21).mean()
-            dataframe['ema_50'] = dataframe['close'].ewm(span=50).mean()
-            dataframe['ema_200'] = dataframe['close'].ewm(span=200).mean()
+            for span in (9, 21, 50, 200):
+                dataframe[f'ema_{span}'] = self.indicator(dataframe, metadata, 'ema', span=span, adjust=True)
         
         if self.use_rsi:
-            dataframe['rsi'] = self._calculate_rsi(dataframe, period=14)
-            dataframe['rsi_6'] = self._calculate_rsi(dataframe, period=6)
+            dataframe['rsi'] = self._calculate_rsi(dataframe, period=14, metadata=metadata)
+            dataframe['rsi_6'] = self._calculate_rsi(dataframe, period=6, metadata=metadata)
         
         if self.use_macd:
-            dataframe = self._calculate_macd(dataframe)
+            dataframe = self._calculate_macd(dataframe, metadata=metadata)
         
         # Bollinger Bands
-        dataframe = self._calculate_bollinger_bands(dataframe)
+        dataframe = self._calculate_bollinger_bands(dataframe, metadata=metadata)
         
         # ATR para volatilidade
-        dataframe['atr'] = self._calculate_atr(dataframe)
+        dataframe['atr'] = self._calculate_atr(dataframe, metadata=metadata)
         dataframe['atr_pct'] = dataframe['atr'] / dataframe['close']
         
         # Identifica tendência no TF atual
@@ -110,7 +111,7 @@ class MultiTimeframeStrategy(BaseStrategy):
         dataframe['momentum_score'] = self._calculate_momentum_score(dataframe)
         
         # Volume
-        dataframe['volume_ma'] = dataframe['volume'].rolling(20).mean()
+        dataframe['volume_ma'] = self.indicator(dataframe, metadata, 'sma', window=20, source='volume')
         dataframe['volume_ratio'] = dataframe['volume'] / dataframe['volume_ma']
         
         return dataframe
@@ -119,12 +120,15 @@ class MultiTimeframeStrategy(BaseStrategy):
         """
         Define sinais de entrada baseado em análise multi-timeframe
         """
-        # Analisa outros timeframes (simulado - em produção, receberia dados reais)
-        # Por enquanto, usamos o TF atual como proxy
+        # Indicadores dos TFs maiores (uma vez, usados nas duas direções)
+        informative = {
+            tf: self._informative_dataframe(dataframe, tf, metadata)
+            for tf in self.secondary_timeframes
+        }
         
         # Score agregado de todos os timeframes
-        dataframe['mtf_long_score'] = self._calculate_mtf_score(dataframe, 'long')
-        dataframe['mtf_short_score'] = self._calculate_mtf_score(dataframe, 'short')
+        dataframe['mtf_long_score'] = self._calculate_mtf_score(dataframe, 'long', metadata, informative)
+        dataframe['mtf_short_score'] = self._calculate_mtf_score(dataframe, 'short', metadata, informative)
         
         # Condições de entrada LONG
         long_conditions = (
@@ -210,19 +214,22 @@ class MultiTimeframeStrategy(BaseStrategy):
         
         return dataframe
     
-    def _calculate_mtf_score(self, dataframe: pd.DataFrame, direction: str = 'long') -> pd.Series:
+    def _calculate_mtf_score(self, dataframe: pd.DataFrame, direction: str = 'long',
+                             metadata: Optional[dict] = None,
+                             informative: Optional[Dict[str, pd.DataFrame]] = None) -> pd.Series:
         """
         Calcula score agregado de múltiplos timeframes
         
         Args:
             dataframe: Dados do TF atual
             direction: 'long' ou 'short'
+            metadata: Metadata do par (habilita cache e estado incremental)
+            informative: Indicadores por TF já projetados no índice base
         
         Returns:
             Score normalizado (0 a 1)
         """
-        # Simula análise de múltiplos TFs
-        # Em produção, analisaria dados reais de cada TF
+        informative = informative or {}
         
         score = pd.Series(0.0, index=dataframe.index)
         total_weight = 0
@@ -234,14 +241,13 @@ class MultiTimeframeStrategy(BaseStrategy):
         score += current_tf_score * current_weight
         total_weight += current_weight
         
-        # Simula scores de outros TFs (baseado em suavização dos dados atuais)
+        # Scores dos TFs maiores (barras reamostradas, sem lookahead)
         for tf in self.secondary_timeframes:
-            # Em produção, pegaria dados reais do TF
-            # Por ora, usa dados suavizados como proxy
-            tf_multiplier = self._get_tf_multiplier(tf)
-            smoothed_df = self._smooth_dataframe(dataframe, tf_multiplier)
+            tf_df = informative.get(tf)
+            if tf_df is None:
+                tf_df = self._informative_dataframe(dataframe, tf, metadata)
             
-            tf_score = self._score_timeframe(smoothed_df, direction)
+            tf_score = self._score_timeframe(tf_df, direction)
             tf_weight = self.timeframe_weights.get(tf, 1.0)
             
             score += tf_score * tf_weight
@@ -322,87 +328,68 @@ class MultiTimeframeStrategy(BaseStrategy):
         
         return roc_normalized.clip(0, 1)
     
-    def _get_tf_multiplier(self, timeframe: str) -> int:
-        """
-        Retorna multiplicador para suavização baseado no timeframe
-        """
-        tf_map = {
-            "1m": 1,
-            "5m": 5,
-            "15m": 15,
-            "1h": 60,
-            "4h": 240,
-            "1d": 1440
-        }
-        
-        current_tf = self.timeframe
-        current_minutes = tf_map.get(current_tf, 15)
-        target_minutes = tf_map.get(timeframe, 60)
-        
-        return max(1, target_minutes // current_minutes)
-    
-    def _smooth_dataframe(self, dataframe: pd.DataFrame, multiplier: int) -> pd.DataFrame:
+    def _informative_dataframe(self, dataframe: pd.DataFrame, timeframe: str,
+                               metadata: Optional[dict] = None) -> pd.DataFrame:
         """
-        Suaviza dataframe para simular timeframe maior
+        Indicadores de um timeframe maior projetados no índice base
+        
+        As barras do TF são agregadas dos candles base (incrementalmente por
+        par), os indicadores são calculados nas barras (1/N das linhas) e
+        cada candle base recebe os valores da última barra fechada.
+        O TF base é o dos candles recebidos (metadata['timeframe'] ou o
+        espaçamento da coluna de datas), nunca o TF declarado da estratégia.
+        TFs iguais ou menores que o TF base (ou TF base desconhecido) usam o
+        próprio dataframe.
         """
-        smoothed = dataframe.copy()
-        
-        # Suaviza OHLC
-        smoothed['open'] = dataframe['open'].rolling(multiplier).first()
-        smoothed['high'] = dataframe['high'].rolling(multiplier).max()
-        smoothed['low'] = dataframe['low'].rolling(multiplier).min()
-        smoothed['close'] = dataframe['close']
-        smoothed['volume'] = dataframe['volume'].rolling(multiplier).sum()
+        metadata = metadata or {}
+        base_timeframe = self.mtf_data.resolve_base_timeframe(dataframe, metadata.get('timeframe'))
+        if base_timeframe is None:
+            logger.debug(f"TF base desconhecido; {timeframe} usa o próprio dataframe")
+            return dataframe
+        if timeframe_to_seconds(timeframe) <= timeframe_to_seconds(base_timeframe):
+            return dataframe
+        
+        symbol = metadata.get('pair') or metadata.get('symbol')
+        bars = self.mtf_data.get_bars(dataframe, timeframe, symbol=symbol, base_timeframe=base_timeframe)
+        bars_metadata = {'pair': symbol, 'timeframe': timeframe} if symbol else {}
         
-        # Recalcula indicadores
         if self.use_ema:
-            smoothed['ema_21'] = smoothed['close'].ewm(span=21).mean()
-            smoothed['ema_50'] = smoothed['close'].ewm(span=50).mean()
+            bars['ema_21'] = self.indicator(bars, bars_metadata, 'ema', span=21, adjust=True)
+            bars['ema_50'] = self.indicator(bars, bars_metadata, 'ema', span=50, adjust=True)
         
         if self.use_rsi:
-            smoothed['rsi'] = self._calculate_rsi(smoothed)
+            bars['rsi'] = self._calculate_rsi(bars, metadata=bars_metadata)
         
         if self.use_macd:
-            smoothed = self._calculate_macd(smoothed)
+            bars = self._calculate_macd(bars, metadata=bars_metadata)
         
-        smoothed['trend'] = self._identify_trend(smoothed)
-        smoothed['momentum_score'] = self._calculate_momentum_score(smoothed)
+        bars['trend'] = self._identify_trend(bars)
+        bars['momentum_score'] = self._calculate_momentum_score(bars)
         
-        return smoothed
+        columns = [c for c in ('rsi', 'macd', 'macd_signal', 'trend', 'momentum_score') if c in bars.columns]
+        return self.mtf_data.merge(dataframe, bars[['timestamp'] + columns], timeframe, base_timeframe)
     
-    # Helper methods (reusados de outras estratégias)
-    def _calculate_rsi(self, dataframe: pd.DataFrame, period: int = 14) -> pd.Series:
+    # Helper methods (via cache de indicadores; sem metadata não há cache)
+    def _calculate_rsi(self, dataframe: pd.DataFrame, period: int = 14,
+                       metadata: Optional[dict] = None) -> pd.Series:
         """Calcula RSI"""
-        delta = dataframe['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
-        return 100 - (100 / (1 + rs))
+        return self.indicator(dataframe, metadata or {}, 'rsi', period=period)
     
-    def _calculate_macd(self, dataframe: pd.DataFrame, fast=12, slow=26, signal=9) -> pd.DataFrame:
+    def _calculate_macd(self, dataframe: pd.DataFrame, fast=12, slow=26, signal=9,
+                        metadata: Optional[dict] = None) -> pd.DataFrame:
         """Calcula MACD"""
-        dataframe['macd'] = dataframe['close'].ewm(span=fast).mean() - dataframe['close'].ewm(span=slow).mean()
-        dataframe['macd_signal'] = dataframe['macd'].ewm(span=signal).mean()
-        dataframe['macd_hist'] = dataframe['macd'] - dataframe['macd_signal']
+        macd = self.indicator(dataframe, metadata or {}, 'macd', fast=fast, slow=slow, signal=signal, adjust=True)
+        dataframe[['macd', 'macd_signal', 'macd_hist']] = macd
         return dataframe
     
-    def _calculate_bollinger_bands(self, dataframe: pd.DataFrame, period=20, std=2) -> pd.DataFrame:
+    def _calculate_bollinger_bands(self, dataframe: pd.DataFrame, period=20, std=2,
+                                   metadata: Optional[dict] = None) -> pd.DataFrame:
         """Calcula Bollinger Bands"""
-        dataframe['bb_middle'] = dataframe['close'].rolling(period).mean()
-        dataframe['bb_std'] = dataframe['close'].rolling(period).std()
-        dataframe['bb_upper'] = dataframe['bb_middle'] + (dataframe['bb_std'] * std)
-        dataframe['bb_lower'] = dataframe['bb_middle'] - (dataframe['bb_std'] * std)
+        bands = self.indicator(dataframe, metadata or {}, 'bollinger', period=period, std=std)
+        dataframe[['bb_middle', 'bb_std', 'bb_upper', 'bb_lower']] = bands
         return dataframe
     
-    def _calculate_atr(self, dataframe: pd.DataFrame, period=14) -> pd.Series:
+    def _calculate_atr(self, dataframe: pd.DataFrame, period=14,
+                       metadata: Optional[dict] = None) -> pd.Series:
         """Calcula ATR"""
-        high = dataframe['high']
-        low = dataframe['low']
-        close = dataframe['close']
-        
-        tr1 = high - low
-        tr2 = abs(high - close.shift())
-        tr3 = abs(low - close.shift())
-        
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        return tr.rolling(period).mean()
+        return self.indicator(dataframe, metadata or {}, 'atr', period=period)
@@ -41,30 +41,23 @@ class SwingTradingStrategy(BaseStrategy):
         Calcula indicadores para swing trading
         """
         # Médias móveis
-        dataframe['sma_20'] = dataframe['close'].rolling(window=20).mean()
-        dataframe['sma_50'] = dataframe['close'].rolling(window=50).mean()
-        dataframe['sma_200'] = dataframe['close'].rolling(window=200).mean()
+        dataframe['sma_20'] = self.indicator(dataframe, metadata, 'sma', window=20)
+        dataframe['sma_50'] = self.indicator(dataframe, metadata, 'sma', window=50)
+        dataframe['sma_200'] = self.indicator(dataframe, metadata, 'sma', window=200)
         
         # Bollinger Bands
-        std = dataframe['close'].rolling(window=20).std()
+        std = self.indicator(dataframe, metadata, 'std', window=20)
         dataframe['bb_upper'] = dataframe['sma_20'] + (2 * std)
         dataframe['bb_middle'] = dataframe['sma_20']
         dataframe['bb_lower'] = dataframe['sma_20'] - (2 * std)
         dataframe['bb_width'] = (dataframe['bb_upper'] - dataframe['bb_lower']) / dataframe['bb_middle']
         
         # RSI
-        delta = dataframe['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        dataframe['rsi'] = 100 - (100 / (1 + rs))
+        dataframe['rsi'] = self.indicator(dataframe, metadata, 'rsi', period=14)
         
         # MACD
-        exp1 = dataframe['close'].ewm(span=12, adjust=False).mean()
-        exp2 = dataframe['close'].ewm(span=26, adjust=False).mean()
-        dataframe['macd'] = exp1 - exp2
-        dataframe['macd_signal'] = dataframe['macd'].ewm(span=9, adjust=False).mean()
-        dataframe['macd_hist'] = dataframe['macd'] - dataframe['macd_signal']
+        macd = self.indicator(dataframe, metadata, 'macd', fast=12, slow=26, signal=9)
+        dataframe[['macd', 'macd_signal', 'macd_hist']] = macd
         
         # Stochastic
         low_14 = dataframe['low'].rolling(window=14).min()
@@ -41,19 +41,12 @@ class TrendFollowingStrategy(BaseStrategy):
         Indicadores para trend following
         """
         # Múltiplas EMAs para identificar tendência
-        dataframe['ema_10'] = dataframe['close'].ewm(span=10, adjust=False).mean()
-        dataframe['ema_20'] = dataframe['close'].ewm(span=20, adjust=False).mean()
-        dataframe['ema_50'] = dataframe['close'].ewm(span=50, adjust=False).mean()
-        dataframe['ema_100'] = dataframe['close'].ewm(span=100, adjust=False).mean()
-        dataframe['ema_200'] = dataframe['close'].ewm(span=200, adjust=False).mean()
+        for span in (10, 20, 50, 100, 200):
+            dataframe[f'ema_{span}'] = self.indicator(dataframe, metadata, 'ema', span=span)
         
         # ADX (Average Directional Index) para força da tendência
-        high_low = dataframe['high'] - dataframe['low']
-        high_close = np.abs(dataframe['high'] - dataframe['close'].shift())
-        low_close = np.abs(dataframe['low'] - dataframe['close'].shift())
-        ranges = pd.concat([high_low, high_close, low_close], axis=1)
-        true_range = ranges.max(axis=1)
-        dataframe['atr'] = true_range.rolling(14).mean()
+        true_range = self.indicator(dataframe, metadata, 'true_range')
+        dataframe['atr'] = self.indicator(dataframe, metadata, 'atr', period=14)
         
         # +DI e -DI
         plus_dm = dataframe['high'].diff()
@@ -78,7 +71,7 @@ class TrendFollowingStrategy(BaseStrategy):
         dataframe['basic_lb'] = hl2 - (3 * dataframe['atr'])
         
         # Volume
-        dataframe['volume_ma'] = dataframe['volume'].rolling(window=20).mean()
+        dataframe['volume_ma'] = self.indicator(dataframe, metadata, 'sma', window=20, source='volume')
         
         return dataframe
     
@@ -4,12 +4,17 @@ Treasury Router - Sistema de Roteamento de Lucros
 Implementa a lógica de cascata com Valor Base (VB) fixo
 """
 
+import heapq
+import json
 import logging
+import os
 import time
 import threading
-from typing import Optional, Dict, Any, List
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Callable, Deque, Optional, Dict, Any, List, Set
 from datetime import datetime, timezone
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from prometheus_client import Counter, Gauge
 
 logger = logging.getLogger(__name__)
@@ -91,26 +96,90 @@ class TreasuryRouter:
     - Slots operam sempre em VB, nunca acima
     - Lucros são 100% roteados para próximo slot não capitalizado
     - Após todos capitalizados, vai para Tesouraria
+    
+    Estado indexado (custo por settlement independe do número de slots):
+    - Slots por ID em dict; slots abaixo do VB num min-heap pela posição
+    - Idempotência num conjunto limitado de settlement_ids com TTL
+    - Gauges Prometheus atualizados só para slots alterados
+    - Settlements opcionalmente persistidos num log append-only; a cada
+      ``compact_every`` eventos (e após o replay no início) o estado vira um
+      snapshot e o log é truncado, então o replay não cresce sem limite
     """
     
-    def __init__(self, valor_base: float = 1000.0):
+    def __init__(
+        self,
+        valor_base: float = 1000.0,
+        simulated: bool = False,
+        num_slots: int = 10,
+        settlement_log: Optional[str] = None,
+        idempotency_ttl_seconds: float = 7 * 86400,
+        max_idempotency_keys: int = 100_000,
+        history_size: int = 1000,
+        compact_every: int = 10_000
+    ):
+        """
+        Args:
+            valor_base: VB de cada slot
+            simulated: Instância de backtest (não exporta métricas Prometheus
+                e registra settlements em DEBUG)
+            num_slots: Número de slots da cascata
+            settlement_log: Arquivo JSONL append-only dos settlements (None = só memória)
+            idempotency_ttl_seconds: Por quanto tempo um settlement_id é lembrado
+            max_idempotency_keys: Máximo de settlement_ids lembrados
+            history_size: Settlements mantidos em memória para consulta
+            compact_every: Eventos no log antes de gravar snapshot e truncá-lo
+        """
         self.valor_base = valor_base
+        self.simulated = simulated
+        self._log = logger.debug if simulated else logger.info
         self.slots: List[SlotState] = []
         self.treasury_balance: float = 0.0
-        self.settlement_history: List[Dict[str, Any]] = []
+        self.settlement_history: Deque[Dict[str, Any]] = deque(maxlen=history_size)
         self._lock = threading.Lock()  # FIX P0: Adicionar lock síncrono
         
-        # Inicializa 10 slots
-        self._initialize_slots()
+        # Índices
+        self._slots_by_id: Dict[str, SlotState] = {}
+        self._slot_position: Dict[str, int] = {}
+        self._undercapitalized: List[int] = []      # min-heap de posições (remoção preguiçosa)
+        self._in_heap: Set[int] = set()
+        self._total_slot_capital = 0.0
+        self._dirty_slots: Set[str] = set()
+        
+        # Idempotência: settlement_id -> instante (monotônico) do processamento
+        self.idempotency_ttl_seconds = idempotency_ttl_seconds
+        self.max_idempotency_keys = max_idempotency_keys
+        self._settled_ids: "OrderedDict[str, float]" = OrderedDict()
+        
+        # Chamados com (slot_id, resultado) após cada settlement bem-sucedido
+        self._settlement_listeners: List[Callable[[str, Dict[str, Any]], None]] = []
+        
+        # Inicializa slots
+        self._initialize_slots(num_slots)
+        
+        # Restaura estado (snapshot + log) e passa a anexar no log
+        self.settlement_log = Path(settlement_log) if settlement_log else None
+        self.compact_every = compact_every
+        self._log_file = None
+        self._log_seq = 0          # número do último evento gravado/aplicado
+        self._log_entries = 0      # eventos no log desde o último snapshot
+        if self.settlement_log:
+            self.settlement_snapshot = self.settlement_log.with_name(self.settlement_log.name + ".snapshot.json")
+            self.settlement_log.parent.mkdir(parents=True, exist_ok=True)
+            self._load_snapshot()
+            self._replay_settlement_log()
+            if self._log_entries:
+                self._compact_settlement_log()
+            else:
+                self._log_file = open(self.settlement_log, 'a', buffering=1)
         
         # Atualizar métricas iniciais
         self._update_prometheus_metrics()
         
-        logger.info(f"Treasury Router inicializado | VB={valor_base} | 10 slots criados")
+        self._log(f"Treasury Router inicializado | VB={valor_base} | {num_slots} slots criados")
     
-    def _initialize_slots(self):
-        """Inicializa os 10 slots da cascata"""
-        for i in range(1, 11):
+    def _initialize_slots(self, num_slots: int):
+        """Inicializa os slots da cascata"""
+        for i in range(1, num_slots + 1):
             slot = SlotState(
                 slot_id=f"slot_{i}",
                 valor_base=self.valor_base,
@@ -122,21 +191,45 @@ class TreasuryRouter:
                 slot.status = "OPERANDO"
                 slot.capital_atual = self.valor_base
             
+            self._slot_position[slot.slot_id] = len(self.slots)
+            self._slots_by_id[slot.slot_id] = slot
             self.slots.append(slot)
+            self._total_slot_capital += slot.capital_atual
+            self._dirty_slots.add(slot.slot_id)
+            self._track_capitalization(slot)
         
-        logger.info(f"✅ Slot 1 inicializado com VB=${self.valor_base} (OPERANDO)")
+        self._log(f"✅ Slot 1 inicializado com VB=${self.valor_base} (OPERANDO)")
+    
+    def _adjust_capital(self, slot: SlotState, delta: float):
+        """Altera o capital do slot mantendo índices, total e dirty-tracking"""
+        slot.capital_atual += delta
+        self._total_slot_capital += delta
+        self._dirty_slots.add(slot.slot_id)
+        self._track_capitalization(slot)
+    
+    def _track_capitalization(self, slot: SlotState):
+        """Coloca o slot no heap de alvos se ficou abaixo do VB"""
+        position = self._slot_position[slot.slot_id]
+        if not slot.is_capitalized() and position not in self._in_heap:
+            heapq.heappush(self._undercapitalized, position)
+            self._in_heap.add(position)
     
     def _update_prometheus_metrics(self):
-        """Atualiza todas as métricas Prometheus do Treasury"""
-        total_capital = sum(slot.capital_atual for slot in self.slots) + self.treasury_balance
-        treasury_capital_total.set(total_capital)
+        """Atualiza as métricas Prometheus do Treasury (gauges de slot só dos alterados)"""
+        if self.simulated:
+            self._dirty_slots.clear()
+            return
+        
+        treasury_capital_total.set(self._total_slot_capital + self.treasury_balance)
         treasury_balance_gauge.set(self.treasury_balance)
         
-        for slot in self.slots:
+        for slot_id in self._dirty_slots:
+            slot = self._slots_by_id[slot_id]
             treasury_allocation_by_slot.labels(
                 slot=slot.slot_id,
                 status=slot.status
             ).set(slot.capital_atual)
+        self._dirty_slots.clear()
     
     def next_target_slot(self) -> Optional[SlotState]:
         """
@@ -145,9 +238,11 @@ class TreasuryRouter:
         Returns:
             SlotState do próximo slot < VB, ou None se todos capitalizados
         """
-        for slot in self.slots:
+        while self._undercapitalized:
+            slot = self.slots[self._undercapitalized[0]]
             if not slot.is_capitalized():
                 return slot
+            self._in_heap.discard(heapq.heappop(self._undercapitalized))
         return None
     
     def settle_trade(
@@ -171,18 +266,50 @@ class TreasuryRouter:
         """
         # FIX P0: Proteger com lock síncrono
         with self._lock:
-            return self._settle_trade_locked(slot_id, net_pnl, settlement_id, trade_details)
+            result = self._settle_trade_locked(slot_id, net_pnl, settlement_id, trade_details)
+            self._maybe_compact()
+        
+        # Listeners fora do lock (podem consultar o router)
+        if result.get("status") == "success":
+            for listener in self._settlement_listeners:
+                try:
+                    listener(slot_id, result)
+                except Exception as e:
+                    logger.error(f"Erro em listener de settlement: {e}")
+        
+        return result
+    
+    def add_settlement_listener(self, listener: Callable[[str, Dict[str, Any]], None]):
+        """
+        Registra callback chamado após cada settlement bem-sucedido
+        
+        Args:
+            listener: Recebe (slot_id, resultado do settle_trade)
+        """
+        self._settlement_listeners.append(listener)
+    
+    def _is_settled(self, settlement_id: str) -> bool:
+        """Verifica idempotência, expirando ids antigos/excedentes"""
+        now = time.monotonic()
+        cutoff = now - self.idempotency_ttl_seconds
+        while self._settled_ids:
+            oldest_id, settled_at = next(iter(self._settled_ids.items()))
+            if settled_at >= cutoff and len(self._settled_ids) <= self.max_idempotency_keys:
+                break
+            del self._settled_ids[oldest_id]
+        return settlement_id in self._settled_ids
     
     def _settle_trade_locked(
         self,
         slot_id: str,
         net_pnl: float,
         settlement_id: str,
-        trade_details: Optional[Dict[str, Any]] = None
+        trade_details: Optional[Dict[str, Any]] = None,
+        replay: bool = False
     ) -> Dict[str, Any]:
         """Versão interna com lock da settle_trade"""
         # Verifica idempotência
-        if any(s['settlement_id'] == settlement_id for s in self.settlement_history):
+        if self._is_settled(settlement_id):
             logger.warning(f"Settlement {settlement_id} já processado (idempotente)")
             return {
                 "status": "already_processed",
@@ -199,22 +326,35 @@ class TreasuryRouter:
                 "message": f"Slot {slot_id} não encontrado"
             }
         
+        timestamp = datetime.now(timezone.utc).isoformat()
+        if not replay:
+            self._append_log({
+                "type": "settlement",
+                "settlement_id": settlement_id,
+                "timestamp": timestamp,
+                "slot_id": slot_id,
+                "net_pnl": net_pnl,
+                "trade_details": trade_details or {}
+            })
+        self._settled_ids[settlement_id] = time.monotonic()
+        
         # Atualiza capital do slot
-        slot.capital_atual += net_pnl
+        self._adjust_capital(slot, net_pnl)
         slot.trades_realizados += 1
         
-        logger.info(
+        self._log(
             f"💰 Settlement {settlement_id} | {slot_id} | "
             f"PnL=${net_pnl:.2f} | Capital: ${slot.capital_atual:.2f}"
         )
         
         # Roteia excesso
         routing_result = self._route_excess(slot)
+        self._update_prometheus_metrics()
         
-        # Registra no histórico
+        # Registra no histórico (limitado a history_size registros)
         settlement_record = {
             "settlement_id": settlement_id,
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": timestamp,
             "slot_id": slot_id,
             "net_pnl": net_pnl,
             "capital_after": slot.capital_atual,
@@ -223,10 +363,6 @@ class TreasuryRouter:
         }
         self.settlement_history.append(settlement_record)
         
-        # Limita histórico a 1000 registros
-        if len(self.settlement_history) > 1000:
-            self.settlement_history = self.settlement_history[-1000:]
-        
         return {
             "status": "success",
             "settlement_id": settlement_id,
@@ -260,19 +396,18 @@ class TreasuryRouter:
         
         if target_slot is None:
             # Todos slots capitalizados → vai para Tesouraria
-            slot.capital_atual -= excess
+            self._adjust_capital(slot, -excess)
             slot.total_lucro_enviado += excess
             self.treasury_balance += excess
             
             # Prometheus metrics
-            treasury_profit_routing.labels(
-                destination='treasury',
-                slot_origin=slot.slot_id
-            ).inc(excess)
+            if not self.simulated:
+                treasury_profit_routing.labels(
+                    destination='treasury',
+                    slot_origin=slot.slot_id
+                ).inc(excess)
             
-            self._update_prometheus_metrics()
-            
-            logger.info(
+            self._log(
                 f"🏦 TESOURARIA | ${excess:.2f} de {slot.slot_id} → Treasury | "
                 f"Balance=${self.treasury_balance:.2f}"
             )
@@ -286,29 +421,28 @@ class TreasuryRouter:
         
         else:
             # Roteia para próximo slot
-            slot.capital_atual -= excess
+            self._adjust_capital(slot, -excess)
             slot.total_lucro_enviado += excess
             
-            target_slot.capital_atual += excess
+            self._adjust_capital(target_slot, excess)
             target_slot.total_lucro_recebido += excess
             
             # Prometheus metrics
-            treasury_profit_routing.labels(
-                destination=target_slot.slot_id,
-                slot_origin=slot.slot_id
-            ).inc(excess)
+            if not self.simulated:
+                treasury_profit_routing.labels(
+                    destination=target_slot.slot_id,
+                    slot_origin=slot.slot_id
+                ).inc(excess)
             
             # Atualiza status se atingiu VB
             if target_slot.is_capitalized() and target_slot.status == "BOOTSTRAP":
                 target_slot.status = "OPERANDO"
-                logger.info(
+                self._log(
                     f"🚀 {target_slot.slot_id} CAPITALIZADO! | "
                     f"VB=${self.valor_base} atingido | Status: OPERANDO"
                 )
             
-            self._update_prometheus_metrics()
-            
-            logger.info(
+            self._log(
                 f"💸 CASCATA | ${excess:.2f} | {slot.slot_id} → {target_slot.slot_id} | "
                 f"Novo capital: ${target_slot.capital_atual:.2f}"
             )
@@ -323,10 +457,7 @@ class TreasuryRouter:
     
     def _get_slot(self, slot_id: str) -> Optional[SlotState]:
         """Retorna slot pelo ID"""
-        for slot in self.slots:
-            if slot.slot_id == slot_id:
-                return slot
-        return None
+        return self._slots_by_id.get(slot_id)
     
     def get_slot_state(self, slot_id: str) -> Optional[Dict[str, Any]]:
         """Retorna estado de um slot"""
@@ -364,7 +495,7 @@ class TreasuryRouter:
     
     def get_settlement_history(self, limit: int = 100) -> List[Dict[str, Any]]:
         """Retorna histórico de settlements"""
-        return self.settlement_history[-limit:]
+        return list(self.settlement_history)[-limit:]
     
     def force_sweep_all_slots(self) -> Dict[str, Any]:
         """
@@ -373,6 +504,22 @@ class TreasuryRouter:
         Returns:
             Resultados da varredura
         """
+        with self._lock:
+            self._append_log({
+                "type": "sweep",
+                "timestamp": datetime.now(timezone.utc).isoformat()
+            })
+            results = self._sweep_locked()
+            self._maybe_compact()
+        
+        logger.info(f"🧹 Varredura forçada | {len(results)} slots com excesso roteado")
+        
+        return {
+            "swept_slots": len(results),
+            "results": results
+        }
+    
+    def _sweep_locked(self) -> List[Dict[str, Any]]:
         results = []
         
         for slot in self.slots:
@@ -383,16 +530,139 @@ class TreasuryRouter:
                     "routing": result
                 })
         
-        logger.info(f"🧹 Varredura forçada | {len(results)} slots com excesso roteado")
+        self._update_prometheus_metrics()
+        return results
+    
+    # ===== LOG APPEND-ONLY =====
+    
+    def _append_log(self, entry: Dict[str, Any]):
+        """Anexa evento ao log de settlements (antes de aplicá-lo)"""
+        if self._log_file is not None:
+            self._log_seq += 1
+            self._log_entries += 1
+            self._log_file.write(json.dumps({**entry, "seq": self._log_seq}, default=str) + "\n")
+    
+    def _maybe_compact(self):
+        """Compacta o log quando passa de compact_every eventos (com o lock)"""
+        if self._log_file is not None and self._log_entries >= self.compact_every:
+            try:
+                self._compact_settlement_log()
+            except Exception as e:
+                logger.error(f"Erro ao compactar log de settlements: {e}")
+    
+    def _compact_settlement_log(self):
+        """
+        Grava o estado num snapshot e trunca o log
         
-        return {
-            "swept_slots": len(results),
-            "results": results
+        O snapshot guarda o seq do último evento aplicado: se o processo cair
+        entre a troca do snapshot e o truncamento, o replay ignora os eventos
+        já incluídos nele.
+        """
+        now = time.monotonic()
+        snapshot = {
+            "log_seq": self._log_seq,
+            "treasury_balance": self.treasury_balance,
+            "slots": [
+                {**asdict(slot), "created_at": slot.created_at.isoformat()}
+                for slot in self.slots
+            ],
+            # Idade (s) de cada settlement_id: o relógio monotônico não sobrevive ao restart
+            "settled_ids": [[sid, now - settled_at] for sid, settled_at in self._settled_ids.items()],
+            "settlement_history": list(self.settlement_history),
         }
+        tmp_path = self.settlement_snapshot.with_suffix(".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(snapshot, f, default=str)
+            f.flush()
+            os.fsync(f.fileno())
+        tmp_path.replace(self.settlement_snapshot)
+        
+        if self._log_file is not None:
+            self._log_file.close()
+        self._log_file = open(self.settlement_log, 'w', buffering=1)
+        self._log_entries = 0
+        logger.debug(f"Log de settlements compactado | seq={self._log_seq}")
+    
+    def _load_snapshot(self):
+        """Restaura slots, tesouraria, idempotência e histórico do snapshot"""
+        if not self.settlement_snapshot.exists():
+            return
+        try:
+            with open(self.settlement_snapshot, 'r') as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"Snapshot de settlements ilegível ({self.settlement_snapshot}): {e}")
+            return
+        
+        for data in snapshot.get("slots", []):
+            slot = self._slots_by_id.get(data["slot_id"])
+            if slot is None:
+                continue  # Cascata configurada com menos slots
+            self._adjust_capital(slot, data["capital_atual"] - slot.capital_atual)
+            slot.status = data["status"]
+            slot.total_lucro_recebido = data["total_lucro_recebido"]
+            slot.total_lucro_enviado = data["total_lucro_enviado"]
+            slot.trades_realizados = data["trades_realizados"]
+            slot.created_at = datetime.fromisoformat(data["created_at"])
+        
+        self.treasury_balance = snapshot.get("treasury_balance", 0.0)
+        now = time.monotonic()
+        for sid, age in snapshot.get("settled_ids", []):
+            self._settled_ids[sid] = now - age
+        self.settlement_history.extend(snapshot.get("settlement_history", []))
+        self._log_seq = snapshot.get("log_seq", 0)
+    
+    def _replay_settlement_log(self):
+        """Reconstrói o estado reaplicando o log de settlements"""
+        if not self.settlement_log.exists():
+            return
+        
+        replayed = 0
+        log = self._log
+        self._log = logger.debug
+        try:
+            with open(self.settlement_log, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # Linha truncada por queda do processo
+                    
+                    seq = entry.get("seq")
+                    if seq is not None:
+                        if seq <= self._log_seq:
+                            continue  # Já incluído no snapshot
+                        self._log_seq = seq
+                    self._log_entries += 1
+                    
+                    if entry.get("type") == "sweep":
+                        self._sweep_locked()
+                    else:
+                        self._settle_trade_locked(
+                            entry["slot_id"], entry["net_pnl"], entry["settlement_id"],
+                            entry.get("trade_details"), replay=True
+                        )
+                    replayed += 1
+        finally:
+            self._log = log
+        
+        logger.info(f"Treasury Router restaurado de {self.settlement_log} | {replayed} eventos")
+    
+    def close(self):
+        """Fecha o log de settlements"""
+        with self._lock:
+            if self._log_file is not None:
+                self._log_file.close()
+                self._log_file = None
 
 
-# Instância global
-treasury_router = TreasuryRouter(valor_base=1000.0)
+# Instância global (estado persistido no log de settlements; vazio desativa)
+_settlement_log = os.getenv("TREASURY_SETTLEMENT_LOG", "./data/treasury_settlements.jsonl")
+try:
+    treasury_router = TreasuryRouter(valor_base=1000.0, settlement_log=_settlement_log or None)
+except OSError as e:
+    logger.error(f"Log de settlements indisponível ({_settlement_log}), estado não será persistido: {e}")
+    treasury_router = TreasuryRouter(valor_base=1000.0)
 
 # ===== ASYNC WRAPPER FOR ORCHESTRATOR =====
 import asyncio
@@ -1,5 +1,7 @@
 """DEX (Decentralized Exchange) trading module"""
 
 from .dex_manager import DEXManager
+from .quote_engine import QuoteEngine
+from .token_graph import TokenGraph
 
-__all__ = ['DEXManager']
+__all__ = ['DEXManager', 'QuoteEngine', 'TokenGraph']
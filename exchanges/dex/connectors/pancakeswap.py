@@ -1,6 +1,7 @@
 """
 PancakeSwap Connector - Interface para PancakeSwap DEX (BSC)
 """
+import asyncio
 import logging
 from typing import Dict, Optional
 from eth_utils import to_checksum_address
@@ -48,6 +49,44 @@ class PancakeSwapConnector:
         }
     ]
 
+    # Factory / Pair ABIs (leitura de reservas)
+    FACTORY_ABI = [
+        {
+            "inputs": [
+                {"internalType": "address", "name": "tokenA", "type": "address"},
+                {"internalType": "address", "name": "tokenB", "type": "address"}
+            ],
+            "name": "getPair",
+            "outputs": [{"internalType": "address", "name": "pair", "type": "address"}],
+            "stateMutability": "view",
+            "type": "function"
+        }
+    ]
+
+    PAIR_ABI = [
+        {
+            "inputs": [],
+            "name": "getReserves",
+            "outputs": [
+                {"internalType": "uint112", "name": "_reserve0", "type": "uint112"},
+                {"internalType": "uint112", "name": "_reserve1", "type": "uint112"},
+                {"internalType": "uint32", "name": "_blockTimestampLast", "type": "uint32"}
+            ],
+            "stateMutability": "view",
+            "type": "function"
+        },
+        {
+            "inputs": [],
+            "name": "token0",
+            "outputs": [{"internalType": "address", "name": "", "type": "address"}],
+            "stateMutability": "view",
+            "type": "function"
+        }
+    ]
+
+    # PancakeSwap V2 tem 0.25% fee
+    FEE_PCT = 0.25
+
     def __init__(self, web3_gateway: Web3Gateway, chain: str = 'bsc'):
         """
         Inicializa PancakeSwap Connector.
@@ -62,6 +101,10 @@ class PancakeSwapConnector:
         self.gateway = web3_gateway
         self.chain = chain
         self.router_address = self.ROUTER_ADDRESS
+        self.factory_address = self.FACTORY_ADDRESS
+        
+        # Endereço do par é imutável: cache indefinido
+        self._pair_addresses: Dict[tuple, str] = {}
         
         logger.info("PancakeSwapConnector initialized for BSC")
 
@@ -88,18 +131,11 @@ class PancakeSwapConnector:
             token_in = to_checksum_address(token_in)
             token_out = to_checksum_address(token_out)
             
-            # Obter decimals
-            token_in_contract = w3.eth.contract(
-                address=token_in,
-                abi=self.gateway.ERC20_ABI
-            )
-            decimals_in = token_in_contract.functions.decimals().call()
-            
-            token_out_contract = w3.eth.contract(
-                address=token_out,
-                abi=self.gateway.ERC20_ABI
+            # Obter decimals (cache no gateway, leituras agrupadas)
+            decimals_in, decimals_out = await asyncio.gather(
+                self.gateway.get_token_decimals(token_in, self.chain),
+                self.gateway.get_token_decimals(token_out, self.chain)
             )
-            decimals_out = token_out_contract.functions.decimals().call()
             
             # Converter amount
             amount_in_wei = int(amount_in * (10 ** decimals_in))
@@ -111,7 +147,10 @@ class PancakeSwapConnector:
             )
             
             path = [token_in, token_out]
-            amounts = router.functions.getAmountsOut(amount_in_wei, path).call()
+            amounts = await self.gateway.batch_call(
+                router.functions.getAmountsOut(amount_in_wei, path),
+                self.chain
+            )
             
             amount_out_wei = amounts[-1]
             amount_out = float(amount_out_wei) / (10 ** decimals_out)
@@ -119,8 +158,7 @@ class PancakeSwapConnector:
             # Calcular price
             price = amount_out / amount_in if amount_in > 0 else 0
             
-            # PancakeSwap V2 tem 0.25% fee
-            fee_pct = 0.25
+            fee_pct = self.FEE_PCT
             
             # Estimar gas
             gas_estimate = 150000  # Typical for V2 swap
@@ -173,18 +211,11 @@ class PancakeSwapConnector:
             token_in = to_checksum_address(token_in)
             token_out = to_checksum_address(token_out)
             
-            # Obter decimals
-            token_in_contract = w3.eth.contract(
-                address=token_in,
-                abi=self.gateway.ERC20_ABI
-            )
-            decimals_in = token_in_contract.functions.decimals().call()
-            
-            token_out_contract = w3.eth.contract(
-                address=token_out,
-                abi=self.gateway.ERC20_ABI
+            # Obter decimals (cache no gateway, leituras agrupadas)
+            decimals_in, decimals_out = await asyncio.gather(
+                self.gateway.get_token_decimals(token_in, self.chain),
+                self.gateway.get_token_decimals(token_out, self.chain)
             )
-            decimals_out = token_out_contract.functions.decimals().call()
             
             # Converter amounts
             amount_in_wei = int(amount_in * (10 ** decimals_in))
@@ -262,8 +293,56 @@ class PancakeSwapConnector:
         Returns:
             Dict com reservas
         """
-        # TODO: Implementar usando Pair contract
-        return {
-            'success': False,
-            'error': 'Implementação pendente'
-        }
+        try:
+            w3 = await self.gateway.connect_to_chain(self.chain)
+            
+            token0 = to_checksum_address(token0)
+            token1 = to_checksum_address(token1)
+            pair_key = tuple(sorted([token0.lower(), token1.lower()]))
+            
+            pair_address = self._pair_addresses.get(pair_key)
+            if pair_address is None:
+                factory = w3.eth.contract(
+                    address=to_checksum_address(self.factory_address),
+                    abi=self.FACTORY_ABI
+                )
+                pair_address = await self.gateway.batch_call(
+                    factory.functions.getPair(token0, token1),
+                    self.chain
+                )
+                self._pair_addresses[pair_key] = pair_address
+            
+            if int(pair_address, 16) == 0:
+                return {
+                    'success': False,
+                    'error': 'Par não existe'
+                }
+            
+            pair = w3.eth.contract(address=pair_address, abi=self.PAIR_ABI)
+            reserve0, reserve1, _ = await self.gateway.batch_call(
+                pair.functions.getReserves(),
+                self.chain
+            )
+            
+            # token0 do par é sempre o menor endereço
+            pair_token0 = token0 if token0.lower() == pair_key[0] else token1
+            pair_token1 = token1 if pair_token0 == token0 else token0
+            
+            return {
+                'success': True,
+                'dex': 'pancakeswap',
+                'chain': self.chain,
+                'pair_address': pair_address,
+                'token0': pair_token0,
+                'token1': pair_token1,
+                'reserve0': int(reserve0),
+                'reserve1': int(reserve1),
+                'fee_pct': self.FEE_PCT
+            }
+            
+        except Exception as e:
+            logger.error(f"Erro ao obter reservas PancakeSwap: {e}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
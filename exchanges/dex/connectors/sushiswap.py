@@ -1,6 +1,7 @@
 """
 SushiSwap Connector - Interface para SushiSwap DEX
 """
+import asyncio
 import logging
 from typing import Dict
 from eth_utils import to_checksum_address
@@ -22,6 +23,16 @@ class SushiSwapConnector:
         'arbitrum': '0x1b02dA8Cb0d097eB8D57A175b88c7D8b47997506'
     }
 
+    # SushiSwap Factory addresses
+    FACTORY_ADDRESSES = {
+        'ethereum': '0xC0AEe478e3658e2610c5F7A4A2E1777cE9e4f2Ac',
+        'polygon': '0xc35DADB65012eC5796536bD9864eD8773aBc74C4',
+        'arbitrum': '0xc35DADB65012eC5796536bD9864eD8773aBc74C4'
+    }
+
+    # SushiSwap tem 0.3% fee
+    FEE_PCT = 0.3
+
     # Mesmo ABI do PancakeSwap (Uniswap V2)
     ROUTER_ABI = [
         {
@@ -63,6 +74,10 @@ class SushiSwapConnector:
         self.gateway = web3_gateway
         self.chain = chain
         self.router_address = self.ROUTER_ADDRESSES[chain]
+        self.factory_address = self.FACTORY_ADDRESSES[chain]
+        
+        # Endereço do par é imutável: cache indefinido
+        self._pair_addresses: Dict[tuple, str] = {}
         
         logger.info(f"SushiSwapConnector initialized for {chain}")
 
@@ -89,18 +104,11 @@ class SushiSwapConnector:
             token_in = to_checksum_address(token_in)
             token_out = to_checksum_address(token_out)
             
-            # Obter decimals
-            token_in_contract = w3.eth.contract(
-                address=token_in,
-                abi=self.gateway.ERC20_ABI
-            )
-            decimals_in = token_in_contract.functions.decimals().call()
-            
-            token_out_contract = w3.eth.contract(
-                address=token_out,
-                abi=self.gateway.ERC20_ABI
+            # Obter decimals (cache no gateway, leituras agrupadas)
+            decimals_in, decimals_out = await asyncio.gather(
+                self.gateway.get_token_decimals(token_in, self.chain),
+                self.gateway.get_token_decimals(token_out, self.chain)
             )
-            decimals_out = token_out_contract.functions.decimals().call()
             
             # Converter amount
             amount_in_wei = int(amount_in * (10 ** decimals_in))
@@ -112,13 +120,16 @@ class SushiSwapConnector:
             )
             
             path = [token_in, token_out]
-            amounts = router.functions.getAmountsOut(amount_in_wei, path).call()
+            amounts = await self.gateway.batch_call(
+                router.functions.getAmountsOut(amount_in_wei, path),
+                self.chain
+            )
             
             amount_out_wei = amounts[-1]
             amount_out = float(amount_out_wei) / (10 ** decimals_out)
             
             price = amount_out / amount_in if amount_in > 0 else 0
-            fee_pct = 0.3  # SushiSwap tem 0.3% fee
+            fee_pct = self.FEE_PCT
             
             return {
                 'success': True,
@@ -141,6 +152,77 @@ class SushiSwapConnector:
                 'error': str(e)
             }
 
+    async def get_pair_reserves(
+        self,
+        token0: str,
+        token1: str
+    ) -> Dict:
+        """
+        Obtém reservas do par (mesma lógica do PancakeSwap).
+        
+        Args:
+            token0: Endereço do primeiro token
+            token1: Endereço do segundo token
+            
+        Returns:
+            Dict com reservas
+        """
+        # Reaproveita ABIs de Factory/Pair do fork Uniswap V2
+        from .pancakeswap import PancakeSwapConnector
+        
+        try:
+            w3 = await self.gateway.connect_to_chain(self.chain)
+            
+            token0 = to_checksum_address(token0)
+            token1 = to_checksum_address(token1)
+            pair_key = tuple(sorted([token0.lower(), token1.lower()]))
+            
+            pair_address = self._pair_addresses.get(pair_key)
+            if pair_address is None:
+                factory = w3.eth.contract(
+                    address=to_checksum_address(self.factory_address),
+                    abi=PancakeSwapConnector.FACTORY_ABI
+                )
+                pair_address = await self.gateway.batch_call(
+                    factory.functions.getPair(token0, token1),
+                    self.chain
+                )
+                self._pair_addresses[pair_key] = pair_address
+            
+            if int(pair_address, 16) == 0:
+                return {
+                    'success': False,
+                    'error': 'Par não existe'
+                }
+            
+            pair = w3.eth.contract(address=pair_address, abi=PancakeSwapConnector.PAIR_ABI)
+            reserve0, reserve1, _ = await self.gateway.batch_call(
+                pair.functions.getReserves(),
+                self.chain
+            )
+            
+            pair_token0 = token0 if token0.lower() == pair_key[0] else token1
+            pair_token1 = token1 if pair_token0 == token0 else token0
+            
+            return {
+                'success': True,
+                'dex': 'sushiswap',
+                'chain': self.chain,
+                'pair_address': pair_address,
+                'token0': pair_token0,
+                'token1': pair_token1,
+                'reserve0': int(reserve0),
+                'reserve1': int(reserve1),
+                'fee_pct': self.FEE_PCT
+            }
+            
+        except Exception as e:
+            logger.error(f"Erro ao obter reservas SushiSwap: {e}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+
     async def execute_swap(
         self,
         token_in: str,
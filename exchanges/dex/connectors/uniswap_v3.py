@@ -1,6 +1,7 @@
 """
 Uniswap V3 Connector - Interface para Uniswap V3 DEX
 """
+import asyncio
 import logging
 from typing import Dict, Optional, List
 from decimal import Decimal
@@ -30,6 +31,13 @@ class UniswapV3Connector:
         'arbitrum': '0xb27308f9F90D607463bb33eA1BeBb41C27CE5AB6'
     }
 
+    # Uniswap V3 Factory address
+    FACTORY_ADDRESSES = {
+        'ethereum': '0x1F98431c8aD98523631AE4a59f267346ea31F984',
+        'polygon': '0x1F98431c8aD98523631AE4a59f267346ea31F984',
+        'arbitrum': '0x1F98431c8aD98523631AE4a59f267346ea31F984'
+    }
+
     # Fee tiers (0.01%, 0.05%, 0.3%, 1%)
     FEE_TIERS = [100, 500, 3000, 10000]
 
@@ -50,6 +58,46 @@ class UniswapV3Connector:
         }
     ]
 
+    # Factory / Pool ABIs (leitura de estado)
+    FACTORY_ABI = [
+        {
+            "inputs": [
+                {"internalType": "address", "name": "tokenA", "type": "address"},
+                {"internalType": "address", "name": "tokenB", "type": "address"},
+                {"internalType": "uint24", "name": "fee", "type": "uint24"}
+            ],
+            "name": "getPool",
+            "outputs": [{"internalType": "address", "name": "pool", "type": "address"}],
+            "stateMutability": "view",
+            "type": "function"
+        }
+    ]
+
+    POOL_ABI = [
+        {
+            "inputs": [],
+            "name": "slot0",
+            "outputs": [
+                {"internalType": "uint160", "name": "sqrtPriceX96", "type": "uint160"},
+                {"internalType": "int24", "name": "tick", "type": "int24"},
+                {"internalType": "uint16", "name": "observationIndex", "type": "uint16"},
+                {"internalType": "uint16", "name": "observationCardinality", "type": "uint16"},
+                {"internalType": "uint16", "name": "observationCardinalityNext", "type": "uint16"},
+                {"internalType": "uint8", "name": "feeProtocol", "type": "uint8"},
+                {"internalType": "bool", "name": "unlocked", "type": "bool"}
+            ],
+            "stateMutability": "view",
+            "type": "function"
+        },
+        {
+            "inputs": [],
+            "name": "liquidity",
+            "outputs": [{"internalType": "uint128", "name": "", "type": "uint128"}],
+            "stateMutability": "view",
+            "type": "function"
+        }
+    ]
+
     # Simplified Router ABI
     ROUTER_ABI = [
         {
@@ -93,6 +141,10 @@ class UniswapV3Connector:
         
         self.router_address = self.ROUTER_ADDRESSES[chain]
         self.quoter_address = self.QUOTER_ADDRESSES[chain]
+        self.factory_address = self.FACTORY_ADDRESSES[chain]
+        
+        # Endereço da pool é imutável: cache indefinido
+        self._pool_addresses: Dict[tuple, str] = {}
         
         logger.info(f"UniswapV3Connector initialized for {chain}")
 
@@ -121,52 +173,50 @@ class UniswapV3Connector:
             token_in = to_checksum_address(token_in)
             token_out = to_checksum_address(token_out)
             
-            # Obter decimals dos tokens
-            token_in_contract = w3.eth.contract(
-                address=token_in,
-                abi=self.gateway.ERC20_ABI
-            )
-            decimals_in = token_in_contract.functions.decimals().call()
-            
-            token_out_contract = w3.eth.contract(
-                address=token_out,
-                abi=self.gateway.ERC20_ABI
+            # Obter decimals (cache no gateway, leituras agrupadas)
+            decimals_in, decimals_out = await asyncio.gather(
+                self.gateway.get_token_decimals(token_in, self.chain),
+                self.gateway.get_token_decimals(token_out, self.chain)
             )
-            decimals_out = token_out_contract.functions.decimals().call()
             
             # Converter amount para wei
             amount_in_wei = int(amount_in * (10 ** decimals_in))
             
-            # Tentar diferentes fee tiers e escolher o melhor
-            best_quote = None
-            best_amount_out = 0
+            # Tentar diferentes fee tiers (no mesmo lote) e escolher o melhor
+            quoter = w3.eth.contract(
+                address=to_checksum_address(self.quoter_address),
+                abi=self.QUOTER_ABI
+            )
             
-            for fee in self.FEE_TIERS:
-                try:
-                    quoter = w3.eth.contract(
-                        address=to_checksum_address(self.quoter_address),
-                        abi=self.QUOTER_ABI
-                    )
-                    
-                    # Chamar quoter (note: pode falhar se pool não existir)
-                    amount_out_wei = quoter.functions.quoteExactInputSingle(
+            # Chamar quoter (note: pode falhar se pool não existir)
+            results = await asyncio.gather(*(
+                self.gateway.batch_call(
+                    quoter.functions.quoteExactInputSingle(
                         token_in,
                         token_out,
                         fee,
                         amount_in_wei,
                         0  # sqrtPriceLimitX96
-                    ).call()
-                    
-                    if amount_out_wei > best_amount_out:
-                        best_amount_out = amount_out_wei
-                        best_quote = {
-                            'fee_tier': fee,
-                            'amount_out_wei': amount_out_wei
-                        }
-                
-                except Exception as e:
-                    # Pool pode não existir para esse fee tier
+                    ),
+                    self.chain
+                )
+                for fee in self.FEE_TIERS
+            ), return_exceptions=True)
+            
+            best_quote = None
+            best_amount_out = 0
+            
+            for fee, amount_out_wei in zip(self.FEE_TIERS, results):
+                # Pool pode não existir para esse fee tier
+                if isinstance(amount_out_wei, Exception):
                     continue
+                
+                if amount_out_wei > best_amount_out:
+                    best_amount_out = amount_out_wei
+                    best_quote = {
+                        'fee_tier': fee,
+                        'amount_out_wei': amount_out_wei
+                    }
             
             if best_quote is None:
                 return {
@@ -237,18 +287,11 @@ class UniswapV3Connector:
             token_in = to_checksum_address(token_in)
             token_out = to_checksum_address(token_out)
             
-            # Obter decimals
-            token_in_contract = w3.eth.contract(
-                address=token_in,
-                abi=self.gateway.ERC20_ABI
-            )
-            decimals_in = token_in_contract.functions.decimals().call()
-            
-            token_out_contract = w3.eth.contract(
-                address=token_out,
-                abi=self.gateway.ERC20_ABI
+            # Obter decimals (cache no gateway, leituras agrupadas)
+            decimals_in, decimals_out = await asyncio.gather(
+                self.gateway.get_token_decimals(token_in, self.chain),
+                self.gateway.get_token_decimals(token_out, self.chain)
             )
-            decimals_out = token_out_contract.functions.decimals().call()
             
             # Converter amounts
             amount_in_wei = int(amount_in * (10 ** decimals_in))
@@ -334,11 +377,61 @@ class UniswapV3Connector:
         Returns:
             Dict com informações da pool
         """
-        # TODO: Implementar usando Pool Factory contract
-        return {
-            'success': False,
-            'error': 'Implementação pendente'
-        }
+        try:
+            w3 = await self.gateway.connect_to_chain(self.chain)
+            
+            token0 = to_checksum_address(token0)
+            token1 = to_checksum_address(token1)
+            pool_key = tuple(sorted([token0.lower(), token1.lower()])) + (fee_tier,)
+            
+            pool_address = self._pool_addresses.get(pool_key)
+            if pool_address is None:
+                factory = w3.eth.contract(
+                    address=to_checksum_address(self.factory_address),
+                    abi=self.FACTORY_ABI
+                )
+                pool_address = await self.gateway.batch_call(
+                    factory.functions.getPool(token0, token1, fee_tier),
+                    self.chain
+                )
+                self._pool_addresses[pool_key] = pool_address
+            
+            if int(pool_address, 16) == 0:
+                return {
+                    'success': False,
+                    'error': 'Pool não existe'
+                }
+            
+            pool = w3.eth.contract(address=pool_address, abi=self.POOL_ABI)
+            slot0, liquidity = await asyncio.gather(
+                self.gateway.batch_call(pool.functions.slot0(), self.chain),
+                self.gateway.batch_call(pool.functions.liquidity(), self.chain)
+            )
+            
+            # token0 da pool é sempre o menor endereço
+            pool_token0 = token0 if token0.lower() == pool_key[0] else token1
+            pool_token1 = token1 if pool_token0 == token0 else token0
+            
+            return {
+                'success': True,
+                'dex': 'uniswap_v3',
+                'chain': self.chain,
+                'pool_address': pool_address,
+                'token0': pool_token0,
+                'token1': pool_token1,
+                'sqrt_price_x96': int(slot0[0]),
+                'tick': int(slot0[1]),
+                'liquidity': int(liquidity),
+                'fee_tier': fee_tier,
+                'fee_pct': fee_tier / 10000
+            }
+            
+        except Exception as e:
+            logger.error(f"Erro ao obter pool Uniswap V3: {e}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
 
     async def _estimate_swap_gas(
         self,
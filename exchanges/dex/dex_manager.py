@@ -3,13 +3,13 @@ DEX Manager - Gerenciador principal de exchanges descentralizadas
 """
 import logging
 import asyncio
-from typing import Dict, List, Optional
-from decimal import Decimal
+from typing import Dict, List
 from .gateway.web3_gateway import Web3Gateway
 from .connectors.uniswap_v3 import UniswapV3Connector
 from .connectors.pancakeswap import PancakeSwapConnector
 from .connectors.sushiswap import SushiSwapConnector
 from .connectors.curve import CurveConnector
+from .quote_engine import QuoteEngine
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +27,38 @@ class DEXManager:
     - Estimativa de gas
     """
 
+    # Mapa de símbolos comuns para endereços
+    TOKEN_ADDRESSES = {
+        'ethereum': {
+            'WETH': '0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2',
+            'USDC': '0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48',
+            'USDT': '0xdAC17F958D2ee523a2206206994597C13D831ec7',
+            'DAI': '0x6B175474E89094C44Da98b954EedeAC495271d0F',
+            'WBTC': '0x2260FAC5E5542a773Aa44fBCfeDf7C193bc2C599'
+        },
+        'bsc': {
+            'WBNB': '0xbb4CdB9CBd36B01bD1cBaEBF2De08d9173bc095c',
+            'USDC': '0x8AC76a51cc950d9822D68b83fE1Ad97B32Cd580d',
+            'USDT': '0x55d398326f99059fF775485246999027B3197955',
+            'BUSD': '0xe9e7CEA3DedcA5984780Bafc599bD69ADd087D56',
+            'BTCB': '0x7130d2A12B9BCbFAe4f2634d864A1Ee1Ce3Ead9c'
+        },
+        'polygon': {
+            'WMATIC': '0x0d500B1d8E8eF31E21C99d1Db9A6444d3ADf1270',
+            'USDC': '0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174',
+            'USDT': '0xc2132D05D31c914a87C6611C10748AEb04B58e8F',
+            'DAI': '0x8f3Cf7ad23Cd3CaDbD9735AFf958023239c6A063',
+            'WETH': '0x7ceB23fD6bC0adD59E62ac25578270cFf1b9f619'
+        },
+        'arbitrum': {
+            'WETH': '0x82aF49447D8a07e3bd95BD0d56f35241523fBab1',
+            'USDC': '0xFF970A61A04b1cA14834A43f5dE4533eBDDB5CC8',
+            'USDT': '0xFd086bC7CD5C481DCC9C85ebE478A1C0b69FCbb9',
+            'DAI': '0xDA10009cBd5D07dd0CeCc66161FC93D7c9000da1',
+            'WBTC': '0x2f2a2543B76A4166549F7aaB2e75Bef0aefC5B0f'
+        }
+    }
+
     def __init__(self, config: Dict):
         """
         Inicializa DEXManager.
@@ -78,6 +110,14 @@ class DEXManager:
         except Exception as e:
             logger.warning(f"Curve não disponível: {e}")
         
+        # Cotações concorrentes com cache de estado de pools por bloco
+        self.quote_engine = QuoteEngine(
+            self.connectors,
+            self.gateway,
+            config,
+            token_addresses=self.TOKEN_ADDRESSES
+        )
+        
         logger.info(f"DEXManager initialized with {len(self.connectors)} connectors")
 
     async def find_best_route(
@@ -106,28 +146,13 @@ class DEXManager:
             token_in_address = await self._resolve_token_address(token_in, chain)
             token_out_address = await self._resolve_token_address(token_out, chain)
             
-            # Obter quotes de todas as DEXs disponíveis para essa chain
-            quotes = []
-            
-            for connector_name, connector in self.connectors.items():
-                # Verificar se connector é para a chain correta
-                if chain not in connector_name:
-                    continue
-                
-                try:
-                    quote = await connector.get_quote(
-                        token_in_address,
-                        token_out_address,
-                        amount_in
-                    )
-                    
-                    if quote.get('success'):
-                        quote['connector_name'] = connector_name
-                        quotes.append(quote)
-                        
-                except Exception as e:
-                    logger.warning(f"Erro ao obter quote de {connector_name}: {e}")
-                    continue
+            # Obter quotes de todas as DEXs da chain em paralelo
+            quotes = await self.quote_engine.get_quotes(
+                token_in_address,
+                token_out_address,
+                amount_in,
+                chain
+            )
             
             if not quotes:
                 return {
@@ -276,28 +301,27 @@ class DEXManager:
             for i, token_in in enumerate(tokens):
                 for token_out in tokens[i+1:]:
                     
-                    # Verificar preços em diferentes DEXs/chains
-                    prices = {}
+                    # Verificar preços em todas as chains em paralelo
+                    routes = await asyncio.gather(*(
+                        self.find_best_route(
+                            token_in=token_in,
+                            token_out=token_out,
+                            amount_in=1.0,  # Normalizado
+                            chain=chain,
+                            compare_dexs=True
+                        )
+                        for chain in chains
+                    ), return_exceptions=True)
                     
-                    for chain in chains:
-                        try:
-                            # Obter melhor preço nessa chain
-                            route = await self.find_best_route(
-                                token_in=token_in,
-                                token_out=token_out,
-                                amount_in=1.0,  # Normalizado
-                                chain=chain,
-                                compare_dexs=True
-                            )
-                            
-                            if route.get('success'):
-                                prices[chain] = {
-                                    'price': route['price'],
-                                    'dex': route['dex'],
-                                    'route': route
-                                }
-                        except Exception as e:
+                    prices = {}
+                    for chain, route in zip(chains, routes):
+                        if isinstance(route, Exception) or not route.get('success'):
                             continue
+                        prices[chain] = {
+                            'price': route['price'],
+                            'dex': route['dex'],
+                            'route': route
+                        }
                     
                     # Encontrar diferenças de preço
                     if len(prices) < 2:
@@ -305,8 +329,8 @@ class DEXManager:
                     
                     # Comparar todos os pares
                     chain_list = list(prices.keys())
-                    for i, buy_chain in enumerate(chain_list):
-                        for sell_chain in chain_list[i+1:]:
+                    for j, buy_chain in enumerate(chain_list):
+                        for sell_chain in chain_list[j+1:]:
                             
                             buy_price = prices[buy_chain]['price']
                             sell_price = prices[sell_chain]['price']
@@ -326,7 +350,8 @@ class DEXManager:
                                     'sell_price': sell_price,
                                     'profit_pct': profit_pct,
                                     'type': 'cross_chain' if buy_chain != sell_chain else 'cross_dex'
-                                })\n            
+                                })
+            
             # Ordenar por lucro
             opportunities.sort(key=lambda x: x['profit_pct'], reverse=True)
             
@@ -353,49 +378,7 @@ class DEXManager:
         Returns:
             Endereço do token
         """
-        # Se já é endereço (começa com 0x), retornar
-        if token.startswith('0x'):
-            return token
-        
-        # Mapa de símbolos comuns para endereços
-        token_addresses = {
-            'ethereum': {
-                'WETH': '0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2',
-                'USDC': '0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48',
-                'USDT': '0xdAC17F958D2ee523a2206206994597C13D831ec7',
-                'DAI': '0x6B175474E89094C44Da98b954EedeAC495271d0F',
-                'WBTC': '0x2260FAC5E5542a773Aa44fBCfeDf7C193bc2C599'
-            },
-            'bsc': {
-                'WBNB': '0xbb4CdB9CBd36B01bD1cBaEBF2De08d9173bc095c',
-                'USDC': '0x8AC76a51cc950d9822D68b83fE1Ad97B32Cd580d',
-                'USDT': '0x55d398326f99059fF775485246999027B3197955',
-                'BUSD': '0xe9e7CEA3DedcA5984780Bafc599bD69ADd087D56',
-                'BTCB': '0x7130d2A12B9BCbFAe4f2634d864A1Ee1Ce3Ead9c'
-            },
-            'polygon': {
-                'WMATIC': '0x0d500B1d8E8eF31E21C99d1Db9A6444d3ADf1270',
-                'USDC': '0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174',
-                'USDT': '0xc2132D05D31c914a87C6611C10748AEb04B58e8F',
-                'DAI': '0x8f3Cf7ad23Cd3CaDbD9735AFf958023239c6A063',
-                'WETH': '0x7ceB23fD6bC0adD59E62ac25578270cFf1b9f619'
-            },
-            'arbitrum': {
-                'WETH': '0x82aF49447D8a07e3bd95BD0d56f35241523fBab1',
-                'USDC': '0xFF970A61A04b1cA14834A43f5dE4533eBDDB5CC8',
-                'USDT': '0xFd086bC7CD5C481DCC9C85ebE478A1C0b69FCbb9',
-                'DAI': '0xDA10009cBd5D07dd0CeCc66161FC93D7c9000da1',
-                'WBTC': '0x2f2a2543B76A4166549F7aaB2e75Bef0aefC5B0f'
-            }
-        }
-        
-        chain_tokens = token_addresses.get(chain, {})
-        address = chain_tokens.get(token.upper())
-        
-        if not address:
-            raise ValueError(f"Token {token} não encontrado em {chain}")
-        
-        return address
+        return self.quote_engine.resolve_token_address(token, chain)
 
     def get_supported_chains(self) -> List[str]:
         """Retorna lista de chains suportadas"""
@@ -435,23 +418,23 @@ class DEXManager:
         Returns:
             Dict com balances
         """
-        balances = {}
-        
-        for token in tokens:
+        async def token_balance(token: str) -> float:
             try:
                 token_address = await self._resolve_token_address(token, chain)
                 
-                balance = await self.gateway.get_balance(
+                return await self.gateway.get_balance(
                     address=self.gateway.wallet_address,
                     token=token_address,
                     chain=chain
                 )
                 
-                balances[token] = balance
-                
             except Exception as e:
                 logger.error(f"Erro ao obter balance de {token}: {e}")
-                balances[token] = 0.0
+                return 0.0
+        
+        # Leituras concorrentes são agrupadas em um único multicall pelo gateway
+        results = await asyncio.gather(*(token_balance(token) for token in tokens))
+        balances = dict(zip(tokens, results))
         
         # Native token balance
         try:
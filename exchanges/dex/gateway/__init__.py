@@ -1,5 +1,7 @@
 """Web3 Gateway module"""
 
 from .web3_gateway import Web3Gateway
+from .memory_chain import InMemoryChain
+from .multicall import MulticallBatcher
 
-__all__ = ['Web3Gateway']
+__all__ = ['Web3Gateway', 'InMemoryChain', 'MulticallBatcher']
@@ -0,0 +1,148 @@
+"""
+In-Memory Chain - Substituto local de blockchain para testes do QuoteEngine
+"""
+import logging
+from typing import Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class InMemoryChain:
+    """
+    Blockchain em memória.
+
+    Implementa a mesma interface de leitura usada pelo QuoteEngine
+    (``get_block_number`` e ``get_token_decimals``) e fornece conectores
+    V2 em memória, permitindo exercitar cache por bloco e cotações locais
+    sem RPC.
+    """
+
+    def __init__(self):
+        self.blocks: Dict[str, int] = {}
+        self.decimals: Dict[Tuple[str, str], int] = {}
+        # (chain, dex, token_a, token_b) ordenados -> estado do par
+        self.pairs: Dict[tuple, Dict] = {}
+        self.reads = {
+            'block_number': 0,
+            'decimals': 0,
+            'reserves': 0,
+            'quotes': 0
+        }
+
+    def add_token(self, chain: str, address: str, decimals: int = 18):
+        """Registra token"""
+        self.decimals[(chain, address.lower())] = decimals
+        self.blocks.setdefault(chain, 1)
+
+    def add_pair(
+        self,
+        chain: str,
+        dex: str,
+        token_a: str,
+        token_b: str,
+        reserve_a: int,
+        reserve_b: int,
+        fee_pct: float = 0.3
+    ):
+        """Registra par V2 com reservas raw"""
+        token0, token1 = sorted([token_a, token_b], key=str.lower)
+        reserve0, reserve1 = (reserve_a, reserve_b) if token0 == token_a else (reserve_b, reserve_a)
+        self.pairs[(chain, dex, token0.lower(), token1.lower())] = {
+            'token0': token0,
+            'token1': token1,
+            'reserve0': int(reserve0),
+            'reserve1': int(reserve1),
+            'fee_pct': fee_pct
+        }
+        self.blocks.setdefault(chain, 1)
+
+    def set_reserves(self, chain: str, dex: str, token_a: str, token_b: str, reserve_a: int, reserve_b: int):
+        """Atualiza reservas e minera um bloco"""
+        pair = self._pair(chain, dex, token_a, token_b)
+        if pair['token0'].lower() == token_a.lower():
+            pair['reserve0'], pair['reserve1'] = int(reserve_a), int(reserve_b)
+        else:
+            pair['reserve0'], pair['reserve1'] = int(reserve_b), int(reserve_a)
+        self.mine(chain)
+
+    def mine(self, chain: str, blocks: int = 1):
+        """Avança o bloco da chain"""
+        self.blocks[chain] = self.blocks.get(chain, 0) + blocks
+
+    def _pair(self, chain: str, dex: str, token_a: str, token_b: str) -> Dict:
+        token0, token1 = sorted([token_a.lower(), token_b.lower()])
+        pair = self.pairs.get((chain, dex, token0, token1))
+        if pair is None:
+            raise KeyError(f"Par inexistente em {dex}/{chain}")
+        return pair
+
+    async def get_block_number(self, chain: str) -> int:
+        self.reads['block_number'] += 1
+        return self.blocks.get(chain, 0)
+
+    async def get_token_decimals(self, token: str, chain: str) -> int:
+        self.reads['decimals'] += 1
+        return self.decimals[(chain, token.lower())]
+
+    def connector(self, dex: str, chain: str) -> 'InMemoryV2Connector':
+        """Cria conector V2 ligado a esta chain"""
+        return InMemoryV2Connector(self, dex, chain)
+
+
+class InMemoryV2Connector:
+    """
+    Conector V2 (x*y=k) sobre o InMemoryChain, com a mesma interface
+    dos conectores reais (``get_quote`` e ``get_pair_reserves``).
+    """
+
+    def __init__(self, chain_state: InMemoryChain, dex: str, chain: str):
+        self.state = chain_state
+        self.dex = dex
+        self.chain = chain
+
+    async def get_pair_reserves(self, token0: str, token1: str) -> Dict:
+        self.state.reads['reserves'] += 1
+        try:
+            pair = self.state._pair(self.chain, self.dex, token0, token1)
+        except KeyError as e:
+            return {'success': False, 'error': str(e)}
+        return {
+            'success': True,
+            'dex': self.dex,
+            'chain': self.chain,
+            **pair
+        }
+
+    async def get_quote(self, token_in: str, token_out: str, amount_in: float) -> Dict:
+        from ..quote_engine import constant_product_amount_out
+
+        self.state.reads['quotes'] += 1
+        try:
+            pair = self.state._pair(self.chain, self.dex, token_in, token_out)
+        except KeyError as e:
+            return {'success': False, 'error': str(e)}
+
+        decimals_in = self.state.decimals[(self.chain, token_in.lower())]
+        decimals_out = self.state.decimals[(self.chain, token_out.lower())]
+        if pair['token0'].lower() == token_in.lower():
+            reserve_in, reserve_out = pair['reserve0'], pair['reserve1']
+        else:
+            reserve_in, reserve_out = pair['reserve1'], pair['reserve0']
+
+        amount_out_raw = constant_product_amount_out(
+            int(amount_in * (10 ** decimals_in)), reserve_in, reserve_out, pair['fee_pct']
+        )
+        amount_out = amount_out_raw / (10 ** decimals_out)
+        return {
+            'success': True,
+            'dex': self.dex,
+            'chain': self.chain,
+            'token_in': token_in,
+            'token_out': token_out,
+            'amount_in': amount_in,
+            'amount_out': amount_out,
+            'price': amount_out / amount_in if amount_in > 0 else 0,
+            'fee_pct': pair['fee_pct'],
+            'gas_estimate': 150000,
+            'route': f"{token_in} -> {token_out}"
+        }
@@ -0,0 +1,314 @@
+"""
+Multicall Batcher - Agrupa leituras eth_call em chamadas Multicall3 por chain
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Tuple
+
+from eth_abi import decode as abi_decode
+from eth_utils import to_bytes, to_checksum_address
+from prometheus_client import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+# === PROMETHEUS METRICS ===
+dex_multicall_batch_size = Histogram(
+    'dex_multicall_batch_size',
+    'Number of reads aggregated per Multicall3 batch',
+    ['chain'],
+    buckets=[1, 2, 5, 10, 25, 50, 100, 250, 500]
+)
+
+dex_multicall_latency_ms = Histogram(
+    'dex_multicall_latency_ms',
+    'Multicall3 batch round-trip latency in milliseconds',
+    ['chain'],
+    buckets=[10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+)
+
+dex_multicall_failures = Counter(
+    'dex_multicall_failures_total',
+    'Multicall3 batches that failed and fell back to individual calls',
+    ['chain']
+)
+
+
+def abi_output_types(fn_abi: Dict) -> List[str]:
+    """Tipos canônicos de saída de uma entrada de ABI"""
+    def collapse(output: Dict) -> str:
+        abi_type = output['type']
+        if abi_type.startswith('tuple'):
+            inner = ','.join(collapse(c) for c in output.get('components', []))
+            return f"({inner}){abi_type[len('tuple'):]}"
+        return abi_type
+
+    return [collapse(o) for o in fn_abi.get('outputs', [])]
+
+
+def encode_call_data(fn) -> bytes:
+    """
+    Calldata de um ``ContractFunction`` pela API pública do web3
+    (``encode_abi`` no web3 7, ``encodeABI`` no web3 6)
+    """
+    contract = fn.w3.eth.contract(address=fn.address, abi=[fn.abi])
+    args = tuple(fn.args or ())
+    kwargs = dict(fn.kwargs or {})
+    if hasattr(contract, 'encode_abi'):
+        data = contract.encode_abi(fn.fn_name, args=args, kwargs=kwargs)
+    else:
+        data = contract.encodeABI(fn_name=fn.fn_name, args=args, kwargs=kwargs)
+    return to_bytes(hexstr=data)
+
+
+class MulticallBatcher:
+    """
+    Agrupador de leituras on-chain.
+
+    Leituras emitidas dentro de uma janela curta (``window_ms``) na mesma
+    chain são enviadas como um único ``aggregate3`` do Multicall3 e os
+    resultados são devolvidos a cada chamador. Se o aggregate falhar, as
+    leituras do lote são refeitas individualmente; se nem isso for possível
+    (ex: RPC fora), todos os chamadores do lote recebem a exceção. Cada
+    chamador espera no máximo ``call_timeout`` segundos.
+    """
+
+    # Multicall3 tem o mesmo endereço em todas as chains suportadas
+    MULTICALL3_ADDRESS = '0xcA11bde05977b3631167028862bE2a173976CA11'
+
+    MULTICALL3_ABI = [
+        {
+            "inputs": [
+                {
+                    "components": [
+                        {"internalType": "address", "name": "target", "type": "address"},
+                        {"internalType": "bool", "name": "allowFailure", "type": "bool"},
+                        {"internalType": "bytes", "name": "callData", "type": "bytes"}
+                    ],
+                    "internalType": "struct Multicall3.Call3[]",
+                    "name": "calls",
+                    "type": "tuple[]"
+                }
+            ],
+            "name": "aggregate3",
+            "outputs": [
+                {
+                    "components": [
+                        {"internalType": "bool", "name": "success", "type": "bool"},
+                        {"internalType": "bytes", "name": "returnData", "type": "bytes"}
+                    ],
+                    "internalType": "struct Multicall3.Result[]",
+                    "name": "returnData",
+                    "type": "tuple[]"
+                }
+            ],
+            "stateMutability": "payable",
+            "type": "function"
+        },
+        {
+            "inputs": [{"internalType": "address", "name": "addr", "type": "address"}],
+            "name": "getEthBalance",
+            "outputs": [{"internalType": "uint256", "name": "balance", "type": "uint256"}],
+            "stateMutability": "view",
+            "type": "function"
+        }
+    ]
+
+    def __init__(self, gateway, config: Dict = None):
+        """
+        Inicializa MulticallBatcher.
+
+        Args:
+            gateway: Instância do Web3Gateway
+            config: Configuração opcional
+        """
+        self.gateway = gateway
+        self.config = config or {}
+        self.window_ms = float(self.config.get('MULTICALL_WINDOW_MS', 5))
+        self.max_batch_size = int(self.config.get('MULTICALL_MAX_BATCH_SIZE', 200))
+        self.call_timeout = float(self.config.get('MULTICALL_CALL_TIMEOUT_SECONDS', 30))
+
+        # chain -> lista de (target, call_data, output_types, future)
+        self._pending: Dict[str, List[Tuple[str, bytes, List[str], asyncio.Future]]] = {}
+        self._flush_handles: Dict[str, asyncio.TimerHandle] = {}
+        self._tasks: set = set()
+
+        self.stats = {
+            'batches': 0,
+            'calls': 0,
+            'fallbacks': 0,
+            'failed_batches': 0,
+            'timeouts': 0,
+            'last_batch_size': 0,
+            'last_latency_ms': 0.0
+        }
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+
+    async def call(
+        self,
+        chain: str,
+        target: str,
+        call_data: bytes,
+        output_types: List[str]
+    ) -> Tuple:
+        """
+        Enfileira uma leitura e aguarda o resultado decodificado.
+
+        Args:
+            chain: Nome da chain
+            target: Endereço do contrato
+            call_data: Calldata ABI-encoded
+            output_types: Tipos de saída para decodificação
+
+        Returns:
+            Tupla decodificada
+
+        Raises:
+            asyncio.TimeoutError: Sem resultado em ``call_timeout`` segundos
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending.setdefault(chain, [])
+        pending.append((to_checksum_address(target), bytes(call_data), output_types, future))
+
+        if len(pending) >= self.max_batch_size:
+            self._schedule_flush(chain, immediate=True)
+        elif chain not in self._flush_handles:
+            self._schedule_flush(chain)
+
+        try:
+            return await asyncio.wait_for(future, self.call_timeout)
+        except asyncio.TimeoutError:
+            self.stats['timeouts'] += 1
+            raise
+
+    async def call_function(self, fn, chain: str) -> Any:
+        """
+        Executa ``ContractFunction`` via lote.
+
+        Args:
+            fn: Função de contrato web3 já com argumentos (ex: token.functions.decimals())
+            chain: Nome da chain
+
+        Returns:
+            Valor decodificado (escalar se houver uma única saída)
+        """
+        output_types = abi_output_types(fn.abi)
+        result = await self.call(chain, fn.address, encode_call_data(fn), output_types)
+        return result[0] if len(result) == 1 else result
+
+    async def get_eth_balance(self, address: str, chain: str) -> int:
+        """Balance nativo (wei) via Multicall3.getEthBalance"""
+        w3 = await self.gateway.connect_to_chain(chain)
+        multicall = w3.eth.contract(
+            address=to_checksum_address(self.MULTICALL3_ADDRESS),
+            abi=self.MULTICALL3_ABI
+        )
+        return await self.call_function(
+            multicall.functions.getEthBalance(to_checksum_address(address)),
+            chain
+        )
+
+    # ------------------------------------------------------------------
+    # Flush
+    # ------------------------------------------------------------------
+
+    def _schedule_flush(self, chain: str, immediate: bool = False):
+        loop = asyncio.get_running_loop()
+        handle = self._flush_handles.pop(chain, None)
+        if handle is not None:
+            handle.cancel()
+        if immediate:
+            self._start_flush(chain)
+        else:
+            self._flush_handles[chain] = loop.call_later(
+                self.window_ms / 1000,
+                self._start_flush,
+                chain
+            )
+
+    def _start_flush(self, chain: str):
+        task = asyncio.get_running_loop().create_task(self._flush(chain))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush(self, chain: str):
+        self._flush_handles.pop(chain, None)
+        batch = self._pending.pop(chain, [])
+        if not batch:
+            return
+
+        start = time.perf_counter()
+        try:
+            try:
+                results = await self._aggregate(chain, batch)
+            except Exception as e:
+                logger.warning(f"Multicall falhou em {chain} ({len(batch)} leituras), refazendo individualmente: {e}")
+                dex_multicall_failures.labels(chain=chain).inc()
+                self.stats['fallbacks'] += 1
+                results = await self._individual(chain, batch)
+        except BaseException as e:
+            # Nenhum resultado: nenhum chamador do lote pode ficar esperando
+            logger.error(f"Leituras on-chain em {chain} falharam ({len(batch)} leituras): {e}")
+            self.stats['failed_batches'] += 1
+            error = e if isinstance(e, Exception) else RuntimeError(f'Lote multicall cancelado: {e!r}')
+            for _, _, _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            if not isinstance(e, Exception):
+                raise
+            return
+
+        latency_ms = (time.perf_counter() - start) * 1000
+        dex_multicall_batch_size.labels(chain=chain).observe(len(batch))
+        dex_multicall_latency_ms.labels(chain=chain).observe(latency_ms)
+        self.stats['batches'] += 1
+        self.stats['calls'] += len(batch)
+        self.stats['last_batch_size'] = len(batch)
+        self.stats['last_latency_ms'] = latency_ms
+
+        for (_, _, output_types, future), (success, data) in zip(batch, results):
+            if future.done():
+                continue
+            if not success:
+                future.set_exception(RuntimeError('Leitura on-chain revertida'))
+                continue
+            try:
+                future.set_result(abi_decode(output_types, data))
+            except Exception as e:
+                future.set_exception(e)
+
+    async def _aggregate(self, chain: str, batch: List) -> List[Tuple[bool, bytes]]:
+        """Executa o lote como um único aggregate3"""
+        w3 = await self.gateway.connect_to_chain(chain)
+        multicall = w3.eth.contract(
+            address=to_checksum_address(self.MULTICALL3_ADDRESS),
+            abi=self.MULTICALL3_ABI
+        )
+        calls = [(target, True, call_data) for target, call_data, _, _ in batch]
+        return await asyncio.to_thread(multicall.functions.aggregate3(calls).call)
+
+    async def _individual(self, chain: str, batch: List) -> List[Tuple[bool, bytes]]:
+        """Fallback: um eth_call por leitura, em paralelo"""
+        w3 = await self.gateway.connect_to_chain(chain)
+
+        async def one(target: str, call_data: bytes) -> Tuple[bool, bytes]:
+            try:
+                data = await asyncio.to_thread(w3.eth.call, {'to': target, 'data': call_data})
+                return True, bytes(data)
+            except Exception:
+                return False, b''
+
+        return await asyncio.gather(*(one(target, call_data) for target, call_data, _, _ in batch))
+
+    def get_stats(self) -> Dict:
+        """Estatísticas de batching"""
+        avg = self.stats['calls'] / self.stats['batches'] if self.stats['batches'] else 0.0
+        return {
+            **self.stats,
+            'avg_batch_size': avg,
+            'pending': {chain: len(calls) for chain, calls in self._pending.items()}
+        }
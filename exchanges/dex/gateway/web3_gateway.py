@@ -10,6 +10,7 @@ from web3.middleware import geth_poa_middleware
 from eth_account import Account
 from eth_utils import to_checksum_address
 import logging
+from .multicall import MulticallBatcher
 
 logger = logging.getLogger(__name__)
 
@@ -110,6 +111,13 @@ class Web3Gateway:
         self.wallet_address = config.get('WALLET_ADDRESS', '')
         self.private_key = config.get('WALLET_PRIVATE_KEY', '')
         
+        # Leituras agrupadas via Multicall3
+        self.multicall_enabled = config.get('MULTICALL_ENABLED', True)
+        self.multicall = MulticallBatcher(self, config)
+        
+        # Decimals são imutáveis: cache indefinido
+        self._decimals_cache: Dict[tuple, int] = {}
+        
         # Override RPC URLs se fornecidas no config
         for chain in self.SUPPORTED_CHAINS:
             env_key = f"{chain.upper()}_RPC_URL"
@@ -157,6 +165,21 @@ class Web3Gateway:
             logger.error(f"Erro ao conectar com {chain_name}: {e}")
             raise
 
+    async def batch_call(self, fn, chain: str) -> Any:
+        """
+        Executa leitura de contrato (eth_call) agrupada com outras leituras.
+        
+        Args:
+            fn: ContractFunction com argumentos (ex: contract.functions.decimals())
+            chain: Nome da chain
+            
+        Returns:
+            Valor decodificado
+        """
+        if self.multicall_enabled:
+            return await self.multicall.call_function(fn, chain)
+        return await asyncio.to_thread(fn.call)
+
     async def get_balance(
         self,
         address: str,
@@ -180,7 +203,10 @@ class Web3Gateway:
         try:
             if token is None:
                 # Native token (ETH, BNB, MATIC)
-                balance_wei = w3.eth.get_balance(address)
+                if self.multicall_enabled:
+                    balance_wei = await self.multicall.get_eth_balance(address, chain)
+                else:
+                    balance_wei = w3.eth.get_balance(address)
                 balance = w3.from_wei(balance_wei, 'ether')
                 return float(balance)
             else:
@@ -188,8 +214,10 @@ class Web3Gateway:
                 token = to_checksum_address(token)
                 contract = w3.eth.contract(address=token, abi=self.ERC20_ABI)
                 
-                balance = contract.functions.balanceOf(address).call()
-                decimals = contract.functions.decimals().call()
+                balance, decimals = await asyncio.gather(
+                    self.batch_call(contract.functions.balanceOf(address), chain),
+                    self.get_token_decimals(token, chain)
+                )
                 
                 return float(balance) / (10 ** decimals)
                 
@@ -197,6 +225,37 @@ class Web3Gateway:
             logger.error(f"Erro ao obter balance em {chain}: {e}")
             return 0.0
 
+    async def get_block_number(self, chain: str = 'ethereum') -> int:
+        """
+        Obtém número do bloco mais recente.
+        
+        Args:
+            chain: Nome da chain
+            
+        Returns:
+            Número do bloco
+        """
+        w3 = await self.connect_to_chain(chain)
+        return int(await asyncio.to_thread(lambda: w3.eth.block_number))
+
+    async def get_token_decimals(self, token: str, chain: str = 'ethereum') -> int:
+        """
+        Obtém decimals de um token ERC20.
+        
+        Args:
+            token: Endereço do token
+            chain: Nome da chain
+            
+        Returns:
+            Decimals do token
+        """
+        key = (chain, token.lower())
+        if key not in self._decimals_cache:
+            w3 = await self.connect_to_chain(chain)
+            contract = w3.eth.contract(address=to_checksum_address(token), abi=self.ERC20_ABI)
+            self._decimals_cache[key] = int(await self.batch_call(contract.functions.decimals(), chain))
+        return self._decimals_cache[key]
+
     async def send_transaction(
         self,
         transaction: Dict,
@@ -351,7 +410,7 @@ class Web3Gateway:
             spender_address = to_checksum_address(spender_address)
             
             contract = w3.eth.contract(address=token_address, abi=self.ERC20_ABI)
-            decimals = contract.functions.decimals().call()
+            decimals = await self.get_token_decimals(token_address, chain)
             
             # Converter amount para wei
             amount_wei = int(amount * (10 ** decimals))
@@ -404,12 +463,13 @@ class Web3Gateway:
             
             contract = w3.eth.contract(address=token_address, abi=self.ERC20_ABI)
             
-            allowance = contract.functions.allowance(
-                owner_address,
-                spender_address
-            ).call()
-            
-            decimals = contract.functions.decimals().call()
+            allowance, decimals = await asyncio.gather(
+                self.batch_call(
+                    contract.functions.allowance(owner_address, spender_address),
+                    chain
+                ),
+                self.get_token_decimals(token_address, chain)
+            )
             
             return float(allowance) / (10 ** decimals)
             
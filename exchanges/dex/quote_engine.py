@@ -0,0 +1,526 @@
+"""
+Quote Engine - Agregação concorrente de cotações DEX com cache de estado de pools
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def constant_product_amount_out(
+    amount_in: int,
+    reserve_in: float,
+    reserve_out: float,
+    fee_pct: float
+) -> float:
+    """
+    Calcula saída de um swap x*y=k.
+
+    Args:
+        amount_in: Quantidade de entrada (unidades raw)
+        reserve_in: Reserva do token de entrada (raw)
+        reserve_out: Reserva do token de saída (raw)
+        fee_pct: Fee da pool em % (ex: 0.3)
+
+    Returns:
+        Quantidade de saída (unidades raw)
+    """
+    if amount_in <= 0 or reserve_in <= 0 or reserve_out <= 0:
+        return 0.0
+    amount_in_with_fee = amount_in * (1 - fee_pct / 100)
+    return reserve_out * amount_in_with_fee / (reserve_in + amount_in_with_fee)
+
+
+class QuoteEngine:
+    """
+    Motor de cotações para DEXs.
+
+    Features:
+    - Fan-out concorrente para todos os conectores da chain
+    - Limite de concorrência por chain
+    - Cache de reservas (V2) / slot0 (V3) por bloco
+    - Cache indefinido de metadata de tokens (decimals, endereços)
+    - Cotação local x*y=k enquanto o bloco não avança
+
+    A fonte de chain (``chain_source``) só precisa expor
+    ``get_block_number(chain)`` e ``get_token_decimals(token, chain)``;
+    o Web3Gateway e o InMemoryChain implementam essa interface.
+    """
+
+    # Intervalo mínimo entre leituras de bloco por chain (segundos)
+    BLOCK_POLL_INTERVALS = {
+        'ethereum': 2.0,
+        'bsc': 1.0,
+        'polygon': 1.0,
+        'arbitrum': 0.25
+    }
+
+    DEFAULT_GAS = {
+        'v2': 150000,
+        'v3': 200000
+    }
+
+    def __init__(
+        self,
+        connectors: Dict,
+        chain_source,
+        config: Dict = None,
+        token_addresses: Optional[Dict[str, Dict[str, str]]] = None
+    ):
+        """
+        Inicializa QuoteEngine.
+
+        Args:
+            connectors: Dict nome -> conector (formato dex_chain)
+            chain_source: Fonte de bloco e decimals (Web3Gateway ou InMemoryChain)
+            config: Configuração opcional
+            token_addresses: Mapa chain -> símbolo -> endereço
+        """
+        self.config = config or {}
+        self.connectors = connectors
+        self.chain_source = chain_source
+        self.token_addresses = token_addresses or {}
+
+        self.max_concurrency_per_chain = int(self.config.get('DEX_MAX_CONCURRENCY_PER_CHAIN', 8))
+        # Acima desse impacto, a aproximação V3 (liquidez virtual) é substituída pelo quoter
+        self.max_local_v3_impact_pct = float(self.config.get('DEX_MAX_LOCAL_V3_IMPACT_PCT', 1.0))
+
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+        # chain -> (block_number, lido_em)
+        self._blocks: Dict[str, Tuple[int, float]] = {}
+        self._block_inflight: Dict[str, asyncio.Future] = {}
+
+        # (connector, token_a, token_b, fee) -> (block_number, state)
+        self._pool_states: Dict[tuple, Tuple[int, Dict]] = {}
+        self._pool_inflight: Dict[tuple, asyncio.Future] = {}
+
+        # Cache indefinido de metadata
+        self._decimals: Dict[Tuple[str, str], int] = {}
+        self._resolved: Dict[Tuple[str, str], str] = {}
+
+        self.stats = {
+            'quotes_local': 0,
+            'quotes_rpc': 0,
+            'pool_state_hits': 0,
+            'pool_state_misses': 0,
+            'block_reads': 0
+        }
+
+        logger.info(f"QuoteEngine initialized with {len(connectors)} connectors")
+
+    # ------------------------------------------------------------------
+    # Metadata
+    # ------------------------------------------------------------------
+
+    def resolve_token_address(self, token: str, chain: str) -> str:
+        """Resolve símbolo para endereço (cache indefinido)"""
+        if token.startswith('0x'):
+            return token
+
+        key = (chain, token.upper())
+        address = self._resolved.get(key)
+        if address is None:
+            address = self.token_addresses.get(chain, {}).get(token.upper())
+            if not address:
+                raise ValueError(f"Token {token} não encontrado em {chain}")
+            self._resolved[key] = address
+        return address
+
+    async def get_decimals(self, token: str, chain: str) -> int:
+        """Decimals do token (cache indefinido)"""
+        key = (chain, token.lower())
+        decimals = self._decimals.get(key)
+        if decimals is None:
+            decimals = await self.chain_source.get_token_decimals(token, chain)
+            self._decimals[key] = decimals
+        return decimals
+
+    # ------------------------------------------------------------------
+    # Bloco e estado de pools
+    # ------------------------------------------------------------------
+
+    def _semaphore(self, chain: str) -> asyncio.Semaphore:
+        if chain not in self._semaphores:
+            self._semaphores[chain] = asyncio.Semaphore(self.max_concurrency_per_chain)
+        return self._semaphores[chain]
+
+    async def get_block_number(self, chain: str) -> int:
+        """Número do bloco atual (leituras concorrentes são coalescidas)"""
+        cached = self._blocks.get(chain)
+        interval = self.BLOCK_POLL_INTERVALS.get(chain, 1.0)
+        if cached and time.monotonic() - cached[1] < interval:
+            return cached[0]
+
+        inflight = self._block_inflight.get(chain)
+        if inflight is not None:
+            return await inflight
+
+        future = asyncio.get_running_loop().create_future()
+        self._block_inflight[chain] = future
+        try:
+            async with self._semaphore(chain):
+                block_number = await self.chain_source.get_block_number(chain)
+            self._blocks[chain] = (block_number, time.monotonic())
+            self.stats['block_reads'] += 1
+            future.set_result(block_number)
+            return block_number
+        except Exception as e:
+            future.set_exception(e)
+            # Evita "exception was never retrieved" quando ninguém aguarda
+            future.exception()
+            raise
+        finally:
+            self._block_inflight.pop(chain, None)
+
+    @staticmethod
+    def _pool_kind(connector) -> Optional[str]:
+        if hasattr(connector, 'get_pair_reserves'):
+            return 'v2'
+        if hasattr(connector, 'get_pool_info'):
+            return 'v3'
+        return None
+
+    async def _read_pool_state(self, connector, kind: str, token_a: str, token_b: str, fee_tier) -> Dict:
+        if kind == 'v2':
+            return await connector.get_pair_reserves(token_a, token_b)
+        return await connector.get_pool_info(token_a, token_b, fee_tier)
+
+    async def get_pool_state(
+        self,
+        connector_name: str,
+        token_a: str,
+        token_b: str,
+        block_number: int,
+        fee_tier: Optional[int] = None
+    ) -> Dict:
+        """
+        Estado da pool válido para o bloco informado.
+
+        Reutiliza o estado em cache se o bloco não avançou; leituras
+        simultâneas da mesma pool são coalescidas em uma só. Pools
+        inexistentes e leituras com erro também ficam em cache no bloco
+        (``{'success': False, ...}``), para que fee tiers sem pool não sejam
+        consultados de novo a cada cotação.
+        """
+        connector = self.connectors[connector_name]
+        kind = self._pool_kind(connector)
+        key = (connector_name,) + tuple(sorted([token_a.lower(), token_b.lower()])) + (fee_tier,)
+
+        cached = self._pool_states.get(key)
+        if cached and cached[0] >= block_number:
+            self.stats['pool_state_hits'] += 1
+            return cached[1]
+
+        inflight = self._pool_inflight.get(key)
+        if inflight is not None:
+            return await inflight
+
+        self.stats['pool_state_misses'] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._pool_inflight[key] = future
+        try:
+            try:
+                async with self._semaphore(connector.chain):
+                    state = await self._read_pool_state(connector, kind, token_a, token_b, fee_tier)
+            except Exception as e:
+                state = {'success': False, 'error': str(e)}
+            self._pool_states[key] = (block_number, state)
+            future.set_result(state)
+            return state
+        except asyncio.CancelledError:
+            future.cancel()  # quem aguarda a mesma leitura não fica preso
+            raise
+        finally:
+            self._pool_inflight.pop(key, None)
+
+    def invalidate(self, chain: Optional[str] = None):
+        """Descarta estado de pools (ex: reorg)"""
+        if chain is None:
+            self._pool_states.clear()
+            self._blocks.clear()
+            return
+        for key in [k for k in self._pool_states if self.connectors[k[0]].chain == chain]:
+            del self._pool_states[key]
+        self._blocks.pop(chain, None)
+
+    # ------------------------------------------------------------------
+    # Cotações
+    # ------------------------------------------------------------------
+
+    def _local_v2_quote(self, state: Dict, token_in: str, amount_in_raw: int) -> Tuple[float, float]:
+        """Retorna (amount_out_raw, preço spot raw) para pool V2"""
+        if state['token0'].lower() == token_in.lower():
+            reserve_in, reserve_out = state['reserve0'], state['reserve1']
+        else:
+            reserve_in, reserve_out = state['reserve1'], state['reserve0']
+        amount_out = constant_product_amount_out(amount_in_raw, reserve_in, reserve_out, state['fee_pct'])
+        spot = reserve_out / reserve_in if reserve_in > 0 else 0.0
+        return amount_out, spot
+
+    def _local_v3_quote(self, state: Dict, token_in: str, amount_in_raw: int) -> Tuple[float, float]:
+        """
+        Aproximação dentro do tick atual: reservas virtuais
+        x = L / sqrtP e y = L * sqrtP seguem x*y=k.
+        """
+        sqrt_price = state['sqrt_price_x96'] / (2 ** 96)
+        liquidity = state['liquidity']
+        if sqrt_price <= 0 or liquidity <= 0:
+            return 0.0, 0.0
+        reserve0 = liquidity / sqrt_price
+        reserve1 = liquidity * sqrt_price
+        if state['token0'].lower() == token_in.lower():
+            reserve_in, reserve_out = reserve0, reserve1
+        else:
+            reserve_in, reserve_out = reserve1, reserve0
+        amount_out = constant_product_amount_out(amount_in_raw, reserve_in, reserve_out, state['fee_pct'])
+        return amount_out, reserve_out / reserve_in
+
+    async def _quote_connector(
+        self,
+        connector_name: str,
+        token_in: str,
+        token_out: str,
+        amount_in: float,
+        block_number: int
+    ) -> Dict:
+        connector = self.connectors[connector_name]
+        kind = self._pool_kind(connector)
+
+        if kind is not None:
+            try:
+                quote = await self._local_quote(
+                    connector_name, kind, token_in, token_out, amount_in, block_number
+                )
+                if quote is not None:
+                    self.stats['quotes_local'] += 1
+                    return quote
+            except Exception as e:
+                logger.debug(f"Cotação local indisponível em {connector_name}: {e}")
+
+        # Fallback: cotação on-chain do próprio conector
+        async with self._semaphore(connector.chain):
+            quote = await connector.get_quote(token_in, token_out, amount_in)
+        if quote.get('success'):
+            quote['source'] = 'rpc'
+            quote['block_number'] = block_number
+        self.stats['quotes_rpc'] += 1
+        return quote
+
+    async def _local_quote(
+        self,
+        connector_name: str,
+        kind: str,
+        token_in: str,
+        token_out: str,
+        amount_in: float,
+        block_number: int
+    ) -> Optional[Dict]:
+        chain = self.connectors[connector_name].chain
+        decimals_in, decimals_out = await asyncio.gather(
+            self.get_decimals(token_in, chain),
+            self.get_decimals(token_out, chain)
+        )
+        amount_in_raw = int(amount_in * (10 ** decimals_in))
+
+        if kind == 'v2':
+            state = await self.get_pool_state(connector_name, token_in, token_out, block_number)
+            if not state.get('success'):
+                return None
+            amount_out_raw, spot = self._local_v2_quote(state, token_in, amount_in_raw)
+            fee_pct = state['fee_pct']
+            fee_tier = None
+        else:
+            fee_tiers = getattr(self.connectors[connector_name], 'FEE_TIERS', [3000])
+            states = await asyncio.gather(*(
+                self.get_pool_state(connector_name, token_in, token_out, block_number, fee)
+                for fee in fee_tiers
+            ), return_exceptions=True)
+            best = None
+            for state in states:
+                if isinstance(state, Exception) or not state.get('success'):
+                    continue
+                out, spot_tier = self._local_v3_quote(state, token_in, amount_in_raw)
+                if best is None or out > best[0]:
+                    best = (out, spot_tier, state)
+            if best is None:
+                return None
+            amount_out_raw, spot, state = best
+            fee_pct = state['fee_pct']
+            fee_tier = state['fee_tier']
+
+            # Trades grandes cruzam ticks: a aproximação deixa de valer
+            if spot > 0 and amount_in_raw > 0:
+                impact_pct = (1 - (amount_out_raw / amount_in_raw) / (spot * (1 - fee_pct / 100))) * 100
+                if impact_pct > self.max_local_v3_impact_pct:
+                    return None
+
+        if amount_out_raw <= 0:
+            return None
+
+        amount_out = amount_out_raw / (10 ** decimals_out)
+        price = amount_out / amount_in if amount_in > 0 else 0
+        spot_price = spot * (10 ** decimals_in) / (10 ** decimals_out)
+        price_impact_pct = (1 - price / (spot_price * (1 - fee_pct / 100))) * 100 if spot_price > 0 else 0
+
+        quote = {
+            'success': True,
+            'dex': state['dex'],
+            'chain': state['chain'],
+            'token_in': token_in,
+            'token_out': token_out,
+            'amount_in': amount_in,
+            'amount_out': amount_out,
+            'price': price,
+            'price_impact_pct': price_impact_pct,
+            'fee_pct': fee_pct,
+            'gas_estimate': self.DEFAULT_GAS[kind],
+            'route': f"{token_in} -> {token_out}" + (f" (fee: {fee_pct}%)" if fee_tier else ''),
+            'source': 'local',
+            'block_number': block_number
+        }
+        if fee_tier is not None:
+            quote['fee_tier'] = fee_tier
+        return quote
+
+    async def get_pool_rates(
+        self,
+        chain: str,
+        token_a: str,
+        token_b: str,
+        block_number: int
+    ) -> List[Tuple[str, float, float]]:
+        """
+        Taxas spot efetivas (já sem fee) de todas as pools entre dois tokens.
+
+        Returns:
+            Lista de (pool_id, taxa a->b, taxa b->a) em unidades de token
+        """
+        decimals_a, decimals_b = await asyncio.gather(
+            self.get_decimals(token_a, chain),
+            self.get_decimals(token_b, chain)
+        )
+
+        reads = []
+        for name in self.connectors_for_chain(chain):
+            kind = self._pool_kind(self.connectors[name])
+            if kind == 'v2':
+                reads.append((name, None))
+            elif kind == 'v3':
+                for fee in getattr(self.connectors[name], 'FEE_TIERS', [3000]):
+                    reads.append((name, fee))
+
+        states = await asyncio.gather(*(
+            self.get_pool_state(name, token_a, token_b, block_number, fee)
+            for name, fee in reads
+        ), return_exceptions=True)
+
+        rates = []
+        for (name, fee), state in zip(reads, states):
+            if isinstance(state, Exception) or not state.get('success'):
+                continue
+
+            # Preço token1/token0 em unidades raw
+            if 'sqrt_price_x96' in state:
+                if state['liquidity'] <= 0:
+                    continue
+                raw_price = (state['sqrt_price_x96'] / (2 ** 96)) ** 2
+            else:
+                if state['reserve0'] <= 0 or state['reserve1'] <= 0:
+                    continue
+                raw_price = state['reserve1'] / state['reserve0']
+
+            a_is_token0 = state['token0'].lower() == token_a.lower()
+            decimals0, decimals1 = (decimals_a, decimals_b) if a_is_token0 else (decimals_b, decimals_a)
+            price_1_per_0 = raw_price * (10 ** decimals0) / (10 ** decimals1)
+            if price_1_per_0 <= 0:
+                continue
+
+            fee_factor = 1 - state['fee_pct'] / 100
+            rate_0_to_1 = price_1_per_0 * fee_factor
+            rate_1_to_0 = fee_factor / price_1_per_0
+            pool_id = f"{name}:{state.get('pool_address') or state.get('pair_address') or fee}"
+
+            if a_is_token0:
+                rates.append((pool_id, rate_0_to_1, rate_1_to_0))
+            else:
+                rates.append((pool_id, rate_1_to_0, rate_0_to_1))
+
+        return rates
+
+    def connectors_for_chain(self, chain: str) -> List[str]:
+        """Conectores disponíveis em uma chain"""
+        return [
+            name for name, connector in self.connectors.items()
+            if getattr(connector, 'chain', None) == chain
+        ]
+
+    async def get_quotes(
+        self,
+        token_in: str,
+        token_out: str,
+        amount_in: float,
+        chain: str = 'ethereum'
+    ) -> List[Dict]:
+        """
+        Cotações de todos os conectores da chain em paralelo.
+
+        Args:
+            token_in: Endereço ou símbolo do token de entrada
+            token_out: Endereço ou símbolo do token de saída
+            amount_in: Quantidade de entrada
+            chain: Chain
+
+        Returns:
+            Lista de cotações bem-sucedidas (com 'connector_name')
+        """
+        token_in = self.resolve_token_address(token_in, chain)
+        token_out = self.resolve_token_address(token_out, chain)
+        names = self.connectors_for_chain(chain)
+        if not names:
+            return []
+
+        block_number = await self.get_block_number(chain)
+        results = await asyncio.gather(*(
+            self._quote_connector(name, token_in, token_out, amount_in, block_number)
+            for name in names
+        ), return_exceptions=True)
+
+        quotes = []
+        for name, result in zip(names, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Erro ao obter quote de {name}: {result}")
+                continue
+            if result.get('success'):
+                result['connector_name'] = name
+                quotes.append(result)
+        return quotes
+
+    async def get_quotes_multi_chain(
+        self,
+        token_in: str,
+        token_out: str,
+        amount_in: float,
+        chains: List[str]
+    ) -> Dict[str, List[Dict]]:
+        """Cotações em várias chains em paralelo"""
+        async def for_chain(chain: str):
+            try:
+                return await self.get_quotes(token_in, token_out, amount_in, chain)
+            except Exception as e:
+                logger.debug(f"Sem cotações em {chain}: {e}")
+                return []
+
+        results = await asyncio.gather(*(for_chain(chain) for chain in chains))
+        return dict(zip(chains, results))
+
+    def get_stats(self) -> Dict:
+        """Estatísticas do engine"""
+        return {
+            **self.stats,
+            'cached_pools': len(self._pool_states),
+            'cached_tokens': len(self._decimals),
+            'blocks': {chain: block for chain, (block, _) in self._blocks.items()}
+        }
@@ -0,0 +1,266 @@
+"""
+Token Graph - Grafo de tokens/pools com índice de ciclos para arbitragem triangular
+"""
+import logging
+import math
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class TokenGraph:
+    """
+    Grafo dirigido de tokens de uma chain.
+
+    Cada aresta i -> j guarda ``-log(taxa efetiva)`` da melhor pool entre
+    os dois tokens (preço spot já descontado da fee). Um ciclo é lucrativo
+    quando a soma dos pesos é negativa (produto das taxas > 1).
+
+    Features:
+    - Construção incremental (pools adicionadas / reservas atualizadas)
+    - Índice pré-computado de todos os ciclos de 3 e 4 saltos
+    - Avaliação vetorizada de todos os ciclos em uma passada
+    - Busca Bellman-Ford de ciclos negativos de qualquer tamanho
+    """
+
+    def __init__(self, chain: str, initial_capacity: int = 32):
+        """
+        Inicializa TokenGraph.
+
+        Args:
+            chain: Nome da chain
+            initial_capacity: Capacidade inicial de tokens
+        """
+        self.chain = chain
+        self.tokens: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._adjacency: List[Set[int]] = []
+
+        # Matriz de pesos -log(taxa); inf onde não há pool
+        self._weights = np.full((initial_capacity, initial_capacity), np.inf)
+        # (i, j) -> {pool_id: peso}; a matriz guarda o melhor
+        self._edge_pools: Dict[Tuple[int, int], Dict[str, float]] = {}
+
+        self._cycles: Dict[int, Set[Tuple[int, ...]]] = {3: set(), 4: set()}
+        self._cycle_arrays: Dict[int, np.ndarray] = {}
+        self._cycles_dirty = {3: False, 4: False}
+
+    # ------------------------------------------------------------------
+    # Construção
+    # ------------------------------------------------------------------
+
+    def _node(self, token: str) -> int:
+        key = token.lower()
+        idx = self._index.get(key)
+        if idx is not None:
+            return idx
+
+        idx = len(self.tokens)
+        self._index[key] = idx
+        self.tokens.append(token)
+        self._adjacency.append(set())
+
+        if idx >= self._weights.shape[0]:
+            size = self._weights.shape[0] * 2
+            grown = np.full((size, size), np.inf)
+            grown[:idx, :idx] = self._weights[:idx, :idx]
+            self._weights = grown
+        return idx
+
+    def has_token(self, token: str) -> bool:
+        return token.lower() in self._index
+
+    def update_pool(self, pool_id: str, token_a: str, token_b: str, rate_ab: float, rate_ba: float):
+        """
+        Adiciona ou atualiza uma pool.
+
+        Args:
+            pool_id: Identificador único da pool (ex: 'sushiswap_ethereum:0x...')
+            token_a: Endereço do token A
+            token_b: Endereço do token B
+            rate_ab: Taxa efetiva A -> B (unidades de B por A, já sem fee)
+            rate_ba: Taxa efetiva B -> A
+        """
+        i = self._node(token_a)
+        j = self._node(token_b)
+        if i == j:
+            return
+
+        is_new_pair = j not in self._adjacency[i]
+        self._set_edge(i, j, pool_id, rate_ab)
+        self._set_edge(j, i, pool_id, rate_ba)
+
+        if is_new_pair:
+            self._adjacency[i].add(j)
+            self._adjacency[j].add(i)
+            self._index_cycles_through(i, j)
+
+    def _set_edge(self, i: int, j: int, pool_id: str, rate: float):
+        pools = self._edge_pools.setdefault((i, j), {})
+        pools[pool_id] = -math.log(rate) if rate > 0 else np.inf
+        self._weights[i, j] = min(pools.values())
+
+    def remove_pool(self, pool_id: str):
+        """Remove pool (a aresta continua se houver outra pool no par)"""
+        for (i, j), pools in self._edge_pools.items():
+            if pools.pop(pool_id, None) is not None:
+                self._weights[i, j] = min(pools.values()) if pools else np.inf
+
+    # ------------------------------------------------------------------
+    # Índice de ciclos
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _canonical(cycle: Tuple[int, ...]) -> Tuple[int, ...]:
+        """Rotaciona o ciclo para começar no menor nó (mantém a direção)"""
+        start = cycle.index(min(cycle))
+        return cycle[start:] + cycle[:start]
+
+    def _add_cycle(self, cycle: Tuple[int, ...]):
+        hops = len(cycle)
+        for directed in (cycle, tuple(reversed(cycle))):
+            canonical = self._canonical(directed)
+            if canonical not in self._cycles[hops]:
+                self._cycles[hops].add(canonical)
+                self._cycles_dirty[hops] = True
+
+    def _index_cycles_through(self, u: int, v: int):
+        """Enumera apenas os ciclos novos que passam pelo par u-v"""
+        adj = self._adjacency
+
+        # 3 saltos: u - v - w - u
+        for w in adj[u] & adj[v]:
+            self._add_cycle((u, v, w))
+
+        # 4 saltos: u - v - w - x - u
+        for w in adj[v]:
+            if w == u:
+                continue
+            for x in adj[w] & adj[u]:
+                if x != v and x != w:
+                    self._add_cycle((u, v, w, x))
+
+    def cycle_array(self, hops: int) -> np.ndarray:
+        """Ciclos de ``hops`` saltos como matriz (n_ciclos, hops) de índices"""
+        if self._cycles_dirty.get(hops) or hops not in self._cycle_arrays:
+            cycles = sorted(self._cycles.get(hops, ()))
+            self._cycle_arrays[hops] = (
+                np.array(cycles, dtype=np.int64) if cycles else np.empty((0, hops), dtype=np.int64)
+            )
+            self._cycles_dirty[hops] = False
+        return self._cycle_arrays[hops]
+
+    def cycle_count(self) -> Dict[int, int]:
+        return {hops: len(cycles) for hops, cycles in self._cycles.items()}
+
+    # ------------------------------------------------------------------
+    # Avaliação
+    # ------------------------------------------------------------------
+
+    def evaluate_cycles(self, hops: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Soma vetorizada dos pesos de todos os ciclos.
+
+        Returns:
+            (ciclos, custo) onde custo < 0 indica ciclo lucrativo
+        """
+        cycles = self.cycle_array(hops)
+        if len(cycles) == 0:
+            return cycles, np.empty(0)
+        nxt = np.roll(cycles, -1, axis=1)
+        cost = self._weights[cycles, nxt].sum(axis=1)
+        return cycles, cost
+
+    def top_cycles(self, k: int = 10, min_profit_pct: float = 0.0, hops: Tuple[int, ...] = (3, 4)) -> List[Dict]:
+        """
+        Melhores ciclos pelo preço spot.
+
+        Args:
+            k: Número máximo de ciclos
+            min_profit_pct: Lucro bruto mínimo (%)
+            hops: Tamanhos de ciclo considerados
+
+        Returns:
+            Lista de ciclos com tokens e lucro bruto estimado
+        """
+        max_cost = -math.log1p(min_profit_pct / 100)
+        candidates = []
+        for h in hops:
+            cycles, cost = self.evaluate_cycles(h)
+            if len(cost) == 0:
+                continue
+            mask = cost < max_cost
+            if not mask.any():
+                continue
+            sel_cycles, sel_cost = cycles[mask], cost[mask]
+            if len(sel_cost) > k:
+                part = np.argpartition(sel_cost, k)[:k]
+                sel_cycles, sel_cost = sel_cycles[part], sel_cost[part]
+            candidates.extend(zip(sel_cost.tolist(), sel_cycles.tolist()))
+
+        candidates.sort(key=lambda c: c[0])
+        return [
+            {
+                'tokens': [self.tokens[i] for i in cycle],
+                'hops': len(cycle),
+                'log_cost': cost,
+                'gross_profit_pct': math.expm1(-cost) * 100
+            }
+            for cost, cycle in candidates[:k]
+        ]
+
+    def find_negative_cycle(self) -> Optional[List[str]]:
+        """
+        Bellman-Ford vetorizado (fonte virtual ligada a todos os nós).
+
+        Returns:
+            Tokens de um ciclo negativo (qualquer tamanho) ou None
+        """
+        n = len(self.tokens)
+        if n < 2:
+            return None
+
+        weights = self._weights[:n, :n]
+        src, dst = np.nonzero(np.isfinite(weights))
+        if len(src) == 0:
+            return None
+        w = weights[src, dst]
+
+        dist = np.zeros(n)
+        pred = np.full(n, -1, dtype=np.int64)
+        updated = None
+
+        for _ in range(n):
+            cand = dist[src] + w
+            best = dist.copy()
+            np.minimum.at(best, dst, cand)
+            improved = best < dist - 1e-12
+            if not improved.any():
+                return None
+            # Predecessor: aresta que atingiu o novo mínimo
+            hit = improved[dst] & (cand <= best[dst])
+            pred[dst[hit]] = src[hit]
+            dist = best
+            updated = int(np.nonzero(improved)[0][0])
+
+        # Ainda relaxando após n iterações: caminha n predecessores para entrar no ciclo
+        node = updated
+        for _ in range(n):
+            node = pred[node]
+        cycle = [node]
+        current = pred[node]
+        while current != node and len(cycle) <= n:
+            cycle.append(current)
+            current = pred[current]
+        cycle.reverse()
+        return [self.tokens[i] for i in cycle]
+
+    def get_stats(self) -> Dict:
+        return {
+            'chain': self.chain,
+            'tokens': len(self.tokens),
+            'pairs': sum(len(a) for a in self._adjacency) // 2,
+            'cycles': self.cycle_count()
+        }
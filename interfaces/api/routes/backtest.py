@@ -4,14 +4,17 @@ Maveretta Backtest API Routes
 Endpoints para execução de backtests integrados com sistema de slots
 """
 
+import asyncio
 import logging
+import os
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from fastapi import APIRouter, HTTPException, Query, Path
 from pydantic import BaseModel, Field
 
 from core.runners import MaverettaBacktestRunner, run_slot_backtest
 from core.runners.backtest_cache import MaverettaBacktestCache
+from core.runners.backtest_jobs import BacktestJobManager, JOB_COMPLETED
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +36,16 @@ class MultiSlotBacktestRequest(BaseModel):
     """Requisição de backtest para múltiplos slots"""
     slots: List[Dict[str, Any]] = Field(..., description="Lista de configurações dos slots")
     period: Dict[str, str] = Field(..., description="Período global (start, end)")
+
+class BacktestJobRequest(BacktestRequest):
+    """Requisição de job de backtest assíncrono (um slot)"""
+    priority: int = Field(default=0, description="Prioridade (maior executa primeiro)")
+    force_refresh: bool = Field(default=False, description="Ignorar resultado em cache")
+
+class MultiSlotBacktestJobRequest(MultiSlotBacktestRequest):
+    """Requisição de job de backtest assíncrono (múltiplos slots)"""
+    priority: int = Field(default=0, description="Prioridade (maior executa primeiro)")
+    force_refresh: bool = Field(default=False, description="Ignorar resultado em cache")
     
 class BacktestResponse(BaseModel):
     """Resposta de backtest"""
@@ -63,6 +76,88 @@ class BacktestResponse(BaseModel):
 backtest_runner = MaverettaBacktestRunner()
 backtest_cache = MaverettaBacktestCache()
 
+# Fila de jobs (criada no primeiro uso, dentro do event loop)
+job_manager: Optional[BacktestJobManager] = None
+
+def _get_job_manager() -> BacktestJobManager:
+    """Retorna o gerenciador de jobs, publicando eventos no stream SSE"""
+    global job_manager
+    if job_manager is None:
+        loop = asyncio.get_running_loop()
+
+        def publish(event: Dict[str, Any]) -> None:
+            # Chamado das threads do gerenciador; publish roda no event loop
+            from core.orchestrator.events import event_publisher
+            loop.call_soon_threadsafe(event_publisher.publish, event)
+
+        job_manager = BacktestJobManager(
+            config={
+                'max_workers': int(os.getenv('BACKTEST_MAX_WORKERS', '0')) or None,
+                'max_tasks_per_job': int(os.getenv('BACKTEST_MAX_TASKS_PER_JOB', '0')) or None,
+            },
+            cache=backtest_cache,
+            publish=publish
+        )
+    return job_manager
+
+def _parse_period(start: str, end: str) -> Tuple[datetime, datetime]:
+    """Valida datas e período do backtest"""
+    try:
+        start_date = datetime.fromisoformat(start.replace('Z', '+00:00'))
+        end_date = datetime.fromisoformat(end.replace('Z', '+00:00'))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid date format: {e}")
+    
+    if start_date >= end_date:
+        raise HTTPException(status_code=400, detail="Start date must be before end date")
+    
+    if (end_date - start_date).days > 365:
+        raise HTTPException(status_code=400, detail="Backtest period cannot exceed 1 year")
+    
+    return start_date, end_date
+
+def _slot_task(request: BacktestRequest) -> Dict[str, Any]:
+    """Parâmetros de run_slot_backtest para uma requisição de slot"""
+    start_date, end_date = _parse_period(request.start_date, request.end_date)
+    return {
+        'slot_id': request.slot_id,
+        'pair': request.symbol,
+        'timeframe': request.timeframe,
+        'start_date': start_date,
+        'end_date': end_date,
+        'initial_capital': request.initial_capital,
+        'strategy': request.strategy,
+        'fee': request.fee
+    }
+
+def _multi_slot_tasks(request: MultiSlotBacktestRequest) -> List[Dict[str, Any]]:
+    """Parâmetros de run_slot_backtest por slot de uma requisição multi-slot"""
+    start_date, end_date = _parse_period(request.period['start'], request.period['end'])
+    
+    tasks = []
+    for slot_config in request.slots:
+        if 'slot_id' not in slot_config or 'symbol' not in slot_config:
+            raise HTTPException(status_code=400, detail="Each slot must have slot_id and symbol")
+        tasks.append({
+            'slot_id': slot_config['slot_id'],
+            'pair': slot_config['symbol'],
+            'timeframe': slot_config.get('timeframe', '1h'),
+            'start_date': start_date,
+            'end_date': end_date,
+            'initial_capital': slot_config.get('initial_capital', 10000.0),
+            'strategy': slot_config.get('strategy', 'momentum')
+        })
+    return tasks
+
+async def _wait_job(job_id: str):
+    """Aguarda o job sem bloquear o event loop"""
+    job = _get_job_manager().get_job(job_id)
+    # shield: desconexão do cliente não cancela o job compartilhado
+    await asyncio.shield(asyncio.wrap_future(job.done))
+    if job.status != JOB_COMPLETED:
+        raise HTTPException(status_code=500, detail=f"Backtest job {job.status}: {job.error or ''}")
+    return job
+
 @router.post("/run", response_model=BacktestResponse)
 async def run_backtest(request: BacktestRequest) -> BacktestResponse:
     """
@@ -77,63 +172,31 @@ async def run_backtest(request: BacktestRequest) -> BacktestResponse:
     try:
         logger.info(f"[API] Starting backtest for slot {request.slot_id}: {request.symbol} {request.timeframe}")
         
-        # Validar datas
-        try:
-            start_date = datetime.fromisoformat(request.start_date.replace('Z', '+00:00'))
-            end_date = datetime.fromisoformat(request.end_date.replace('Z', '+00:00'))
-        except ValueError as e:
-            raise HTTPException(status_code=400, detail=f"Invalid date format: {e}")
-        
-        # Validar período
-        if start_date >= end_date:
-            raise HTTPException(status_code=400, detail="Start date must be before end date")
-        
-        if (end_date - start_date).days > 365:
-            raise HTTPException(status_code=400, detail="Backtest period cannot exceed 1 year")
-        
-        # Executar backtest
-        result = backtest_runner.run_slot_backtest(
-            slot_id=request.slot_id,
-            pair=request.symbol,
-            timeframe=request.timeframe,
-            start_date=start_date,
-            end_date=end_date,
-            initial_capital=request.initial_capital,
-            strategy=request.strategy
-        )
+        # Executar backtest na fila de jobs (deduplicado/cache)
+        job = _get_job_manager().submit('slot', [_slot_task(request)])
+        job = await _wait_job(job.job_id)
+        result = job.result
         
         # Preparar resposta
         response = BacktestResponse(
             success=True,
-            backtest_id=result.backtest_id,
-            slot_id=result.slot_id,
-            pair=result.pair,
-            timeframe=result.timeframe,
-            total_return=result.total_return,
-            sharpe_ratio=result.sharpe_ratio,
-            max_drawdown=result.max_drawdown,
-            win_rate=result.win_rate,
-            trades_count=len(result.trades),
-            candles_analyzed=result.candles_analyzed,
-            execution_time_seconds=result.execution_time_seconds,
-            completed_at=result.completed_at.isoformat(),
-            trades=[
-                {
-                    'id': trade.id,
-                    'entry_time': trade.entry_time.isoformat() if trade.entry_time else None,
-                    'entry_price': trade.entry_price,
-                    'exit_time': trade.exit_time.isoformat() if trade.exit_time else None,
-                    'exit_price': trade.exit_price,
-                    'profit_abs': trade.profit_abs,
-                    'profit_pct': trade.profit_pct,
-                    'side': trade.side
-                }
-                for trade in result.trades
-            ]
+            backtest_id=result['backtest_id'],
+            slot_id=result['slot_id'],
+            pair=result['pair'],
+            timeframe=result['timeframe'],
+            total_return=result['total_return'],
+            sharpe_ratio=result['sharpe_ratio'],
+            max_drawdown=result['max_drawdown'],
+            win_rate=result['win_rate'],
+            trades_count=result['trades_count'],
+            candles_analyzed=result['candles_analyzed'],
+            execution_time_seconds=result['execution_time_seconds'],
+            completed_at=result['completed_at'],
+            trades=result['trades']
         )
         
         logger.info(f"[API] Backtest completed for slot {request.slot_id}: "
-                   f"{result.total_return:.2%} return, {len(result.trades)} trades")
+                   f"{result['total_return']:.2%} return, {result['trades_count']} trades")
         
         return response
         
@@ -157,29 +220,19 @@ async def run_multi_slot_backtest(request: MultiSlotBacktestRequest) -> Dict[str
     try:
         logger.info(f"[API] Starting multi-slot backtest for {len(request.slots)} slots")
         
-        # Validar período global
-        start_date = datetime.fromisoformat(request.period['start'].replace('Z', '+00:00'))
-        end_date = datetime.fromisoformat(request.period['end'].replace('Z', '+00:00'))
-        
-        # Validar configurações dos slots
-        for slot_config in request.slots:
-            if 'slot_id' not in slot_config or 'symbol' not in slot_config:
-                raise HTTPException(status_code=400, detail="Each slot must have slot_id and symbol")
-        
-        # Executar backtest multi-slot
-        results = backtest_runner.run_multi_slot_backtest(
-            slot_configs=request.slots,
-            start_date=start_date,
-            end_date=end_date
-        )
+        # Executar backtest multi-slot na fila de jobs (slots em paralelo)
+        tasks = _multi_slot_tasks(request)
+        job = _get_job_manager().submit('multi_slot', tasks)
+        job = await _wait_job(job.job_id)
+        results = job.result['results']
         
         # Preparar resposta agregada
         response_data = {
             'success': True,
             'total_slots': len(results),
             'period': {
-                'start_date': start_date.isoformat(),
-                'end_date': end_date.isoformat()
+                'start_date': tasks[0]['start_date'].isoformat(),
+                'end_date': tasks[0]['end_date'].isoformat()
             },
             'results': {}
         }
@@ -188,21 +241,21 @@ async def run_multi_slot_backtest(request: MultiSlotBacktestRequest) -> Dict[str
         total_return_sum = 0.0
         for slot_id, result in results.items():
             response_data['results'][slot_id] = {
-                'backtest_id': result.backtest_id,
-                'total_return': result.total_return,
-                'sharpe_ratio': result.sharpe_ratio,
-                'max_drawdown': result.max_drawdown,
-                'trades_count': len(result.trades),
-                'execution_time': result.execution_time_seconds
+                'backtest_id': result['backtest_id'],
+                'total_return': result['total_return'],
+                'sharpe_ratio': result['sharpe_ratio'],
+                'max_drawdown': result['max_drawdown'],
+                'trades_count': result['trades_count'],
+                'execution_time': result['execution_time_seconds']
             }
-            total_return_sum += result.total_return
+            total_return_sum += result['total_return']
         
         # Adicionar estatísticas agregadas
         response_data['portfolio_stats'] = {
             'average_return': total_return_sum / len(results) if results else 0.0,
-            'total_trades': sum(len(r.trades) for r in results.values()),
-            'best_performer': max(results.keys(), key=lambda k: results[k].total_return) if results else None,
-            'worst_performer': min(results.keys(), key=lambda k: results[k].total_return) if results else None
+            'total_trades': sum(r['trades_count'] for r in results.values()),
+            'best_performer': max(results.keys(), key=lambda k: results[k]['total_return']) if results else None,
+            'worst_performer': min(results.keys(), key=lambda k: results[k]['total_return']) if results else None
         }
         
         logger.info(f"[API] Multi-slot backtest completed: {len(results)} slots processed")
@@ -215,6 +268,118 @@ async def run_multi_slot_backtest(request: MultiSlotBacktestRequest) -> Dict[str
         logger.error(f"[API] Error in multi-slot backtest: {e}")
         raise HTTPException(status_code=500, detail=f"Multi-slot backtest failed: {str(e)}")
 
+@router.post("/jobs")
+async def submit_backtest_job(request: BacktestJobRequest) -> Dict[str, Any]:
+    """
+    Enfileira backtest de um slot e retorna o job imediatamente
+    
+    Jobs idênticos em andamento são compartilhados; resultados em cache
+    retornam um job já concluído.
+    
+    Args:
+        request: Parâmetros do backtest, prioridade e force_refresh
+        
+    Returns:
+        Status do job
+    """
+    try:
+        job = _get_job_manager().submit(
+            'slot', [_slot_task(request)],
+            priority=request.priority, force_refresh=request.force_refresh
+        )
+        return job.to_dict(include_result=False)
+        
+    except HTTPException:
+        raise
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.error(f"[API] Error submitting backtest job: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to submit backtest job: {str(e)}")
+
+@router.post("/jobs/multi-slot")
+async def submit_multi_slot_backtest_job(request: MultiSlotBacktestJobRequest) -> Dict[str, Any]:
+    """
+    Enfileira backtest de múltiplos slots e retorna o job imediatamente
+    
+    Args:
+        request: Slots, período, prioridade e force_refresh
+        
+    Returns:
+        Status do job
+    """
+    try:
+        job = _get_job_manager().submit(
+            'multi_slot', _multi_slot_tasks(request),
+            priority=request.priority, force_refresh=request.force_refresh
+        )
+        return job.to_dict(include_result=False)
+        
+    except HTTPException:
+        raise
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.error(f"[API] Error submitting multi-slot backtest job: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to submit backtest job: {str(e)}")
+
+@router.get("/jobs")
+async def list_backtest_jobs(
+    status: Optional[str] = Query(None, description="Filtrar por status"),
+    limit: int = Query(50, ge=1, le=500, description="Limite de resultados")
+) -> Dict[str, Any]:
+    """
+    Lista jobs de backtest (mais recentes primeiro)
+    
+    Returns:
+        Jobs e estatísticas da fila
+    """
+    manager = _get_job_manager()
+    return {
+        'jobs': [job.to_dict(include_result=False) for job in manager.list_jobs(status, limit)],
+        'stats': manager.get_stats()
+    }
+
+@router.get("/jobs/{job_id}")
+async def get_backtest_job(job_id: str = Path(..., description="ID do job")) -> Dict[str, Any]:
+    """
+    Status, progresso e resultados parciais de um job
+    
+    Args:
+        job_id: ID do job
+        
+    Returns:
+        Job (com resultado final quando concluído)
+    """
+    job = _get_job_manager().get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Backtest job {job_id} not found")
+    return job.to_dict()
+
+@router.delete("/jobs/{job_id}")
+async def cancel_backtest_job(job_id: str = Path(..., description="ID do job")) -> Dict[str, Any]:
+    """
+    Cancela um job de backtest
+    
+    Args:
+        job_id: ID do job
+        
+    Returns:
+        Status do cancelamento
+    """
+    manager = _get_job_manager()
+    job = manager.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Backtest job {job_id} not found")
+    
+    cancelled = manager.cancel(job_id)
+    return {
+        'success': cancelled,
+        'job_id': job_id,
+        'status': job.status,
+        'message': "Job cancelled" if cancelled else f"Job already {job.status}"
+    }
+
 @router.get("/results/{backtest_id}")
 async def get_backtest_result(backtest_id: str = Path(..., description="ID do backtest")) -> Dict[str, Any]:
     """
@@ -271,20 +436,28 @@ async def get_backtest_result(backtest_id: str = Path(..., description="ID do ba
 @router.get("/history")
 async def get_backtest_history(
     slot_id: Optional[str] = Query(None, description="Filtrar por slot ID"),
-    limit: int = Query(10, ge=1, le=100, description="Limite de resultados")
+    pair: Optional[str] = Query(None, description="Filtrar por par"),
+    strategy: Optional[str] = Query(None, description="Filtrar por estratégia"),
+    limit: int = Query(10, ge=1, le=100, description="Limite de resultados"),
+    offset: int = Query(0, ge=0, description="Deslocamento para paginação")
 ) -> List[Dict[str, Any]]:
     """
     Retorna histórico de backtests executados
     
     Args:
         slot_id: Filtrar por slot específico (opcional)
+        pair: Filtrar por par (opcional)
+        strategy: Filtrar por estratégia (opcional)
         limit: Número máximo de resultados
+        offset: Deslocamento para paginação
         
     Returns:
         Lista de backtests executados
     """
     try:
-        history = backtest_runner.get_backtest_history(slot_id=slot_id, limit=limit)
+        history = backtest_runner.get_backtest_history(
+            slot_id=slot_id, limit=limit, offset=offset, pair=pair, strategy=strategy
+        )
         
         return [
             {
@@ -316,6 +489,7 @@ async def get_cache_stats() -> Dict[str, Any]:
         stats = backtest_cache.get_cache_stats()
         return {
             'cache_stats': stats,
+            'result_store': backtest_runner.result_store.get_stats(),
             'cache_enabled': True
         }
         
@@ -372,6 +546,7 @@ async def get_backtest_engine_status() -> Dict[str, Any]:
             'engine_status': 'running',
             'version': '1.0.0',
             'cache_info': cache_stats,
+            'job_queue': job_manager.get_stats() if job_manager else None,
             'supported_timeframes': ['1m', '5m', '15m', '30m', '1h', '2h', '4h', '6h', '12h', '1d'],
             'supported_strategies': ['momentum', 'mean_reversion', 'breakout'],
             'max_backtest_period_days': 365,
@@ -4,13 +4,17 @@
 from .futures_manager import FuturesManager
 from .margin_calculator import MarginCalculator
 from .liquidation_protection import LiquidationProtection
+from .liquidation_monitor import LiquidationMonitor
 from .funding_rate_analyzer import FundingRateAnalyzer
+from .funding_rate_store import FundingRateStore
 from .position_sizer import PositionSizer
 
 __all__ = [
     'FuturesManager',
     'MarginCalculator',
     'LiquidationProtection',
+    'LiquidationMonitor',
     'FundingRateAnalyzer',
+    'FundingRateStore',
     'PositionSizer',
 ]
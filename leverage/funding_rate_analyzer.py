@@ -19,14 +19,31 @@ class FundingRateAnalyzer:
     Análise de funding rate para futures perpetuos.
     """
 
-    def __init__(self, exchanges: Dict):
+    def __init__(self, exchanges: Dict, store=None):
         """
         Inicializa analyzer de funding rate.
 
         Args:
             exchanges: Dicionário com conexões CCXT das exchanges
+            store: FundingRateStore opcional (consultas servidas da memória)
         """
         self.exchanges = exchanges
+        self.store = store
+
+    @staticmethod
+    def _classify(funding_pct: float) -> str:
+        """Classifica funding rate (em %)"""
+        if abs(funding_pct) < 0.01:
+            return 'NEUTRAL'
+        elif funding_pct > 0.05:
+            return 'HIGH_POSITIVE'
+        elif funding_pct > 0.01:
+            return 'POSITIVE'
+        elif funding_pct < -0.05:
+            return 'HIGH_NEGATIVE'
+        elif funding_pct < -0.01:
+            return 'NEGATIVE'
+        return 'NEUTRAL'
 
     async def get_current_funding_rate(
         self,
@@ -46,6 +63,23 @@ class FundingRateAnalyzer:
         if exchange_name not in self.exchanges:
             raise ValueError(f"Exchange {exchange_name} não disponível")
 
+        # Servir do store quando atualizado
+        if self.store is not None and self.store.is_fresh(exchange_name):
+            cached = self.store.get_latest(exchange_name, symbol)
+            if cached:
+                return {
+                    'symbol': symbol,
+                    'exchange': exchange_name,
+                    'funding_rate': cached['funding_rate'],
+                    'funding_rate_pct': cached['funding_rate_pct'],
+                    'next_funding_time': cached['next_funding_time'],
+                    'mark_price': cached['mark_price'],
+                    'index_price': cached['index_price'],
+                    'classification': self._classify(cached['funding_rate_pct']),
+                    'timestamp': datetime.utcnow().isoformat(),
+                    'success': True
+                }
+
         exchange = self.exchanges[exchange_name]
 
         try:
@@ -65,19 +99,7 @@ class FundingRateAnalyzer:
             }
 
             # Classificar funding rate
-            funding_pct = result['funding_rate_pct']
-            if abs(funding_pct) < 0.01:
-                result['classification'] = 'NEUTRAL'
-            elif funding_pct > 0.05:
-                result['classification'] = 'HIGH_POSITIVE'
-            elif funding_pct > 0.01:
-                result['classification'] = 'POSITIVE'
-            elif funding_pct < -0.05:
-                result['classification'] = 'HIGH_NEGATIVE'
-            elif funding_pct < -0.01:
-                result['classification'] = 'NEGATIVE'
-            else:
-                result['classification'] = 'NEUTRAL'
+            result['classification'] = self._classify(result['funding_rate_pct'])
 
             return result
 
@@ -111,6 +133,14 @@ class FundingRateAnalyzer:
         if exchange_name not in self.exchanges:
             raise ValueError(f"Exchange {exchange_name} não disponível")
 
+        # Histórico local; importa da exchange apenas o que faltar
+        if self.store is not None:
+            history = self.store.get_history(exchange_name, symbol, limit=limit)
+            if len(history) < limit:
+                await self.store.backfill_history(exchange_name, symbol, limit=limit)
+                history = self.store.get_history(exchange_name, symbol, limit=limit)
+            return history
+
         exchange = self.exchanges[exchange_name]
 
         try:
@@ -0,0 +1,537 @@
+"""
+Funding Rate Store - Cache de Histórico de Funding Rate
+
+Features:
+- Bulk fetch de todos os funding rates perpétuos por exchange
+- Atualização agendada (todas as exchanges em paralelo)
+- Histórico persistido localmente em formato binário compacto indexado por tempo
+  (apenas funding liquidado; a taxa prevista fica só no snapshot mais recente)
+- Médias e spreads entre exchanges respondidos da memória
+"""
+
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+from pathlib import Path
+import asyncio
+import json
+import time
+
+import numpy as np
+
+
+# Registro persistido: (timestamp ms, id do símbolo, funding rate)
+RECORD_DTYPE = np.dtype([('ts', '<i8'), ('sid', '<u4'), ('rate', '<f8')])
+
+
+class _SymbolSeries:
+    """Série temporal de funding de um símbolo em uma exchange."""
+
+    __slots__ = ('ts', 'rate', 'size')
+
+    def __init__(self, capacity: int = 64):
+        self.ts = np.empty(capacity, dtype=np.int64)
+        self.rate = np.empty(capacity, dtype=np.float64)
+        self.size = 0
+
+    def append(self, ts: int, rate: float) -> bool:
+        pos = self.size
+        if self.size and ts <= self.ts[self.size - 1]:
+            # Fora de ordem (ex: backfill): inserção ordenada, sem duplicatas
+            pos = int(np.searchsorted(self.ts[:self.size], ts))
+            if pos < self.size and self.ts[pos] == ts:
+                return False
+        if self.size == len(self.ts):
+            self.ts = np.resize(self.ts, self.size * 2)
+            self.rate = np.resize(self.rate, self.size * 2)
+        if pos < self.size:
+            self.ts[pos + 1:self.size + 1] = self.ts[pos:self.size].copy()
+            self.rate[pos + 1:self.size + 1] = self.rate[pos:self.size].copy()
+        self.ts[pos] = ts
+        self.rate[pos] = rate
+        self.size += 1
+        return True
+
+    @classmethod
+    def from_arrays(cls, ts: np.ndarray, rate: np.ndarray) -> '_SymbolSeries':
+        ts, first = np.unique(ts, return_index=True)
+        series = cls(capacity=max(64, len(ts) * 2))
+        series.ts[:len(ts)] = ts
+        series.rate[:len(ts)] = rate[first]
+        series.size = len(ts)
+        return series
+
+    def window(self, since_ms: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+        start = int(np.searchsorted(self.ts[:self.size], since_ms, side='left'))
+        return self.ts[start:self.size], self.rate[start:self.size]
+
+
+class FundingRateStore:
+    """
+    Store de funding rates com atualização em lote por exchange.
+    """
+
+    def __init__(self, exchanges: Dict, config: Dict = None):
+        """
+        Inicializa o store.
+
+        Args:
+            exchanges: Dicionário com conexões CCXT (async) das exchanges
+            config: Configurações opcionais
+        """
+        self.exchanges = exchanges
+        self.config = config or {}
+        self.refresh_interval = float(self.config.get('FUNDING_REFRESH_SECONDS', 300))
+        self.max_staleness = float(self.config.get('FUNDING_MAX_STALENESS_SECONDS', 900))
+        self.fallback_concurrency = int(self.config.get('FUNDING_FALLBACK_CONCURRENCY', 5))
+        self.data_dir = Path(self.config.get('FUNDING_DATA_DIR', 'data/funding'))
+
+        # exchange -> symbol -> série
+        self._series: Dict[str, Dict[str, _SymbolSeries]] = {}
+        # exchange -> symbol -> último snapshot completo
+        self._latest: Dict[str, Dict[str, Dict]] = {}
+        # exchange -> symbol -> id (persistência)
+        self._symbol_ids: Dict[str, Dict[str, int]] = {}
+        self._last_refresh: Dict[str, float] = {}
+        # (exchange, símbolo) -> maior limit já importado por backfill
+        self._backfilled: Dict[Tuple[str, str], int] = {}
+
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Persistência
+    # ------------------------------------------------------------------
+
+    def _records_path(self, exchange_name: str) -> Path:
+        return self.data_dir / f"{exchange_name}.bin"
+
+    def _symbols_path(self, exchange_name: str) -> Path:
+        return self.data_dir / f"{exchange_name}.symbols.json"
+
+    def _load(self):
+        """Carrega histórico persistido"""
+        for symbols_path in self.data_dir.glob('*.symbols.json'):
+            exchange_name = symbols_path.name[:-len('.symbols.json')]
+            try:
+                with open(symbols_path, 'r') as f:
+                    symbol_ids = json.load(f)
+                records = np.fromfile(self._records_path(exchange_name), dtype=RECORD_DTYPE)
+            except Exception as e:
+                print(f"⚠️ Erro ao carregar histórico de funding ({exchange_name}): {e}")
+                continue
+
+            self._symbol_ids[exchange_name] = symbol_ids
+            names = {sid: symbol for symbol, sid in symbol_ids.items()}
+            series = self._series.setdefault(exchange_name, {})
+            records = records[np.lexsort((records['ts'], records['sid']))]
+            sids, starts = np.unique(records['sid'], return_index=True)
+            for sid, chunk in zip(sids, np.split(records, starts[1:])):
+                symbol = names.get(int(sid))
+                if symbol is not None:
+                    series[symbol] = _SymbolSeries.from_arrays(chunk['ts'], chunk['rate'])
+
+    def _persist(self, exchange_name: str, records: List[Tuple[int, str, float]]):
+        """Anexa novos registros ao arquivo da exchange"""
+        if not records:
+            return
+
+        symbol_ids = self._symbol_ids.setdefault(exchange_name, {})
+        new_symbols = False
+        for _, symbol, _ in records:
+            if symbol not in symbol_ids:
+                symbol_ids[symbol] = len(symbol_ids)
+                new_symbols = True
+
+        data = np.array(
+            [(ts, symbol_ids[symbol], rate) for ts, symbol, rate in records],
+            dtype=RECORD_DTYPE
+        )
+        try:
+            if new_symbols:
+                with open(self._symbols_path(exchange_name), 'w') as f:
+                    json.dump(symbol_ids, f)
+            with open(self._records_path(exchange_name), 'ab') as f:
+                data.tofile(f)
+        except Exception as e:
+            print(f"⚠️ Erro ao persistir funding rates ({exchange_name}): {e}")
+
+    def _record(self, exchange_name: str, symbol: str, ts: int, rate: float) -> bool:
+        series = self._series.setdefault(exchange_name, {}).setdefault(symbol, _SymbolSeries())
+        return series.append(ts, rate)
+
+    # ------------------------------------------------------------------
+    # Atualização
+    # ------------------------------------------------------------------
+
+    async def _fetch_all(self, exchange_name: str, exchange) -> Dict[str, Dict]:
+        """Busca todos os funding rates da exchange (bulk quando suportado)"""
+        has = getattr(exchange, 'has', {}) or {}
+        if has.get('fetchFundingRates', True):
+            try:
+                return await exchange.fetch_funding_rates()
+            except Exception as e:
+                print(f"⚠️ fetch_funding_rates indisponível em {exchange_name}, usando fallback: {e}")
+
+        # Fallback: símbolos já conhecidos, com concorrência limitada
+        symbols = list(self._latest.get(exchange_name, {}).keys()) or list(self._series.get(exchange_name, {}).keys())
+        semaphore = asyncio.Semaphore(self.fallback_concurrency)
+
+        async def fetch_one(symbol: str):
+            async with semaphore:
+                try:
+                    return symbol, await exchange.fetch_funding_rate(symbol)
+                except Exception:
+                    return symbol, None
+
+        results = await asyncio.gather(*(fetch_one(s) for s in symbols))
+        return {symbol: info for symbol, info in results if info}
+
+    async def refresh(self, exchange_name: str) -> int:
+        """
+        Atualiza funding rates de uma exchange.
+
+        Args:
+            exchange_name: Nome da exchange
+
+        Returns:
+            Número de símbolos atualizados
+        """
+        if exchange_name not in self.exchanges:
+            raise ValueError(f"Exchange {exchange_name} não disponível")
+
+        try:
+            rates = await self._fetch_all(exchange_name, self.exchanges[exchange_name])
+        except Exception as e:
+            print(f"❌ Erro ao atualizar funding rates ({exchange_name}): {e}")
+            return 0
+
+        now_ms = int(time.time() * 1000)
+        latest = self._latest.setdefault(exchange_name, {})
+        new_records = []
+
+        for symbol, info in rates.items():
+            rate = info.get('fundingRate')
+            if rate is None:
+                continue
+            rate = float(rate)
+            ts = int(info.get('timestamp') or now_ms)
+            next_funding = int(info.get('fundingTimestamp') or 0)
+
+            # Histórico só com funding liquidado, no timestamp da liquidação
+            for settled_ts, settled_rate in self._settled_funding(latest.get(symbol), info, next_funding, now_ms):
+                if self._record(exchange_name, symbol, settled_ts, settled_rate):
+                    new_records.append((settled_ts, symbol, settled_rate))
+
+            latest[symbol] = {
+                'symbol': symbol,
+                'exchange': exchange_name,
+                'funding_rate': rate,
+                'funding_rate_pct': rate * 100,
+                'next_funding_time': next_funding,
+                'mark_price': info.get('markPrice', 0),
+                'index_price': info.get('indexPrice', 0),
+                'updated_at': ts,
+            }
+
+        self._persist(exchange_name, new_records)
+        self._last_refresh[exchange_name] = time.time()
+        return len(latest)
+
+    @staticmethod
+    def _settled_funding(
+        previous: Optional[Dict],
+        info: Dict,
+        next_funding: int,
+        now_ms: int
+    ) -> List[Tuple[int, float]]:
+        """
+        Funding liquidado visível num snapshot: o informado pela exchange
+        (previousFundingRate/Timestamp) ou, sem ele, a última taxa prevista
+        do snapshot anterior quando o horário de funding dele já passou
+        """
+        prev_rate = info.get('previousFundingRate')
+        prev_ts = info.get('previousFundingTimestamp')
+        if prev_rate is not None and prev_ts:
+            return [(int(prev_ts), float(prev_rate))]
+
+        if previous is None:
+            return []
+        funding_ts = int(previous.get('next_funding_time') or 0)
+        if funding_ts and funding_ts <= now_ms and next_funding != funding_ts:
+            return [(funding_ts, float(previous['funding_rate']))]
+        return []
+
+    async def refresh_all(self) -> Dict[str, int]:
+        """Atualiza todas as exchanges em paralelo"""
+        names = list(self.exchanges.keys())
+        counts = await asyncio.gather(*(self.refresh(name) for name in names))
+        return dict(zip(names, counts))
+
+    async def backfill_history(self, exchange_name: str, symbol: str, limit: int = 100) -> int:
+        """
+        Importa histórico liquidado da exchange para o store.
+
+        Args:
+            exchange_name: Nome da exchange
+            symbol: Símbolo
+            limit: Número de registros
+
+        Returns:
+            Número de registros novos
+        """
+        resolved = self.resolve_symbol(exchange_name, symbol)
+        if self._backfilled.get((exchange_name, resolved or symbol), 0) >= limit:
+            # Já importado; novas liquidações chegam pelo refresh
+            return 0
+
+        exchange = self.exchanges[exchange_name]
+        try:
+            history = await exchange.fetch_funding_rate_history(symbol=symbol, limit=limit)
+        except Exception as e:
+            print(f"❌ Erro ao importar histórico de funding ({exchange_name} {symbol}): {e}")
+            return 0
+
+        new_records = []
+        for record in sorted(history, key=lambda r: r.get('timestamp', 0)):
+            ts = int(record.get('timestamp') or 0)
+            rate = float(record.get('fundingRate') or 0)
+            # Mesma chave usada nas leituras ('BTC/USDT' -> 'BTC/USDT:USDT')
+            key = resolved or record.get('symbol') or symbol
+            if ts and self._record(exchange_name, key, ts, rate):
+                new_records.append((ts, key, rate))
+            resolved = resolved or key
+
+        self._backfilled[(exchange_name, resolved or symbol)] = limit
+        self._persist(exchange_name, new_records)
+        return len(new_records)
+
+    async def _refresh_loop(self):
+        while self._running:
+            try:
+                await self.refresh_all()
+            except Exception as e:
+                print(f"❌ Erro no loop de funding rates: {e}")
+            await asyncio.sleep(self.refresh_interval)
+
+    async def start(self):
+        """Inicia atualização agendada"""
+        if self._running:
+            return
+        self._running = True
+        self._task = asyncio.create_task(self._refresh_loop())
+        print(f"✅ Funding rate store iniciado (refresh a cada {self.refresh_interval}s)")
+
+    async def stop(self):
+        """Para atualização agendada"""
+        self._running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    # ------------------------------------------------------------------
+    # Consultas (memória)
+    # ------------------------------------------------------------------
+
+    def is_fresh(self, exchange_name: str) -> bool:
+        """Verifica se os dados da exchange estão atualizados"""
+        last = self._last_refresh.get(exchange_name)
+        return last is not None and (time.time() - last) <= self.max_staleness
+
+    def resolve_symbol(self, exchange_name: str, symbol: str) -> Optional[str]:
+        """Resolve 'BTC/USDT' para o símbolo perpétuo ('BTC/USDT:USDT')"""
+        latest = self._latest.get(exchange_name, {})
+        series = self._series.get(exchange_name, {})
+        if symbol in latest or symbol in series:
+            return symbol
+        if ':' not in symbol and '/' in symbol:
+            perp = f"{symbol}:{symbol.split('/')[1]}"
+            if perp in latest or perp in series:
+                return perp
+        return None
+
+    def get_latest(self, exchange_name: str, symbol: str) -> Optional[Dict]:
+        """Retorna último funding rate conhecido"""
+        resolved = self.resolve_symbol(exchange_name, symbol)
+        if resolved is None:
+            return None
+        return self._latest.get(exchange_name, {}).get(resolved)
+
+    def get_history(
+        self,
+        exchange_name: str,
+        symbol: str,
+        limit: int = 100,
+        since_ms: int = 0
+    ) -> List[Dict]:
+        """
+        Retorna histórico de funding da memória.
+
+        Args:
+            exchange_name: Nome da exchange
+            symbol: Símbolo
+            limit: Número máximo de registros (mais recentes)
+            since_ms: Timestamp inicial em ms
+
+        Returns:
+            Lista no formato de FundingRateAnalyzer.get_funding_rate_history
+        """
+        resolved = self.resolve_symbol(exchange_name, symbol)
+        series = self._series.get(exchange_name, {}).get(resolved) if resolved else None
+        if series is None:
+            return []
+
+        ts, rates = series.window(since_ms)
+        ts, rates = ts[-limit:], rates[-limit:]
+        return [
+            {
+                'timestamp': int(t),
+                'datetime': datetime.utcfromtimestamp(t / 1000).isoformat(),
+                'funding_rate': float(r),
+                'funding_rate_pct': float(r) * 100,
+                'symbol': symbol,
+                'exchange': exchange_name
+            }
+            for t, r in zip(ts, rates)
+        ]
+
+    def get_average(self, exchange_name: str, symbol: str, hours: float = 24.0) -> Dict:
+        """
+        Calcula estatísticas do funding na janela.
+
+        Args:
+            exchange_name: Nome da exchange
+            symbol: Símbolo
+            hours: Janela em horas
+
+        Returns:
+            Dict no formato de FundingRateAnalyzer.calculate_average_funding
+        """
+        resolved = self.resolve_symbol(exchange_name, symbol)
+        series = self._series.get(exchange_name, {}).get(resolved) if resolved else None
+        since_ms = int((time.time() - hours * 3600) * 1000)
+        if series is None:
+            return {'avg_funding_rate': 0, 'min_funding_rate': 0, 'max_funding_rate': 0, 'count': 0}
+
+        ts, rates = series.window(since_ms)
+        if len(rates) == 0:
+            return {'avg_funding_rate': 0, 'min_funding_rate': 0, 'max_funding_rate': 0, 'count': 0}
+
+        avg_rate = float(rates.mean())
+        min_rate = float(rates.min())
+        max_rate = float(rates.max())
+        return {
+            'avg_funding_rate': avg_rate,
+            'avg_funding_rate_pct': avg_rate * 100,
+            'min_funding_rate': min_rate,
+            'min_funding_rate_pct': min_rate * 100,
+            'max_funding_rate': max_rate,
+            'max_funding_rate_pct': max_rate * 100,
+            'count': int(len(rates)),
+            'period_start': datetime.utcfromtimestamp(ts[0] / 1000).isoformat(),
+            'period_end': datetime.utcfromtimestamp(ts[-1] / 1000).isoformat()
+        }
+
+    def rate_matrix(
+        self,
+        symbols: Optional[List[str]] = None,
+        exchanges: Optional[List[str]] = None
+    ) -> Tuple[List[str], List[str], np.ndarray]:
+        """
+        Monta matriz símbolos × exchanges com o último funding rate (NaN se ausente).
+
+        Símbolos perpétuos são agrupados pelo par base ('BTC/USDT:USDT' -> 'BTC/USDT').
+        """
+        if exchanges is None:
+            exchanges = list(self.exchanges.keys())
+
+        if symbols is None:
+            symbols = sorted({
+                s.split(':')[0]
+                for name in exchanges
+                for s in self._latest.get(name, {})
+            })
+
+        matrix = np.full((len(symbols), len(exchanges)), np.nan)
+        for j, name in enumerate(exchanges):
+            latest = self._latest.get(name, {})
+            by_base = {s.split(':')[0]: info['funding_rate'] for s, info in latest.items()}
+            for i, symbol in enumerate(symbols):
+                rate = latest.get(symbol, {}).get('funding_rate')
+                if rate is None:
+                    rate = by_base.get(symbol.split(':')[0])
+                if rate is not None:
+                    matrix[i, j] = rate
+
+        return symbols, exchanges, matrix
+
+    def cross_exchange_spreads(
+        self,
+        symbols: Optional[List[str]] = None,
+        exchanges: Optional[List[str]] = None,
+        min_diff: float = 0.0
+    ) -> List[Dict]:
+        """
+        Calcula spreads de funding entre exchanges para todos os símbolos.
+
+        Args:
+            symbols: Lista de símbolos (None = todos conhecidos)
+            exchanges: Lista de exchanges (None = todas)
+            min_diff: Diferença mínima (fração, ex: 0.0005)
+
+        Returns:
+            Lista de spreads ordenada pela diferença
+        """
+        symbols, exchanges, matrix = self.rate_matrix(symbols, exchanges)
+        if matrix.size == 0:
+            return []
+
+        available = np.sum(~np.isnan(matrix), axis=1) >= 2
+        if not available.any():
+            return []
+
+        rows = np.nonzero(available)[0]
+        sub = matrix[rows]
+        low_idx = np.nanargmin(sub, axis=1)
+        high_idx = np.nanargmax(sub, axis=1)
+        low = sub[np.arange(len(rows)), low_idx]
+        high = sub[np.arange(len(rows)), high_idx]
+        diff = high - low
+
+        spreads = []
+        for k in np.argsort(-diff):
+            if diff[k] < min_diff:
+                break
+            spreads.append({
+                'symbol': symbols[rows[k]],
+                'long_exchange': exchanges[low_idx[k]],
+                'short_exchange': exchanges[high_idx[k]],
+                'long_funding_rate': float(low[k]),
+                'short_funding_rate': float(high[k]),
+                'funding_diff': float(diff[k]),
+                'funding_diff_pct': float(diff[k]) * 100,
+            })
+
+        return spreads
+
+    def get_status(self) -> Dict:
+        """Retorna status do store"""
+        return {
+            'running': self._running,
+            'exchanges': {
+                name: {
+                    'symbols': len(self._latest.get(name, {})),
+                    'history_symbols': len(self._series.get(name, {})),
+                    'fresh': self.is_fresh(name),
+                    'last_refresh': self._last_refresh.get(name)
+                }
+                for name in self.exchanges
+            },
+            'timestamp': datetime.utcnow().isoformat()
+        }
@@ -17,6 +17,8 @@ import ccxt
 import asyncio
 from datetime import datetime
 
+from .liquidation_monitor import LiquidationMonitor
+
 
 class FuturesManager:
     """
@@ -38,6 +40,12 @@ class FuturesManager:
         # Inicializar exchanges com futures habilitado
         self._init_exchanges()
 
+        # Posições abertas aqui são vigiadas pelo monitor de liquidação
+        # (iniciado na primeira posição, dentro do event loop)
+        self.liquidation_monitor: Optional[LiquidationMonitor] = None
+        if config.get('LIQUIDATION_MONITOR_ENABLED', True):
+            self.liquidation_monitor = LiquidationMonitor(self, config=config)
+
     def _init_exchanges(self):
         """Inicializa conexões com exchanges para futures"""
         # Binance Futures
@@ -271,6 +279,8 @@ class FuturesManager:
             }
 
             print(f"✅ Posição de futures aberta: {symbol} {side.upper()} {amount} @ {entry_price} (leverage: {leverage}x)")
+
+            await self._track_position(position_data)
             
             return position_data
 
@@ -336,6 +346,9 @@ class FuturesManager:
             }
 
             print(f"✅ Posição de futures fechada: {symbol} PnL: ${result['pnl']:.2f}")
+
+            if self.liquidation_monitor is not None:
+                await self.liquidation_monitor.untrack_position(exchange_name, symbol, position['side'])
             
             return result
 
@@ -343,6 +356,46 @@ class FuturesManager:
             print(f"❌ Erro ao fechar posição de futures: {e}")
             raise
 
+    async def reduce_futures_position(
+        self,
+        exchange_name: str,
+        symbol: str,
+        side: str,
+        amount: float
+    ) -> Dict:
+        """
+        Reduz posição de futuros com ordem a mercado reduce-only.
+
+        Args:
+            exchange_name: Nome da exchange
+            symbol: Par de moedas
+            side: Lado da ordem de redução ('sell' reduz long, 'buy' reduz short)
+            amount: Quantidade a reduzir
+
+        Returns:
+            Ordem criada
+        """
+        if exchange_name not in self.exchanges:
+            raise ValueError(f"Exchange {exchange_name} não disponível")
+
+        return await self.exchanges[exchange_name].create_order(
+            symbol=symbol,
+            type='market',
+            side=side,
+            amount=amount,
+            params={'reduceOnly': True}
+        )
+
+    async def _track_position(self, position_data: Dict):
+        """Entrega a posição aberta ao monitor de liquidação"""
+        if self.liquidation_monitor is None:
+            return
+        try:
+            await self.liquidation_monitor.start()
+            await self.liquidation_monitor.track_position(position_data)
+        except Exception as e:
+            print(f"⚠️ Erro ao registrar posição no monitor de liquidação: {e}")
+
     async def get_open_positions(
         self,
         exchange_name: str,
@@ -0,0 +1,537 @@
+"""
+Liquidation Monitor - Monitor de Liquidação Orientado a Eventos
+
+Features:
+- Posições de futures mantidas em memória
+- Índice por preço de gatilho (heap por símbolo e lado)
+- Reavaliação apenas quando o mark price do símbolo muda
+- Mark prices lidos em lote das exchanges do FuturesManager (ou de um feed externo)
+- Auto-reduce disparado assim que o threshold é cruzado, com a ordem fora do lock
+- Leitura de posições na exchange apenas como reconciliação periódica
+"""
+
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import heapq
+import itertools
+import math
+from datetime import datetime
+
+from .liquidation_protection import LiquidationProtection
+
+
+PositionKey = Tuple[str, str, str]  # (exchange, symbol, side)
+
+
+class LiquidationMonitor:
+    """
+    Monitor de liquidação orientado a eventos de preço.
+
+    Cada posição tem um preço de gatilho derivado do preço de liquidação e
+    do threshold: para longs o risco começa quando o preço cai abaixo de
+    ``liq / (1 - t)``; para shorts quando sobe acima de ``liq / (1 + t)``.
+    Os gatilhos ficam em heaps por símbolo, então um tick de preço só toca
+    as posições que realmente cruzaram o threshold.
+    """
+
+    def __init__(
+        self,
+        futures_manager,
+        protection: Optional[LiquidationProtection] = None,
+        config: Dict = None
+    ):
+        """
+        Inicializa o monitor.
+
+        Args:
+            futures_manager: Instância do FuturesManager
+            protection: Instância de LiquidationProtection (opcional)
+            config: Configurações opcionais
+        """
+        self.config = config or {}
+        self.futures_manager = futures_manager
+        self.protection = protection or LiquidationProtection(self.config)
+        self.threshold_pct = float(
+            self.config.get('LIQUIDATION_THRESHOLD_PCT', self.protection.liquidation_threshold_pct)
+        )
+        self.reduction_pct = float(self.config.get('AUTO_REDUCE_PCT', 50.0))
+        self.reconcile_interval = float(self.config.get('RECONCILE_INTERVAL_SECONDS', 30.0))
+        self.mark_price_interval = float(self.config.get('MARK_PRICE_INTERVAL_SECONDS', 2.0))
+        self.critical_pct = float(self.config.get('LIQUIDATION_CRITICAL_PCT', 5.0))
+        # Folga para rearmar uma posição já disparada (evita disparos repetidos)
+        self.rearm_buffer_pct = float(self.config.get('REARM_BUFFER_PCT', 2.0))
+
+        self._positions: Dict[PositionKey, Dict] = {}
+        self._versions: Dict[PositionKey, int] = {}
+        # symbol -> heap de longs (max-heap via preço negativo) e shorts (min-heap)
+        self._long_heaps: Dict[Tuple[str, str], List] = {}
+        self._short_heaps: Dict[Tuple[str, str], List] = {}
+        # Posições disparadas aguardando rearme
+        self._fired: Dict[PositionKey, float] = {}
+        # Posições que já entraram além do gatilho (disparo no próximo evento)
+        self._due: set = set()
+        # Posições com ordem de redução em andamento
+        self._reducing: set = set()
+        self._mark_prices: Dict[Tuple[str, str], float] = {}
+        self._counter = itertools.count()
+        self._lock = asyncio.Lock()
+        self._reconcile_task: Optional[asyncio.Task] = None
+        self._mark_price_task: Optional[asyncio.Task] = None
+        self._running = False
+
+        self.stats = {
+            'price_updates': 0,
+            'skipped_updates': 0,
+            'reductions_triggered': 0,
+            'reconciliations': 0,
+            'last_reconcile': None,
+            'mark_price_polls': 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Gestão de posições
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _normalize_side(side: str) -> str:
+        return 'long' if str(side).lower() in ['long', 'buy'] else 'short'
+
+    def _trigger_price(self, liquidation_price: float, side: str, threshold_pct: float) -> float:
+        t = threshold_pct / 100
+        if side == 'long':
+            return liquidation_price / (1 - t) if t < 1 else float('inf')
+        return liquidation_price / (1 + t)
+
+    def upsert_position(self, position: Dict) -> bool:
+        """
+        Adiciona ou atualiza uma posição no índice.
+
+        Só rearma (e limpa o estado de disparo) quando ``liquidation_price``
+        ou ``contracts`` mudam; atualizações com a mesma exposição apenas
+        refrescam os demais campos.
+
+        Args:
+            position: Posição no formato de FuturesManager.get_open_positions
+
+        Returns:
+            True se a posição já está além do gatilho no último mark price
+            conhecido (disparada no próximo reconcile/evento de preço)
+        """
+        exchange = position['exchange']
+        symbol = position['symbol']
+        side = self._normalize_side(position['side'])
+        key = (exchange, symbol, side)
+
+        amount = float(position.get('contracts', position.get('amount', 0)) or 0)
+        liquidation_price = float(position.get('liquidation_price') or 0)
+
+        if amount == 0 or liquidation_price <= 0:
+            self.remove_position(exchange, symbol, side)
+            return False
+
+        book = (exchange, symbol)
+        mark_price = float(position.get('mark_price') or 0)
+        seeded = mark_price > 0 and book not in self._mark_prices
+        if seeded:
+            self._mark_prices[book] = mark_price
+
+        current = self._positions.get(key)
+        # Tamanho anterior ao nosso auto-reduce = leitura atrasada da exchange
+        same_amount = current is not None and any(
+            size is not None and math.isclose(size, amount, rel_tol=1e-9)
+            for size in (current['contracts'], current.get('reduced_from'))
+        )
+        if same_amount and math.isclose(current['liquidation_price'], liquidation_price, rel_tol=1e-9):
+            # Mesma exposição: mantém gatilho e estado de disparo
+            for field, value in position.items():
+                if field not in ('side', 'contracts', 'liquidation_price',
+                                 'trigger_price', 'armed_threshold_pct'):
+                    current[field] = value
+            if seeded and key not in self._fired and self._past_trigger(key):
+                # Primeiro mark price do símbolo já está além do gatilho
+                self._due.add(key)
+            return key in self._due
+
+        self._positions[key] = {
+            **position,
+            'side': side,
+            'contracts': amount,
+            'liquidation_price': liquidation_price,
+        }
+        self._fired.pop(key, None)
+        self._arm(key, self.threshold_pct)
+        return key in self._due
+
+    def _past_trigger(self, key: PositionKey) -> bool:
+        """Verifica o gatilho contra o último mark price conhecido do símbolo."""
+        price = self._mark_prices.get((key[0], key[1]))
+        if not price:
+            return False
+        trigger = self._positions[key]['trigger_price']
+        return price <= trigger if key[2] == 'long' else price >= trigger
+
+    def _arm(self, key: PositionKey, threshold_pct: float):
+        """Insere o gatilho da posição no heap do símbolo."""
+        position = self._positions[key]
+        version = self._versions.get(key, 0) + 1
+        self._versions[key] = version
+
+        side = key[2]
+        trigger = self._trigger_price(position['liquidation_price'], side, threshold_pct)
+        position['trigger_price'] = trigger
+        position['armed_threshold_pct'] = threshold_pct
+
+        book = (key[0], key[1])
+        heaps = self._long_heaps if side == 'long' else self._short_heaps
+        heap = heaps.setdefault(book, [])
+        heapq.heappush(heap, (-trigger if side == 'long' else trigger, next(self._counter), key, version))
+        if len(heap) > 2 * len(self._positions) + 64:
+            self._compact(heap)
+
+        if self._past_trigger(key):
+            self._due.add(key)
+        else:
+            self._due.discard(key)
+
+    def _compact(self, heap: List):
+        """Descarta entradas invalidadas (versão antiga ou posição removida)."""
+        heap[:] = [
+            entry for entry in heap
+            if self._versions.get(entry[2]) == entry[3] and entry[2] in self._positions
+        ]
+        heapq.heapify(heap)
+
+    def remove_position(self, exchange: str, symbol: str, side: str):
+        """Remove posição do índice (entradas no heap são invalidadas pela versão)."""
+        key = (exchange, symbol, self._normalize_side(side))
+        self._positions.pop(key, None)
+        self._fired.pop(key, None)
+        self._due.discard(key)
+        self._versions[key] = self._versions.get(key, 0) + 1
+
+    def get_positions(self) -> List[Dict]:
+        """Retorna posições monitoradas"""
+        return list(self._positions.values())
+
+    async def track_position(self, position: Dict) -> List[Dict]:
+        """
+        Registra uma posição aberta pelo FuturesManager.
+
+        Args:
+            position: Posição (formato de open_futures_position ou get_open_positions)
+
+        Returns:
+            Resultados de auto-reduce, se a posição já entrou além do gatilho
+        """
+        async with self._lock:
+            key = (position['exchange'], position['symbol'], self._normalize_side(position['side']))
+            due = self.upsert_position(position)
+            claims = self._claim([key]) if due else []
+        return await self._execute(claims)
+
+    async def untrack_position(self, exchange: str, symbol: str, side: str):
+        """Remove uma posição fechada pelo FuturesManager."""
+        async with self._lock:
+            self.remove_position(exchange, symbol, side)
+
+    # ------------------------------------------------------------------
+    # Eventos de preço
+    # ------------------------------------------------------------------
+
+    def _pop_crossed(self, book: Tuple[str, str], price: float) -> List[PositionKey]:
+        """Remove dos heaps as posições cujo gatilho foi cruzado."""
+        crossed = []
+
+        long_heap = self._long_heaps.get(book)
+        while long_heap and -long_heap[0][0] >= price:
+            _, _, key, version = heapq.heappop(long_heap)
+            if self._versions.get(key) == version and key in self._positions:
+                crossed.append(key)
+
+        short_heap = self._short_heaps.get(book)
+        while short_heap and short_heap[0][0] <= price:
+            _, _, key, version = heapq.heappop(short_heap)
+            if self._versions.get(key) == version and key in self._positions:
+                crossed.append(key)
+
+        return crossed
+
+    def _rearm(self, book: Tuple[str, str], price: float):
+        """Rearma posições disparadas cujo preço voltou para zona segura."""
+        if not self._fired:
+            return
+        buffer = self.rearm_buffer_pct / 100
+        for key in [k for k in self._fired if (k[0], k[1]) == book]:
+            trigger = self._fired[key]
+            side = key[2]
+            recovered = price > trigger * (1 + buffer) if side == 'long' else price < trigger * (1 - buffer)
+            if recovered and key in self._positions and key not in self._reducing:
+                del self._fired[key]
+                self._arm(key, self.threshold_pct)
+
+    async def on_mark_price(self, exchange: str, symbol: str, price: float) -> List[Dict]:
+        """
+        Processa atualização de mark price.
+
+        Args:
+            exchange: Nome da exchange
+            symbol: Símbolo
+            price: Novo mark price
+
+        Returns:
+            Lista de resultados de auto-reduce disparados
+        """
+        book = (exchange, symbol)
+        async with self._lock:
+            if price <= 0 or self._mark_prices.get(book) == price:
+                self.stats['skipped_updates'] += 1
+                return []
+
+            self._mark_prices[book] = price
+            self.stats['price_updates'] += 1
+
+            self._rearm(book, price)
+            crossed = self._pop_crossed(book, price)
+            crossed += [k for k in self._due if (k[0], k[1]) == book and k not in crossed]
+            claims = self._claim(crossed)
+
+        return await self._execute(claims)
+
+    def _claim(self, keys: List[PositionKey]) -> List[Tuple]:
+        """
+        Marca as posições como disparadas (com o lock).
+
+        Returns:
+            Lista de (key, versão, cópia da posição, mark price) para _execute
+        """
+        claims = []
+        for key in keys:
+            self._due.discard(key)
+            position = self._positions.get(key)
+            if position is None:
+                continue
+            if key in self._reducing:
+                # Redução anterior ainda em andamento: reavalia no próximo evento
+                self._due.add(key)
+                continue
+            self._fired[key] = position['trigger_price']
+            # Invalida a entrada do heap (disparos por _due não passam pelo pop)
+            version = self._versions.get(key, 0) + 1
+            self._versions[key] = version
+            self._reducing.add(key)
+            claims.append((key, version, dict(position), self._mark_prices[(key[0], key[1])]))
+        return claims
+
+    async def _execute(self, claims: List[Tuple]) -> List[Dict]:
+        """Executa os auto-reduces sem o lock e aplica os resultados com ele."""
+        results = []
+        for key, version, position, price in claims:
+            result = None
+            try:
+                result = await self._reduce(position, price)
+            finally:
+                async with self._lock:
+                    self._reducing.discard(key)
+                    if result is not None:
+                        self._apply_reduction(key, version, result)
+            results.append(result)
+        return results
+
+    def _apply_reduction(self, key: PositionKey, version: int, result: Dict):
+        """Atualiza a posição após o auto-reduce (com o lock)."""
+        if not result.get('success'):
+            return
+        if self._versions.get(key) != version or key not in self._positions:
+            return  # Posição mudou durante a ordem: a reconciliação traz o estado real
+
+        position = self._positions[key]
+        remaining = float(result.get('remaining_amount', 0))
+        if remaining <= 0:
+            self.remove_position(*key)
+        else:
+            position['reduced_from'] = position['contracts']
+            position['contracts'] = remaining
+            # Após a redução parcial, a posição segue armada no nível crítico
+            if position['armed_threshold_pct'] > self.critical_pct:
+                self._arm(key, self.critical_pct)
+
+    async def _reduce(self, position: Dict, price: float) -> Dict:
+        """Dispara auto_reduce_position para uma posição em risco (sem o lock)."""
+        risk = self.protection.check_liquidation_risk(
+            current_price=price,
+            liquidation_price=position['liquidation_price'],
+            side=position['side'],
+            threshold_pct=self.threshold_pct
+        )
+        reduce_input = {
+            **position,
+            'amount': position['contracts'],
+            'side': 'buy' if position['side'] == 'long' else 'sell',
+        }
+        reduction_pct = 100.0 if risk['action_required'] == 'IMMEDIATE_CLOSE' else self.reduction_pct
+
+        result = await self.protection.auto_reduce_position(
+            reduce_input,
+            self.futures_manager,
+            reduction_pct=reduction_pct
+        )
+        result['risk_analysis'] = risk
+        self.stats['reductions_triggered'] += 1
+        return result
+
+    # ------------------------------------------------------------------
+    # Mark prices
+    # ------------------------------------------------------------------
+
+    async def _fetch_mark_prices(self, exchange_name: str, symbols: List[str]) -> Dict[str, float]:
+        """Busca os mark prices dos símbolos numa chamada (bulk quando suportado)"""
+        exchange = self.futures_manager.exchanges[exchange_name]
+        has = getattr(exchange, 'has', {}) or {}
+        if has.get('fetchMarkPrices'):
+            tickers = await exchange.fetch_mark_prices(symbols)
+        else:
+            tickers = await exchange.fetch_tickers(symbols)
+
+        prices = {}
+        for symbol, ticker in (tickers or {}).items():
+            price = ticker.get('markPrice') or ticker.get('last')
+            if price:
+                prices[symbol] = float(price)
+        return prices
+
+    async def poll_mark_prices(self) -> List[Dict]:
+        """
+        Lê os mark prices dos símbolos monitorados e os processa como eventos.
+
+        Returns:
+            Resultados de auto-reduce disparados
+        """
+        books: Dict[str, set] = {}
+        for exchange_name, symbol, _ in list(self._positions):
+            books.setdefault(exchange_name, set()).add(symbol)
+
+        results = []
+        for exchange_name, symbols in books.items():
+            try:
+                prices = await self._fetch_mark_prices(exchange_name, sorted(symbols))
+            except Exception as e:
+                print(f"⚠️ Erro ao buscar mark prices ({exchange_name}): {e}")
+                continue
+            for symbol, price in prices.items():
+                if symbol in symbols:
+                    results += await self.on_mark_price(exchange_name, symbol, price)
+
+        self.stats['mark_price_polls'] += 1
+        return results
+
+    # ------------------------------------------------------------------
+    # Reconciliação periódica
+    # ------------------------------------------------------------------
+
+    async def reconcile(self, exchange_name: Optional[str] = None) -> Dict:
+        """
+        Reconcilia o estado em memória com as posições da exchange.
+
+        Args:
+            exchange_name: Exchange específica (None = todas)
+
+        Returns:
+            Resumo da reconciliação
+        """
+        exchanges = [exchange_name] if exchange_name else self.futures_manager.get_supported_exchanges()
+        added = removed = 0
+
+        # Leitura na exchange fora do lock: eventos de preço seguem processados
+        fetched = {}
+        for name in exchanges:
+            try:
+                fetched[name] = await self.futures_manager.get_open_positions(name)
+            except Exception as e:
+                print(f"⚠️ Erro na reconciliação de posições ({name}): {e}")
+
+        async with self._lock:
+            for name, positions in fetched.items():
+                seen = set()
+                for pos in positions:
+                    key = (name, pos['symbol'], self._normalize_side(pos['side']))
+                    seen.add(key)
+                    if key not in self._positions:
+                        added += 1
+                    self.upsert_position({**pos, 'exchange': name})
+
+                for key in [k for k in self._positions if k[0] == name and k not in seen]:
+                    self.remove_position(*key)
+                    removed += 1
+
+            # Posições que chegaram já além do gatilho disparam agora
+            claims = self._claim(list(self._due))
+
+        reductions = await self._execute(claims)
+
+        self.stats['reconciliations'] += 1
+        self.stats['last_reconcile'] = datetime.utcnow().isoformat()
+
+        return {
+            'exchanges': exchanges,
+            'positions': len(self._positions),
+            'added': added,
+            'removed': removed,
+            'reductions': reductions,
+            'timestamp': self.stats['last_reconcile']
+        }
+
+    async def _reconcile_loop(self):
+        while self._running:
+            try:
+                await self.reconcile()
+            except Exception as e:
+                print(f"❌ Erro no loop de reconciliação: {e}")
+            await asyncio.sleep(self.reconcile_interval)
+
+    async def _mark_price_loop(self):
+        while self._running:
+            try:
+                await self.poll_mark_prices()
+            except Exception as e:
+                print(f"❌ Erro no loop de mark prices: {e}")
+            await asyncio.sleep(self.mark_price_interval)
+
+    async def start(self, poll_mark_prices: bool = True):
+        """
+        Inicia reconciliação periódica e a leitura de mark prices
+
+        Args:
+            poll_mark_prices: False quando um feed externo chama on_mark_price
+        """
+        if self._running:
+            return
+        self._running = True
+        self._reconcile_task = asyncio.create_task(self._reconcile_loop())
+        if poll_mark_prices:
+            self._mark_price_task = asyncio.create_task(self._mark_price_loop())
+        print(f"🛡️ Liquidation monitor iniciado (reconciliação a cada {self.reconcile_interval}s)")
+
+    async def stop(self):
+        """Para reconciliação periódica e leitura de mark prices"""
+        self._running = False
+        for task in (self._reconcile_task, self._mark_price_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._reconcile_task = self._mark_price_task = None
+
+    def get_status(self) -> Dict:
+        """Retorna status do monitor"""
+        return {
+            'running': self._running,
+            'positions': len(self._positions),
+            'fired_positions': len(self._fired),
+            'due_positions': len(self._due),
+            'reducing_positions': len(self._reducing),
+            'threshold_pct': self.threshold_pct,
+            **self.stats,
+            'timestamp': datetime.utcnow().isoformat()
+        }
@@ -156,9 +156,16 @@ class LiquidationProtection:
             # Fechar parcialmente a posição
             side = 'sell' if position['side'] == 'buy' else 'buy'
             
-            # Executar redução (simulado aqui - integraria com exchange)
+            # Executar redução na exchange (sem FuturesManager, apenas simulada)
+            order = None
+            if futures_manager is not None:
+                order = await futures_manager.reduce_futures_position(
+                    exchange, symbol, side, reduction_amount
+                )
+
             result = {
                 'success': True,
+                'order_id': order.get('id') if order else None,
                 'symbol': symbol,
                 'exchange': exchange,
                 'original_amount': current_amount,
@@ -10,6 +10,7 @@ This module provides ML capabilities including:
 """
 
 from .model_registry import ModelRegistry
+from .model_cache import ModelCache
 
 __version__ = "1.0.0"
-__all__ = ['ModelRegistry']
+__all__ = ['ModelRegistry', 'ModelCache']
@@ -3,12 +3,22 @@
 This module provides:
 - FreqAI interface for training and predictions
 - Feature engineering
+- Incremental feature store for inference
 - Data kitchen for data preparation
 - Data drawer for model storage
+- Parallel model comparison
 - Multiple ML models
 """
 
 from .freqai_interface import FreqAIInterface
 from .feature_engineering import FeatureEngineering
+from .feature_store import FeatureStore
+from .model_comparison import ModelComparisonRunner, simulate_signals
 
-__all__ = ['FreqAIInterface', 'FeatureEngineering']
+__all__ = [
+    'FreqAIInterface',
+    'FeatureEngineering',
+    'FeatureStore',
+    'ModelComparisonRunner',
+    'simulate_signals',
+]
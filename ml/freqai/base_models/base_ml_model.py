@@ -2,7 +2,7 @@
 
 from abc import ABC, abstractmethod
 import numpy as np
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from sklearn.metrics import (
     accuracy_score,
     f1_score,
@@ -75,6 +75,19 @@ class BaseMLModel(ABC):
         """
         pass
 
+    def predict_batch(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Labels and probabilities for many rows with a single model pass.
+        
+        Args:
+            X: Features, one row per sample (e.g. one row per symbol)
+            
+        Returns:
+            (labels, probabilities)
+        """
+        y_pred_proba = self.predict_proba(X)
+        return np.argmax(y_pred_proba, axis=1), y_pred_proba
+
     def evaluate(
         self,
         X_test: np.ndarray,
@@ -1,7 +1,7 @@
 """XGBoost model implementation."""
 
 import numpy as np
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 import logging
 
 try:
@@ -127,6 +127,23 @@ class XGBoostModel(BaseMLModel):
         
         return y_pred_proba
 
+    def predict_batch(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Labels and probabilities from a single booster pass.
+        """
+        if not self.is_trained:
+            raise ValueError("Model not trained!")
+        
+        y_pred_proba = self.model.predict(xgb.DMatrix(X))
+        
+        if y_pred_proba.ndim == 1:
+            y_pred = (y_pred_proba > 0.5).astype(int)
+            y_pred_proba = np.column_stack([1 - y_pred_proba, y_pred_proba])
+        else:
+            y_pred = np.argmax(y_pred_proba, axis=1)
+        
+        return y_pred, y_pred_proba
+
     def get_feature_importance(self) -> Dict[str, float]:
         """
         Get feature importance.
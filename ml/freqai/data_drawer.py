@@ -1,12 +1,14 @@
 """Data Drawer for model storage and versioning."""
 
-import joblib
 import json
+import threading
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from datetime import datetime
 import logging
 
+from ..model_cache import ModelCache, load_artifact, dump_artifact, file_stamp
+
 logger = logging.getLogger(__name__)
 
 
@@ -19,12 +21,35 @@ class DataDrawer:
     - Load models for prediction
     - Manage model versions
     - Store model metadata
+    
+    Loaded models are served from an LRU cache keyed by
+    (strategy, symbol, version), numpy arrays are memory-mapped on load and
+    the latest version per (strategy, symbol) is indexed in memory. Saving a
+    new version swaps it in atomically: readers get either the previous
+    model or the complete new one.
     """
 
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], model_cache: Optional[ModelCache] = None):
         self.config = config
         self.models_dir = Path(config.get('models_path', 'models'))
         self.models_dir.mkdir(parents=True, exist_ok=True)
+        self._models_root = self.models_dir.resolve()
+        
+        self.mmap_mode = config.get('model_mmap_mode', 'c')
+        self.model_cache = model_cache or ModelCache(config.get('model_cache_size', 32))
+        
+        # (strategy, symbol_clean) -> (latest model path, directory mtime)
+        self._latest: Dict[Tuple[str, str], Tuple[Optional[Path], Optional[int]]] = {}
+        self._index_lock = threading.Lock()
+
+    def _cache_key(self, model_path: Path) -> Tuple[str, str, str]:
+        """(strategy, symbol, version) for a model file."""
+        try:
+            relative = model_path.resolve().relative_to(self._models_root)
+            strategy_name, symbol_clean, filename = relative.parts
+            return strategy_name, symbol_clean, Path(filename).stem
+        except ValueError:
+            return '', '', str(model_path.resolve())
 
     def save_model(
         self,
@@ -61,9 +86,6 @@ class DataDrawer:
         
         model_path = model_dir / filename
         
-        # Save model
-        joblib.dump(model, model_path)
-        
         # Save metadata
         metadata = {
             'strategy_name': strategy_name,
@@ -76,8 +98,18 @@ class DataDrawer:
         }
         
         metadata_path = model_path.with_suffix('.json')
-        with open(metadata_path, 'w') as f:
+        tmp_metadata_path = metadata_path.with_name(f".{metadata_path.name}.tmp")
+        with open(tmp_metadata_path, 'w') as f:
             json.dump(metadata, f, indent=2)
+        tmp_metadata_path.replace(metadata_path)
+        
+        # Save model (atomic rename, after metadata so it is never missing)
+        dump_artifact(model, model_path)
+        
+        # Hot-swap: serve the new version from memory right away
+        self.model_cache.put(self._cache_key(model_path), model, file_stamp(model_path))
+        with self._index_lock:
+            self._latest[(strategy_name, symbol_clean)] = (model_path, file_stamp(model_dir))
         
         logger.info(f"✅ Model saved: {model_path}")
         
@@ -94,11 +126,19 @@ class DataDrawer:
             Loaded model object
         """
         model_path = Path(model_path)
+        stamp = file_stamp(model_path)
         
-        if not model_path.exists():
+        if stamp is None:
             raise FileNotFoundError(f"Model not found: {model_path}")
         
-        model = joblib.load(model_path)
+        return self.model_cache.get(
+            self._cache_key(model_path),
+            lambda: self._load_from_disk(model_path),
+            stamp
+        )
+
+    def _load_from_disk(self, model_path: Path) -> Any:
+        model = load_artifact(str(model_path), mmap_mode=self.mmap_mode)
         
         logger.info(f"✅ Model loaded: {model_path}")
         
@@ -119,24 +159,94 @@ class DataDrawer:
         Returns:
             Loaded model or None if not found
         """
+        latest_model = self.get_latest_model_path(strategy_name, symbol)
+        
+        if latest_model is None:
+            return None
+        
+        return self.load_model(latest_model)
+
+    def get_latest_model_path(self, strategy_name: str, symbol: str) -> Optional[str]:
+        """
+        Path of the latest model for a strategy and symbol.
+        
+        Served from the in-memory index; the directory is rescanned only
+        when its mtime changes (e.g. a model saved by another process).
+        """
         symbol_clean = symbol.replace('/', '_')
         model_dir = self.models_dir / strategy_name / symbol_clean
+        key = (strategy_name, symbol_clean)
         
-        if not model_dir.exists():
+        dir_stamp = file_stamp(model_dir)
+        if dir_stamp is None:
             logger.warning(f"No models found for {strategy_name}/{symbol}")
             return None
         
-        # Find latest model
-        model_files = list(model_dir.glob('*.pkl'))
+        with self._index_lock:
+            cached = self._latest.get(key)
+        
+        if cached is not None and cached[1] == dir_stamp:
+            latest_model = cached[0]
+        else:
+            # Find latest model (by modification time)
+            model_files = list(model_dir.glob('*.pkl'))
+            latest_model = max(model_files, key=lambda p: p.stat().st_mtime) if model_files else None
+            with self._index_lock:
+                self._latest[key] = (latest_model, dir_stamp)
         
-        if not model_files:
+        if latest_model is None:
             logger.warning(f"No model files found in {model_dir}")
             return None
         
-        # Sort by modification time
-        latest_model = max(model_files, key=lambda p: p.stat().st_mtime)
+        return str(latest_model)
+
+    def get_latest_metadata(self, strategy_name: str, symbol: str) -> Optional[Dict]:
+        """
+        Metadata of the latest model for a strategy and symbol.
+        """
+        latest_model = self.get_latest_model_path(strategy_name, symbol)
+        return self.get_model_metadata(latest_model) if latest_model else None
+
+    def warm_cache(self, strategy_name: Optional[str] = None) -> int:
+        """
+        Preload the latest model of every (strategy, symbol) into the cache.
         
-        return self.load_model(str(latest_model))
+        Call at startup so the first prediction does not pay the load.
+        
+        Args:
+            strategy_name: Only this strategy (optional)
+            
+        Returns:
+            Number of models loaded
+        """
+        strategy_dirs = [self.models_dir / strategy_name] if strategy_name else [
+            p for p in self.models_dir.iterdir() if p.is_dir()
+        ]
+        
+        loaded = 0
+        for strategy_dir in strategy_dirs:
+            if not strategy_dir.is_dir():
+                continue
+            for symbol_dir in strategy_dir.iterdir():
+                if not symbol_dir.is_dir():
+                    continue
+                try:
+                    if self.load_latest_model(strategy_dir.name, symbol_dir.name) is not None:
+                        loaded += 1
+                except Exception as e:
+                    logger.warning(f"Could not preload model for {strategy_dir.name}/{symbol_dir.name}: {e}")
+        
+        logger.info(f"✅ Model cache warmed: {loaded} models")
+        return loaded
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        Model cache statistics.
+        """
+        return {
+            **self.model_cache.get_stats(),
+            'indexed_keys': len(self._latest)
+        }
 
     def get_model_metadata(self, model_path: str) -> Optional[Dict]:
         """
@@ -198,6 +308,8 @@ class DataDrawer:
         model_path = Path(model_path)
         metadata_path = model_path.with_suffix('.json')
         
+        self.model_cache.invalidate(self._cache_key(model_path))
+        
         # Delete model file
         if model_path.exists():
             model_path.unlink()
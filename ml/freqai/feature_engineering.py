@@ -2,7 +2,7 @@
 
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import logging
 
 try:
@@ -31,6 +31,10 @@ class FeatureEngineering:
         self.config = config
         self.freqai_config = config.get('freqai', {})
         self.feature_params = self.freqai_config.get('feature_params', {})
+        # Raw candles kept per stream as indicator warmup for incremental updates
+        self.incremental_warmup = int(self.feature_params.get('incremental_warmup', 1000))
+        self._raw_tail: Dict[str, pd.DataFrame] = {}
+        self._last_emitted: Dict[str, pd.Timestamp] = {}
 
     def create_features(
         self,
@@ -80,8 +84,8 @@ class FeatureEngineering:
             else:
                 # Create default labels: 1 if next candle is up, 0 otherwise
                 df['future_return'] = df['close'].shift(-1) / df['close'] - 1
-                y = (df['future_return'] > 0).astype(int).values
                 df = df[:-1]  # Remove last row (no future data)
+                y = (df['future_return'] > 0).astype(int).values
         
         # Select feature columns
         feature_cols = self._select_feature_columns(df)
@@ -98,6 +102,72 @@ class FeatureEngineering:
             'dataframe': df
         }
 
+    def create_features_incremental(
+        self,
+        key: str,
+        dataframe: pd.DataFrame,
+        include_labels: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Create features only for candles not seen before on a stream.
+        
+        The last ``incremental_warmup`` raw candles of the stream are kept and
+        prepended as indicator warmup, so each call costs O(warmup + new rows)
+        instead of recomputing the whole history, and small batches still get
+        fully warmed-up indicators. Requires a 'date' column; without it this
+        falls back to ``create_features``.
+        
+        Args:
+            key: Stream identifier (e.g. symbol)
+            dataframe: DataFrame with OHLCV data (may overlap previous calls)
+            include_labels: Whether to create labels (y)
+            
+        Returns:
+            Same structure as ``create_features``, restricted to new rows
+        """
+        if 'date' not in dataframe.columns:
+            return self.create_features(dataframe, include_labels=include_labels)
+        
+        new_data = dataframe.copy()
+        new_data['date'] = pd.to_datetime(new_data['date'])
+        
+        tail = self._raw_tail.get(key)
+        if tail is not None and not tail.empty:
+            new_data = new_data[new_data['date'] > tail['date'].iloc[-1]]
+            combined = pd.concat([tail, new_data], ignore_index=True)
+        else:
+            combined = new_data.reset_index(drop=True)
+        
+        self._raw_tail[key] = combined.iloc[-self.incremental_warmup:].reset_index(drop=True)
+        
+        features = self.create_features(combined, include_labels=include_labels)
+        df = features['dataframe']
+        
+        last_emitted = self._last_emitted.get(key)
+        if last_emitted is not None:
+            mask = (df['date'] > last_emitted).values
+            df = df[mask]
+            features['X'] = features['X'][mask]
+            if features['y'] is not None:
+                features['y'] = features['y'][mask]
+        
+        if len(df):
+            self._last_emitted[key] = df['date'].iloc[-1]
+        
+        features['dataframe'] = df
+        return features
+
+    def reset_incremental(self, key: Optional[str] = None):
+        """
+        Drop incremental state of a stream (or all streams).
+        """
+        if key is None:
+            self._raw_tail.clear()
+            self._last_emitted.clear()
+        else:
+            self._raw_tail.pop(key, None)
+            self._last_emitted.pop(key, None)
+
     def _select_feature_columns(self, df: pd.DataFrame) -> List[str]:
         """
         Select feature columns from dataframe.
@@ -0,0 +1,559 @@
+"""Feature Store - Incremental per-symbol feature vectors for inference."""
+
+import pandas as pd
+import numpy as np
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime, timedelta
+import logging
+import math
+
+
+logger = logging.getLogger(__name__)
+
+
+# Feature definitions shared by the batch (training) and incremental (inference) paths
+RSI_WINDOW = 14
+MACD_FAST = 12
+MACD_SLOW = 26
+MACD_SIGNAL = 9
+BB_WINDOW = 20
+BB_STD = 2
+SMA_WINDOWS = (10, 20, 50)
+EMA_SPANS = (10, 20)
+VOLATILITY_WINDOWS = (10, 20)
+VOLUME_SMA_WINDOW = 10
+CHANGE_PERIODS = (1, 3, 5, 10)
+
+BASE_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+TECHNICAL_COLUMNS = (
+    ['rsi', 'macd', 'macd_signal', 'macd_histogram',
+     'bb_middle', 'bb_upper', 'bb_lower', 'bb_position']
+    + [f'sma_{w}' for w in SMA_WINDOWS]
+    + [f'ema_{s}' for s in EMA_SPANS]
+)
+
+STATISTICAL_COLUMNS = (
+    [f'volatility_{w}' for w in VOLATILITY_WINDOWS]
+    + ['high_low_ratio', 'close_open_ratio', f'volume_sma_{VOLUME_SMA_WINDOW}', 'volume_ratio']
+    + [name for p in CHANGE_PERIODS for name in (f'price_change_{p}', f'volume_change_{p}')]
+)
+
+TEMPORAL_COLUMNS = ['hour', 'day_of_week', 'month', 'hour_sin', 'hour_cos', 'dow_sin', 'dow_cos']
+
+FEATURE_COLUMNS = BASE_COLUMNS + TECHNICAL_COLUMNS + STATISTICAL_COLUMNS + TEMPORAL_COLUMNS
+
+
+def frame_timestamps(df: pd.DataFrame) -> Tuple[pd.DatetimeIndex, bool]:
+    """
+    Timestamps of a candle frame.
+
+    Returns:
+        (timestamps, is_real) - is_real is False when the frame has no time
+        information and hourly timestamps ending now were synthesized
+    """
+    if 'timestamp' in df.columns:
+        return pd.DatetimeIndex(pd.to_datetime(df['timestamp'])), True
+    if isinstance(df.index, pd.DatetimeIndex):
+        return df.index, True
+
+    # Fallback - hourly timestamps ending now
+    synthetic = pd.date_range(
+        start=datetime.now() - timedelta(hours=len(df)),
+        periods=len(df),
+        freq='h'
+    )
+    return synthetic, False
+
+
+def _tail_timestamps(df: pd.DataFrame, size: int) -> pd.DatetimeIndex:
+    """Timestamps of the last ``size`` rows (frame must have time information)."""
+    if 'timestamp' not in df.columns:
+        return df.index[-size:]
+    column = df['timestamp']
+    if pd.api.types.is_datetime64_dtype(column.dtype):
+        return pd.DatetimeIndex(column.to_numpy()[-size:])
+    return pd.DatetimeIndex(pd.to_datetime(column.iloc[-size:]))
+
+
+def add_technical_indicators(df: pd.DataFrame) -> pd.DataFrame:
+    """Add technical indicators (RSI, MACD, Bollinger Bands, moving averages)."""
+    close = df['close']
+
+    # RSI
+    delta = close.diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=RSI_WINDOW).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=RSI_WINDOW).mean()
+    rs = gain / loss
+    df['rsi'] = 100 - (100 / (1 + rs))
+
+    # MACD
+    exp1 = close.ewm(span=MACD_FAST).mean()
+    exp2 = close.ewm(span=MACD_SLOW).mean()
+    df['macd'] = exp1 - exp2
+    df['macd_signal'] = df['macd'].ewm(span=MACD_SIGNAL).mean()
+    df['macd_histogram'] = df['macd'] - df['macd_signal']
+
+    # Bollinger Bands
+    df['bb_middle'] = close.rolling(window=BB_WINDOW).mean()
+    bb_std = close.rolling(window=BB_WINDOW).std()
+    df['bb_upper'] = df['bb_middle'] + (bb_std * BB_STD)
+    df['bb_lower'] = df['bb_middle'] - (bb_std * BB_STD)
+    df['bb_position'] = (close - df['bb_lower']) / (df['bb_upper'] - df['bb_lower'])
+
+    # Moving averages
+    for window in SMA_WINDOWS:
+        df[f'sma_{window}'] = close.rolling(window=window).mean()
+    for span in EMA_SPANS:
+        df[f'ema_{span}'] = close.ewm(span=span).mean()
+
+    return df
+
+
+def add_statistical_features(df: pd.DataFrame) -> pd.DataFrame:
+    """Add volatility, ratio, volume and price change features."""
+    # Volatility
+    for window in VOLATILITY_WINDOWS:
+        df[f'volatility_{window}'] = df['close'].rolling(window=window).std()
+
+    # Price ratios
+    df['high_low_ratio'] = df['high'] / df['low']
+    df['close_open_ratio'] = df['close'] / df['open']
+
+    # Volume
+    volume_sma = f'volume_sma_{VOLUME_SMA_WINDOW}'
+    df[volume_sma] = df['volume'].rolling(window=VOLUME_SMA_WINDOW).mean()
+    df['volume_ratio'] = df['volume'] / df[volume_sma]
+
+    # Price changes
+    for period in CHANGE_PERIODS:
+        df[f'price_change_{period}'] = df['close'].pct_change(period)
+        df[f'volume_change_{period}'] = df['volume'].pct_change(period)
+
+    return df
+
+
+def add_temporal_features(df: pd.DataFrame) -> pd.DataFrame:
+    """Add hour / weekday / month features and their cyclical encodings."""
+    timestamps, _ = frame_timestamps(df)
+
+    df['hour'] = timestamps.hour
+    df['day_of_week'] = timestamps.dayofweek
+    df['month'] = timestamps.month
+
+    df['hour_sin'] = np.sin(2 * np.pi * df['hour'] / 24)
+    df['hour_cos'] = np.cos(2 * np.pi * df['hour'] / 24)
+    df['dow_sin'] = np.sin(2 * np.pi * df['day_of_week'] / 7)
+    df['dow_cos'] = np.cos(2 * np.pi * df['day_of_week'] / 7)
+
+    return df
+
+
+def _div(a: float, b: float) -> float:
+    """Float division with numpy semantics (x/0 -> +-inf, 0/0 -> nan)."""
+    if b == 0:
+        if a == 0 or a != a:
+            return math.nan
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+    return a / b
+
+
+class _SymbolState:
+    """
+    Rolling candle buffer plus recursive EMA state for one symbol.
+
+    EMAs follow pandas ``ewm(span=s, adjust=True)``: numerator and
+    denominator are kept separately so each candle is an O(1) update.
+    """
+
+    # Close EMAs tracked recursively: MACD fast/slow plus the plain EMAs
+    CLOSE_SPANS = np.array([MACD_FAST, MACD_SLOW] + list(EMA_SPANS), dtype=np.float64)
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.ohlcv = np.full((5, capacity), np.nan)
+        self.count = 0
+        self.last_ts: Optional[pd.Timestamp] = None
+
+        self.close_decay = 1 - 2 / (self.CLOSE_SPANS + 1)
+        self.signal_decay = 1 - 2 / (MACD_SIGNAL + 1)
+        self.close_num = np.zeros(len(self.CLOSE_SPANS))
+        self.close_den = np.zeros(len(self.CLOSE_SPANS))
+        self.signal_num = 0.0
+        self.signal_den = 0.0
+        # EMA state before the last candle, used when the last candle is revised
+        self._previous = None
+
+        self.values = np.full(len(FEATURE_COLUMNS), np.nan)
+
+    # ------------------------------------------------------------------
+
+    def load(self, ohlcv: np.ndarray, timestamps: pd.DatetimeIndex):
+        """
+        Seed the state from a full candle history (vectorized).
+
+        The history up to the second-to-last candle is loaded in closed form
+        and the last candle is pushed on top, so the EMA state before it is
+        kept and a revision of that (possibly still open) candle replaces it.
+        """
+        n = ohlcv.shape[1] - 1
+        close = pd.Series(ohlcv[3, :n])
+
+        # Closed-form adjust=True state: den = sum(w^i), num = ema * den
+        if n > 0:
+            for k, span in enumerate(self.CLOSE_SPANS):
+                decay = self.close_decay[k]
+                self.close_den[k] = (1 - decay ** n) / (1 - decay)
+                self.close_num[k] = close.ewm(span=span).mean().iloc[-1] * self.close_den[k]
+
+            macd = close.ewm(span=MACD_FAST).mean() - close.ewm(span=MACD_SLOW).mean()
+            self.signal_den = (1 - self.signal_decay ** n) / (1 - self.signal_decay)
+            self.signal_num = macd.ewm(span=MACD_SIGNAL).mean().iloc[-1] * self.signal_den
+        else:
+            self.close_num = np.zeros(len(self.CLOSE_SPANS))
+            self.close_den = np.zeros(len(self.CLOSE_SPANS))
+            self.signal_num = self.signal_den = 0.0
+
+        tail = min(n, self.capacity)
+        self.ohlcv[:] = np.nan
+        if tail:
+            self.ohlcv[:, -tail:] = ohlcv[:, n - tail:n]
+        self.count = n
+        self._previous = None
+        self.push(ohlcv[:, -1], timestamps[-1])
+
+    def push(self, candle: np.ndarray, ts: pd.Timestamp, replace: bool = False):
+        """
+        Apply one candle.
+
+        Args:
+            candle: [open, high, low, close, volume]
+            ts: Candle timestamp
+            replace: Revise the last candle instead of appending a new one
+        """
+        if replace and self._previous is not None:
+            self.close_num, self.close_den, self.signal_num, self.signal_den = self._previous
+        else:
+            self._previous = (self.close_num, self.close_den, self.signal_num, self.signal_den)
+            self.ohlcv[:, :-1] = self.ohlcv[:, 1:]
+            self.count += 1
+        self.ohlcv[:, -1] = candle
+
+        close = candle[3]
+        self.close_num = close + self.close_decay * self.close_num
+        self.close_den = 1 + self.close_decay * self.close_den
+        fast, slow = self.close_num[:2] / self.close_den[:2]
+        self.signal_num = (fast - slow) + self.signal_decay * self.signal_num
+        self.signal_den = 1 + self.signal_decay * self.signal_den
+
+        self.last_ts = ts
+        self._compute(ts)
+
+    # ------------------------------------------------------------------
+
+    def _compute(self, ts: pd.Timestamp):
+        nan = math.nan
+        count = self.count
+        o, h, l, c, v = self.ohlcv[:, -1].tolist()
+        values = {'open': o, 'high': h, 'low': l, 'close': c, 'volume': v}
+
+        # Prefix sums over the newest candles, shifted by the last close so
+        # rolling variances do not lose precision on large prices
+        shifted = self.ohlcv[3, ::-1] - c
+        sum1 = np.cumsum(shifted).tolist()
+        sum2 = np.cumsum(shifted * shifted).tolist()
+        volume_sums = np.cumsum(self.ohlcv[4, ::-1]).tolist()
+
+        def mean(window):
+            return c + sum1[window - 1] / window if count >= window else nan
+
+        def std(window):
+            if count < window:
+                return nan
+            s1 = sum1[window - 1]
+            var = (sum2[window - 1] - s1 * s1 / window) / (window - 1)
+            return math.sqrt(var) if var > 0 else 0.0
+
+        # RSI
+        if count > RSI_WINDOW:
+            deltas = np.diff(self.ohlcv[3, -RSI_WINDOW - 1:]).tolist()
+            gain = sum(d for d in deltas if d > 0) / RSI_WINDOW
+            loss = -sum(d for d in deltas if d < 0) / RSI_WINDOW
+            values['rsi'] = 100 - (100 / (1 + _div(gain, loss)))
+        else:
+            values['rsi'] = nan
+
+        # MACD
+        emas = (self.close_num / self.close_den).tolist()
+        values['macd'] = emas[0] - emas[1]
+        values['macd_signal'] = self.signal_num / self.signal_den
+        values['macd_histogram'] = values['macd'] - values['macd_signal']
+
+        # Bollinger Bands
+        middle, bb_std = mean(BB_WINDOW), std(BB_WINDOW)
+        upper, lower = middle + bb_std * BB_STD, middle - bb_std * BB_STD
+        values['bb_middle'] = middle
+        values['bb_upper'] = upper
+        values['bb_lower'] = lower
+        values['bb_position'] = _div(c - lower, upper - lower)
+
+        # Moving averages
+        for window in SMA_WINDOWS:
+            values[f'sma_{window}'] = mean(window)
+        for k, span in enumerate(EMA_SPANS):
+            values[f'ema_{span}'] = emas[2 + k]
+
+        # Statistical
+        for window in VOLATILITY_WINDOWS:
+            values[f'volatility_{window}'] = std(window)
+
+        values['high_low_ratio'] = _div(h, l)
+        values['close_open_ratio'] = _div(c, o)
+
+        if count >= VOLUME_SMA_WINDOW:
+            volume_sma = volume_sums[VOLUME_SMA_WINDOW - 1] / VOLUME_SMA_WINDOW
+        else:
+            volume_sma = nan
+        values[f'volume_sma_{VOLUME_SMA_WINDOW}'] = volume_sma
+        values['volume_ratio'] = _div(v, volume_sma)
+
+        for period in CHANGE_PERIODS:
+            if count > period:
+                values[f'price_change_{period}'] = _div(c, self.ohlcv[3, -1 - period]) - 1
+                values[f'volume_change_{period}'] = _div(v, self.ohlcv[4, -1 - period]) - 1
+            else:
+                values[f'price_change_{period}'] = nan
+                values[f'volume_change_{period}'] = nan
+
+        # Temporal
+        hour, dow = ts.hour, ts.dayofweek
+        values['hour'] = hour
+        values['day_of_week'] = dow
+        values['month'] = ts.month
+        values['hour_sin'] = math.sin(2 * math.pi * hour / 24)
+        values['hour_cos'] = math.cos(2 * math.pi * hour / 24)
+        values['dow_sin'] = math.sin(2 * math.pi * dow / 7)
+        values['dow_cos'] = math.cos(2 * math.pi * dow / 7)
+
+        self.values = np.array([values[name] for name in FEATURE_COLUMNS], dtype=np.float64)
+
+
+class FeatureStore:
+    """
+    Per-symbol feature store.
+
+    Training frames are built with ``compute_frame`` and live inference reads
+    ``latest``; both use the feature definitions of this module. For each
+    symbol the store keeps only a rolling candle buffer and recursive EMA
+    state, so a new candle costs O(largest window) instead of re-running
+    the pandas pipeline over the whole frame.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = config or {}
+        longest = max(SMA_WINDOWS + VOLATILITY_WINDOWS + (BB_WINDOW, VOLUME_SMA_WINDOW, RSI_WINDOW + 1))
+        self.capacity = max(longest, max(CHANGE_PERIODS) + 1)
+
+        self._states: Dict[str, _SymbolState] = {}
+        self._column_index = {name: i for i, name in enumerate(FEATURE_COLUMNS)}
+        self._selection_cache: Dict[Tuple[str, ...], np.ndarray] = {}
+
+        self.stats = {
+            'warmups': 0,
+            'incremental_updates': 0,
+            'revisions': 0,
+        }
+
+    @property
+    def feature_names(self) -> List[str]:
+        return list(FEATURE_COLUMNS)
+
+    # ------------------------------------------------------------------
+    # Batch (training)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def compute_frame(dataframe: pd.DataFrame) -> pd.DataFrame:
+        """
+        Compute all features over a full frame (in place).
+
+        Args:
+            dataframe: OHLCV DataFrame
+
+        Returns:
+            DataFrame with feature columns added
+        """
+        dataframe = add_technical_indicators(dataframe)
+        dataframe = add_statistical_features(dataframe)
+        return add_temporal_features(dataframe)
+
+    # ------------------------------------------------------------------
+    # Incremental (inference)
+    # ------------------------------------------------------------------
+
+    def warmup(self, symbol: str, dataframe: pd.DataFrame):
+        """
+        (Re)build a symbol state from a candle history.
+
+        Args:
+            symbol: Trading pair
+            dataframe: OHLCV DataFrame (oldest first)
+        """
+        if dataframe.empty:
+            self._states.pop(symbol, None)
+            return
+
+        timestamps, _ = frame_timestamps(dataframe)
+        state = _SymbolState(self.capacity)
+        state.load(dataframe[BASE_COLUMNS].to_numpy(dtype=np.float64).T, timestamps)
+        self._states[symbol] = state
+        self.stats['warmups'] += 1
+
+    def update(self, symbol: str, candle: Dict[str, Any]) -> Optional[np.ndarray]:
+        """
+        Apply a single candle to a symbol.
+
+        A candle with the same timestamp as the last one revises it (live,
+        still-open candle); older candles are ignored.
+
+        Args:
+            symbol: Trading pair
+            candle: Dict with open/high/low/close/volume and 'timestamp'
+                (datetime or epoch milliseconds)
+
+        Returns:
+            Latest feature row (float64) or None if the candle was ignored
+        """
+        ts = candle.get('timestamp')
+        if ts is None:
+            ts = pd.Timestamp(datetime.now())
+        elif isinstance(ts, (int, float, np.integer, np.floating)):
+            ts = pd.Timestamp(int(ts), unit='ms')
+        else:
+            ts = pd.Timestamp(ts)
+
+        values = np.array([float(candle[col]) for col in BASE_COLUMNS], dtype=np.float64)
+
+        state = self._states.get(symbol)
+        if state is None:
+            state = _SymbolState(self.capacity)
+            self._states[symbol] = state
+            state.push(values, ts)
+        elif state.last_ts is not None and ts < state.last_ts:
+            return None
+        elif state.last_ts is not None and ts == state.last_ts:
+            state.push(values, ts, replace=True)
+            self.stats['revisions'] += 1
+        else:
+            state.push(values, ts)
+            self.stats['incremental_updates'] += 1
+
+        return state.values
+
+    def sync(self, symbol: str, dataframe: pd.DataFrame) -> int:
+        """
+        Bring a symbol up to date with a candle frame.
+
+        Only candles newer than the last one seen are applied (the last one
+        is revised if it changed). Frames without timestamps, or that do not
+        overlap the stored state, trigger a full warmup.
+
+        Args:
+            symbol: Trading pair
+            dataframe: OHLCV DataFrame (oldest first)
+
+        Returns:
+            Number of candles applied
+        """
+        if dataframe.empty:
+            return 0
+
+        state = self._states.get(symbol)
+        has_time = 'timestamp' in dataframe.columns or isinstance(dataframe.index, pd.DatetimeIndex)
+
+        if not has_time or state is None or state.last_ts is None:
+            self.warmup(symbol, dataframe)
+            return len(dataframe)
+
+        # Only the tail newer than the stored state is converted
+        n = len(dataframe)
+        size = min(n, 8)
+        while True:
+            timestamps = _tail_timestamps(dataframe, size)
+            if timestamps[0] <= state.last_ts or size == n:
+                break
+            size = min(n, size * 4)
+
+        if timestamps[0] > state.last_ts:
+            self.warmup(symbol, dataframe)
+            return n
+
+        start = timestamps.searchsorted(state.last_ts, side='left')
+        timestamps = timestamps[start:]
+        tail = len(timestamps)
+        if tail == 0:
+            return 0
+        ohlcv = np.column_stack([
+            dataframe[col].to_numpy(dtype=np.float64)[n - tail:] for col in BASE_COLUMNS
+        ])
+        revised = 0
+        first = 0
+
+        if timestamps[0] == state.last_ts:
+            if not np.array_equal(ohlcv[0], state.ohlcv[:, -1]):
+                state.push(ohlcv[0], timestamps[0], replace=True)
+                self.stats['revisions'] += 1
+                revised = 1
+            first = 1
+
+        for i in range(first, tail):
+            state.push(ohlcv[i], timestamps[i])
+        appended = tail - first
+        self.stats['incremental_updates'] += appended
+        return appended + revised
+
+    def latest(self, symbol: str, feature_names: Optional[List[str]] = None) -> Optional[np.ndarray]:
+        """
+        Latest feature row of a symbol, ready for ``model.predict``.
+
+        Args:
+            symbol: Trading pair
+            feature_names: Columns in model order (None = all features)
+
+        Returns:
+            float32 array of shape (1, n_features) or None if unknown symbol
+        """
+        state = self._states.get(symbol)
+        if state is None:
+            return None
+        if feature_names is None:
+            return state.values.astype(np.float32).reshape(1, -1)
+
+        key = tuple(feature_names)
+        index = self._selection_cache.get(key)
+        if index is None:
+            index = np.array([self._column_index[name] for name in feature_names], dtype=np.int64)
+            self._selection_cache[key] = index
+        return state.values[index].astype(np.float32).reshape(1, -1)
+
+    def latest_timestamp(self, symbol: str) -> Optional[pd.Timestamp]:
+        state = self._states.get(symbol)
+        return state.last_ts if state else None
+
+    def has_symbol(self, symbol: str) -> bool:
+        return symbol in self._states
+
+    def reset(self, symbol: Optional[str] = None):
+        """Drop the state of one symbol (or all)."""
+        if symbol is None:
+            self._states.clear()
+        else:
+            self._states.pop(symbol, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'symbols': len(self._states),
+            'features': len(FEATURE_COLUMNS),
+            'buffer_size': self.capacity
+        }
@@ -9,6 +9,7 @@ import logging
 from .data_kitchen import DataKitchen
 from .data_drawer import DataDrawer
 from .feature_engineering import FeatureEngineering
+from .model_comparison import ModelComparisonRunner, simulate_signals
 from .base_models import LightGBMModel, XGBoostModel, CatBoostModel
 
 logger = logging.getLogger(__name__)
@@ -24,7 +25,7 @@ class FreqAIInterface:
     - Model versioning
     - Backtesting with ML
     - Online learning
-    - Model comparison
+    - Model comparison (parallel, vectorized signal backtest)
     """
 
     AVAILABLE_MODELS = {
@@ -214,7 +215,7 @@ class FreqAIInterface:
             metadata = self.data_drawer.get_model_metadata(model_path)
         else:
             self.current_model = self.data_drawer.load_latest_model(strategy_name, symbol)
-            metadata = {}
+            metadata = self.data_drawer.get_latest_metadata(strategy_name, symbol) or {}
         
         if self.current_model is None:
             raise ValueError(f"No model found for {strategy_name}/{symbol}")
@@ -224,22 +225,36 @@ class FreqAIInterface:
 
     def online_update(
         self,
-        new_data: pd.DataFrame
+        new_data: pd.DataFrame,
+        symbol: Optional[str] = None
     ):
         """
         Update model with new data (online learning).
         
+        Features are computed incrementally per symbol: only candles not
+        seen in previous updates are featurized, using the cached tail of
+        raw candles as indicator warmup.
+        
         Args:
             new_data: DataFrame with new OHLCV data and labels
+            symbol: Trading pair (stream key for incremental features)
         """
         if self.current_model is None:
             raise ValueError("No model loaded")
         
-        # Feature engineering
-        features = self.feature_engineering.create_features(new_data, include_labels=True)
+        # Feature engineering (incremental)
+        features = self.feature_engineering.create_features_incremental(
+            symbol or self.current_model_name or 'default',
+            new_data,
+            include_labels=True
+        )
         X = features['X']
         y = features['y']
         
+        if len(X) == 0:
+            logger.info("No new samples for online update")
+            return
+        
         # Update model
         self.current_model.partial_fit(X, y)
         
@@ -251,63 +266,103 @@ class FreqAIInterface:
         symbol: str,
         timerange: str,
         models: List[str] = None,
-        timeframe: str = '5m'
+        timeframe: str = '5m',
+        test_size: float = 0.2,
+        max_workers: Optional[int] = None
     ) -> pd.DataFrame:
         """
         Compare performance of multiple models.
         
+        Data and features are prepared once; candidates train in parallel
+        worker processes on the shared matrix and are scored on the same
+        out-of-sample window (classification metrics + signal PnL). Every
+        candidate is saved and the best one (F1) becomes the current model.
+        
         Args:
             strategy_name: Strategy name
             symbol: Trading pair
             timerange: Time range for training
             models: List of model names (None = all available)
             timeframe: Candle timeframe
+            test_size: Test set proportion
+            max_workers: Parallel candidates (None = config / CPU count)
             
         Returns:
-            DataFrame with model comparison
+            DataFrame with model comparison (one row per model, with timings)
         """
         if models is None:
             models = list(self.AVAILABLE_MODELS.keys())
         
         logger.info(f"🔬 Comparing {len(models)} models...")
         
-        results = []
-        
+        candidates = {}
+        errors = []
         for model_name in models:
-            logger.info(f"\n--- Testing {model_name} ---")
+            if model_name in self.AVAILABLE_MODELS:
+                candidates[model_name] = self.AVAILABLE_MODELS[model_name]
+            else:
+                errors.append({'model': model_name, 'error': f"Model {model_name} not available"})
+        
+        data = self.data_kitchen.prepare_data(
+            symbol=symbol,
+            timerange=timerange,
+            strategy=strategy_name,
+            timeframe=timeframe
+        )
+        
+        if len(data) == 0:
+            raise ValueError("No data available for training")
+        
+        features = self.feature_engineering.create_features(data, include_labels=True)
+        
+        runner = ModelComparisonRunner(
+            self.config,
+            max_workers=max_workers,
+            periods_per_year=self._periods_per_year(timeframe)
+        )
+        run = runner.run(
+            candidates,
+            features['X'],
+            features['y'],
+            features['dataframe']['close'].values,
+            test_size=test_size
+        )
+        
+        comparison = run['table']
+        if errors:
+            comparison = pd.concat([comparison, pd.DataFrame(errors)], ignore_index=True)
+        
+        for model_name, result in run['results'].items():
+            result['model_path'] = self.data_drawer.save_model(
+                model=result['model'],
+                strategy_name=strategy_name,
+                symbol=symbol,
+                metrics=result['test_metrics'],
+                model_name=model_name
+            )
+        
+        if run['results']:
+            best_name = comparison['model'].iloc[0]
+            best = run['results'][best_name]
             
-            try:
-                metrics = self.train(
-                    strategy_name=strategy_name,
-                    symbol=symbol,
-                    timerange=timerange,
-                    model_name=model_name,
-                    timeframe=timeframe
-                )
-                
-                results.append({
-                    'model': model_name,
-                    'accuracy': metrics['test_metrics']['accuracy'],
-                    'f1_score': metrics['test_metrics']['f1_score'],
-                    'precision': metrics['test_metrics']['precision'],
-                    'recall': metrics['test_metrics']['recall'],
-                    'train_samples': metrics['train_samples'],
-                    'num_features': metrics['num_features']
-                })
-            except Exception as e:
-                logger.error(f"Error training {model_name}: {e}")
-                results.append({
-                    'model': model_name,
-                    'error': str(e)
-                })
-        
-        comparison = pd.DataFrame(results)
-        
-        # Sort by F1 score (descending)
-        if 'f1_score' in comparison.columns:
-            comparison = comparison.sort_values('f1_score', ascending=False)
-        
-        logger.info("\n📊 Model Comparison:")
+            self.current_model = best['model']
+            self.current_model_name = best_name
+            self.model_metadata = {
+                'strategy': strategy_name,
+                'symbol': symbol,
+                'model_name': best_name,
+                'timeframe': timeframe,
+                'trained_at': datetime.now().isoformat(),
+                'train_samples': int(len(features['X']) * (1 - test_size)),
+                'num_features': len(features['feature_names']),
+                'feature_names': features['feature_names'],
+                'train_metrics': best['train_metrics'],
+                'test_metrics': best['test_metrics'],
+                'backtest': best['backtest'],
+                'model_path': best['model_path']
+            }
+        
+        logger.info(f"\n📊 Model Comparison ({run['total_time']:.1f}s):")
         print(comparison.to_string(index=False))
         
         return comparison
@@ -317,16 +372,21 @@ class FreqAIInterface:
         strategy_name: str,
         symbol: str,
         timerange: str,
-        timeframe: str = '5m'
+        timeframe: str = '5m',
+        fee: float = 0.001
     ) -> Dict[str, Any]:
         """
         Run backtest using ML predictions.
         
+        The whole range is featurized and predicted in one call; the
+        signal array is then simulated vectorized (long/flat).
+        
         Args:
             strategy_name: Strategy name
             symbol: Trading pair
             timerange: Time range for backtesting
             timeframe: Candle timeframe
+            fee: Cost per position change
             
         Returns:
             Backtest results
@@ -344,32 +404,43 @@ class FreqAIInterface:
             timeframe=timeframe
         )
         
-        # Get predictions
-        predictions = self.predict(data)
-        predictions_proba = self.predict(data, return_proba=True)
+        # Get predictions (single model pass)
+        features = self.feature_engineering.create_features(data, include_labels=False)
+        predictions, predictions_proba = self.current_model.predict_batch(features['X'])
         
-        # Add predictions to dataframe
-        data['ml_prediction'] = predictions
         if predictions_proba.ndim > 1:
-            data['ml_confidence'] = predictions_proba[:, 1]
+            confidence = predictions_proba[:, 1]
         else:
-            data['ml_confidence'] = predictions_proba
+            confidence = predictions_proba
+        
+        performance = simulate_signals(
+            features['dataframe']['close'].values,
+            predictions,
+            fee=fee,
+            periods_per_year=self._periods_per_year(timeframe)
+        )
         
-        # TODO: Integrate with existing backtest runner
-        # For now, return basic statistics
         results = {
             'symbol': symbol,
             'timerange': timerange,
             'total_signals': int(np.sum(predictions == 1)),
             'signal_rate': float(np.mean(predictions)),
-            'avg_confidence': float(np.mean(data['ml_confidence'])),
-            'data_points': len(data)
+            'avg_confidence': float(np.mean(confidence)),
+            'data_points': len(predictions),
+            **performance
         }
         
-        logger.info(f"✅ Backtest complete. Signals: {results['total_signals']}")
+        logger.info(
+            f"✅ Backtest complete. Signals: {results['total_signals']}, "
+            f"Return: {results['total_return']:.2%}"
+        )
         
         return results
 
+    def _periods_per_year(self, timeframe: str) -> float:
+        """Number of candles per year (Sharpe annualization)."""
+        return 365 * 24 * 60 / self.data_kitchen._parse_timeframe_to_minutes(timeframe)
+
     def _split_data(
         self,
         X: np.ndarray,
@@ -0,0 +1,288 @@
+"""Model Comparison - parallel candidate training and vectorized signal backtests."""
+
+import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Type
+
+import numpy as np
+import pandas as pd
+
+from ..model_cache import dump_artifact, load_artifact
+from .base_models import BaseMLModel
+
+try:
+    from threadpoolctl import threadpool_limits
+except ImportError:  # ships with scikit-learn
+    threadpool_limits = None
+
+logger = logging.getLogger(__name__)
+
+
+def simulate_signals(
+    close: np.ndarray,
+    signals: np.ndarray,
+    fee: float = 0.001,
+    periods_per_year: float = 365 * 24 * 12
+) -> Dict[str, float]:
+    """
+    Vectorized long/flat PnL of a signal array.
+
+    A signal of 1 on bar t holds the asset from close[t] to close[t + 1];
+    every position change pays ``fee`` (fraction of equity).
+
+    Args:
+        close: Close prices, one per bar
+        signals: 1 = long, 0 = flat, aligned with ``close``
+        fee: Cost per position change
+        periods_per_year: Bars per year (Sharpe annualization)
+
+    Returns:
+        Dict with total_return, sharpe_ratio, max_drawdown, num_trades,
+        win_rate, exposure
+    """
+    close = np.asarray(close, dtype=np.float64)
+    position = (np.asarray(signals) > 0).astype(np.float64)[:-1]
+
+    if len(position) == 0:
+        return {
+            'total_return': 0.0,
+            'sharpe_ratio': 0.0,
+            'max_drawdown': 0.0,
+            'num_trades': 0,
+            'win_rate': 0.0,
+            'exposure': 0.0,
+        }
+
+    bar_returns = close[1:] / close[:-1] - 1.0
+    turnover = np.abs(np.diff(position, prepend=0.0))
+    strategy_returns = position * bar_returns - fee * turnover
+
+    equity = np.cumprod(1.0 + strategy_returns)
+    drawdown = equity / np.maximum.accumulate(equity) - 1.0
+
+    std = strategy_returns.std()
+    sharpe = strategy_returns.mean() / std * np.sqrt(periods_per_year) if std > 0 else 0.0
+
+    # Per-trade returns: sum log returns over each run of consecutive longs
+    entries = np.diff(position, prepend=0.0) > 0
+    in_trade = position > 0
+    num_trades = int(entries.sum())
+    win_rate = 0.0
+    if num_trades:
+        trade_ids = np.cumsum(entries)[in_trade] - 1
+        trade_log_returns = np.bincount(
+            trade_ids,
+            weights=np.log1p(strategy_returns[in_trade]),
+            minlength=num_trades
+        )
+        win_rate = float((trade_log_returns > 0).mean())
+
+    return {
+        'total_return': float(equity[-1] - 1.0),
+        'sharpe_ratio': float(sharpe),
+        'max_drawdown': float(drawdown.min()),
+        'num_trades': num_trades,
+        'win_rate': win_rate,
+        'exposure': float(position.mean()),
+    }
+
+
+def _limit_threads(threads: int):
+    """Cap the native (BLAS/OpenMP) thread pools already loaded in this process."""
+    if threadpool_limits is not None:
+        threadpool_limits(limits=threads)
+
+
+def _init_worker(threads: int):
+    """Split the host cores between concurrently training candidates."""
+    # The env vars only reach libraries loaded after this point; numpy's
+    # BLAS is already loaded, so its pool is capped at runtime instead
+    for var in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+        os.environ[var] = str(threads)
+    _limit_threads(threads)
+
+
+def _fit_candidate(
+    model_name: str,
+    model_class: Type[BaseMLModel],
+    config: Dict[str, Any],
+    data_path: str,
+    val_fraction: float,
+    threads: int = 1
+) -> Dict[str, Any]:
+    """
+    Train one candidate on the shared matrix and predict the test window.
+
+    Runs in a worker process; the feature matrix is memory-mapped
+    read-only, so candidates share the page cache instead of each holding
+    a private copy.
+    """
+    # Unpickling model_class loaded the model library (and its OpenMP pool)
+    _limit_threads(threads)
+
+    data = load_artifact(data_path, mmap_mode='r')
+    X_train, y_train = data['X_train'], data['y_train']
+
+    val_split = int(len(X_train) * (1 - val_fraction))
+
+    model = model_class(config)
+
+    started = time.perf_counter()
+    train_metrics = model.train(
+        X_train=X_train[:val_split],
+        y_train=y_train[:val_split],
+        X_valid=X_train[val_split:],
+        y_valid=y_train[val_split:]
+    )
+    train_time = time.perf_counter() - started
+
+    # Whole out-of-sample window in one pass
+    started = time.perf_counter()
+    labels, proba = model.predict_batch(data['X_test'])
+    predict_time = time.perf_counter() - started
+
+    return {
+        'model_name': model_name,
+        'model': model,
+        'labels': labels,
+        'proba': proba,
+        'train_metrics': train_metrics,
+        'test_metrics': model._calculate_metrics(data['y_test'], labels, proba),
+        'train_time': train_time,
+        'predict_time': predict_time,
+    }
+
+
+class ModelComparisonRunner:
+    """
+    Train model candidates in parallel and rank them on one table.
+
+    The train/test matrices are written once (uncompressed joblib) and
+    memory-mapped by every worker. Each candidate predicts the full test
+    window with a single predict_batch call and its signals are scored by
+    ``simulate_signals``.
+    """
+
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        max_workers: Optional[int] = None,
+        fee: Optional[float] = None,
+        periods_per_year: Optional[float] = None,
+        start_method: str = 'spawn'
+    ):
+        comparison_config = config.get('freqai', {}).get('comparison', {})
+
+        self.config = config
+        self.max_workers = max_workers or comparison_config.get('max_workers')
+        self.fee = fee if fee is not None else comparison_config.get('fee', 0.001)
+        self.periods_per_year = periods_per_year or comparison_config.get(
+            'periods_per_year', 365 * 24 * 12
+        )
+        self.start_method = start_method
+
+    def run(
+        self,
+        candidates: Dict[str, Type[BaseMLModel]],
+        X: np.ndarray,
+        y: np.ndarray,
+        close: np.ndarray,
+        test_size: float = 0.2,
+        val_fraction: float = 0.2
+    ) -> Dict[str, Any]:
+        """
+        Compare candidates on a time-ordered dataset.
+
+        Args:
+            candidates: model name -> BaseMLModel subclass
+            X: Feature matrix (time ordered)
+            y: Labels aligned with X
+            close: Close prices aligned with X (for the PnL simulation)
+            test_size: Out-of-sample fraction (taken from the end)
+            val_fraction: Early-stopping fraction of the training window
+
+        Returns:
+            Dict with 'table' (DataFrame, best first), 'results'
+            (model name -> full worker result) and 'total_time'
+        """
+        split_idx = int(len(X) * (1 - test_size))
+        close_test = np.asarray(close, dtype=np.float64)[split_idx:]
+
+        workers = max(1, min(len(candidates), self.max_workers or os.cpu_count() or 1))
+        threads = max(1, (os.cpu_count() or 1) // workers)
+
+        started = time.perf_counter()
+        tmp_dir = Path(tempfile.mkdtemp(prefix='freqai_compare_'))
+        results: Dict[str, Dict[str, Any]] = {}
+        rows: List[Dict[str, Any]] = []
+
+        try:
+            data_path = dump_artifact(
+                {
+                    'X_train': np.ascontiguousarray(X[:split_idx], dtype=np.float32),
+                    'y_train': np.asarray(y[:split_idx]),
+                    'X_test': np.ascontiguousarray(X[split_idx:], dtype=np.float32),
+                    'y_test': np.asarray(y[split_idx:]),
+                },
+                tmp_dir / 'features.joblib'
+            )
+
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context(self.start_method),
+                initializer=_init_worker,
+                initargs=(threads,)
+            ) as pool:
+                futures = {
+                    pool.submit(
+                        _fit_candidate, name, model_class, self.config, str(data_path), val_fraction, threads
+                    ): name
+                    for name, model_class in candidates.items()
+                }
+
+                for future in as_completed(futures):
+                    name = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logger.error(f"Error training {name}: {e}")
+                        rows.append({'model': name, 'error': str(e)})
+                        continue
+
+                    backtest = simulate_signals(
+                        close_test, result['labels'], self.fee, self.periods_per_year
+                    )
+                    result['backtest'] = backtest
+                    results[name] = result
+
+                    test_metrics = result['test_metrics']
+                    rows.append({
+                        'model': name,
+                        'accuracy': test_metrics['accuracy'],
+                        'f1_score': test_metrics['f1_score'],
+                        'precision': test_metrics['precision'],
+                        'recall': test_metrics['recall'],
+                        **backtest,
+                        'train_time_s': result['train_time'],
+                        'predict_time_s': result['predict_time'],
+                        'train_samples': split_idx,
+                        'num_features': X.shape[1],
+                    })
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        table = pd.DataFrame(rows)
+        if 'f1_score' in table.columns:
+            table = table.sort_values('f1_score', ascending=False, na_position='last')
+
+        return {
+            'table': table.reset_index(drop=True),
+            'results': results,
+            'total_time': time.perf_counter() - started,
+        }
@@ -16,6 +16,7 @@ import os
 import json
 from datetime import datetime, timedelta
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 # Sistema existente (PRESERVAR COMPATIBILIDADE)
 try:
@@ -28,6 +29,9 @@ except ImportError:
 
 # Componentes ML
 from .freqai_bridge import FreqAIBridge
+from .model_cache import dump_artifact
+from .model_registry import ModelRegistry
+from .training_scheduler import TrainingScheduler
 
 # AutoML components (implementar posteriormente)
 try:
@@ -86,12 +90,20 @@ class MLManager:
         self.automl_feature_engineer = None
         self.automl_model_selector = None
         self.ensemble_predictor = None
+        self.model_registry = None
+        self.training_scheduler = None
         
         # Performance tracking
         self.prediction_history = []
         self.model_performance = {}
         self.last_retrain = {}
         
+        # Pool para famílias de modelos independentes
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.config.get('inference_workers', 4),
+            thread_name_prefix='ml-inference'
+        )
+        
         # Inicializar componentes
         self._initialize_components()
         
@@ -115,6 +127,16 @@ class MLManager:
             'retrain_frequency': 'weekly',  # daily, weekly, monthly
             'min_accuracy_threshold': 0.6,
             'confidence_threshold': 0.7,
+            'inference_workers': 4,  # threads para inferência em lote
+            
+            # Treino em background (processos separados da inferência)
+            'training_scheduler_enabled': True,
+            'training_cpu_budget': None,  # núcleos para treino (None = metade)
+            'training_memory_budget_mb': 4096,
+            'training_memory_per_job_mb': 2048,
+            'training_history_days': 30,
+            'training_timeframe': '1h',
+            'symbol_priorities': {},  # símbolo -> prioridade (maior primeiro)
             
             # Paths
             'models_path': 'ml/models_cache/',
@@ -167,6 +189,28 @@ class MLManager:
             # 4. Criar diretórios necessários
             self._create_directories()
             
+            # 5. Registry + scheduler de treino em background
+            if self.freqai_bridge and self.config.get('training_scheduler_enabled', True):
+                self.model_registry = ModelRegistry(
+                    base_path=str(Path(self.config['models_path']) / 'registry')
+                )
+                self.training_scheduler = TrainingScheduler(
+                    {
+                        'cpu_budget': self.config.get('training_cpu_budget'),
+                        'memory_budget_mb': self.config.get('training_memory_budget_mb', 4096),
+                        'memory_per_job_mb': self.config.get('training_memory_per_job_mb', 2048),
+                        'retrain_interval_seconds': self._retrain_threshold().total_seconds(),
+                        'symbol_priorities': self.config.get('symbol_priorities', {}),
+                        'history': {
+                            'days': self.config.get('training_history_days', 30),
+                            'timeframe': self.config.get('training_timeframe', '1h'),
+                            'cache_dir': self.config['data_cache_path'],
+                        },
+                    },
+                    publish=self._publish_model
+                )
+                logging.info("✅ Training Scheduler inicializado")
+            
         except Exception as e:
             logging.error(f"Erro na inicialização de componentes: {e}")
     
@@ -189,104 +233,189 @@ class MLManager:
             Predição aprimorada combinando ML + IA original
         """
         
-        try:
-            symbol = symbol or market_data.get('symbol', 'UNKNOWN')
-            
-            # 1. SEMPRE verificar sistema IA original primeiro (NUNCA PULAR)
-            if AI_SYSTEM_AVAILABLE and self.ai_coordinator:
-                ai_allowed = self.ai_coordinator.allow(symbol)
-                
-                if not ai_allowed:
-                    return {
-                        'action': 'hold',
-                        'confidence': 0.0,
-                        'reasoning': 'Sistema IA original bloqueou trading',
-                        'source': 'original_ai_block',
-                        'symbol': symbol
-                    }
-            
-            # 2. Obter predições ML
-            ml_predictions = []
+        symbol = symbol or market_data.get('symbol', 'UNKNOWN')
+        return self.get_predictions_batch({symbol: market_data})[symbol]
+    
+    def get_predictions_batch(self, market_data_by_symbol: Dict[str, Dict]) -> Dict[str, Dict]:
+        """
+        Obtém predições para todos os símbolos ativos em um ciclo
+        
+        As linhas de features de todos os símbolos que compartilham um modelo
+        são avaliadas em um único predict_proba. FreqAI, ensemble e a
+        validação multi-agente são famílias independentes e rodam em
+        paralelo no pool de threads.
+        
+        Args:
+            market_data_by_symbol: symbol -> dados de mercado
             
-            # 2a. FreqAI prediction
-            if self.freqai_bridge:
-                try:
-                    # Converter market_data para DataFrame se necessário
-                    if isinstance(market_data, dict):
-                        df_data = self._dict_to_dataframe(market_data)
-                    else:
-                        df_data = market_data
+        Returns:
+            symbol -> predição (mesmo formato de get_prediction)
+        """
+        
+        results = {}
+        active = {}
+        
+        # 1. SEMPRE verificar sistema IA original primeiro (NUNCA PULAR)
+        for symbol, market_data in market_data_by_symbol.items():
+            try:
+                if AI_SYSTEM_AVAILABLE and self.ai_coordinator:
+                    ai_allowed = self.ai_coordinator.allow(symbol)
                     
-                    freqai_pred = self.freqai_bridge.predict(symbol, df_data)
-                    ml_predictions.append({
+                    if not ai_allowed:
+                        results[symbol] = {
+                            'action': 'hold',
+                            'confidence': 0.0,
+                            'reasoning': 'Sistema IA original bloqueou trading',
+                            'source': 'original_ai_block',
+                            'symbol': symbol
+                        }
+                        continue
+                
+                active[symbol] = market_data
+                
+            except Exception as e:
+                results[symbol] = self._prediction_error(e, symbol)
+        
+        if not active:
+            return results
+        
+        # 2. Famílias independentes em paralelo
+        ml_predictions = {symbol: [] for symbol in active}
+        
+        ensemble_future = None
+        if self.ensemble_predictor:
+            ensemble_future = self._executor.submit(self._predict_ensemble, active)
+        
+        agents_future = None
+        if AI_SYSTEM_AVAILABLE and self.multi_agent:
+            agents_future = self._executor.submit(self._multi_agent_decisions, active)
+        
+        # 2a. FreqAI: um predict_proba por modelo
+        if self.freqai_bridge:
+            try:
+                frames = {
+                    symbol: self._dict_to_dataframe(market_data) if isinstance(market_data, dict) else market_data
+                    for symbol, market_data in active.items()
+                }
+                freqai_preds = self.freqai_bridge.predict_batch(frames, executor=self._executor)
+                
+                for symbol, freqai_pred in freqai_preds.items():
+                    ml_predictions[symbol].append({
                         'source': 'freqai',
                         'weight': 0.4,
                         **freqai_pred
                     })
-                except Exception as e:
-                    logging.warning(f"Erro FreqAI prediction: {e}")
-            
-            # 2b. Ensemble prediction (se disponível)
-            if self.ensemble_predictor:
-                try:
-                    ensemble_pred = self.ensemble_predictor.predict(market_data)
-                    ml_predictions.append({
-                        'source': 'ensemble',
-                        'weight': 0.6,
-                        **ensemble_pred
-                    })
-                except Exception as e:
-                    logging.warning(f"Erro ensemble prediction: {e}")
-            
-            # 3. Combinar predições ML
-            if not ml_predictions:
-                return {
-                    'action': 'hold',
-                    'confidence': 0.0,
-                    'reasoning': 'Nenhuma predição ML disponível',
-                    'source': 'no_ml_models',
-                    'symbol': symbol
-                }
-            
-            combined_ml = self._combine_ml_predictions(ml_predictions)
-            
-            # 4. INTEGRAÇÃO COM SISTEMA MULTI-AGENTE ORIGINAL
-            if AI_SYSTEM_AVAILABLE and self.multi_agent:
-                try:
-                    # Usar multi-agent para validar decisão ML
-                    agent_decision = self.multi_agent.make_trading_decision(market_data)
-                    
-                    if agent_decision:
-                        # Boost confiança se agentes concordam
-                        if agent_decision.get('action') == combined_ml.get('action'):
-                            combined_ml['confidence'] *= 1.15  # 15% boost
-                            combined_ml['confidence'] = min(combined_ml['confidence'], 0.95)
-                            combined_ml['multi_agent_boost'] = True
-                        
-                        combined_ml['multi_agent_decision'] = agent_decision
-                
-                except Exception as e:
-                    logging.warning(f"Erro integração multi-agent: {e}")
-            
-            # 5. Aplicar thresholds finais
-            final_prediction = self._apply_final_filters(combined_ml, symbol)
-            
-            # 6. Logging e tracking
-            self._track_prediction(final_prediction, market_data)
-            
-            return final_prediction
-            
-        except Exception as e:
-            logging.error(f"Erro na predição ML: {e}")
-            
+            except Exception as e:
+                logging.warning(f"Erro FreqAI prediction: {e}")
+        
+        # 2b. Ensemble prediction (se disponível)
+        if ensemble_future is not None:
+            for symbol, ensemble_pred in ensemble_future.result().items():
+                ml_predictions[symbol].append({
+                    'source': 'ensemble',
+                    'weight': 0.6,
+                    **ensemble_pred
+                })
+        
+        agent_decisions = agents_future.result() if agents_future is not None else {}
+        
+        # 2c. Retreino em background (só enfileira, nunca treina aqui)
+        self._schedule_retraining(active)
+        
+        # 3. Combinar, validar e filtrar por símbolo
+        for symbol, market_data in active.items():
+            try:
+                results[symbol] = self._finalize_prediction(
+                    symbol,
+                    market_data,
+                    ml_predictions[symbol],
+                    agent_decisions.get(symbol)
+                )
+            except Exception as e:
+                logging.error(f"Erro na predição ML: {e}")
+                results[symbol] = self._prediction_error(e, symbol)
+        
+        return results
+    
+    def _predict_ensemble(self, active: Dict[str, Dict]) -> Dict[str, Dict]:
+        """Predições do ensemble (em lote se suportado)"""
+        
+        if hasattr(self.ensemble_predictor, 'predict_batch'):
+            try:
+                return self.ensemble_predictor.predict_batch(active)
+            except Exception as e:
+                logging.warning(f"Erro ensemble prediction: {e}")
+                return {}
+        
+        predictions = {}
+        for symbol, market_data in active.items():
+            try:
+                predictions[symbol] = self.ensemble_predictor.predict(market_data)
+            except Exception as e:
+                logging.warning(f"Erro ensemble prediction: {e}")
+        return predictions
+    
+    def _multi_agent_decisions(self, active: Dict[str, Dict]) -> Dict[str, Dict]:
+        """Decisões do sistema multi-agente original por símbolo"""
+        
+        decisions = {}
+        for symbol, market_data in active.items():
+            try:
+                decisions[symbol] = self.multi_agent.make_trading_decision(market_data)
+            except Exception as e:
+                logging.warning(f"Erro integração multi-agent: {e}")
+        return decisions
+    
+    def _finalize_prediction(
+        self,
+        symbol: str,
+        market_data: Dict,
+        ml_predictions: List[Dict],
+        agent_decision: Optional[Dict]
+    ) -> Dict:
+        """Combina predições ML, aplica multi-agente, filtros e tracking"""
+        
+        # 3. Combinar predições ML
+        if not ml_predictions:
             return {
                 'action': 'hold',
                 'confidence': 0.0,
-                'reasoning': f'Erro no ML Manager: {str(e)[:100]}',
-                'source': 'error',
-                'error': str(e),
-                'symbol': symbol or 'UNKNOWN'
+                'reasoning': 'Nenhuma predição ML disponível',
+                'source': 'no_ml_models',
+                'symbol': symbol
             }
+        
+        combined_ml = self._combine_ml_predictions(ml_predictions)
+        
+        # 4. INTEGRAÇÃO COM SISTEMA MULTI-AGENTE ORIGINAL
+        if agent_decision:
+            # Boost confiança se agentes concordam
+            if agent_decision.get('action') == combined_ml.get('action'):
+                combined_ml['confidence'] *= 1.15  # 15% boost
+                combined_ml['confidence'] = min(combined_ml['confidence'], 0.95)
+                combined_ml['multi_agent_boost'] = True
+            
+            combined_ml['multi_agent_decision'] = agent_decision
+        
+        # 5. Aplicar thresholds finais
+        final_prediction = self._apply_final_filters(combined_ml, symbol)
+        
+        # 6. Logging e tracking
+        self._track_prediction(final_prediction, market_data)
+        
+        return final_prediction
+    
+    def _prediction_error(self, error: Exception, symbol: str) -> Dict:
+        logging.error(f"Erro na predição ML: {error}")
+        
+        return {
+            'action': 'hold',
+            'confidence': 0.0,
+            'reasoning': f'Erro no ML Manager: {str(error)[:100]}',
+            'source': 'error',
+            'error': str(error),
+            'symbol': symbol or 'UNKNOWN'
+        }
     
     def _dict_to_dataframe(self, market_data: Dict) -> pd.DataFrame:
         """Converte dict market_data para DataFrame"""
@@ -380,19 +509,63 @@ class MLManager:
         if symbol not in self.last_retrain:
             return True
         
-        last_retrain = self.last_retrain[symbol]
+        return (datetime.now() - self.last_retrain[symbol]) > self._retrain_threshold()
+    
+    def _retrain_threshold(self) -> timedelta:
+        """Idade máxima do modelo conforme retrain_frequency"""
+        
         retrain_freq = self.config.get('retrain_frequency', 'weekly')
         
         if retrain_freq == 'daily':
-            threshold = timedelta(days=1)
+            return timedelta(days=1)
         elif retrain_freq == 'weekly':
-            threshold = timedelta(weeks=1)
+            return timedelta(weeks=1)
         elif retrain_freq == 'monthly':
-            threshold = timedelta(days=30)
+            return timedelta(days=30)
         else:
-            threshold = timedelta(weeks=1)  # default
+            return timedelta(weeks=1)  # default
+    
+    def _schedule_retraining(self, symbols) -> int:
+        """Enfileira retreino dos símbolos com modelo ausente ou velho"""
+        
+        if not self.training_scheduler:
+            return 0
+        
+        scheduled = 0
+        for symbol in symbols:
+            if self._needs_retraining(symbol) and not self.training_scheduler.is_scheduled(symbol):
+                scheduled += self.training_scheduler.submit(symbol)
+        return scheduled
+    
+    def _publish_model(self, symbol: str, entry: Dict):
+        """
+        Publica um modelo treinado em background
         
-        return (datetime.now() - last_retrain) > threshold
+        Ordem: artefato gravado atomicamente -> registro no registry ->
+        troca do modelo no FreqAI Bridge. Se qualquer passo falhar, a
+        inferência continua com o modelo anterior.
+        """
+        
+        model_name = f"freqai_{entry['config'].get('model', 'lgb')}"
+        model_dir = Path(self.config['models_path']) / 'freqai' / symbol.replace('/', '_')
+        model_dir.mkdir(parents=True, exist_ok=True)
+        
+        model_path = dump_artifact(
+            entry,
+            model_dir / f"{model_name}_{entry['trained_at'].strftime('%Y%m%d_%H%M%S')}.joblib"
+        )
+        self.model_registry.register_model(
+            model_name=model_name,
+            strategy_name='freqai_bridge',
+            symbol=symbol,
+            model_path=str(model_path),
+            metrics={'accuracy': float(entry['accuracy'])},
+            hyperparameters=entry['config'],
+            model=entry
+        )
+        
+        self.freqai_bridge.install_model(symbol, entry)
+        self.last_retrain[symbol] = datetime.now()
     
     def _track_prediction(self, prediction: Dict, market_data: Dict):
         """Tracking de predições para análise"""
@@ -414,13 +587,21 @@ class MLManager:
         if len(self.prediction_history) > 1000:
             self.prediction_history = self.prediction_history[-1000:]
     
-    def train_models(self, symbol: str, training_data: pd.DataFrame = None) -> Dict:
+    def train_models(
+        self,
+        symbol: str,
+        training_data: pd.DataFrame = None,
+        background: bool = False,
+        priority: Optional[int] = None
+    ) -> Dict:
         """
         Treina modelos ML para símbolo específico
         
         Args:
             symbol: Símbolo para treinar
             training_data: Dados de treinamento (opcional)
+            background: Só enfileira no scheduler de treino e retorna
+            priority: Prioridade do job em background (maior primeiro)
             
         Returns:
             Resultado do treinamento
@@ -433,16 +614,23 @@ class MLManager:
             'errors': []
         }
         
+        if background and self.training_scheduler:
+            self.training_scheduler.submit(symbol, priority)
+            results['scheduled'] = True
+            return results
+        
         try:
             # 1. FreqAI model
             if self.freqai_bridge:
                 try:
                     freqai_config = {'model': 'lgb'}
-                    success = self.freqai_bridge.train_model(symbol, freqai_config)
+                    success = self.freqai_bridge.train_model(symbol, freqai_config, training_data)
                     
                     if success:
                         results['models_trained'].append('freqai')
                         self.last_retrain[symbol] = datetime.now()
+                        if self.training_scheduler:
+                            self.training_scheduler.mark_trained(symbol)
                     else:
                         results['errors'].append('FreqAI training failed')
                         
@@ -487,6 +675,9 @@ class MLManager:
                 freqai_info = self.freqai_bridge.get_model_info(symbol)
                 status['models']['freqai'] = freqai_info
             
+            if self.training_scheduler:
+                status['retrain_scheduled'] = self.training_scheduler.is_scheduled(symbol)
+            
             return status
         else:
             # Status geral
@@ -495,7 +686,8 @@ class MLManager:
                 'components': {
                     'freqai_bridge': self.freqai_bridge is not None,
                     'automl': self.automl_feature_engineer is not None,
-                    'ensemble': self.ensemble_predictor is not None
+                    'ensemble': self.ensemble_predictor is not None,
+                    'training_scheduler': self.training_scheduler is not None
                 },
                 'ai_system_integration': {
                     'ai_coordinator_available': self.ai_coordinator is not None,
@@ -508,6 +700,12 @@ class MLManager:
                 'config': self.config
             }
     
+    def shutdown(self):
+        """Libera os pools de inferência e de treino"""
+        self._executor.shutdown(wait=False)
+        if self.training_scheduler:
+            self.training_scheduler.stop()
+    
     def health_check(self) -> Dict:
         """Health check completo do ML Manager"""
         
@@ -523,6 +721,9 @@ class MLManager:
         if self.freqai_bridge:
             health['components']['freqai'] = self.freqai_bridge.health_check()
         
+        if self.training_scheduler:
+            health['components']['training_scheduler'] = self.training_scheduler.get_stats()
+        
         # 2. Integrações com sistema original
         if AI_SYSTEM_AVAILABLE:
             health['integrations']['original_ai'] = {
@@ -0,0 +1,165 @@
+"""Model Cache - LRU cache of loaded ML models shared by model stores."""
+
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import joblib
+
+
+def load_artifact(path: str, mmap_mode: Optional[str] = 'c') -> Any:
+    """
+    Load a joblib artifact.
+
+    Numpy arrays stored uncompressed in the file are memory-mapped instead of
+    copied into memory, so large arrays load in O(1). The default
+    copy-on-write mode ('c') keeps in-place updates (e.g. online learning)
+    private to the process and never touches the file.
+
+    Args:
+        path: Path to the joblib file
+        mmap_mode: numpy mmap mode ('r', 'c', 'r+') or None to disable
+
+    Returns:
+        Loaded object
+    """
+    return joblib.load(path, mmap_mode=mmap_mode)
+
+
+def dump_artifact(obj: Any, path: Path) -> Path:
+    """
+    Atomically write a joblib artifact (temp file + rename).
+
+    Readers never observe a partially written file: they either open the
+    previous version or the complete new one.
+
+    Args:
+        obj: Object to save
+        path: Destination path
+
+    Returns:
+        Destination path
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    joblib.dump(obj, tmp_path)
+    tmp_path.replace(path)
+    return path
+
+
+def file_stamp(path: Path) -> Optional[int]:
+    """Modification time (ns) used to detect replaced files, None if missing."""
+    try:
+        return Path(path).stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+class ModelCache:
+    """
+    Thread-safe LRU cache of loaded models.
+
+    Entries are keyed by (strategy, symbol, version). Each entry carries a
+    stamp (e.g. file mtime); a lookup with a different stamp reloads the
+    model. Concurrent lookups of the same missing key share a single load.
+    """
+
+    def __init__(self, max_models: int = 32):
+        self.max_models = max_models
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'loads': 0,
+            'evictions': 0,
+        }
+
+    def _lookup(self, key: Hashable, stamp: Any) -> tuple:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (stamp is None or entry[1] == stamp):
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return True, entry[0]
+            return False, None
+
+    def get(self, key: Hashable, loader: Callable[[], Any], stamp: Any = None) -> Any:
+        """
+        Return the cached model or load it.
+
+        Args:
+            key: Cache key, e.g. (strategy, symbol, version)
+            loader: Called (once) to load the model on a miss
+            stamp: Entry validator; a different stamp forces a reload
+
+        Returns:
+            Model
+        """
+        found, model = self._lookup(key, stamp)
+        if found:
+            return model
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # Another thread may have loaded it while we waited
+            found, model = self._lookup(key, stamp)
+            if found:
+                return model
+
+            with self._lock:
+                self.stats['misses'] += 1
+            model = loader()
+            self.put(key, model, stamp)
+            with self._lock:
+                self.stats['loads'] += 1
+            return model
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """Cached model without loading or touching the LRU order."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[0] if entry else None
+
+    def put(self, key: Hashable, model: Any, stamp: Any = None):
+        """Insert or replace a model (atomic for readers)."""
+        with self._lock:
+            self._entries[key] = (model, stamp)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_models:
+                evicted, _ = self._entries.popitem(last=False)
+                self._key_locks.pop(evicted, None)
+                self.stats['evictions'] += 1
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        """Drop one entry (or all)."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._key_locks.clear()
+            else:
+                self._entries.pop(key, None)
+                self._key_locks.pop(key, None)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return {
+                **self.stats,
+                'cached_models': len(self._entries),
+                'max_models': self.max_models,
+                'hit_rate': self.stats['hits'] / lookups if lookups else 0.0
+            }
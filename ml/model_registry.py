@@ -1,12 +1,14 @@
 """Model Registry for managing trained ML models."""
 
 import json
-import joblib
+import threading
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 import pandas as pd
 
+from .model_cache import ModelCache, load_artifact, file_stamp
+
 
 class ModelRegistry:
     """
@@ -17,26 +19,108 @@ class ModelRegistry:
     - Version control
     - Model metadata tracking
     - Performance metrics storage
+    - Cached model serving (LRU + memory-mapped loading)
+    
+    Registrations are appended to a journal (one JSON line each) instead of
+    rewriting the whole registry; the journal is folded into registry.json
+    every ``compact_every`` entries. The latest version per
+    (strategy, symbol[, model]) is kept in an in-memory index.
     """
 
-    def __init__(self, base_path: str = "models"):
+    def __init__(
+        self,
+        base_path: str = "models",
+        cache_size: int = 32,
+        mmap_mode: Optional[str] = 'c',
+        compact_every: int = 500
+    ):
         self.base_path = Path(base_path)
         self.base_path.mkdir(parents=True, exist_ok=True)
         
         self.metadata_file = self.base_path / "registry.json"
+        self.journal_file = self.base_path / "registry.journal.jsonl"
+        self.compact_every = compact_every
+        self.mmap_mode = mmap_mode
+        
+        self._lock = threading.RLock()
+        self._journal_entries = 0
         self.metadata = self._load_metadata()
+        
+        # (strategy, symbol, model_name) -> last version number
+        self._versions: Dict[Tuple[str, str, str], int] = {}
+        # (strategy, symbol, model_name | None) -> latest model_id
+        self._latest: Dict[Tuple[str, str, Optional[str]], str] = {}
+        for model_id, info in self.metadata.items():
+            self._index_model(model_id, info)
+        
+        self.model_cache = ModelCache(cache_size)
 
     def _load_metadata(self) -> Dict:
-        """Load registry metadata from file."""
+        """Load registry metadata from file (snapshot + journal)."""
+        metadata = {}
         if self.metadata_file.exists():
             with open(self.metadata_file, 'r') as f:
-                return json.load(f)
-        return {}
+                metadata = json.load(f)
+        
+        if self.journal_file.exists():
+            with open(self.journal_file, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Partial line from an interrupted write
+                    self._journal_entries += 1
+                    if entry.get('op') == 'register':
+                        metadata[entry['model_id']] = entry['info']
+                    elif entry.get('op') == 'delete':
+                        metadata.pop(entry['model_id'], None)
+        
+        return metadata
 
     def _save_metadata(self):
-        """Save registry metadata to file."""
-        with open(self.metadata_file, 'w') as f:
-            json.dump(self.metadata, f, indent=2, default=str)
+        """Save registry metadata to file (atomic) and reset the journal."""
+        with self._lock:
+            tmp_file = self.metadata_file.with_name(f".{self.metadata_file.name}.tmp")
+            with open(tmp_file, 'w') as f:
+                json.dump(self.metadata, f, indent=2, default=str)
+            tmp_file.replace(self.metadata_file)
+            
+            # Replaying the old journal over the new snapshot is idempotent,
+            # so a crash between the two steps loses nothing
+            self.journal_file.unlink(missing_ok=True)
+            self._journal_entries = 0
+
+    def _append_journal(self, entry: Dict):
+        """Append one registry change; compact when the journal grows."""
+        with self._lock:
+            with open(self.journal_file, 'a') as f:
+                f.write(json.dumps(entry, default=str) + '\n')
+            self._journal_entries += 1
+            
+            if self._journal_entries >= self.compact_every:
+                self._save_metadata()
+
+    def compact(self):
+        """Fold the journal into registry.json."""
+        self._save_metadata()
+
+    def _index_model(self, model_id: str, info: Dict):
+        """Update version counter and latest-model index for a model."""
+        name_key = (info['strategy_name'], info['symbol'], info['model_name'])
+        self._versions[name_key] = max(self._versions.get(name_key, 0), int(info.get('version', 0)))
+        
+        for key in (name_key, (info['strategy_name'], info['symbol'], None)):
+            current = self._latest.get(key)
+            if current is None or self.metadata[current]['created_at'] <= info['created_at']:
+                self._latest[key] = model_id
+
+    def _reindex_key(self, strategy_name: str, symbol: str):
+        """Rebuild the latest-model index of a (strategy, symbol) after deletion."""
+        for key in [k for k in self._latest if k[0] == strategy_name and k[1] == symbol]:
+            del self._latest[key]
+        for model_id, info in self.metadata.items():
+            if info['strategy_name'] == strategy_name and info['symbol'] == symbol:
+                self._index_model(model_id, info)
 
     def register_model(
         self,
@@ -45,7 +129,8 @@ class ModelRegistry:
         symbol: str,
         model_path: str,
         metrics: Dict[str, float],
-        hyperparameters: Dict[str, Any] = None
+        hyperparameters: Dict[str, Any] = None,
+        model: Any = None
     ) -> str:
         """
         Register a trained model in the registry.
@@ -57,24 +142,38 @@ class ModelRegistry:
             model_path: Path where model is saved
             metrics: Performance metrics
             hyperparameters: Model hyperparameters
+            model: Trained model object (optional) - served from the cache
+                right away instead of being loaded on first use
             
         Returns:
             Model ID
         """
         model_id = f"{strategy_name}_{symbol}_{model_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         
-        self.metadata[model_id] = {
-            'model_name': model_name,
-            'strategy_name': strategy_name,
-            'symbol': symbol,
-            'model_path': model_path,
-            'metrics': metrics,
-            'hyperparameters': hyperparameters or {},
-            'created_at': datetime.now().isoformat(),
-            'version': len([k for k in self.metadata.keys() if k.startswith(f"{strategy_name}_{symbol}_{model_name}")]) + 1
-        }
+        with self._lock:
+            version = self._versions.get((strategy_name, symbol, model_name), 0) + 1
+            info = {
+                'model_name': model_name,
+                'strategy_name': strategy_name,
+                'symbol': symbol,
+                'model_path': model_path,
+                'metrics': metrics,
+                'hyperparameters': hyperparameters or {},
+                'created_at': datetime.now().isoformat(),
+                'version': version
+            }
+            
+            if model is not None:
+                self.model_cache.put(self._cache_key(info), model, file_stamp(model_path))
+            
+            # Hot-swap: readers see the previous or the new version, never a mix
+            self.metadata[model_id] = info
+            self._index_model(model_id, info)
+            
+            # Journal after the in-memory update, so a compaction triggered
+            # by this entry snapshots it
+            self._append_journal({'op': 'register', 'model_id': model_id, 'info': info})
         
-        self._save_metadata()
         print(f"✅ Model registered: {model_id}")
         
         return model_id
@@ -100,21 +199,65 @@ class ModelRegistry:
         Returns:
             Model metadata dict or None
         """
-        matching_models = []
+        with self._lock:
+            model_id = self._latest.get((strategy_name, symbol, model_name))
+            if model_id is None:
+                return None
+            return {'model_id': model_id, **self.metadata[model_id]}
+
+    def _cache_key(self, info: Dict) -> Tuple[str, str, str]:
+        """(strategy, symbol, version) cache key of a registered model."""
+        return info['strategy_name'], info['symbol'], f"{info['model_name']}_v{info['version']}"
+
+    def load_model(self, model_id: str) -> Any:
+        """
+        Load a registered model (cached, numpy arrays memory-mapped).
         
-        for model_id, info in self.metadata.items():
-            if info['strategy_name'] == strategy_name and info['symbol'] == symbol:
-                if model_name is None or info['model_name'] == model_name:
-                    matching_models.append((model_id, info))
+        Args:
+            model_id: Model ID
+            
+        Returns:
+            Loaded model
+        """
+        info = self.get_model_info(model_id)
+        if info is None:
+            raise KeyError(f"Model not registered: {model_id}")
         
-        if not matching_models:
-            return None
+        model_path = Path(info['model_path'])
+        stamp = file_stamp(model_path)
+        if stamp is None:
+            raise FileNotFoundError(f"Model not found: {model_path}")
         
-        # Sort by creation date
-        matching_models.sort(key=lambda x: x[1]['created_at'], reverse=True)
+        return self.model_cache.get(
+            self._cache_key(info),
+            lambda: load_artifact(str(model_path), mmap_mode=self.mmap_mode),
+            stamp
+        )
+
+    def load_latest_model(
+        self,
+        strategy_name: str,
+        symbol: str,
+        model_name: Optional[str] = None
+    ) -> Optional[Any]:
+        """
+        Load the latest registered model for a strategy and symbol.
         
-        model_id, info = matching_models[0]
-        return {'model_id': model_id, **info}
+        Returns:
+            Loaded model or None if nothing is registered
+        """
+        latest = self.get_latest_model(strategy_name, symbol, model_name)
+        if latest is None:
+            return None
+        return self.load_model(latest['model_id'])
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Model cache and journal statistics."""
+        return {
+            **self.model_cache.get_stats(),
+            'registered_models': len(self.metadata),
+            'journal_entries': self._journal_entries
+        }
 
     def list_models(
         self,
@@ -193,17 +336,20 @@ class ModelRegistry:
             model_id: Model ID to delete
         """
         if model_id in self.metadata:
-            model_info = self.metadata[model_id]
-            model_path = Path(model_info['model_path'])
+            with self._lock:
+                model_info = self.metadata[model_id]
+                model_path = Path(model_info['model_path'])
+                
+                # Remove from metadata
+                del self.metadata[model_id]
+                self._reindex_key(model_info['strategy_name'], model_info['symbol'])
+                self.model_cache.invalidate(self._cache_key(model_info))
+                self._append_journal({'op': 'delete', 'model_id': model_id})
             
             # Delete model file
             if model_path.exists():
                 model_path.unlink()
             
-            # Remove from metadata
-            del self.metadata[model_id]
-            self._save_metadata()
-            
             print(f"✅ Model deleted: {model_id}")
         else:
             print(f"⚠️ Model not found: {model_id}")
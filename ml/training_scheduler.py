@@ -0,0 +1,509 @@
+"""Training Scheduler - background retraining in a process pool with resource budgets."""
+
+import heapq
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from prometheus_client import Counter, Gauge, Histogram
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    from threadpoolctl import threadpool_limits
+except ImportError:  # ships with scikit-learn
+    threadpool_limits = None
+
+logger = logging.getLogger(__name__)
+
+# === PROMETHEUS METRICS ===
+ml_training_queue_depth = Gauge(
+    'ml_training_queue_depth',
+    'Retrain jobs waiting in the training scheduler'
+)
+
+ml_training_jobs_running = Gauge(
+    'ml_training_jobs_running',
+    'Retrain jobs currently running in the training pool'
+)
+
+ml_training_job_duration_seconds = Histogram(
+    'ml_training_job_duration_seconds',
+    'Wall time of a retrain job (history load + fit)',
+    ['status'],
+    buckets=[1, 5, 10, 30, 60, 120, 300, 600, 1800]
+)
+
+ml_training_jobs_total = Counter(
+    'ml_training_jobs_total',
+    'Retrain jobs finished by the training scheduler',
+    ['status']
+)
+
+ml_model_staleness_seconds = Gauge(
+    'ml_model_staleness_seconds',
+    'Seconds since the model of a symbol was last published',
+    ['symbol']
+)
+
+
+# ----------------------------------------------------------------------
+# Worker side (runs in the pool processes)
+# ----------------------------------------------------------------------
+
+def load_history(symbol: str, history_config: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Load training candles from the local history store.
+
+    Uses the backtest DataManager parquet cache; whole-day ranges keep
+    repeated retrains of the same symbol on cache hits.
+
+    Args:
+        symbol: Trading pair
+        history_config: 'days', 'timeframe', 'exchange', 'cache_dir'
+
+    Returns:
+        OHLCV DataFrame (oldest first)
+    """
+    from backtest.data.data_manager import DataManager
+
+    end = datetime.now().date()
+    start = end - timedelta(days=history_config.get('days', 30))
+
+    manager = DataManager(cache_dir=history_config.get('cache_dir', 'data/backtest_cache'))
+    return manager.get_historical_data(
+        symbol,
+        start.strftime('%Y-%m-%d'),
+        end.strftime('%Y-%m-%d'),
+        timeframe=history_config.get('timeframe', '1h'),
+        exchange=history_config.get('exchange', 'binance')
+    )
+
+
+def _init_worker(memory_limit_mb: int, threads: int, niceness: int):
+    """Apply the per-process budgets once when a pool worker starts."""
+    # Native thread pools (OpenMP/BLAS) inherit the CPU budget of the job:
+    # env vars for libraries loaded later, threadpoolctl for numpy's BLAS,
+    # which is already loaded when the initializer runs
+    for var in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+        os.environ[var] = str(threads)
+    if threadpool_limits is not None:
+        threadpool_limits(limits=threads)
+
+    # Training yields the CPU to the inference process
+    if niceness and hasattr(os, 'nice'):
+        try:
+            os.nice(niceness)
+        except OSError:
+            pass
+
+    # Address-space cap: a runaway job fails with MemoryError instead of
+    # pushing the host (and the inference process) into swap
+    if memory_limit_mb and resource is not None:
+        limit = memory_limit_mb * 1024 * 1024
+        try:
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ValueError, OSError) as e:
+            logger.warning(f"Could not apply training memory limit: {e}")
+
+
+def run_training_job(
+    symbol: str,
+    model_config: Dict[str, Any],
+    history_config: Dict[str, Any],
+    history_loader: Callable[[str, Dict[str, Any]], pd.DataFrame]
+) -> Dict[str, Any]:
+    """
+    Load history and fit one symbol model (executed in a pool worker).
+
+    Returns:
+        {'entry': model entry or None, 'rows': history rows}
+    """
+    from .freqai_bridge import fit_symbol_model
+
+    # Model libraries imported by the job bring their own OpenMP pools
+    if threadpool_limits is not None:
+        threadpool_limits(limits=model_config.get('n_jobs', 1))
+
+    data = history_loader(symbol, history_config)
+    entry = fit_symbol_model(symbol, data, model_config)
+    return {'entry': entry, 'rows': len(data)}
+
+
+# ----------------------------------------------------------------------
+# Scheduler (runs in the serving process)
+# ----------------------------------------------------------------------
+
+class TrainingScheduler:
+    """
+    Background retraining of per-symbol models.
+
+    Jobs wait in a priority queue (highest priority first, FIFO within a
+    priority, at most one pending and one running job per symbol) and run
+    in a process pool sized by the CPU and memory budgets. A dispatcher
+    thread hands jobs to the pool and publishes finished models through
+    the ``publish`` callback, so neither submission nor publication ever
+    runs on the inference path.
+
+    The pool is started lazily on the first submitted job.
+    """
+
+    def __init__(
+        self,
+        config: Optional[Dict[str, Any]] = None,
+        publish: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+        history_loader: Callable[[str, Dict[str, Any]], pd.DataFrame] = load_history
+    ):
+        """
+        Args:
+            config: Scheduler configuration (see _default_config)
+            publish: Called as publish(symbol, entry) for every trained model
+            history_loader: Picklable function (symbol, history_config) -> OHLCV
+        """
+        self.config = {**self._default_config(), **(config or {})}
+        self.publish = publish
+        self.history_loader = history_loader
+
+        self.threads_per_job = max(1, int(self.config['threads_per_job']))
+        cpu_budget = self.config['cpu_budget'] or max(1, (os.cpu_count() or 2) // 2)
+        memory_slots = self.config['memory_budget_mb'] // max(1, self.config['memory_per_job_mb'])
+        self.max_workers = max(1, min(int(cpu_budget) // self.threads_per_job, int(memory_slots)))
+
+        self.retrain_interval = float(self.config['retrain_interval_seconds'])
+        self.symbol_priorities: Dict[str, int] = dict(self.config['symbol_priorities'])
+
+        self._lock = threading.Condition(threading.Lock())
+        # Heap of (-priority, seq, symbol); stale entries are skipped on pop
+        self._heap: List[tuple] = []
+        self._seq = 0
+        self._pending: Dict[str, tuple] = {}
+        self._running: Dict[str, float] = {}
+        self._finished: deque = deque()
+        self._last_trained: Dict[str, float] = {}
+        self._durations: deque = deque(maxlen=500)
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+        self.stats = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'pool_restarts': 0,
+        }
+
+    @staticmethod
+    def _default_config() -> Dict[str, Any]:
+        return {
+            'cpu_budget': None,            # cores for training (None = half the host)
+            'threads_per_job': 1,          # native threads per fit
+            'memory_budget_mb': 4096,      # total memory for training workers
+            'memory_per_job_mb': 2048,     # address-space cap per worker (0 = off)
+            'worker_niceness': 10,
+            'start_method': 'spawn',
+            'retrain_interval_seconds': 7 * 24 * 3600,
+            'symbol_priorities': {},
+            'model_config': {'model': 'lgb'},
+            'history': {'days': 30, 'timeframe': '1h', 'exchange': 'binance'},
+        }
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Start the pool and the dispatcher thread (idempotent)."""
+        with self._lock:
+            if self._thread is not None or self._stopped:
+                return
+            self._pool = self._create_pool()
+            self._thread = threading.Thread(
+                target=self._dispatch_loop,
+                name='ml-training-dispatcher',
+                daemon=True
+            )
+            self._thread.start()
+
+        logger.info(f"Training scheduler started with {self.max_workers} workers")
+
+    def _create_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context(self.config['start_method']),
+            initializer=_init_worker,
+            initargs=(
+                self.config['memory_per_job_mb'],
+                self.threads_per_job,
+                self.config['worker_niceness'],
+            )
+        )
+
+    def _replace_broken_pool(self, broken: ProcessPoolExecutor):
+        """
+        Recreate the pool after a worker died (e.g. under the memory cap).
+
+        A broken pool rejects every new job; only the first caller that
+        reports a given broken pool replaces it.
+        """
+        with self._lock:
+            if self._stopped or self._pool is not broken:
+                return
+            self._pool = self._create_pool()
+            self.stats['pool_restarts'] += 1
+
+        logger.warning("Training worker process died; process pool recreated")
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def stop(self, wait: bool = False):
+        """Stop dispatching; running jobs are awaited only if ``wait``."""
+        with self._lock:
+            self._stopped = True
+            self._lock.notify_all()
+            pool, thread = self._pool, self._thread
+
+        if thread is not None:
+            thread.join(timeout=5.0)
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+    # ------------------------------------------------------------------
+    # Submission (non-blocking, safe from the inference path)
+    # ------------------------------------------------------------------
+
+    def submit(self, symbol: str, priority: Optional[int] = None) -> bool:
+        """
+        Queue a retrain of ``symbol``.
+
+        A symbol already waiting keeps a single queue entry, raised to the
+        higher of both priorities.
+
+        Args:
+            symbol: Trading pair
+            priority: Higher runs first (None = configured symbol priority)
+
+        Returns:
+            True if a new job was queued
+        """
+        if priority is None:
+            priority = self.symbol_priorities.get(symbol, 0)
+
+        with self._lock:
+            if self._stopped:
+                return False
+
+            current = self._pending.get(symbol)
+            if current is not None and current[0] <= -priority:
+                return False
+
+            self._seq += 1
+            item = (-priority, self._seq, symbol)
+            heapq.heappush(self._heap, item)
+            self._pending[symbol] = item
+            is_new = current is None
+            if is_new:
+                self.stats['submitted'] += 1
+            ml_training_queue_depth.set(len(self._pending))
+            self._lock.notify_all()
+
+        if self._thread is None:
+            self.start()
+        return is_new
+
+    def needs_retraining(self, symbol: str) -> bool:
+        """O(1): no model yet or older than the retrain interval."""
+        last = self._last_trained.get(symbol)
+        return last is None or (time.time() - last) > self.retrain_interval
+
+    def is_scheduled(self, symbol: str) -> bool:
+        """Job waiting or running for ``symbol``."""
+        with self._lock:
+            return symbol in self._pending or symbol in self._running
+
+    def mark_trained(self, symbol: str, when: Optional[float] = None):
+        """Record a model published outside the scheduler (e.g. sync training)."""
+        with self._lock:
+            self._last_trained[symbol] = when if when is not None else time.time()
+
+    # ------------------------------------------------------------------
+    # Dispatcher
+    # ------------------------------------------------------------------
+
+    def _next_job(self) -> Optional[str]:
+        """Pop the best pending symbol that is not already running (lock held)."""
+        deferred = []
+        symbol = None
+        while self._heap:
+            item = heapq.heappop(self._heap)
+            if self._pending.get(item[2]) is not item:
+                continue  # superseded by a higher priority entry
+            if item[2] in self._running:
+                deferred.append(item)
+                continue
+            del self._pending[item[2]]
+            symbol = item[2]
+            break
+        for item in deferred:
+            heapq.heappush(self._heap, item)
+        return symbol
+
+    def _dispatch_loop(self):
+        while True:
+            with self._lock:
+                while not self._stopped and not self._finished and not (
+                    self._pending and len(self._running) < self.max_workers
+                    and self._has_runnable()
+                ):
+                    self._lock.wait(timeout=30.0)
+                    self._refresh_staleness()
+
+                if self._stopped:
+                    return
+
+                finished = list(self._finished)
+                self._finished.clear()
+
+                launched = []
+                while len(self._running) < self.max_workers:
+                    symbol = self._next_job()
+                    if symbol is None:
+                        break
+                    self._running[symbol] = time.perf_counter()
+                    launched.append(symbol)
+
+                ml_training_queue_depth.set(len(self._pending))
+                ml_training_jobs_running.set(len(self._running))
+
+            for symbol in launched:
+                self._launch(symbol)
+
+            for symbol, started, future, pool in finished:
+                self._complete(symbol, started, future, pool)
+
+    def _has_runnable(self) -> bool:
+        return any(symbol not in self._running for symbol in self._pending)
+
+    def _launch(self, symbol: str):
+        pool = self._pool
+        try:
+            future = pool.submit(
+                run_training_job,
+                symbol,
+                {**self.config['model_config'], 'n_jobs': self.threads_per_job},
+                self.config['history'],
+                self.history_loader
+            )
+        except BrokenProcessPool as e:
+            # The job never ran: recreate the pool and queue it again
+            logger.warning(f"Training job for {symbol} not started: {e}")
+            self._replace_broken_pool(pool)
+            self._requeue(symbol)
+            return
+        except RuntimeError as e:  # pool shut down
+            logger.warning(f"Training job for {symbol} not started: {e}")
+            with self._lock:
+                self._running.pop(symbol, None)
+            return
+
+        started = self._running[symbol]
+        future.add_done_callback(lambda f, s=symbol, t=started, p=pool: self._on_done(s, t, f, p))
+
+    def _requeue(self, symbol: str):
+        """Put a job that could not start back in the queue."""
+        with self._lock:
+            self._running.pop(symbol, None)
+            if self._stopped or symbol in self._pending:
+                return
+            self._seq += 1
+            item = (-self.symbol_priorities.get(symbol, 0), self._seq, symbol)
+            heapq.heappush(self._heap, item)
+            self._pending[symbol] = item
+            ml_training_queue_depth.set(len(self._pending))
+            self._lock.notify_all()
+
+    def _on_done(self, symbol: str, started: float, future: Future, pool: ProcessPoolExecutor):
+        # Executor callback thread: hand off to the dispatcher and return
+        with self._lock:
+            self._finished.append((symbol, started, future, pool))
+            self._lock.notify_all()
+
+    def _complete(self, symbol: str, started: float, future: Future, pool: ProcessPoolExecutor):
+        """Record metrics and publish a finished job (dispatcher thread)."""
+        duration = time.perf_counter() - started
+        entry = None
+        try:
+            if not future.cancelled():
+                entry = future.result()['entry']
+        except BrokenProcessPool as e:
+            logger.error(f"Training job for {symbol} failed: {e}")
+            self._replace_broken_pool(pool)
+        except Exception as e:
+            logger.error(f"Training job for {symbol} failed: {e}")
+
+        published = False
+        if entry is not None:
+            try:
+                if self.publish is not None:
+                    self.publish(symbol, entry)
+                published = True
+            except Exception as e:
+                logger.error(f"Publishing model for {symbol} failed: {e}")
+
+        status = 'completed' if published else 'failed'
+        ml_training_job_duration_seconds.labels(status=status).observe(duration)
+        ml_training_jobs_total.labels(status=status).inc()
+
+        with self._lock:
+            self._running.pop(symbol, None)
+            self._durations.append(duration)
+            self.stats[status] += 1
+            if published:
+                self._last_trained[symbol] = time.time()
+                ml_model_staleness_seconds.labels(symbol=symbol).set(0.0)
+            ml_training_jobs_running.set(len(self._running))
+
+    def _refresh_staleness(self):
+        now = time.time()
+        for symbol, last in self._last_trained.items():
+            ml_model_staleness_seconds.labels(symbol=symbol).set(now - last)
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refresh_staleness()
+            durations = np.fromiter(self._durations, dtype=np.float64)
+            now = time.time()
+            staleness = np.fromiter(
+                (now - last for last in self._last_trained.values()),
+                dtype=np.float64
+            )
+            return {
+                **self.stats,
+                'queue_depth': len(self._pending),
+                'running': len(self._running),
+                'max_workers': self.max_workers,
+                'threads_per_job': self.threads_per_job,
+                'memory_per_job_mb': self.config['memory_per_job_mb'],
+                'job_duration_avg': float(durations.mean()) if durations.size else 0.0,
+                'job_duration_p95': float(np.percentile(durations, 95)) if durations.size else 0.0,
+                'job_duration_max': float(durations.max()) if durations.size else 0.0,
+                'models_tracked': len(self._last_trained),
+                'staleness_max': float(staleness.max()) if staleness.size else 0.0,
+                'staleness_avg': float(staleness.mean()) if staleness.size else 0.0,
+                'stale_models': int((staleness > self.retrain_interval).sum()),
+            }